@@ -0,0 +1,203 @@
+import os
+import json
+import functools
+import threading
+import multiprocessing
+
+from server.cache import ProgramCache
+from server.capture import install_streams, installed_streams
+from server.job import Job, INVALID_REQUEST_STATUS
+from lexical.exception import LexicalException
+from syntactic.exception import SyntacticException
+from execution.exception import ExecutionException
+
+# Compiled programs inherited (or received once) by the worker process.
+_worker_programs = None
+_worker_options = None
+# Shared memory blocks of the matrices attached by the worker process.
+_worker_blocks = []
+
+
+class BatchJob:
+    """
+    BatchJob is the single entry of the batch manifest.
+
+    Manifest is the JSON-lines file, where each line describes single
+    execution: 'program' path (relative to the manifest directory),
+    optional 'input' read by the cin function (text or list of numbers)
+    and optional 'id' of the job reported back (line number by default).
+    """
+
+    def __init__(self, identifier, program, stdin):
+        self.identifier = identifier
+        self.program = program
+        self.stdin = stdin
+        self.program_index = None
+        self.response = None
+
+    @staticmethod
+    def parse(line, line_number, directory):
+        """
+        Parses single manifest line.
+
+        :param line: manifest line.
+        :param line_number: number of the line, starting from 1.
+        :param directory: directory of the manifest.
+        :return: BatchJob of the line; invalid line has its error response set.
+        """
+        job = BatchJob(line_number, None, '')
+        try:
+            entry = json.loads(line)
+            job.identifier = entry.get('id', line_number)
+            job.program = os.path.join(directory, entry['program'])
+            stdin = entry.get('input', '')
+            job.stdin = '\n'.join(str(value) for value in stdin) if type(stdin) is list else str(stdin)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            job.response = _invalid_response(f'Error: Invalid manifest line {line_number}; {e!r}\n')
+        return job
+
+
+class BatchRunner:
+    """
+    Class executing many programs, or many inputs of programs, at once.
+
+    Each distinct program is parsed once, by the runner process; worker
+    processes receive the compiled programs when they start, so they
+    execute the jobs with NumPy already imported and nothing to parse.
+    Workers are replaced after JOBS_PER_WORKER jobs, which bounds the
+    memory they may accumulate. Report contains single JSON line per
+    job, in the manifest order.
+    """
+
+    default_options = {
+        'PROCESSES': None,
+        'JOBS_PER_WORKER': 100,
+        'TIMEOUT': None,
+        'INTERPRETER_OPTIONS': None,
+        'SHARED_MATRICES': None
+    }
+
+    def __init__(self, options=None):
+        """
+        BatchRunner constructor.
+
+        :param options: runner options, see default_options; shared
+            matrices are given as entered SharedMatrices context.
+        """
+        self.options = ({**BatchRunner.default_options, **options}
+                        if options is not None
+                        else BatchRunner.default_options)
+
+    def run(self, manifest_path, report):
+        """
+        Executes jobs of the manifest.
+
+        :param manifest_path: path of the JSON-lines manifest.
+        :param report: text stream, which the JSON-lines report is written to.
+        """
+        directory = os.path.dirname(os.path.abspath(manifest_path))
+        with open(manifest_path, encoding='utf-8') as manifest:
+            jobs = [
+                BatchJob.parse(line, line_number, directory)
+                for line_number, line in enumerate(manifest, 1)
+                if line.strip()
+            ]
+        programs = self.__compile_programs(jobs)
+        pending = [(job.program_index, job.stdin) for job in jobs if job.response is None]
+
+        if pending:
+            context = multiprocessing.get_context()
+            if context.get_start_method() == 'forkserver':
+                context.set_forkserver_preload(['numpy', 'execution.interpreter'])
+            with context.Pool(
+                    self.options['PROCESSES'],
+                    initializer=_initialize_worker,
+                    initargs=(programs, self.options['INTERPRETER_OPTIONS'], self.__shared_matrices()),
+                    maxtasksperchild=self.options['JOBS_PER_WORKER']
+            ) as pool:
+                responses = pool.imap(_run_job, [(*task, self.options['TIMEOUT']) for task in pending])
+                self.__write_report(jobs, responses, report)
+        else:
+            self.__write_report(jobs, iter(()), report)
+
+    def __compile_programs(self, jobs):
+        # Programs are identified by their source code, so the same
+        # program listed under different paths is parsed once as well.
+        cache = ProgramCache(len(jobs))
+        programs = []
+        indexes = {}
+        for job in jobs:
+            if job.response is not None:
+                continue
+            try:
+                with open(job.program, encoding='utf-8') as file:
+                    source_code = file.read()
+            except OSError as e:
+                job.response = _invalid_response(f'Error: {e}\n')
+                continue
+            if source_code not in indexes:
+                indexes[source_code] = len(programs)
+                programs.append(self.__compile(cache, source_code))
+            program = programs[indexes[source_code]]
+            if type(program) is dict:
+                # Invalid program, its errors are reported by each job.
+                job.response = program
+            else:
+                job.program_index = indexes[source_code]
+        return programs
+
+    def __compile(self, cache, source_code):
+        options = (self.options['INTERPRETER_OPTIONS'] or {}).get('COMPILER_OPTIONS')
+        try:
+            return cache.compile(source_code, options)[0]
+        except (LexicalException, SyntacticException, ExecutionException):
+            # Job reports the compilation errors the same way as the
+            # server and the interpreter do; it never gets to execution.
+            with installed_streams():
+                response = Job(functools.partial(cache.compile, source_code, options), '', None).run()
+            del response['cached']
+            return response
+
+    def __shared_matrices(self):
+        shared = self.options['SHARED_MATRICES']
+        return shared.descriptions if shared is not None else {}
+
+    @staticmethod
+    def __write_report(jobs, responses, report):
+        for job in jobs:
+            response = job.response if job.response is not None else next(responses)
+            report.write(json.dumps({'id': job.identifier, 'program': job.program, **response}) + '\n')
+            report.flush()
+
+
+def _invalid_response(message):
+    return {'status': INVALID_REQUEST_STATUS, 'stdout': '', 'stderr': message, 'time': 0.0}
+
+
+def _initialize_worker(programs, options, shared_matrices):
+    global _worker_programs, _worker_options
+    matrices = {}
+    for name, shared_matrix in shared_matrices.items():
+        block, matrices[name] = shared_matrix.attach()
+        _worker_blocks.append(block)
+    _worker_programs = programs
+    _worker_options = {**(options if options is not None else {}), 'SHARED_MATRICES': matrices}
+    # Worker process lives only for the batch, so the streams are
+    # never restored.
+    install_streams()
+
+
+def _run_job(task):
+    program_index, stdin, timeout = task
+    job = Job(lambda: (_worker_programs[program_index], True), stdin, _worker_options)
+    timer = None
+    if timeout is not None:
+        timer = threading.Timer(timeout, job.cancel)
+        timer.start()
+    try:
+        response = job.run()
+    finally:
+        if timer is not None:
+            timer.cancel()
+    del response['cached']
+    return {**response, 'worker': os.getpid()}
@@ -0,0 +1,62 @@
+"""
+Benchmark comparing peak resident memory of the program with and
+without releasing the variables dead after their last read.
+
+Program computes the chain of intermediate matrices, each read only
+by the next statement. Every measurement runs in a separate process,
+which reports its own peak resident set size. Run from the repository
+root:
+
+    python -m benchmark.liveness_memory [size]
+"""
+import sys
+import time
+import subprocess
+
+from data.source.pipeline import positional_string_source_pipe
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from execution.interpreter import Interpreter
+from benchmark.out_of_core_matmul import peak_rss_mb
+
+
+program = """
+main() {{
+    a = full({size}, {size}, 1)
+    b = a * 2
+    c = b + 1
+    d = c * 3
+    e = d - 1
+    f = e * 0.5
+    print(f[0, 0])
+}}
+"""
+
+
+def measure(size, release):
+    interpreter = Interpreter(
+        SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(program.format(size=size)))),
+        {'RELEASE_DEAD_VARIABLES': release}
+    )
+    start = time.perf_counter()
+    interpreter.execute()
+    elapsed = time.perf_counter() - start
+    print(f'{elapsed:.2f} {peak_rss_mb():.1f}')
+
+
+def run(size):
+    matrix_mb = size * size * 8 / 2 ** 20
+    print(f'Intermediates: 6 matrices {size}x{size}, {matrix_mb:.1f} MB each')
+    for label, release in [('kept', False), ('released', True)]:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmark.liveness_memory', 'measure', str(size), str(int(release))],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        print(f'{label:>8}: time {output[-2]} s, peak RSS {output[-1]} MB')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['measure']:
+        measure(int(sys.argv[2]), bool(int(sys.argv[3])))
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
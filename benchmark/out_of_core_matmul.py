@@ -0,0 +1,88 @@
+"""
+Benchmark comparing peak resident memory of in-core and tiled
+multiplication of memory mapped matrices.
+
+Every measurement runs in a separate process, which reports its own
+peak resident set size. Run from the repository root:
+
+    python -m benchmark.out_of_core_matmul [size] [tile size]
+"""
+import os
+import sys
+import time
+import resource
+import tempfile
+import subprocess
+import numpy as np
+
+from data.source.pipeline import positional_string_source_pipe
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from execution.interpreter import Interpreter
+
+
+program = """
+main() {{
+    a = load("{directory}/a.npy", "r")
+    b = load("{directory}/b.npy", "r")
+    c = a * b
+    return c[0, 0]
+}}
+"""
+
+
+def measure(directory, threshold, tile_size):
+    interpreter = Interpreter(
+        SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(program.format(directory=directory)))),
+        {'OUT_OF_CORE_THRESHOLD': threshold, 'OUT_OF_CORE_TILE_SIZE': tile_size, 'OUT_OF_CORE_DIRECTORY': directory}
+    )
+    start = time.perf_counter()
+    interpreter.execute()
+    elapsed = time.perf_counter() - start
+    print(f'{elapsed:.2f} {peak_rss_mb():.1f}')
+
+
+def peak_rss_mb():
+    # Peak resident set size reported by getrusage survives the exec call,
+    # so it would include the memory of the parent process. The VmHWM
+    # entry describes the current process image only.
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # On Linux and BSD maximal resident set size is reported in kilobytes.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(size, tile_size):
+    with tempfile.TemporaryDirectory() as directory:
+        generator = np.random.default_rng(0)
+        for name in ['a', 'b']:
+            # Operands are written in row blocks, so the benchmark itself
+            # never holds the whole matrix in memory.
+            matrix = np.lib.format.open_memmap(
+                os.path.join(directory, f'{name}.npy'), mode='w+', dtype=np.float64, shape=(size, size)
+            )
+            for row in range(0, size, tile_size):
+                matrix[row:row + tile_size] = generator.random((min(tile_size, size - row), size))
+            matrix.flush()
+            del matrix
+        operand_mb = size * size * 8 / 2 ** 20
+        print(f'Operands: {size}x{size} float64, {operand_mb:.1f} MB each, tile size {tile_size}')
+        for label, threshold in [('in-core', 2 ** 62), ('tiled', 0)]:
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmark.out_of_core_matmul', 'measure', directory, str(threshold),
+                 str(tile_size)],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            print(f'{label:>8}: time {output[0]} s, peak RSS {output[1]} MB')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['measure']:
+        measure(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 3000, int(sys.argv[2]) if len(sys.argv) > 2 else 512)
@@ -43,3 +43,13 @@ class RawStringSource:
         return (self.content[self.pos]
                 if self.pos < len(self.content)
                 else '')
+
+    def set_position(self, position):
+        self.pos = position - 1
+
+    def get_line(self):
+        start = self.pos + 1
+        end = self.content.find('\n', start)
+        end = len(self.content) if end == -1 else end + 1
+        self.pos = end - 1
+        return self.content[start:end]
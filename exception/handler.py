@@ -139,6 +139,9 @@ class ExceptionHandler:
         elif type(exception) is UndefinedVariableException:
             e_print(f'Error: Usage of undefined variable')
             ExceptionHandler.__print_exception_stack(exception)
+        elif type(exception) is ExecutionCancelledException:
+            e_print(f'Error: Execution cancelled')
+            ExceptionHandler.__print_exception_stack(exception)
         else:
             e_print(f'Error: Execution exception appeared')
 
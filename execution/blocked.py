@@ -0,0 +1,67 @@
+import mmap
+import tempfile
+import numpy as np
+
+
+def blocked_matmul(left, right, tile_size, directory=None):
+    """
+    Multiplies matrices tile by tile, writing the result into memory mapped file.
+
+    Only single tile of each operand and of the result is processed at
+    once, so matrices larger than the available memory can be multiplied.
+    Pages of memory mapped operands are released after each tile, so
+    the resident memory of the process stays bounded by the tile size.
+
+    Matrices dimensions mismatch is reported with ValueError, the same
+    way as numpy.matmul does.
+
+    :param left: left operand of the multiplication.
+    :param right: right operand of the multiplication.
+    :param tile_size: number of rows and columns of the single tile.
+    :param directory: directory of the temporary result file, system default if None.
+    :return: numpy.memmap containing the result.
+    :raise OSError: temporary result file could not be created or written.
+    """
+    rows, inner = left.shape
+    if inner != right.shape[0]:
+        raise ValueError(f'matmul: dimensions mismatch {left.shape} and {right.shape}')
+    cols = right.shape[1]
+    dtype = np.result_type(left.dtype, right.dtype)
+    if rows == 0 or cols == 0:
+        # Empty files can not be memory mapped.
+        return np.zeros((rows, cols), dtype=dtype)
+    # Temporary file is removed from the file system immediately, so the
+    # result file lives as long as the memory mapping, which keeps its own
+    # descriptor of the file.
+    with tempfile.TemporaryFile(dir=directory) as file:
+        result = np.memmap(file, dtype=dtype, mode='w+', shape=(rows, cols))
+
+    for i in range(0, rows, tile_size):
+        for j in range(0, cols, tile_size):
+            tile = np.zeros((min(tile_size, rows - i), min(tile_size, cols - j)), dtype=dtype)
+            for k in range(0, inner, tile_size):
+                left_tile = left[i:i + tile_size, k:k + tile_size]
+                right_tile = right[k:k + tile_size, j:j + tile_size]
+                tile += np.matmul(left_tile, right_tile)
+                _release_pages(left_tile)
+                _release_pages(right_tile)
+            result[i:i + tile_size, j:j + tile_size] = tile
+            _release_pages(result[i:i + tile_size, j:j + tile_size])
+
+    return result
+
+
+def _release_pages(array):
+    # Releasing the pages of shared file mappings keeps them in the page
+    # cache (dirty pages are still written back to the file), but stops
+    # counting them into the resident memory of the process.
+    # Private mappings are skipped, since releasing their pages would
+    # discard the modifications.
+    mapping = getattr(array, '_mmap', None)
+    if mapping is None or array.mode == 'c' or not hasattr(mmap, 'MADV_DONTNEED'):
+        return
+    base = np.frombuffer(mapping, dtype=np.uint8).__array_interface__['data'][0]
+    low = array.__array_interface__['data'][0]
+    high = low + sum((n - 1) * s for n, s in zip(array.shape, array.strides)) + array.itemsize
+    start = (low - base) // mmap.PAGESIZE * mmap.PAGESIZE
+    mapping.madvise(mmap.MADV_DONTNEED, start, high - base - start)
@@ -0,0 +1,15 @@
+class CancellationToken:
+    """
+    CancellationToken requests cooperative cancellation of the execution.
+
+    Interpreter checks the token before every loop iteration and every
+    program function call, so cancelled execution stops at the next of
+    them; single long library call or matrix operation is not interrupted.
+    Token is shared by the interpreter and its forks.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
@@ -67,3 +67,8 @@ class IndexException(WithStackTraceException):
 class UndefinedVariableException(WithStackTraceException):
     def __init__(self):
         super().__init__()
+
+
+class ExecutionCancelledException(WithStackTraceException):
+    def __init__(self):
+        super().__init__()
@@ -1,36 +1,149 @@
 import numpy as np
 
-from execution.variable import Variable, VariableType
-from execution.libraries import StandardLibrary
+from execution.variable import Variable, VariableType, StructuredVariable
+from execution.libraries import StandardLibrary, e_print
+from execution.blocked import blocked_matmul
+from execution.program import CompiledProgram
+from execution.cancellation import CancellationToken
+from execution.parallel import ParallelStatementEvaluator, ParallelArgumentsEvaluator, ContextThreadPoolExecutor
 from execution.stacks import FunctionStack
+from execution.structured import pending, combined, negated
+from execution.sparse import combined as combined_sparse, negated as negated_sparse
+from execution.scalars import matrix_element
 from execution.exception import *
+from syntax_tree.constructions import ElementIndex, FunctionDefinition
 
 
 class Interpreter:
-    def __init__(self, parser):
+    default_options = {
+        'OUT_OF_CORE_THRESHOLD': 2 ** 30,
+        'OUT_OF_CORE_TILE_SIZE': 1024,
+        'OUT_OF_CORE_DIRECTORY': None,
+        'PARALLEL_STATEMENTS': False,
+        'PARALLEL_ARGUMENTS': False,
+        'PARALLEL_WORKERS': None,
+        'SHARED_MATRICES': {},
+        'RELEASE_DEAD_VARIABLES': True,
+        'COMPILER_OPTIONS': {}
+    }
+
+    def __init__(self, parser, options=None, program=None, cancellation=None):
+        # Interpreter is the execution context of the program. Contexts
+        # created with the same compiled program share it, so the program
+        # is parsed only once and may be executed by many threads at once.
         self.parser = parser
+        self.options = ({**Interpreter.default_options, **options}
+                        if options is not None
+                        else Interpreter.default_options)
+        if self.options['OUT_OF_CORE_TILE_SIZE'] <= 0:
+            raise ValueError(f'OUT_OF_CORE_TILE_SIZE must be positive, got {self.options["OUT_OF_CORE_TILE_SIZE"]}')
+        self.program = None
         self.program_functions = {}
         self.lib_functions = {}
+        self.pure_functions = frozenset(StandardLibrary.pure_functions)
+        # Ids of the constructions, which type checks are proven to pass.
+        self.checked_constructions = frozenset()
+        # Ids of the multiplicative expressions of numbers only.
+        self.scalar_products = frozenset()
+        # Ids of the expressions mapped into the functions evaluating them
+        # on plain numbers.
+        self.scalar_expressions = {}
+        # Ids of the function calls mapped into the called functions.
+        self.call_targets = {}
+        # Ids of the statements mapped into the variables dead after them.
+        self.dead_variables = {}
         self.stack = FunctionStack()
+        self.cancellation = cancellation if cancellation is not None else CancellationToken()
         self.result = None
         self.returns = False
+        # Arguments of the innermost inlined call, read by its expression.
+        self.inlined_arguments = []
+        # Tiers of the program functions and name of the evaluated one.
+        self.tiers = None
+        self.function = None
         # Invariant: result contains recent variable result of
         # execution and returns is a flag informing about
         # return statement being executed.
-
-        self.__load_library_functions()
+        self.executor = None
+        self.parallel_evaluator = None
+        self.arguments_evaluator = None
+        # Rows streams opened by the execution, closed when it ends.
+        self.streams = []
+
+        if program is not None:
+            self.__load_compiled_program(program)
+        else:
+            self.__load_library_functions()
 
     def execute(self):
-        self.parser.construct_program().accept(self)
+        if self.program is None:
+            self.__load_compiled_program(CompiledProgram.compile(self.parser, self.options['COMPILER_OPTIONS']))
+        try:
+            self.program.program.accept(self)
+        finally:
+            self.__shutdown_executor()
+            self.__close_streams()
+
+    def call(self, identifier, args):
+        """
+        Calls the function of the program with already evaluated arguments.
+
+        :param identifier: name of the program or library function.
+        :param args: list of argument variables.
+        :return: variable returned by the function.
+        """
+        if self.program is None:
+            self.__load_compiled_program(CompiledProgram.compile(self.parser, self.options['COMPILER_OPTIONS']))
+        try:
+            self.__call_function(identifier, args)
+            return self.result
+        finally:
+            self.__shutdown_executor()
+            self.__close_streams(self.result)
+
+    def __close_streams(self, returned=None):
+        # Stream returned by the called function is closed by the caller.
+        if isinstance(returned, Variable) and returned.type == VariableType.STREAM:
+            returned = returned.value
+        for stream in self.streams:
+            if stream is not returned:
+                stream.close()
+        self.streams = []
+
+    def __shutdown_executor(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+            self.parallel_evaluator = None
+            self.arguments_evaluator = None
+
+    def fork(self):
+        # Forked interpreter evaluates sequentially in the current context
+        # of this interpreter; it is used by the worker threads, which
+        # must not wait for the other tasks of the same thread pool.
+        forked = Interpreter(
+            None,
+            {**self.options, 'PARALLEL_STATEMENTS': False, 'PARALLEL_ARGUMENTS': False},
+            self.program,
+            self.cancellation
+        )
+        forked.stack = self.stack.fork()
+        forked.streams = self.streams
+        forked.inlined_arguments = self.inlined_arguments
+        forked.function = self.function
+        return forked
 
     def evaluate_program(self, program):
         # Store program functions definitions for performing function
         # calls arguments binding.
-        self.__load_program_functions(program)
+        if self.program is None or \
+                (program is not self.program.program and program is not self.program.parsed_program):
+            self.__load_compiled_program(CompiledProgram(program, self.options['COMPILER_OPTIONS']))
         # Without main there is no possibility to execute the program.
-        if 'main' not in program.functions_definitions:
+        if 'main' not in self.program_functions:
             raise MissingMainException()
-        main = program.functions_definitions['main']
+        main = self.program_functions['main']
+        self.function = 'main'
         try:
             main.accept(self)
         except WithStackTraceException as e:
@@ -47,18 +160,33 @@ class Interpreter:
     def evaluate_statement_block(self, statement_block):
         # Statement block always creates new scope of execution.
         self.stack.open_scope()
+        if self.options['PARALLEL_STATEMENTS']:
+            self.__parallel_statement_evaluator().evaluate_statements(statement_block)
+            self.stack.close_scope()
+            return
         for statement in statement_block.statements:
             try:
                 statement.accept(self)
                 if self.returns:
                     # Break since we have to close scope before returning.
                     break
+                if (names := self.dead_variables.get(id(statement))) is not None:
+                    self.release_variables(names)
             except WithStackTraceException as e:
                 e.stack.append('evaluate statement block')
                 raise e
         # Statement block ended, time to close the scope.
         self.stack.close_scope()
 
+    def release_variables(self, names):
+        # Matrices never read again are released, so their memory may be
+        # freed before the scope is closed; variables keep their types,
+        # so later assignments are checked the same way.
+        for name in names:
+            variable = self.stack.find_variable(name)
+            if variable is not None and variable.type == VariableType.MATRIX:
+                variable.value = None
+
     def evaluate_if_statement(self, if_statement):
         try:
             self.__evaluate_condition(if_statement.condition)
@@ -71,16 +199,76 @@ class Interpreter:
             raise e
 
     def evaluate_until_statement(self, until_statement):
+        if until_statement.invariants:
+            # Invariants are stored in the scope of the loop, so they are
+            # computed again, when the loop is executed next time.
+            self.stack.open_scope()
+            for name in until_statement.invariants:
+                self.stack.set_variable(name, Variable(VariableType.UNDEFINED, None))
+        iterations = 0
         try:
             self.__evaluate_condition(until_statement.condition)
             while self.result:
+                if self.cancellation.cancelled:
+                    raise ExecutionCancelledException()
+                iterations += 1
                 until_statement.statement_block.accept(self)
                 if self.returns:
-                    return
+                    break
+                if self.tiers is not None and iterations == self.tiers.osr_threshold and \
+                        (translated := self.tiers.loop(until_statement, self.stack)) is not None and \
+                        translated.run(self):
+                    # Rest of the loop was evaluated by the translated one.
+                    break
                 self.__evaluate_condition(until_statement.condition)
         except WithStackTraceException as e:
             e.stack.append('evaluate until statement')
             raise e
+        finally:
+            if self.tiers is not None and iterations:
+                self.tiers.iterated(self.function, iterations)
+        if until_statement.invariants:
+            self.stack.close_scope()
+
+    def evaluate_loop_invariant(self, invariant):
+        variable = self.__stored_variable(invariant.expression, invariant.name)
+        if variable.structure is not None:
+            self.result = StructuredVariable(variable.structure)
+            return
+        self.result = Variable(variable.type, variable.value)
+
+    def evaluate_common_expression(self, common):
+        # Common expressions of the statement block are stored in its
+        # scope, which is the current one.
+        variable = self.__stored_variable(common.expression, common.name)
+        if common.copied and variable.type == VariableType.MATRIX:
+            if (structure := pending(variable)) is not None:
+                self.result = StructuredVariable(structure.copy())
+                return
+            self.result = Variable(variable.type, variable.value.copy())
+            return
+        if common.copied and variable.type == VariableType.SPARSE:
+            self.result = Variable(variable.type, variable.value.copy())
+            return
+        if variable.structure is not None:
+            self.result = StructuredVariable(variable.structure)
+            return
+        self.result = Variable(variable.type, variable.value)
+
+    def __stored_variable(self, expression, name):
+        # Returns variable storing the value of the expression, which is
+        # evaluated, when the variable is not set yet.
+        variable = self.stack.get_variable(name)
+        if variable.type == VariableType.UNDEFINED:
+            expression.accept(self)
+            if self.result.structure is not None:
+                StructuredVariable.assign(variable, self.result.structure)
+                return variable
+            # Value is set first, since the variable may be read by the
+            # statements evaluated concurrently.
+            variable.value = self.result.value
+            variable.type = self.result.type
+        return variable
 
     def __evaluate_condition(self, condition):
         condition.accept(self)
@@ -101,17 +289,61 @@ class Interpreter:
 
     def evaluate_function_call(self, function_call):
         args = self.__evaluate_function_call_arguments(function_call)
+        target = self.call_targets.get(id(function_call))
+        if type(target) is FunctionDefinition:
+            self.__bind_and_evaluate_program_function(function_call.identifier, target, args)
+        elif target is not None:
+            self.__bind_and_evaluate_library_function(target, args)
+        else:
+            self.__call_function(function_call.identifier, args)
+
+    def evaluate_inlined_call(self, inlined_call):
+        function_call = inlined_call.function_call
+        args = self.__evaluate_function_call_arguments(function_call)
+        if self.cancellation.cancelled:
+            raise ExecutionCancelledException()
+        # Expression is evaluated the same way as the return statement of
+        # the function, but without opening its context.
+        outer_arguments, self.inlined_arguments = self.inlined_arguments, args
+        try:
+            inlined_call.expression.accept(self)
+        except WithStackTraceException as e:
+            e.stack.extend([
+                'evaluate return statement',
+                'evaluate statement block',
+                f'evaluate function {function_call.identifier}'
+            ])
+            raise e
+        finally:
+            self.inlined_arguments = outer_arguments
+
+    def evaluate_inlined_argument(self, argument):
+        try:
+            self.__read_variable(self.inlined_arguments[argument.position], argument.index_operator)
+        except WithStackTraceException as e:
+            e.stack.append('evaluate identifier')
+            raise e
+
+    def __call_function(self, identifier, args):
         # Functions defined in program source code behaves different than
         # those defined in libraries.
-        if (identifier := function_call.identifier) in self.program_functions:
-            self.__bind_and_evaluate_program_function(identifier, args)
+        if identifier in self.program_functions:
+            self.__bind_and_evaluate_program_function(identifier, self.program_functions[identifier], args)
         elif identifier in self.lib_functions:
-            self.__bind_and_evaluate_library_function(identifier, args)
+            self.__bind_and_evaluate_library_function(self.lib_functions[identifier], args)
         else:
             # There is no other place, where the function may be present.
             raise UndefinedFunctionException(identifier)
 
     def __evaluate_function_call_arguments(self, function_call):
+        if self.options['PARALLEL_ARGUMENTS']:
+            try:
+                evaluated_arguments = self.__parallel_arguments_evaluator().evaluate_arguments(function_call)
+            except WithStackTraceException as e:
+                e.stack.append(f'evaluate function {function_call.identifier} arguments')
+                raise e
+            if evaluated_arguments is not None:
+                return evaluated_arguments
         evaluated_arguments = []
         for argument in function_call.arguments:
             try:
@@ -122,10 +354,15 @@ class Interpreter:
                 raise e
         return evaluated_arguments
 
-    def __bind_and_evaluate_program_function(self, identifier, args):
-        function_def = self.program_functions[identifier]
+    def __bind_and_evaluate_program_function(self, identifier, function_def, args):
+        if self.cancellation.cancelled:
+            raise ExecutionCancelledException()
         if len(function_def.parameters) != len(args):
             raise FunctionArgumentsMismatchException(identifier, len(function_def.parameters), len(args))
+        if self.tiers is not None and (translated := self.tiers.called(identifier, args)) is not None and \
+                (result := translated.call(args, self.cancellation)) is not None:
+            self.result = result
+            return
         # Binding the arguments with names.
         initial_scope = {}
         for ident, arg in zip(function_def.parameters, args):
@@ -133,43 +370,104 @@ class Interpreter:
         # Preparing fresh context for the function call with
         # bonded arguments placed in the initial scope.
         self.stack.open_context(initial_scope)
+        outer_function, self.function = self.function, identifier
         # Evaluate the function call as the function definition.
-        function_def.accept(self)
+        try:
+            function_def.accept(self)
+        finally:
+            self.function = outer_function
+        if not self.returns:
+            # Function ended without return statement, so the result of
+            # its last statement must not leak as the call result.
+            self.result = Variable(VariableType.UNDEFINED, None)
         # Clearing the flag for returning, since we do not want to
         # end outer function execution yet and popping the context.
         self.returns = False
         self.stack.close_context()
 
-    def __bind_and_evaluate_library_function(self, identifier, args):
+    def __bind_and_evaluate_library_function(self, function, args):
         try:
-            self.lib_functions[identifier](args, self)
+            function(args, self)
         except WithStackTraceException as e:
             e.stack.append('evaluate library function')
             raise e
 
+    def __parallel_statement_evaluator(self):
+        if self.parallel_evaluator is None:
+            self.parallel_evaluator = ParallelStatementEvaluator(
+                self, self.__executor(), self.pure_functions, self.scalar_products
+            )
+        return self.parallel_evaluator
+
+    def __parallel_arguments_evaluator(self):
+        if self.arguments_evaluator is None:
+            self.arguments_evaluator = ParallelArgumentsEvaluator(
+                self, self.__executor(), self.pure_functions, self.scalar_products
+            )
+        return self.arguments_evaluator
+
+    def __executor(self):
+        # Statements and arguments share the single thread pool.
+        if self.executor is None:
+            self.executor = ContextThreadPoolExecutor(self.options['PARALLEL_WORKERS'])
+        return self.executor
+
     def evaluate_assign_statement(self, assign_statement):
+        identifier = assign_statement.identifier
+        if identifier.index_operator is None and \
+                (scalar := self.scalar_expressions.get(id(assign_statement.expression))) is not None and \
+                (value := scalar(self.stack.get_variable)) is not None:
+            variable = self.stack.get_variable(identifier.name)
+            if variable.type == VariableType.NUMBER or variable.type == VariableType.UNDEFINED:
+                # Variable is updated in place, the same way as by set_variable.
+                variable.type = VariableType.NUMBER
+                variable.value = value
+                return
         try:
             assign_statement.expression.accept(self)
-            result = self.result
-            variable = self.stack.get_variable(assign_statement.identifier.name)
-            if assign_statement.identifier.index_operator is not None:
-                self.__modify_variable_with_index_operator(variable, assign_statement.identifier.index_operator, result)
-            else:
-                self.__check_variables_types_matching(variable, result, for_assignment=True)
-                self.stack.set_variable(assign_statement.identifier.name, result)
+            self.__assign(assign_statement, self.result)
         except WithStackTraceException as e:
             e.stack.append('evaluate assign statement')
             raise e
 
+    def assign_evaluated(self, assign_statement, evaluate):
+        # Expression of the assignment may be evaluated by other interpreter,
+        # evaluate returns its result or raises its exception.
+        try:
+            self.__assign(assign_statement, evaluate())
+        except WithStackTraceException as e:
+            e.stack.append('evaluate assign statement')
+            raise e
+
+    def __assign(self, assign_statement, result):
+        identifier = assign_statement.identifier
+        variable = self.stack.get_variable(identifier.name)
+        if identifier.index_operator is not None:
+            self.__modify_variable_with_index_operator(variable, identifier.index_operator, result)
+        else:
+            if id(assign_statement) not in self.checked_constructions:
+                self.__check_variables_types_matching(variable, result, for_assignment=True)
+            self.stack.set_variable(identifier.name, result)
+
     def __modify_variable_with_index_operator(self, variable, index_operator, result):
         try:
+            if variable.type is VariableType.SPARSE:
+                self.__modify_sparse_element(variable, index_operator, result)
+                return
             if variable.type is not VariableType.MATRIX:
                 raise InvalidTypeException(variable.type)
             if result.type not in [VariableType.MATRIX, VariableType.NUMBER]:
                 raise InvalidTypeException(result.type)
 
+            if type(index_operator) is ElementIndex:
+                row, column = self.__evaluate_element_position(index_operator)
+                self.__copy_read_only(variable)
+                variable.value[row, column] = result.value
+                return
+
             first, second = self.__evaluate_selectors(index_operator)
 
+            self.__copy_read_only(variable)
             if first.type == VariableType.DOTS and second.type == VariableType.DOTS:
                 variable.value[:, :] = result.value
             elif first.type == VariableType.NUMBER and second.type == VariableType.DOTS:
@@ -179,13 +477,37 @@ class Interpreter:
             else:
                 variable.value[int(first.value), int(second.value)] = result.value
 
-        except ValueError as e:
+        except (IndexError, ValueError, OverflowError) as e:
             raise IndexException(e)
         except WithStackTraceException as e:
             e.stack.append('modify variable by index operator')
             raise e
 
+    def __modify_sparse_element(self, variable, index_operator, result):
+        # Only single elements of the sparse matrices are modified.
+        if result.type != VariableType.NUMBER:
+            raise InvalidTypeException(result.type)
+        row, column = self.__evaluate_element_position(index_operator)
+        try:
+            variable.value.set_item(row, column, result.value)
+        except (IndexError, OverflowError) as e:
+            raise IndexException(e)
+
+    @staticmethod
+    def __copy_read_only(variable):
+        if not variable.value.flags.writeable and not isinstance(variable.value, np.memmap):
+            # Read-only matrices, such as the ones shared with other
+            # processes, are copied on write. Memory mapped ones were
+            # explicitly loaded as read-only, so modifying them fails.
+            # Only this variable gets the copy, so the other variables
+            # assigned the same matrix keep the original values.
+            variable.value = variable.value.copy()
+
     def evaluate_additive_expression(self, add_expression):
+        if (scalar := self.scalar_expressions.get(id(add_expression))) is not None and \
+                (value := scalar(self.stack.get_variable)) is not None:
+            self.result = Variable(VariableType.NUMBER, value)
+            return
         try:
             # Hacky solution: append some dummy operator at the beginning  in order to use zip function.
             # Below if ... else ... condition will always avoid this dummy operator usage.
@@ -198,7 +520,8 @@ class Interpreter:
                 if prev_result is None:
                     prev_result = result
                 else:
-                    self.__check_variables_types_matching(prev_result, result)
+                    if id(add_expression) not in self.checked_constructions:
+                        self.__check_variables_types_matching(prev_result, result)
                     self.__combine_additive_variables(prev_result, result, operator)
                     prev_result = self.result
 
@@ -220,10 +543,24 @@ class Interpreter:
         # but for assignment types must be the same on both sides.
         if not for_assignment and left.type == VariableType.MATRIX and right.type == VariableType.NUMBER:
             return
+        # Sparse matrix is combined with the number, and with the dense
+        # matrix on either side.
+        if not for_assignment and left.type == VariableType.SPARSE and \
+                right.type in [VariableType.MATRIX, VariableType.NUMBER]:
+            return
+        if not for_assignment and left.type == VariableType.MATRIX and right.type == VariableType.SPARSE:
+            return
         # Any other combinations of types are forbidden.
         raise TypesMismatchException(left.type, right.type)
 
     def __combine_additive_variables(self, left, right, operator):
+        if left.type is VariableType.SPARSE or right.type is VariableType.SPARSE:
+            self.result = combined_sparse(left, right, operator)
+            return
+        if (left.structure is not None or right.structure is not None) and \
+                (result := combined(left, right, operator)) is not None:
+            self.result = result
+            return
         match operator:
             case '+':
                 if left.type == VariableType.MATRIX and right.type == VariableType.MATRIX:
@@ -237,6 +574,10 @@ class Interpreter:
                     self.result = Variable(left.type, left.value - right.value)
 
     def evaluate_multiplicative_expression(self, mul_expression):
+        if (scalar := self.scalar_expressions.get(id(mul_expression))) is not None and \
+                (value := scalar(self.stack.get_variable)) is not None:
+            self.result = Variable(VariableType.NUMBER, value)
+            return
         try:
             # Hacky solution: append some dummy operator at the beginning  in order to use zip function.
             # Below if ... else ... condition will always avoid this dummy operator usage.
@@ -249,7 +590,8 @@ class Interpreter:
                 if prev_result is None:
                     prev_result = result
                 else:
-                    self.__check_variables_types_matching(prev_result, result)
+                    if id(mul_expression) not in self.checked_constructions:
+                        self.__check_variables_types_matching(prev_result, result)
                     self.__combine_multiplicative_variables(prev_result, result, operator)
                     prev_result = self.result
 
@@ -260,10 +602,17 @@ class Interpreter:
     def __combine_multiplicative_variables(self, left, right, operator):
         match operator:
             case '*':
+                if left.type is VariableType.SPARSE or right.type is VariableType.SPARSE:
+                    self.result = combined_sparse(left, right, operator)
+                    return
+                if (left.structure is not None or right.structure is not None) and \
+                        (result := combined(left, right, operator)) is not None:
+                    self.result = result
+                    return
                 if left.type == VariableType.MATRIX and right.type == VariableType.MATRIX:
                     # Matrix multiplication requires separate error handling.
                     try:
-                        self.result = Variable(VariableType.MATRIX, np.matmul(left.value, right.value))
+                        self.result = Variable(VariableType.MATRIX, self.__multiply_matrices(left.value, right.value))
                     except ValueError:
                         raise MatrixDimensionsMismatchException(left.value.shape, right.value.shape)
                 else:
@@ -271,18 +620,57 @@ class Interpreter:
             case '/':
                 if right.type == VariableType.MATRIX and right.type == VariableType.MATRIX:
                     raise TypesMismatchException(left.type, right.type)
+                if right.type == VariableType.SPARSE:
+                    raise TypesMismatchException(left.type, right.type)
                 if right.type == VariableType.NUMBER and right.value == 0:
                     raise ZeroDivisionException()
+                if left.structure is not None and (result := combined(left, right, operator)) is not None:
+                    self.result = result
+                    return
+                if left.type == VariableType.SPARSE:
+                    self.result = combined_sparse(left, right, operator)
+                    return
                 self.result = Variable(left.type, left.value / right.value)
 
+    def __multiply_matrices(self, left, right):
+        # Operands (or the result) exceeding the threshold, for example
+        # large memory mapped matrices, are multiplied tile by tile, so
+        # they never need to fit into the memory at once.
+        result_bytes = left.shape[0] * right.shape[1] * np.result_type(left, right).itemsize
+        if max(left.nbytes, right.nbytes, result_bytes) < self.options['OUT_OF_CORE_THRESHOLD']:
+            return np.matmul(left, right)
+        try:
+            return blocked_matmul(
+                left,
+                right,
+                self.options['OUT_OF_CORE_TILE_SIZE'],
+                self.options['OUT_OF_CORE_DIRECTORY']
+            )
+        except OSError as e:
+            # For example no space left for the result file.
+            e_print(f'Error: Out of core multiplication failed: {e}')
+            raise WithStackTraceException()
+
     def evaluate_negated_atomic_expression(self, expression):
+        if (scalar := self.scalar_expressions.get(id(expression))) is not None and \
+                (value := scalar(self.stack.get_variable)) is not None:
+            self.result = Variable(VariableType.NUMBER, value)
+            return
         try:
             expression.atomic_expression.accept(self)
+            # New variable is created, since matrices are evaluated by
+            # reference and negation must not modify the operand.
             if self.result.type == VariableType.MATRIX:
-                self.result.value = np.negative(self.result.value)
+                if self.result.structure is not None and (result := negated(self.result)) is not None:
+                    self.result = result
+                    return
+                self.result = Variable(VariableType.MATRIX, np.negative(self.result.value))
                 return
             if self.result.type == VariableType.NUMBER:
-                self.result.value = - self.result.value
+                self.result = Variable(VariableType.NUMBER, - self.result.value)
+                return
+            if self.result.type == VariableType.SPARSE:
+                self.result = Variable(VariableType.SPARSE, negated_sparse(self.result.value))
                 return
             raise InvalidTypeException(self.result.type)
         except WithStackTraceException as e:
@@ -310,6 +698,10 @@ class Interpreter:
             raise e
 
     def evaluate_relation_condition(self, rel_condition):
+        if (scalar := self.scalar_expressions.get(id(rel_condition))) is not None and \
+                (result := scalar(self.stack.get_variable)) is not None:
+            self.result = result
+            return
         try:
             rel_condition.left_expression.accept(self)
             if rel_condition.operator is None:
@@ -318,7 +710,12 @@ class Interpreter:
                 left = self.result
                 rel_condition.right_expression.accept(self)
                 right = self.result
-                self.__evaluate_comparison_into_bool(left, right, rel_condition.operator)
+                if id(rel_condition) not in self.checked_constructions:
+                    self.__evaluate_comparison_into_bool(left, right, rel_condition.operator)
+                elif left.type == VariableType.MATRIX:
+                    self.__evaluate_matrix_comparison_into_bool(left, right, rel_condition.operator)
+                else:
+                    self.__evaluate_number_comparison_into_bool(left, right, rel_condition.operator)
 
         except WithStackTraceException as e:
             e.stack.append('evaluate rel condition')
@@ -336,11 +733,14 @@ class Interpreter:
         if self.result.type == VariableType.STRING:
             self.result = self.result.value != ''
             return
+        if self.result.type == VariableType.SPARSE:
+            self.result = np.any(self.result.value.data)
+            return
 
         raise InvalidTypeException(self.result.type)
 
     def __evaluate_comparison_into_bool(self, left, right, operator):
-        invalid_types = [VariableType.STRING, VariableType.UNDEFINED]
+        invalid_types = [VariableType.STRING, VariableType.SPARSE, VariableType.UNDEFINED]
         if left.type in invalid_types:
             raise InvalidTypeException(left.type)
         if right.type in invalid_types:
@@ -409,6 +809,12 @@ class Interpreter:
             np.array(values)
         )
 
+    def evaluate_constant_matrix(self, constant_matrix):
+        # Shared constant is read-only, so only the copy may be bound
+        # to the variable.
+        value = constant_matrix.value.copy() if constant_matrix.copied else constant_matrix.value
+        self.result = Variable(VariableType.MATRIX, value)
+
     def evaluate_number_literal(self, number_literal):
         self.result = Variable(
             VariableType.NUMBER,
@@ -423,27 +829,34 @@ class Interpreter:
 
     def evaluate_identifier(self, identifier):
         try:
-            variable = self.stack.get_variable(identifier.name)
-            if identifier.index_operator is not None:
-                self.__evaluate_identifier_with_index_operator(variable, identifier.index_operator)
-                return
-            if variable.type == VariableType.MATRIX:
-                # Matrix is passed by reference.
-                self.result = variable
-                return
-            # Simple types are passed by value.
-            self.result = Variable(
-                variable.type,
-                variable.value
-            )
+            self.__read_variable(self.stack.get_variable(identifier.name), identifier.index_operator)
         except WithStackTraceException as e:
             e.stack.append('evaluate identifier')
             raise e
 
+    def __read_variable(self, variable, index_operator):
+        if index_operator is not None:
+            self.__evaluate_identifier_with_index_operator(variable, index_operator)
+            return
+        if variable.type == VariableType.MATRIX or variable.type == VariableType.SPARSE:
+            # Matrix is passed by reference.
+            self.result = variable
+            return
+        # Simple types are passed by value.
+        self.result = Variable(
+            variable.type,
+            variable.value
+        )
+
     def __evaluate_identifier_with_index_operator(self, variable, index_operator):
-        if variable.type != VariableType.MATRIX:
+        if variable.type != VariableType.MATRIX and variable.type != VariableType.SPARSE:
             raise InvalidTypeException(variable.type)
         try:
+            if type(index_operator) is ElementIndex:
+                row, column = self.__evaluate_element_position(index_operator)
+                matrix = variable.value if variable.structure is None else variable.structure
+                self.result = Variable(VariableType.NUMBER, matrix_element(matrix, row, column))
+                return
             first, second = self.__evaluate_selectors(index_operator)
             self.__select_matrix_variable_content(variable, first, second)
         except WithStackTraceException as e:
@@ -469,15 +882,50 @@ class Interpreter:
 
         return first, second
 
+    def __evaluate_element_position(self, index_operator):
+        # Selectors of the element are never dots, so they are evaluated
+        # straight into the ints.
+        try:
+            index_operator.first_selector.accept(self)
+            first = self.result
+            index_operator.second_selector.accept(self)
+            second = self.result
+            if first.type != VariableType.NUMBER:
+                raise InvalidTypeException(first.type)
+            if second.type != VariableType.NUMBER:
+                raise InvalidTypeException(second.type)
+        except WithStackTraceException as e:
+            e.stack.append('evaluate selectors')
+            raise e
+
+        return int(first.value), int(second.value)
+
     def __select_matrix_variable_content(self, variable, first, second):
         if first.type == VariableType.DOTS and second.type == VariableType.DOTS:
             self.result = variable
+        elif variable.structure is not None:
+            # Selected part of the structured or sparse matrix is created
+            # without materializing the whole matrix.
+            self.__select_elements_of(variable.structure, first, second)
+        elif variable.type == VariableType.SPARSE:
+            self.__select_elements_of(variable.value, first, second)
         elif first.type == VariableType.NUMBER and second.type == VariableType.DOTS:
             self.result = Variable(VariableType.MATRIX, np.array([variable.value[int(first.value), :]]))
         elif first.type == VariableType.DOTS and second.type == VariableType.NUMBER:
             self.result = Variable(VariableType.MATRIX, np.array([variable.value[:, int(second.value)]]))
         else:
-            self.result = Variable(VariableType.NUMBER, variable.value[int(first.value), int(second.value)])
+            self.result = Variable(
+                VariableType.NUMBER,
+                matrix_element(variable.value, int(first.value), int(second.value))
+            )
+
+    def __select_elements_of(self, matrix, first, second):
+        if second.type == VariableType.DOTS:
+            self.result = Variable(VariableType.MATRIX, np.array([matrix.row(int(first.value))]))
+        elif first.type == VariableType.DOTS:
+            self.result = Variable(VariableType.MATRIX, np.array([matrix.column(int(second.value))]))
+        else:
+            self.result = Variable(VariableType.NUMBER, matrix_element(matrix, int(first.value), int(second.value)))
 
     def evaluate_dots_select(self, _):
         self.result = Variable(VariableType.DOTS, None)
@@ -485,5 +933,15 @@ class Interpreter:
     def __load_library_functions(self):
         self.lib_functions = {**self.lib_functions, **StandardLibrary.import_library()}
 
-    def __load_program_functions(self, program):
-        self.program_functions = program.functions_definitions.copy()
+    def __load_compiled_program(self, program):
+        self.program = program
+        self.program_functions = program.functions
+        self.lib_functions = program.library_functions
+        self.pure_functions = program.pure_functions
+        self.tiers = program.tiers
+        self.checked_constructions = program.checked_constructions
+        self.scalar_products = program.scalar_products
+        self.scalar_expressions = program.scalar_expressions
+        self.call_targets = program.call_targets
+        if self.options['RELEASE_DEAD_VARIABLES']:
+            self.dead_variables = program.dead_variables
@@ -2,7 +2,10 @@ import sys
 import math
 import numpy as np
 
-from execution.variable import Variable, VariableType
+from execution.variable import Variable, VariableType, StructuredVariable
+from execution.structured import StructuredMatrix
+from execution.sparse import SparseMatrix
+from execution.readers import RowsReader
 from execution.exception import WithStackTraceException, FunctionArgumentsMismatchException, InvalidTypeException
 
 
@@ -11,6 +14,34 @@ def e_print(*args, **kwargs):
 
 
 class StandardLibrary:
+    # Modes accepted by the load function; they are passed directly
+    # to numpy as the memory mapping mode.
+    load_modes = ['r', 'r+', 'c']
+    # Functions without side effects; they neither interact with the
+    # environment nor modify their arguments.
+    pure_functions = ['transpose', 'ident', 'size', 'full', 'diag', 'sparse', 'dense', 'reshape', 'shared']
+    # Functions with side effects, which never modify their arguments.
+    preserving_functions = ['print', 'cin', 'load', 'save', 'open_rows']
+    # Functions always returning newly created matrices.
+    fresh_functions = ['ident', 'size', 'full', 'diag', 'sparse', 'dense']
+    # Possible types of the results of the functions; functions missing
+    # here may leave any result, since print and save do not set it.
+    result_types = {
+        'cin': [VariableType.NUMBER],
+        'transpose': [VariableType.MATRIX, VariableType.SPARSE],
+        'ident': [VariableType.MATRIX],
+        'size': [VariableType.MATRIX],
+        'full': [VariableType.MATRIX],
+        'diag': [VariableType.MATRIX],
+        'sparse': [VariableType.SPARSE],
+        'dense': [VariableType.MATRIX],
+        'reshape': [VariableType.MATRIX],
+        'load': [VariableType.MATRIX],
+        'open_rows': [VariableType.STREAM],
+        'next_chunk': [VariableType.MATRIX],
+        'shared': [VariableType.MATRIX]
+    }
+
     @staticmethod
     def import_library():
         return {
@@ -20,7 +51,15 @@ class StandardLibrary:
             'ident': StandardLibrary.__ident,
             'size': StandardLibrary.__size,
             'full': StandardLibrary.__full,
-            'reshape': StandardLibrary.__reshape
+            'diag': StandardLibrary.__diag,
+            'sparse': StandardLibrary.__sparse,
+            'dense': StandardLibrary.__dense,
+            'reshape': StandardLibrary.__reshape,
+            'load': StandardLibrary.__load,
+            'save': StandardLibrary.__save,
+            'open_rows': StandardLibrary.__open_rows,
+            'next_chunk': StandardLibrary.__next_chunk,
+            'shared': StandardLibrary.__shared
         }
 
     @staticmethod
@@ -33,6 +72,9 @@ class StandardLibrary:
     def __cin(_, interpreter):
         try:
             number = float(input('Provide a number: '))
+        except EOFError:
+            e_print('Error: No more input')
+            raise WithStackTraceException()
         except OverflowError:
             e_print('Error: Number overflow')
             raise WithStackTraceException()
@@ -57,12 +99,16 @@ class StandardLibrary:
         if (args_len := len(args)) != 1:
             raise FunctionArgumentsMismatchException('transpose', 1, args_len)
         variable = args[0]
+        if variable.type == VariableType.SPARSE:
+            interpreter.result = Variable(VariableType.SPARSE, variable.value.transpose())
+            return
         if variable.type != VariableType.MATRIX:
             e_print('Error: Transpose function must obtain a matrix')
             raise InvalidTypeException(variable.type)
 
-        variable.value = variable.value.T
-        interpreter.result = variable
+        # Transposed matrix shares the memory with the argument, like
+        # the matrices assigned from the variables.
+        interpreter.result = Variable(VariableType.MATRIX, variable.value.T)
 
     @staticmethod
     def __ident(args, interpreter):
@@ -73,20 +119,23 @@ class StandardLibrary:
             e_print('Error: Ident function must obtain a number')
             raise InvalidTypeException(variable.type)
 
-        interpreter.result = Variable(VariableType.MATRIX, np.identity(variable.value))
+        # Identity matrix is structured, so it is not materialized until
+        # it is modified or exported.
+        interpreter.result = StructuredVariable(StructuredMatrix.identity(variable.value))
 
     @staticmethod
     def __size(args, interpreter):
         if (args_len := len(args)) != 1:
             raise FunctionArgumentsMismatchException('size', 1, args_len)
         variable = args[0]
-        if variable.type != VariableType.MATRIX:
+        if variable.type not in [VariableType.MATRIX, VariableType.SPARSE]:
             e_print('Error: Size function must obtain a matrix')
             raise InvalidTypeException(variable.type)
 
+        shape = variable.value.shape if variable.structure is None else variable.structure.shape
         interpreter.result = Variable(
             VariableType.MATRIX,
-            np.array([list(variable.value.shape)])
+            np.array([list(shape)])
         )
 
     @staticmethod
@@ -104,11 +153,60 @@ class StandardLibrary:
             e_print('Error: Full function must obtain a numbers only')
             raise InvalidTypeException(value.type)
 
-        interpreter.result = Variable(
-            VariableType.MATRIX,
-            np.full((int(rows.value), int(cols.value)), int(value.value))
+        interpreter.result = StructuredVariable(
+            StructuredMatrix.constant(int(rows.value), int(cols.value), int(value.value))
         )
 
+    @staticmethod
+    def __diag(args, interpreter):
+        if (args_len := len(args)) != 1:
+            raise FunctionArgumentsMismatchException('diag', 1, args_len)
+        variable = args[0]
+        if variable.type != VariableType.MATRIX:
+            e_print('Error: Diag function must obtain a matrix')
+            raise InvalidTypeException(variable.type)
+        if 1 not in variable.value.shape:
+            e_print('Error: Diag function must obtain a single row or column matrix')
+            raise WithStackTraceException()
+
+        interpreter.result = StructuredVariable(StructuredMatrix.diagonal_of(variable.value))
+
+    @staticmethod
+    def __sparse(args, interpreter):
+        if (args_len := len(args)) != 5:
+            raise FunctionArgumentsMismatchException('sparse', 5, args_len)
+        rows, cols, values, rows_number, cols_number = args
+        for matrix in [rows, cols, values]:
+            if matrix.type != VariableType.MATRIX:
+                e_print('Error: Sparse function must obtain rows, columns and values matrices')
+                raise InvalidTypeException(matrix.type)
+        for number in [rows_number, cols_number]:
+            if number.type != VariableType.NUMBER:
+                e_print('Error: Sparse function must obtain numbers of rows and columns')
+                raise InvalidTypeException(number.type)
+
+        try:
+            interpreter.result = Variable(VariableType.SPARSE, SparseMatrix.from_triplets(
+                (int(rows_number.value), int(cols_number.value)),
+                rows.value,
+                cols.value,
+                values.value
+            ))
+        except ValueError as e:
+            e_print(e)
+            raise WithStackTraceException()
+
+    @staticmethod
+    def __dense(args, interpreter):
+        if (args_len := len(args)) != 1:
+            raise FunctionArgumentsMismatchException('dense', 1, args_len)
+        variable = args[0]
+        if variable.type != VariableType.SPARSE:
+            e_print('Error: Dense function must obtain a sparse matrix')
+            raise InvalidTypeException(variable.type)
+
+        interpreter.result = Variable(VariableType.MATRIX, variable.value.dense())
+
     @staticmethod
     def __reshape(args, interpreter):
         if (args_len := len(args)) != 3:
@@ -132,3 +230,116 @@ class StandardLibrary:
         except ValueError as e:
             e_print(e)
             raise WithStackTraceException()
+
+    @staticmethod
+    def __load(args, interpreter):
+        if (args_len := len(args)) not in [1, 2]:
+            raise FunctionArgumentsMismatchException('load', '1 or 2', args_len)
+        path = args[0]
+        if path.type != VariableType.STRING:
+            e_print('Error: Load function must obtain a path string as first argument')
+            raise InvalidTypeException(path.type)
+        mode = None
+        if args_len == 2:
+            if args[1].type != VariableType.STRING:
+                e_print('Error: Load function must obtain a mode string as second argument')
+                raise InvalidTypeException(args[1].type)
+            if (mode := args[1].value) not in StandardLibrary.load_modes:
+                e_print(f'Error: Load function mode must be one of {StandardLibrary.load_modes}')
+                raise WithStackTraceException()
+
+        try:
+            # With mode specified the file is memory mapped, so only
+            # the accessed parts of the matrix are read from the disk.
+            matrix = np.load(path.value, mmap_mode=mode, allow_pickle=False)
+        except (OSError, ValueError, EOFError) as e:
+            # Empty file raises EOFError, truncated one ValueError.
+            e_print(e)
+            raise WithStackTraceException()
+        if not isinstance(matrix, np.ndarray):
+            e_print('Error: Load function supports .npy files only')
+            raise WithStackTraceException()
+        if matrix.ndim == 1:
+            # Reshaping keeps the memory mapping, since view is returned.
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2:
+            e_print('Error: Load function supports one and two dimensional arrays only')
+            raise WithStackTraceException()
+        if matrix.dtype.kind not in 'biuf':
+            # Strings, complex numbers or dates are not numbers of the language.
+            e_print(f'Error: Load function supports numeric arrays only, got {matrix.dtype} array')
+            raise WithStackTraceException()
+
+        interpreter.result = Variable(VariableType.MATRIX, matrix)
+
+    @staticmethod
+    def __save(args, _):
+        if (args_len := len(args)) != 2:
+            raise FunctionArgumentsMismatchException('save', 2, args_len)
+        path, matrix = args
+        if path.type != VariableType.STRING:
+            e_print('Error: Save function must obtain a path string as first argument')
+            raise InvalidTypeException(path.type)
+        if matrix.type != VariableType.MATRIX:
+            e_print('Error: Save function must obtain a matrix as second argument')
+            raise InvalidTypeException(matrix.type)
+
+        try:
+            np.save(path.value, matrix.value, allow_pickle=False)
+        except (OSError, ValueError) as e:
+            e_print(e)
+            raise WithStackTraceException()
+
+    @staticmethod
+    def __open_rows(args, interpreter):
+        if (args_len := len(args)) != 2:
+            raise FunctionArgumentsMismatchException('open_rows', 2, args_len)
+        path, chunk_rows = args
+        if path.type != VariableType.STRING:
+            e_print('Error: Open rows function must obtain a path string as first argument')
+            raise InvalidTypeException(path.type)
+        if chunk_rows.type != VariableType.NUMBER:
+            e_print('Error: Open rows function must obtain a number as second argument')
+            raise InvalidTypeException(chunk_rows.type)
+        if chunk_rows.value < 1:
+            e_print('Error: Open rows function chunk must contain at least one row')
+            raise WithStackTraceException()
+
+        try:
+            reader = RowsReader(path.value, int(chunk_rows.value))
+        except OSError as e:
+            e_print(e)
+            raise WithStackTraceException()
+        interpreter.streams.append(reader)
+
+        interpreter.result = Variable(VariableType.STREAM, reader)
+
+    @staticmethod
+    def __next_chunk(args, interpreter):
+        if (args_len := len(args)) != 1:
+            raise FunctionArgumentsMismatchException('next_chunk', 1, args_len)
+        stream = args[0]
+        if stream.type != VariableType.STREAM:
+            e_print('Error: Next chunk function must obtain a rows stream')
+            raise InvalidTypeException(stream.type)
+
+        try:
+            interpreter.result = Variable(VariableType.MATRIX, stream.value.next_chunk())
+        except (OSError, ValueError) as e:
+            e_print(e)
+            raise WithStackTraceException()
+
+    @staticmethod
+    def __shared(args, interpreter):
+        if (args_len := len(args)) != 1:
+            raise FunctionArgumentsMismatchException('shared', 1, args_len)
+        name = args[0]
+        if name.type != VariableType.STRING:
+            e_print('Error: Shared function must obtain a matrix name string')
+            raise InvalidTypeException(name.type)
+        if (matrix := interpreter.options['SHARED_MATRICES'].get(name.value)) is None:
+            e_print(f'Error: There is no shared matrix {name.value}')
+            raise WithStackTraceException()
+
+        # Shared matrix is read-only, so it is copied when modified.
+        interpreter.result = Variable(VariableType.MATRIX, matrix)
@@ -0,0 +1,250 @@
+import contextvars
+import concurrent.futures
+
+from semantic.effects import EffectsCollector
+from syntax_tree.constructions import AssignStatement, AdditiveExpression, MultiplicativeExpression, \
+    NegatedAtomicExpression
+from execution.exception import WithStackTraceException
+
+
+class ContextThreadPoolExecutor(concurrent.futures.ThreadPoolExecutor):
+    """
+    Thread pool running the tasks in the copy of the context of the
+    submitting thread, so the worker threads see the same context
+    variables, for example the captured standard streams of the server
+    jobs (see server.capture).
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class StatementPlan:
+    """
+    StatementPlan describes how the statement may be evaluated in parallel.
+
+    Barrier statements (control flow, function calls, index operator
+    assignments and assignments calling impure functions) are evaluated
+    in order, after all the preceding statements are finished.
+    Pure assignments may be evaluated out of order, as long as they
+    do not access variables assigned by not yet finished statements;
+    only the costly ones are sent to the worker threads.
+    """
+
+    def __init__(self, barrier, concurrent=False, reads=frozenset(), write=None):
+        self.barrier = barrier
+        self.concurrent = concurrent
+        self.reads = reads
+        self.write = write
+
+    def conflicts(self, other):
+        return self.write == other.write or \
+            self.write in other.reads or \
+            other.write in self.reads
+
+
+class ParallelStatementEvaluator:
+    """
+    Class evaluating independent statements of statement block concurrently.
+
+    Independent statements are found with the read and write sets of
+    the variables and the purity of the called functions. Expressions
+    of the pure assignments are evaluated by the forked interpreters on
+    the thread pool, since numpy releases the GIL during the costly
+    matrix operations. Results are assigned in the program order, so
+    the type errors and the exceptions are reported the same way as
+    in sequential execution. Variables dead after the statements are
+    released, once no pending statement may read them.
+    """
+
+    def __init__(self, interpreter, executor, pure_functions, scalar_products=frozenset()):
+        """
+        ParallelStatementEvaluator constructor.
+
+        :param interpreter: interpreter owning the evaluated statement blocks.
+        :param executor: thread pool evaluating the expressions.
+        :param pure_functions: names of functions without side effects.
+        :param scalar_products: ids of the multiplicative expressions of numbers,
+            which are not worth evaluating on the thread pool.
+        """
+        self.interpreter = interpreter
+        self.executor = executor
+        self.pure_functions = pure_functions
+        self.scalar_products = scalar_products
+        self.plans = {}
+
+    def evaluate_statements(self, statement_block):
+        """
+        Evaluates statements of the block in the current scope.
+
+        :param statement_block: statement block, which scope is already opened.
+        """
+        pending = []
+        # Names of the variables dead after the evaluated statements,
+        # released when the pending statements are assigned.
+        released = set()
+        for statement in statement_block.statements:
+            plan = self.__plan_of(statement)
+            try:
+                # Variable assigned again must be released before.
+                if plan.barrier or plan.write in released or any(plan.conflicts(other) for _, other, _ in pending):
+                    self.__assign_pending(pending, released)
+                if plan.concurrent:
+                    forked = self.interpreter.fork()
+                    pending.append((statement, plan, self.executor.submit(_evaluate_assigned_expression, forked, statement)))
+                    released |= self.interpreter.dead_variables.get(id(statement), frozenset())
+                    continue
+                try:
+                    statement.accept(self.interpreter)
+                except WithStackTraceException:
+                    # Preceding statements exceptions must be reported first.
+                    self.__assign_pending(pending, released)
+                    raise
+                if self.interpreter.returns:
+                    break
+                released |= self.interpreter.dead_variables.get(id(statement), frozenset())
+                if not pending:
+                    self.__assign_pending(pending, released)
+            except WithStackTraceException as e:
+                e.stack.append('evaluate statement block')
+                raise e
+        try:
+            self.__assign_pending(pending, released)
+        except WithStackTraceException as e:
+            e.stack.append('evaluate statement block')
+            raise e
+
+    def __assign_pending(self, pending, released):
+        try:
+            for statement, _, future in pending:
+                self.interpreter.assign_evaluated(statement, future.result)
+        finally:
+            # Results of the statements following the failed one are
+            # discarded, they are pure, so nothing else needs undoing.
+            concurrent.futures.wait([future for _, _, future in pending])
+            pending.clear()
+        # Forked interpreters of the finished statements do not read
+        # the released variables anymore.
+        self.interpreter.release_variables(released)
+        released.clear()
+
+    def __plan_of(self, statement):
+        if (plan := self.plans.get(id(statement))) is None:
+            plan = self.plans[id(statement)] = self.__create_plan(statement)
+        return plan
+
+    def __create_plan(self, statement):
+        if type(statement) is not AssignStatement or statement.identifier.index_operator is not None:
+            return StatementPlan(barrier=True)
+        effects = EffectsCollector.collect(statement.expression)
+        if not effects.calls <= self.pure_functions:
+            return StatementPlan(barrier=True)
+        return StatementPlan(
+            barrier=False,
+            concurrent=bool(effects.calls) or _contains_product(statement.expression, self.scalar_products),
+            reads=frozenset(effects.reads),
+            write=statement.identifier.name
+        )
+
+
+class ParallelArgumentsEvaluator:
+    """
+    Class evaluating arguments of function call concurrently.
+
+    Arguments are expressions, so they can not assign variables; they
+    are independent as long as the functions they call are pure. Costly
+    arguments, except the first one, are evaluated by the forked
+    interpreters on the thread pool, the rest is evaluated by the owning
+    interpreter. Exception of the leftmost failing argument is raised,
+    after all the arguments are finished, so the reported error does
+    not depend on the threads scheduling.
+    """
+
+    def __init__(self, interpreter, executor, pure_functions, scalar_products=frozenset()):
+        """
+        ParallelArgumentsEvaluator constructor.
+
+        :param interpreter: interpreter owning the evaluated function calls.
+        :param executor: thread pool evaluating the arguments.
+        :param pure_functions: names of functions without side effects.
+        :param scalar_products: ids of the multiplicative expressions of numbers,
+            which are not worth evaluating on the thread pool.
+        """
+        self.interpreter = interpreter
+        self.executor = executor
+        self.pure_functions = pure_functions
+        self.scalar_products = scalar_products
+        self.plans = {}
+
+    def evaluate_arguments(self, function_call):
+        """
+        Evaluates arguments of the function call.
+
+        :param function_call: evaluated function call.
+        :return: list of evaluated arguments or None, if the arguments
+            should be evaluated sequentially.
+        """
+        concurrent_arguments = self.__plan_of(function_call)
+        if not concurrent_arguments:
+            return None
+        futures = [
+            self.executor.submit(_evaluate_expression, self.interpreter.fork(), argument)
+            if concurrent else None
+            for argument, concurrent in zip(function_call.arguments, concurrent_arguments)
+        ]
+        try:
+            evaluated_arguments = []
+            for argument, future in zip(function_call.arguments, futures):
+                if future is None:
+                    argument.accept(self.interpreter)
+                    evaluated_arguments.append(self.interpreter.result)
+                else:
+                    evaluated_arguments.append(future.result())
+            return evaluated_arguments
+        finally:
+            concurrent.futures.wait([future for future in futures if future is not None])
+
+    def __plan_of(self, function_call):
+        if (plan := self.plans.get(id(function_call))) is None:
+            plan = self.plans[id(function_call)] = self.__create_plan(function_call)
+        return plan
+
+    def __create_plan(self, function_call):
+        # Plan contains flags of arguments evaluated on the thread pool,
+        # it is empty if the call is not worth parallelizing.
+        calls = set()
+        costly = []
+        for argument in function_call.arguments:
+            effects = EffectsCollector.collect(argument)
+            calls |= effects.calls
+            costly.append(bool(effects.calls) or _contains_product(argument, self.scalar_products))
+        if not calls <= self.pure_functions or sum(costly) < 2:
+            return ()
+        # First costly argument is evaluated by the owning interpreter,
+        # instead of waiting idle for the worker threads.
+        first = costly.index(True)
+        return tuple(flag and index != first for index, flag in enumerate(costly))
+
+
+def _evaluate_assigned_expression(interpreter, assign_statement):
+    return _evaluate_expression(interpreter, assign_statement.expression)
+
+
+def _evaluate_expression(interpreter, expression):
+    expression.accept(interpreter)
+    return interpreter.result
+
+
+def _contains_product(expression, scalar_products):
+    # Products, which operands may be matrices, are costly; products of
+    # numbers only are cheaper than sending them to the thread pool.
+    if type(expression) is MultiplicativeExpression:
+        return id(expression) not in scalar_products
+    if type(expression) is AdditiveExpression:
+        return any(
+            _contains_product(mul_expression, scalar_products)
+            for mul_expression in expression.multiplicative_expressions
+        )
+    if type(expression) is NegatedAtomicExpression:
+        return _contains_product(expression.atomic_expression, scalar_products)
+    return False
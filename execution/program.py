@@ -0,0 +1,119 @@
+from types import MappingProxyType
+
+from semantic.effects import PurityAnalyzer
+from semantic.types import TypeChecker
+from semantic.liveness import LivenessAnalyzer
+from semantic.scalars import ScalarExpressionsCollector
+from semantic.calls import CallResolver
+from optimizer.folding import ConstantFolder
+from optimizer.hoisting import LoopInvariantHoister
+from optimizer.cse import CommonSubexpressionEliminator
+from optimizer.inlining import FunctionInliner
+from optimizer.elements import ElementIndexSpecializer
+from execution.libraries import StandardLibrary
+from execution.tiering import FunctionTiers
+from execution.scalars import ScalarTranslator
+
+
+class CompiledProgram:
+    """
+    CompiledProgram is the parsed program together with results of its analysis.
+
+    Program is optimized, when it is compiled: constant expressions are
+    folded, loop invariants are hoisted, common subexpressions are
+    reused, calls of the small functions are inlined and index operators
+    of single elements are specialized, so the program executed is the
+    optimized one. Types of the program are checked, so the type
+    errors are reported before any statement is executed; runtime type
+    checks proven to pass are skipped by the interpreter.
+
+    Compiled program is never modified after construction, except for the
+    tiers of its functions, which change only how fast they run, so it may be
+    shared by many execution contexts (interpreters) running it at the
+    same time from different threads. Each context keeps its own result,
+    returns flag and function stack, so the program is parsed and
+    analyzed only once, no matter how many times it is executed.
+    """
+
+    def __init__(self, program, options=None):
+        """
+        CompiledProgram constructor.
+
+        :param program: Program construction created by the syntactic analyzer.
+        :param options: optimization options, see FunctionInliner.default_options
+            and FunctionTiers.default_options.
+        :raise WithStackTraceException: type error certain to happen, when the
+            program is executed (see TypeChecker).
+        """
+        self.parsed_program = program
+        self.options = options
+        program = ConstantFolder.fold(program)
+        self.pure_functions = frozenset(PurityAnalyzer.pure_functions(
+            program.functions_definitions,
+            StandardLibrary.pure_functions,
+            StandardLibrary.fresh_functions
+        ))
+        program = LoopInvariantHoister.hoist(
+            program,
+            self.pure_functions,
+            StandardLibrary.preserving_functions,
+            StandardLibrary.fresh_functions
+        )
+        program, eliminated = CommonSubexpressionEliminator.eliminate(
+            program,
+            self.pure_functions,
+            StandardLibrary.preserving_functions,
+            StandardLibrary.fresh_functions
+        )
+        # Calls are inlined last, so the other optimizations see them as
+        # the function calls; element index operators are specialized in
+        # the final program.
+        self.program = ElementIndexSpecializer.specialize(FunctionInliner.inline(program, options))
+        # Numbers of the evaluations of common subexpressions eliminated
+        # from the single execution of the functions statements.
+        self.eliminated_evaluations = MappingProxyType(eliminated)
+        self.functions = MappingProxyType(self.program.functions_definitions.copy())
+        self.library_functions = MappingProxyType(StandardLibrary.import_library())
+        types = TypeChecker.check(self.functions, StandardLibrary.result_types, self.library_functions)
+        # Other errors are raised by the runtime checks, when their
+        # constructions are evaluated.
+        if types.early_errors:
+            raise types.early_errors[0]
+        self.checked_constructions = types.checked
+        self.scalar_products = types.scalar_products
+        # Call sites are bound to the called functions once (see CallResolver).
+        self.call_targets = MappingProxyType(CallResolver.targets_of(self.functions, self.library_functions))
+        # Number expressions are evaluated on plain numbers, while their
+        # variables are numbers (see ScalarTranslator).
+        self.scalar_expressions = MappingProxyType(
+            ScalarTranslator.translate(ScalarExpressionsCollector.collect(self.functions))
+        )
+        # Hot functions are translated into Python code, when they are
+        # executed (see FunctionTiers).
+        self.tiers = FunctionTiers(self.functions, options)
+        self.dead_variables = MappingProxyType({
+            statement: names
+            for function_def in self.functions.values()
+            for statement, names in LivenessAnalyzer.dead_variables(function_def).items()
+        })
+
+    @staticmethod
+    def compile(parser, options=None):
+        """
+        Parses and analyzes the program.
+
+        :param parser: syntactic analyzer of the program source.
+        :param options: optimization options, see FunctionInliner.default_options
+            and FunctionTiers.default_options.
+        :return: CompiledProgram of the parsed program.
+        """
+        return CompiledProgram(parser.construct_program(), options)
+
+    def __reduce__(self):
+        # Read-only mappings can not be pickled, so the program is analyzed
+        # and optimized again by the receiving process; parsing is not
+        # repeated.
+        return CompiledProgram, (self.parsed_program, self.options)
+
+    def __repr__(self):
+        return str.format('CompiledProgram\n\tFunctions: {}\n', list(self.functions))
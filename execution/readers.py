@@ -0,0 +1,97 @@
+import queue
+import itertools
+import threading
+import numpy as np
+
+
+class RowsReader:
+    """
+    RowsReader streams delimited text file as fixed size matrix chunks.
+
+    Rows are read and parsed by the background thread, which keeps at
+    most 'prefetch' parsed chunks in memory, so files larger than the
+    memory can be processed chunk by chunk.
+    Every chunk is parsed at once by numpy, not number by number.
+
+    When the file is exhausted, reader produces matrices with no rows.
+    Reader abandoned before the end of the file must be closed, so its
+    thread stops and the file is closed.
+    """
+
+    def __init__(self, path, chunk_rows, delimiter=',', prefetch=2):
+        """
+        RowsReader constructor.
+
+        Opening the file happens in the constructor, so IOError is raised
+        to the caller if the file can not be read.
+
+        :param path: path of the delimited text file.
+        :param chunk_rows: maximal number of rows in single chunk.
+        :param delimiter: string separating the numbers in a row.
+        :param prefetch: number of chunks parsed ahead of the consumer.
+        """
+        self.file = open(path, encoding='utf-8')
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.delimiter = delimiter
+        self.columns = 0
+        self.exhausted = False
+        self.closed = threading.Event()
+        self.chunks = queue.Queue(maxsize=prefetch)
+        self.thread = threading.Thread(target=self.__read_chunks, daemon=True)
+        self.thread.start()
+
+    def next_chunk(self):
+        """
+        Returns next chunk of the file.
+
+        If the file content is malformed, ValueError is raised; errors of
+        reading the file, like OSError, are raised as well.
+        :return: matrix with at most chunk_rows rows; matrix without rows when file ended.
+        """
+        if self.exhausted:
+            return np.empty((0, self.columns))
+        chunk = self.chunks.get()
+        if chunk is None or isinstance(chunk, Exception):
+            self.exhausted = True
+        if isinstance(chunk, Exception):
+            raise chunk
+        if chunk is None:
+            return np.empty((0, self.columns))
+        if self.columns and self.columns != chunk.shape[1]:
+            self.exhausted = True
+            raise ValueError(f'the number of columns changed from {self.columns} to {chunk.shape[1]}')
+        self.columns = chunk.shape[1]
+        return chunk
+
+    def close(self):
+        """
+        Stops reading the file and closes it; following chunks have no rows.
+        """
+        self.closed.set()
+        self.exhausted = True
+        # Chunks are taken, so the thread waiting for the free place in the
+        # queue notices the reader is closed.
+        while self.thread.is_alive():
+            try:
+                self.chunks.get(timeout=0.05)
+            except queue.Empty:
+                pass
+
+    def __read_chunks(self):
+        # Blank lines are skipped, so every chunk except the last one
+        # has exactly chunk_rows rows.
+        rows = (line for line in self.file if line.strip())
+        try:
+            while not self.closed.is_set() and (lines := list(itertools.islice(rows, self.chunk_rows))):
+                self.chunks.put(np.loadtxt(lines, delimiter=self.delimiter, ndmin=2))
+            self.chunks.put(None)
+        except Exception as e:
+            # Every error is passed to the consumer, which would wait
+            # for the next chunk forever otherwise.
+            self.chunks.put(e)
+        finally:
+            self.file.close()
+
+    def __repr__(self):
+        return f'Rows reader: path: {self.path}, chunk rows: {self.chunk_rows}'
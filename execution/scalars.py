@@ -0,0 +1,117 @@
+import numpy as np
+
+from syntax_tree.constructions import *
+from execution.variable import VariableType
+
+
+def matrix_element(matrix, row, column):
+    """
+    Reads the element of the NumPy, structured or sparse matrix.
+
+    Elements of the float64 matrices are converted into the plain Python
+    floats, which are fast in arithmetic and behave the same. Other
+    elements keep the NumPy type of the matrix, so the integer arithmetic
+    wraps around the same as the matrix operations do.
+    """
+    element = matrix.item(row, column)
+    return element if matrix.dtype.type is np.float64 else matrix.dtype.type(element)
+
+
+
+class ScalarTranslator:
+    """
+    Class translating the scalar expressions (see ScalarExpressionsCollector)
+    into Python functions evaluating them on the plain Python numbers.
+
+    Translated function takes the get_variable function of the scope and
+    returns the number (bool for the relation conditions), or None if any
+    variable read is not a number, the element is out of the matrix or
+    the divisor is zero; the interpreter evaluates the expression with
+    the variables then, which reports the error. Elements of the matrices
+    are read with matrix_element.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.temporaries = 0
+
+    @staticmethod
+    def translate(scalars):
+        """
+        Translates the scalar expressions.
+
+        :param scalars: dictionary mapping ids of the scalar expressions into the expressions.
+        :return: dictionary mapping ids of the expressions into their functions.
+        """
+        translator = ScalarTranslator()
+        for key, expression in scalars.items():
+            translator.lines.append(f'def s_{key}(get):')
+            if type(expression) is RelationCondition:
+                left = translator.__value(expression.left_expression)
+                right = translator.__value(expression.right_expression)
+                result = f'bool({left} {expression.operator} {right})'
+                translator.__line(f'return not {result}' if expression.negated else f'return {result}')
+            else:
+                translator.__line(f'return {translator.__value(expression)}')
+        namespace = {'NUMBER': VariableType.NUMBER, 'MATRIX': VariableType.MATRIX, 'element': matrix_element}
+        exec(compile('\n'.join(translator.lines), '<scalar expressions>', 'exec'), namespace)
+        return {key: namespace[f's_{key}'] for key in scalars}
+
+    def __line(self, text):
+        self.lines.append(f'    {text}')
+
+    def __temporary(self):
+        self.temporaries += 1
+        return f't{self.temporaries}'
+
+    def __value(self, expression):
+        # Emits the statements computing the expression and returns the
+        # Python expression of its value.
+        expression_type = type(expression)
+        if expression_type is NumberLiteral:
+            return repr(expression.value)
+        if expression_type in (LoopInvariant, CommonExpression):
+            return self.__number(repr(expression.name))
+        if expression_type is Identifier:
+            if expression.index_operator is None:
+                return self.__number(repr(expression.name))
+            variable = self.__temporary()
+            self.__line(f'{variable} = get({expression.name!r})')
+            self.__line(f'if {variable}.type is not MATRIX:')
+            self.__line('    return None')
+            first = self.__value(expression.index_operator.first_selector)
+            second = self.__value(expression.index_operator.second_selector)
+            element = self.__temporary()
+            # Elements of the structured matrices are read without
+            # materializing them.
+            matrix = f'({variable}.value if {variable}.structure is None else {variable}.structure)'
+            self.__line('try:')
+            self.__line(f'    {element} = element({matrix}, int({first}), int({second}))')
+            self.__line('except Exception:')
+            self.__line('    return None')
+            return element
+        if expression_type is NegatedAtomicExpression:
+            value = self.__temporary()
+            self.__line(f'{value} = -{self.__value(expression.atomic_expression)}')
+            return value
+        if expression_type is AdditiveExpression:
+            operands = expression.multiplicative_expressions
+        else:
+            operands = expression.atomic_expressions
+        value = self.__value(operands[0])
+        for operator, operand in zip(expression.operators, operands[1:]):
+            right = self.__value(operand)
+            if operator == '/':
+                self.__line(f'if {right} == 0:')
+                self.__line('    return None')
+            result = self.__temporary()
+            self.__line(f'{result} = {value} {operator} {right}')
+            value = result
+        return value
+
+    def __number(self, name):
+        variable = self.__temporary()
+        self.__line(f'{variable} = get({name})')
+        self.__line(f'if {variable}.type is not NUMBER:')
+        self.__line('    return None')
+        return f'{variable}.value'
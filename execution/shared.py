@@ -0,0 +1,86 @@
+import numpy as np
+
+from multiprocessing import shared_memory
+
+
+class SharedMatrix:
+    """
+    SharedMatrix describes the matrix placed in the shared memory block.
+
+    Description is small and picklable, so it is sent to the worker
+    processes, which attach to the block instead of copying the matrix.
+    """
+
+    def __init__(self, block_name, shape, dtype):
+        self.block_name = block_name
+        self.shape = shape
+        self.dtype = dtype
+
+    def attach(self):
+        """
+        Attaches to the shared memory block of the matrix.
+
+        Returned block must be kept as long as the matrix is used.
+
+        :return: tuple of SharedMemory block and read-only numpy.ndarray of the matrix.
+        """
+        block = shared_memory.SharedMemory(name=self.block_name)
+        matrix = np.ndarray(self.shape, dtype=self.dtype, buffer=block.buf)
+        matrix.flags.writeable = False
+        return block, matrix
+
+    def __repr__(self):
+        return str.format('SharedMatrix\n\tBlock: {}\n\tShape: {}\n\tType: {}\n', self.block_name, self.shape, self.dtype)
+
+
+class SharedMatrices:
+    """
+    Context manager placing the matrices in the shared memory blocks.
+
+    Matrices are copied into the blocks once, when the context is entered,
+    and the blocks are removed, when it is exited. Worker processes attach
+    to the blocks (see SharedMatrix) and programs read them with the
+    shared function as read-only matrices; matrix modified with the index
+    operator is copied first, so the modifications stay private to the
+    modifying execution.
+    """
+
+    def __init__(self, matrices):
+        """
+        SharedMatrices constructor.
+
+        :param matrices: dictionary mapping names into numpy arrays; vectors
+            are treated as single row matrices.
+        """
+        self.matrices = matrices
+        self.blocks = []
+        self.descriptions = {}
+
+    def __enter__(self):
+        try:
+            for name, matrix in self.matrices.items():
+                self.descriptions[name] = self.__share(np.asarray(matrix))
+        except BaseException:
+            self.__release()
+            raise
+        return self
+
+    def __exit__(self, *_):
+        self.__release()
+
+    def __share(self, matrix):
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2 or matrix.dtype.kind not in 'biuf':
+            raise ValueError(f'expected numeric matrix, got {matrix.ndim} dimensional {matrix.dtype} array')
+        # Empty blocks can not be created.
+        block = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+        self.blocks.append(block)
+        np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=block.buf)[...] = matrix
+        return SharedMatrix(block.name, matrix.shape, matrix.dtype.str)
+
+    def __release(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
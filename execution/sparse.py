@@ -0,0 +1,289 @@
+import numpy as np
+
+from execution.variable import Variable, VariableType
+from execution.exception import MatrixDimensionsMismatchException
+
+# Number of the elements of the temporary scaled rows of the product of
+# the sparse and the dense matrix.
+_PRODUCT_CHUNK_SIZE = 2 ** 20
+
+
+class SparseMatrix:
+    """
+    Matrix of mostly zeros stored in the compressed sparse row (CSR) format.
+
+    Nonzero elements of the row i are data[indptr[i]:indptr[i + 1]], and
+    their columns are the same range of indices, sorted; zeros are never
+    stored. Memory is proportional to the number of the nonzero elements,
+    so large matrices, like the adjacency matrices of graphs, fit into the
+    memory.
+
+    Arrays of the matrix are never shared with the other matrices, since
+    the elements are modified in place.
+    """
+
+    def __init__(self, shape, data, indices, indptr):
+        self.shape = shape
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+
+    @staticmethod
+    def from_triplets(shape, rows, cols, values):
+        """
+        Creates the matrix of the elements given by their positions.
+
+        Values of the same element are summed.
+
+        :param shape: rows and columns of the matrix.
+        :param rows: array of the rows of the elements.
+        :param cols: array of the columns of the elements.
+        :param values: array of the values of the elements.
+        :return: SparseMatrix of the elements.
+        :raise ValueError: arrays are of different sizes or elements are out of the matrix.
+        """
+        rows, cols, values = np.ravel(rows), np.ravel(cols), np.ravel(values)
+        if shape[0] < 0 or shape[1] < 0:
+            raise ValueError('negative dimensions are not allowed')
+        if not rows.size == cols.size == values.size:
+            raise ValueError('rows, columns and values must have the same number of elements')
+        rows, cols = rows.astype(np.int64), cols.astype(np.int64)
+        if rows.size and (rows.min() < 0 or rows.max() >= shape[0] or cols.min() < 0 or cols.max() >= shape[1]):
+            raise ValueError(f'element position out of the matrix of shape {shape}')
+        return _canonical(shape, rows, cols, values)
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def dense(self):
+        """
+        Returns the dense array of the matrix.
+        """
+        dense = np.zeros(self.shape, dtype=self.data.dtype)
+        dense[self.row_ids(), self.indices] = self.data
+        return dense
+
+    def item(self, row, column):
+        """
+        Returns the element of the matrix as the Python number, like numpy.ndarray.item.
+        """
+        row = _position(row, 0, self.shape[0])
+        column = _position(column, 1, self.shape[1])
+        if (position := self.__find(row, column)) is None:
+            return self.data.dtype.type(0).item()
+        return self.data.item(position)
+
+    def set_item(self, row, column, value):
+        """
+        Sets the element of the matrix, casting the value the same way as numpy does.
+
+        New nonzero elements and the elements set to zero move the following
+        elements of the matrix, so they take time proportional to their number.
+        """
+        row = _position(row, 0, self.shape[0])
+        column = _position(column, 1, self.shape[1])
+        value = self.data.dtype.type(value)
+        position = self.__find(row, column)
+        if position is not None and value != 0:
+            self.data[position] = value
+        elif position is not None:
+            self.data = np.delete(self.data, position)
+            self.indices = np.delete(self.indices, position)
+            self.indptr[row + 1:] -= 1
+        elif value != 0:
+            start, end = self.indptr[row], self.indptr[row + 1]
+            position = start + np.searchsorted(self.indices[start:end], column)
+            self.data = np.insert(self.data, position, value)
+            self.indices = np.insert(self.indices, position, column)
+            self.indptr[row + 1:] += 1
+
+    def row(self, index):
+        """
+        Returns the row of the matrix as the one dimensional dense array.
+        """
+        index = _position(index, 0, self.shape[0])
+        start, end = self.indptr[index], self.indptr[index + 1]
+        row = np.zeros(self.shape[1], dtype=self.data.dtype)
+        row[self.indices[start:end]] = self.data[start:end]
+        return row
+
+    def column(self, index):
+        """
+        Returns the column of the matrix as the one dimensional dense array.
+        """
+        index = _position(index, 1, self.shape[1])
+        selected = self.indices == index
+        column = np.zeros(self.shape[0], dtype=self.data.dtype)
+        column[self.row_ids()[selected]] = self.data[selected]
+        return column
+
+    def transpose(self):
+        return _canonical((self.shape[1], self.shape[0]), self.indices, self.row_ids(), self.data)
+
+    def copy(self):
+        return SparseMatrix(self.shape, self.data.copy(), self.indices.copy(), self.indptr.copy())
+
+    def with_data(self, data):
+        """
+        Returns the matrix of the same nonzero positions with the given values; new zeros are removed.
+        """
+        return _canonical(self.shape, self.row_ids(), self.indices, data, ordered=True)
+
+    def row_ids(self):
+        """
+        Returns the rows of the stored elements.
+        """
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def __find(self, row, column):
+        start, end = self.indptr[row], self.indptr[row + 1]
+        position = start + np.searchsorted(self.indices[start:end], column)
+        if position < end and self.indices[position] == column:
+            return position
+        return None
+
+    def __str__(self):
+        # Nonzero elements only are printed, like by scipy.sparse.
+        elements = [
+            f'  ({row}, {column})\t{value}'
+            for row, column, value in zip(self.row_ids().tolist(), self.indices.tolist(), self.data.tolist())
+        ]
+        return '\n'.join([f'<{self.shape[0]}x{self.shape[1]} sparse matrix of {self.data.size} elements>', *elements])
+
+
+def combined(left, right, operator_symbol):
+    """
+    Combines the variables, when any of them is the sparse matrix.
+
+    Sum and difference of the sparse matrices are sparse; with the dense
+    matrix or the number they are dense. Products of the sparse matrices
+    and the sparse matrix multiplied or divided by the number are sparse;
+    product with the dense matrix is dense. Zeros of the sparse matrix are
+    not stored, so they stay zeros, when multiplied by the infinity or NaN.
+
+    Types of the operands are already checked, so the sparse matrix is
+    combined with the sparse or dense matrix, or with the number.
+
+    :param left: left operand Variable.
+    :param right: right operand Variable.
+    :param operator_symbol: arithmetic operator.
+    :return: Variable of the result.
+    :raise MatrixDimensionsMismatchException: shapes of the matrices do not match.
+    """
+    if right.type == VariableType.NUMBER:
+        return _with_number(left.value, right.value, operator_symbol)
+    left_shape, right_shape = left.value.shape, right.value.shape
+    if operator_symbol == '*':
+        if left_shape[1] != right_shape[0]:
+            raise MatrixDimensionsMismatchException(left_shape, right_shape)
+        if left.type == VariableType.SPARSE and right.type == VariableType.SPARSE:
+            return Variable(VariableType.SPARSE, _product(left.value, right.value))
+        if left.type == VariableType.SPARSE:
+            return Variable(VariableType.MATRIX, _dense_product(left.value, right.value))
+        return Variable(VariableType.MATRIX, _dense_product(right.value.transpose(), left.value.T).T)
+    if left_shape != right_shape:
+        raise MatrixDimensionsMismatchException(left_shape, right_shape)
+    if left.type == VariableType.SPARSE and right.type == VariableType.SPARSE:
+        return Variable(VariableType.SPARSE, _sum(left.value, right.value, operator_symbol))
+    if left.type == VariableType.SPARSE:
+        # Difference is the sum with the negated operand, like for dense matrices.
+        dense = right.value if operator_symbol == '+' else np.negative(right.value)
+        return Variable(VariableType.MATRIX, _scattered(dense, left.value, left.value.data))
+    data = right.value.data if operator_symbol == '+' else np.negative(right.value.data)
+    return Variable(VariableType.MATRIX, _scattered(left.value, right.value, data))
+
+
+def negated(matrix):
+    """
+    Returns the new sparse matrix of the negated elements.
+    """
+    return matrix.with_data(np.negative(matrix.data))
+
+
+def _with_number(matrix, number, operator_symbol):
+    match operator_symbol:
+        case '*':
+            return Variable(VariableType.SPARSE, matrix.with_data(matrix.data * number))
+        case '/':
+            return Variable(VariableType.SPARSE, matrix.with_data(matrix.data / number))
+    # Number is added to the zeros as well, so the result is dense.
+    zero = np.zeros(1, dtype=matrix.dtype)
+    if operator_symbol == '+':
+        fill, data = zero + number, matrix.data + number
+    else:
+        fill, data = zero - number, matrix.data - number
+    result = np.full(matrix.shape, fill[0], dtype=fill.dtype)
+    result[matrix.row_ids(), matrix.indices] = data
+    return Variable(VariableType.MATRIX, result)
+
+
+def _sum(left, right, operator_symbol):
+    data = right.data if operator_symbol == '+' else np.negative(right.data)
+    return _canonical(
+        left.shape,
+        np.concatenate([left.row_ids(), right.row_ids()]),
+        np.concatenate([left.indices, right.indices]),
+        np.concatenate([left.data, data])
+    )
+
+
+def _scattered(dense, sparse, data):
+    # Dense matrix with the values of the sparse one added.
+    result = dense.astype(np.result_type(dense, data))
+    result[sparse.row_ids(), sparse.indices] += data
+    return result
+
+
+def _product(left, right):
+    # Every stored element of the left matrix is multiplied by the row of
+    # the right one, which it selects; products of the same position are
+    # summed.
+    counts = np.diff(right.indptr)[left.indices]
+    ends = np.cumsum(counts)
+    total = ends[-1] if ends.size else 0
+    positions = np.arange(total) + np.repeat(right.indptr[left.indices] - (ends - counts), counts)
+    return _canonical(
+        (left.shape[0], right.shape[1]),
+        np.repeat(left.row_ids(), counts),
+        right.indices[positions],
+        np.repeat(left.data, counts) * right.data[positions]
+    )
+
+
+def _dense_product(sparse, dense):
+    # Rows of the dense matrix selected by the stored elements are scaled
+    # by them and summed into the rows of the result. Elements are taken
+    # in chunks, so the scaled rows never take more than the chunk size.
+    result = np.zeros((sparse.shape[0], dense.shape[1]), dtype=np.result_type(sparse.dtype, dense))
+    rows = sparse.row_ids()
+    step = max(1, _PRODUCT_CHUNK_SIZE // max(1, dense.shape[1]))
+    for start in range(0, sparse.data.size, step):
+        stop = start + step
+        np.add.at(result, rows[start:stop], sparse.data[start:stop, None] * dense[sparse.indices[start:stop]])
+    return result
+
+
+def _canonical(shape, rows, cols, values, ordered=False):
+    # Sparse matrix of the elements sorted by the rows and columns, with
+    # the values of the same position summed and the zeros removed.
+    if not ordered:
+        order = np.lexsort((cols, rows))
+        rows, cols, values = rows[order], cols[order], values[order]
+        if rows.size:
+            first = np.empty(rows.size, dtype=bool)
+            first[0] = True
+            first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+            starts = np.flatnonzero(first)
+            rows, cols, values = rows[starts], cols[starts], np.add.reduceat(values, starts)
+    nonzero = values != 0
+    rows, cols, values = rows[nonzero], cols[nonzero], values[nonzero]
+    indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+    return SparseMatrix(shape, values, cols.astype(np.int64), indptr)
+
+
+def _position(index, axis, size):
+    if not -size <= index < size:
+        raise IndexError(f'index {index} is out of bounds for axis {axis} with size {size}')
+    return index % size
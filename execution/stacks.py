@@ -1,4 +1,4 @@
-from execution.variable import Variable, VariableType
+from execution.variable import Variable, VariableType, StructuredVariable
 
 
 class FunctionStack:
@@ -11,6 +11,9 @@ class FunctionStack:
     def set_variable(self, identifier, variable):
         self.scope_stack[-1].set_variable(identifier, variable)
 
+    def find_variable(self, identifier):
+        return self.scope_stack[-1].find_variable(identifier)
+
     def open_context(self, init_scope=None):
         self.scope_stack.append(ScopeStack(init_scope))
 
@@ -20,6 +23,14 @@ class FunctionStack:
     def open_scope(self):
         self.scope_stack[-1].open_scope()
 
+    def fork(self):
+        # Forked stack sees the variables of the current context, but
+        # variables initialized by it are placed in its own scope.
+        forked = FunctionStack()
+        forked.scope_stack = [ScopeStack()]
+        forked.scope_stack[0].stack = [*self.scope_stack[-1].stack, {}]
+        return forked
+
     def close_scope(self):
         self.scope_stack[-1].close_scope()
 
@@ -45,6 +56,13 @@ class ScopeStack:
         self.stack[-1][identifier] = Variable(VariableType.UNDEFINED, None)
         return self.stack[-1][identifier]
 
+    def find_variable(self, identifier):
+        # Unlike get_variable, missing variable is not initialized.
+        for scope in reversed(self.stack):
+            if identifier in scope:
+                return scope[identifier]
+        return None
+
     def set_variable(self, identifier, variable):
         for scope in reversed(self.stack):
             if identifier in scope:
@@ -52,6 +70,10 @@ class ScopeStack:
                 # Hacky solution, we set type and value, but not the whole
                 # variable since we may want to make reference changing as
                 # well is some later part of the function stack.
+                if variable.structure is not None:
+                    # Structured matrix stays not materialized.
+                    StructuredVariable.assign(value_in_scope, variable.structure)
+                    return
                 value_in_scope.type = variable.type
                 value_in_scope.value = variable.value
                 return
@@ -0,0 +1,285 @@
+import operator
+import threading
+import numpy as np
+
+from execution.variable import Variable, VariableType, StructuredVariable
+from execution.exception import MatrixDimensionsMismatchException
+
+
+class StructuredMatrix:
+    """
+    Matrix of the known structure, which elements are not stored.
+
+    All elements of the matrix equal the fill value, except the main
+    diagonal holding the diagonal values, if they are given. Fill and
+    diagonal are one dimensional arrays of the matrix dtype; the single
+    diagonal value is repeated along the whole diagonal. Constant matrices,
+    the identity, the scaled identity and the diagonal matrices are all
+    represented this way, so elementwise arithmetic on them computes these
+    few values only, with the same numpy operations as for dense matrices.
+
+    Dense array is created once, when it is needed, and then it replaces
+    the structure, since it may be modified. It is created under the lock,
+    so the variables sharing the matrix, read concurrently, never get
+    different arrays.
+    """
+
+    def __init__(self, shape, fill, diagonal=None):
+        self.shape = shape
+        self.fill = fill
+        self.diagonal = diagonal
+        self.dense = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def constant(rows, cols, value):
+        if rows < 0 or cols < 0:
+            raise ValueError('negative dimensions are not allowed')
+        return StructuredMatrix((rows, cols), np.full(1, value))
+
+    @staticmethod
+    def identity(size):
+        size = operator.index(size)
+        if size < 0:
+            raise ValueError('negative dimensions are not allowed')
+        return StructuredMatrix((size, size), np.zeros(1), np.ones(1))
+
+    @staticmethod
+    def diagonal_of(values):
+        values = values.ravel()
+        return StructuredMatrix((values.size, values.size), np.zeros(1, dtype=values.dtype), values.copy())
+
+    @property
+    def dtype(self):
+        return self.fill.dtype
+
+    def materialized(self):
+        """
+        Returns the dense array of the matrix, creating it on the first call.
+        """
+        if self.dense is None:
+            with self.lock:
+                if self.dense is None:
+                    dense = np.full(self.shape, self.fill[0], dtype=self.fill.dtype)
+                    if self.diagonal is not None:
+                        np.fill_diagonal(dense, self.diagonal)
+                    self.dense = dense
+        return self.dense
+
+    def item(self, row, column):
+        """
+        Returns the element of the matrix as the Python number, like numpy.ndarray.item.
+        """
+        if self.dense is not None:
+            return self.dense.item(row, column)
+        row = _position(row, 0, self.shape[0])
+        column = _position(column, 1, self.shape[1])
+        if row == column and self.diagonal is not None:
+            return self.diagonal.item(row if self.diagonal.size > 1 else 0)
+        return self.fill.item(0)
+
+    def row(self, index):
+        """
+        Returns the row of the matrix as the one dimensional array.
+        """
+        if self.dense is not None:
+            return self.dense[index, :]
+        return self.__line(_position(index, 0, self.shape[0]), self.shape[1])
+
+    def column(self, index):
+        """
+        Returns the column of the matrix as the one dimensional array.
+        """
+        if self.dense is not None:
+            return self.dense[:, index]
+        return self.__line(_position(index, 1, self.shape[1]), self.shape[0])
+
+    def copy(self):
+        # Fill and diagonal values are never modified, so they are shared.
+        return StructuredMatrix(self.shape, self.fill, self.diagonal)
+
+    def diagonal_values(self):
+        return self.fill if self.diagonal is None else self.diagonal
+
+    def is_diagonal(self):
+        return self.diagonal is not None and not self.fill.any()
+
+    def is_zero(self):
+        return self.diagonal is None and not self.fill.any()
+
+    def is_finite(self):
+        return _finite(self.fill) and (self.diagonal is None or _finite(self.diagonal))
+
+    def __line(self, index, size):
+        line = np.full(size, self.fill[0], dtype=self.fill.dtype)
+        if self.diagonal is not None:
+            line[index] = self.diagonal[index if self.diagonal.size > 1 else 0]
+        return line
+
+
+# Operations combining the matrices elementwise; they are computed on the
+# fill and diagonal values the same way as the interpreter computes them
+# on the dense matrices.
+_MATRICES_OPERATIONS = {
+    '+': np.add,
+    '-': lambda left, right: np.add(left, np.negative(right))
+}
+_NUMBER_OPERATIONS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv
+}
+
+
+def pending(variable):
+    """
+    Returns the structured matrix of the variable, None if the variable
+    holds the dense matrix or its structure is already materialized.
+    """
+    structure = variable.structure
+    if structure is None or structure.dense is not None:
+        return None
+    return structure
+
+
+def combined(left, right, operator_symbol):
+    """
+    Combines the matrix variables without materializing the structured ones.
+
+    Matrix is combined with the number, or with the other matrix elementwise,
+    when operator is additive. Multiplication of two matrices is the matrix
+    product; the diagonal matrix scales the rows or the columns of the other
+    operand and the zero matrix results in zeros.
+
+    :param left: left operand Variable, matrix.
+    :param right: right operand Variable, matrix or number.
+    :param operator_symbol: operator combining the operands.
+    :return: Variable of the result, None when it must be computed on the dense matrices.
+    """
+    if right.type == VariableType.NUMBER:
+        if (structure := pending(left)) is None or np.ndim(right.value) != 0:
+            return None
+        operation = _NUMBER_OPERATIONS[operator_symbol]
+        return _structured(
+            structure.shape,
+            operation(structure.fill, right.value),
+            None if structure.diagonal is None else operation(structure.diagonal, right.value)
+        )
+    if operator_symbol == '*':
+        return _product(left, right)
+    return _elementwise(left, right, _MATRICES_OPERATIONS[operator_symbol])
+
+
+def negated(variable):
+    """
+    Negates the matrix variable without materializing the structured one.
+
+    :return: Variable of the result, None when the matrix is not structured.
+    """
+    if (structure := pending(variable)) is None:
+        return None
+    return _structured(
+        structure.shape,
+        np.negative(structure.fill),
+        None if structure.diagonal is None else np.negative(structure.diagonal)
+    )
+
+
+def _elementwise(left, right, operation):
+    left_structure, right_structure = pending(left), pending(right)
+    if left_structure is None or right_structure is None:
+        return None
+    if left_structure.diagonal is None and right_structure.diagonal is None:
+        try:
+            shape = np.broadcast_shapes(left_structure.shape, right_structure.shape)
+        except ValueError:
+            # Mismatch is reported by the dense operation.
+            return None
+        return _structured(shape, operation(left_structure.fill, right_structure.fill))
+    # Broadcasting would move the diagonal, so the shapes must be the same.
+    if left_structure.shape != right_structure.shape:
+        return None
+    return _structured(
+        left_structure.shape,
+        operation(left_structure.fill, right_structure.fill),
+        operation(left_structure.diagonal_values(), right_structure.diagonal_values())
+    )
+
+
+def _product(left, right):
+    left_structure, right_structure = pending(left), pending(right)
+    left_shape = left.value.shape if left_structure is None else left_structure.shape
+    right_shape = right.value.shape if right_structure is None else right_structure.shape
+    if len(left_shape) != 2 or len(right_shape) != 2:
+        return None
+    if left_shape[1] != right_shape[0]:
+        raise MatrixDimensionsMismatchException(left_shape, right_shape)
+    shape = (left_shape[0], right_shape[1])
+
+    if left_structure is not None and right_structure is not None:
+        if left_structure.is_diagonal() and right_structure.is_diagonal() and \
+                left_structure.is_finite() and right_structure.is_finite():
+            return _structured(
+                shape,
+                np.zeros(1, dtype=np.result_type(left_structure.dtype, right_structure.dtype)),
+                _unsigned_zeros(np.multiply(left_structure.diagonal, right_structure.diagonal))
+            )
+    if left_structure is not None and left_structure.is_zero() and _finite_operand(right, right_structure):
+        return _structured(shape, np.zeros(1, dtype=np.result_type(left_structure.dtype, _dtype(right))))
+    if right_structure is not None and right_structure.is_zero() and _finite_operand(left, left_structure):
+        return _structured(shape, np.zeros(1, dtype=np.result_type(_dtype(left), right_structure.dtype)))
+    # Diagonal matrix scales the rows of the right operand or the columns
+    # of the left one; the other operand is dense then.
+    if left_structure is not None and left_structure.is_diagonal() and _scalable(right):
+        return _dense(_unsigned_zeros(np.multiply(left_structure.diagonal[:, None], right.value)))
+    if right_structure is not None and right_structure.is_diagonal() and _scalable(left):
+        return _dense(_unsigned_zeros(np.multiply(left.value, right_structure.diagonal[None, :])))
+    return None
+
+
+def _structured(shape, fill, diagonal=None):
+    return StructuredVariable(StructuredMatrix(shape, fill, diagonal))
+
+
+def _dense(value):
+    return Variable(VariableType.MATRIX, value)
+
+
+def _dtype(variable):
+    structure = pending(variable)
+    return variable.value.dtype if structure is None else structure.dtype
+
+
+def _finite(array):
+    if array.dtype.kind in 'biu':
+        return True
+    return array.dtype.kind in 'fc' and bool(np.isfinite(array).all())
+
+
+def _finite_operand(variable, structure):
+    if structure is not None:
+        return structure.is_finite()
+    return _finite(variable.value)
+
+
+def _scalable(variable):
+    # Operand of the matrix product is scaled, when it is the finite dense
+    # matrix fitting into the memory; zero elements of the diagonal matrix
+    # would turn its infinities into nans in the product.
+    value = variable.value
+    return value.ndim == 2 and not isinstance(value, np.memmap) and _finite(value)
+
+
+def _unsigned_zeros(array):
+    # Zeros of the matrix product are the sums starting with the positive
+    # zero, so the negative zeros of the scaled elements are turned into it.
+    if array.dtype.kind in 'fc':
+        np.add(array, 0, out=array)
+    return array
+
+
+def _position(index, axis, size):
+    if not -size <= index < size:
+        raise IndexError(f'index {index} is out of bounds for axis {axis} with size {size}')
+    return index % size
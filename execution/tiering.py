@@ -0,0 +1,650 @@
+import numpy as np
+from collections import Counter
+
+from syntax_tree.constructions import *
+from semantic.effects import EffectsCollector
+from execution.variable import Variable, VariableType
+from execution.exception import WithStackTraceException, ExecutionCancelledException
+
+# Operators of the relation conditions are the Python ones.
+RELATION_OPERATORS = ('<', '>', '<=', '>=', '==', '!=')
+
+
+class NotTranslatableException(Exception):
+    """
+    Raised when the function can not be translated into Python code.
+    """
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Deoptimization(Exception):
+    """
+    Raised by the translated code, when it can not continue the same way
+    as the interpreter; the call is evaluated by the interpreter again.
+    Translated loop informs also about the number of the construction
+    it stopped before and the values of its variables.
+    """
+
+    def __init__(self, point=None, variables=None):
+        super().__init__()
+        self.point = point
+        self.variables = variables
+
+
+class FunctionTiers:
+    """
+    Class tiering up the hot functions of the program.
+
+    Functions are evaluated by the interpreter first. Calls of the
+    functions and iterations of their until statements are counted, and
+    the function reaching any threshold is translated into Python code
+    (see FunctionTranslator), which is called instead of the interpreter
+    while the types of the arguments match the types observed before.
+
+    Translated functions compute numbers only, so they have no side
+    effects: whenever the translated code can not continue the same way
+    as the interpreter (errors, function ending without return,
+    cancellation), the call is evaluated again by the interpreter, which
+    reports the error with its proper stack trace.
+
+    Until statements iterated many times during the single execution
+    are translated on their own (see FunctionTranslator.translate_loop),
+    and the interpreter replaces the rest of the loop with the translated
+    one, passing it the variables of its scope.
+
+    Tiers are shared by all the interpreters executing the program;
+    counters may miss the updates of the concurrent calls, which only
+    delays the translation.
+    """
+
+    default_options = {
+        # Number of calls of the function translating it, None disables tiering.
+        'TIER_UP_CALLS': 100,
+        # Number of the until statements iterations translating the function.
+        'TIER_UP_ITERATIONS': 1000,
+        # Number of the iterations of the single until statement execution
+        # replacing the rest of the loop with the translated one, None disables it.
+        'OSR_ITERATIONS': 1000
+    }
+
+    def __init__(self, functions_definitions, options=None):
+        self.functions_definitions = functions_definitions
+        options = {**FunctionTiers.default_options, **(options if options is not None else {})}
+        self.calls_threshold = options['TIER_UP_CALLS']
+        self.iterations_threshold = options['TIER_UP_ITERATIONS']
+        self.osr_threshold = options['OSR_ITERATIONS'] if self.calls_threshold is not None else None
+        self.calls = Counter()
+        self.iterations = Counter()
+        # Functions called with the arguments other than numbers.
+        self.polymorphic = set()
+        # Names of the functions mapped into their translated entries,
+        # None if they can not be translated.
+        self.translated = {}
+        # Identities of the until statements mapped into their translated
+        # loops, None if they can not be translated.
+        self.loops = {}
+
+    def called(self, identifier, args):
+        """
+        Counts the call of the function.
+
+        :param identifier: name of the called program function.
+        :param args: list of argument variables.
+        :return: TranslatedFunction to call or None, if the function is interpreted.
+        """
+        if (translated := self.translated.get(identifier)) is not None:
+            return translated
+        if self.calls_threshold is None or identifier in self.translated:
+            return None
+        if any(arg.type != VariableType.NUMBER for arg in args):
+            self.polymorphic.add(identifier)
+        self.calls[identifier] += 1
+        if self.calls[identifier] >= self.calls_threshold:
+            return self.__tier_up(identifier)
+        return None
+
+    def iterated(self, identifier, iterations):
+        """
+        Counts the iterations of the until statement of the function.
+
+        :param identifier: name of the function executing the until statement.
+        :param iterations: number of the iterations.
+        """
+        if self.calls_threshold is None or identifier in self.translated:
+            return
+        self.iterations[identifier] += iterations
+        if self.iterations[identifier] >= self.iterations_threshold:
+            self.__tier_up(identifier)
+
+    def loop(self, until_statement, stack):
+        """
+        Returns the translated until statement, which is evaluated by the
+        interpreter for a long time.
+
+        :param until_statement: evaluated until statement.
+        :param stack: ScopeStack of the interpreter, which variables are passed to
+            the translated loop.
+        :return: TranslatedLoop to run or None, if the loop stays interpreted.
+        """
+        key = id(until_statement)
+        if key not in self.loops:
+            effects = EffectsCollector.collect(until_statement)
+            variables = {
+                name: variable
+                for name in effects.reads | effects.writes | effects.modifies
+                if (variable := stack.find_variable(name)) is not None
+            }
+            translated = None
+            try:
+                translated = FunctionTranslator(self.functions_definitions).translate_loop(until_statement, variables)
+            except NotTranslatableException:
+                pass
+            self.loops[key] = translated
+        return self.loops[key]
+
+    def __tier_up(self, identifier):
+        translated = None
+        if identifier not in self.polymorphic:
+            try:
+                translated = FunctionTranslator(self.functions_definitions).translate(identifier)
+            except NotTranslatableException:
+                pass
+        self.translated[identifier] = translated
+        return translated
+
+
+class TranslatedFunction:
+    """
+    Python function translated from the program function, guarded by the
+    types of the arguments.
+    """
+
+    def __init__(self, entry, source):
+        self.entry = entry
+        self.source = source
+
+    def call(self, args, cancellation):
+        """
+        Calls the translated function.
+
+        :param args: list of argument variables; numbers assigned to the
+            parameters are stored in them, the same way as by the interpreter.
+        :param cancellation: CancellationToken of the execution.
+        :return: result variable or None, if the call must be evaluated by the interpreter.
+        """
+        for arg in args:
+            if arg.type != VariableType.NUMBER:
+                return None
+        try:
+            result, *parameters = self.entry(cancellation, *[arg.value for arg in args])
+        except Exception:
+            # Translated code is pure, so the interpreter evaluates the
+            # call again from the beginning.
+            return None
+        for arg, value in zip(args, parameters):
+            arg.value = value
+        return Variable(VariableType.NUMBER, result)
+
+
+class TranslatedLoop:
+    """
+    Python function translated from the until statement, replacing the
+    interpreter in the middle of the loop execution, guarded by the types
+    of the variables it uses.
+    """
+
+    def __init__(self, entry, names, types, points, source):
+        self.entry = entry
+        self.names = names
+        self.types = types
+        self.points = points
+        self.source = source
+
+    def run(self, interpreter):
+        """
+        Evaluates the rest of the loop with the variables of the interpreter.
+
+        :param interpreter: interpreter evaluating the until statement, after the
+            end of the loop body.
+        :return: True if the loop was evaluated, False if it must be continued
+            by the interpreter.
+        :raise WithStackTraceException: error of the loop, the same as raised
+            by the interpreter.
+        """
+        variables = [interpreter.stack.find_variable(name) for name in self.names]
+        for variable, variable_type in zip(variables, self.types):
+            if variable is None or variable.type != variable_type:
+                return False
+            if variable_type == VariableType.MATRIX and not _writeable_matrix(variable.value):
+                return False
+        try:
+            values = self.entry(interpreter.cancellation, *[variable.value for variable in variables])
+        except Deoptimization as deoptimization:
+            self.__deoptimized(interpreter, variables, deoptimization)
+            return False
+        except Exception:
+            # Numbers of the variables are not changed, so the interpreter
+            # continues the loop.
+            return False
+        for variable, value in zip(variables, values):
+            variable.value = value
+        return True
+
+    def __deoptimized(self, interpreter, variables, deoptimization):
+        # Loop stopped before the statement or condition, which can not be
+        # evaluated, so the interpreter evaluates it and raises its error.
+        # When it is evaluated without the error, the translated code is
+        # wrong, so the interpreter evaluates the rest of the loop body
+        # as well, and then it continues the loop.
+        values = deoptimization.variables
+        for variable, name in zip(variables, self.names):
+            variable.value = values[_local('v', name)]
+        construction, frames, continuation = self.points[deoptimization.point]
+        if construction is None:
+            error = ExecutionCancelledException()
+            error.stack.extend(frames)
+            raise error
+        interpreter.stack.open_scope()
+        try:
+            # Variables of the loop body are the only locals not being
+            # the variables of the interpreter.
+            for local, value in values.items():
+                if local.startswith('v_') and local[2:] not in self.names:
+                    interpreter.stack.set_variable(local[2:], Variable(VariableType.NUMBER, value))
+            for constructions, frames in [([construction], frames), *continuation]:
+                for following in constructions:
+                    try:
+                        following.accept(interpreter)
+                    except WithStackTraceException as e:
+                        e.stack.extend(frames)
+                        raise e
+        finally:
+            interpreter.stack.close_scope()
+
+
+class FunctionTranslator:
+    """
+    Class translating the program functions and until statements computing
+    numbers into the Python source code.
+
+    Parameters of the function are numbers, so every variable is a
+    number; variables are the Python locals and scopes are checked
+    statically, so reading the variable, which may be not initialized,
+    is not translated. Functions called by the translated function are
+    translated as well. Strings, matrices, index operators and library
+    functions are not translated, so the translated function never
+    changes anything other than its locals.
+
+    Until statements are translated with the variables of the scope,
+    which they use: the numbers are passed and returned, while the single
+    elements of the matrices may be read and modified in place. Calls and
+    return statements are not translated. Statements and conditions are
+    numbered, so the loop stopped by the error is left before the failing
+    one, which is evaluated by the interpreter together with the rest of
+    the loop body (see TranslatedLoop).
+    """
+
+    def __init__(self, functions_definitions):
+        self.functions_definitions = functions_definitions
+        self.lines = []
+        self.depth = 0
+        # Scopes map the names of the variables into their types.
+        self.scopes = []
+        self.temporaries = 0
+        self.pending = []
+        self.entry = False
+        self.parameters = []
+        # Translated loop keeps the statements and conditions, which may
+        # fail, with the stack trace of the constructions enclosing them.
+        self.loop = False
+        self.points = []
+        self.enclosing = []
+        # Statements following the translated one in the enclosing blocks,
+        # from the outermost, with the stack trace of their constructions.
+        self.continuation = []
+
+    def translate(self, identifier):
+        """
+        Translates the function and the functions it calls.
+
+        :param identifier: name of the program function.
+        :return: TranslatedFunction calling the function.
+        :raise NotTranslatableException: function can not be translated.
+        """
+        translated = set()
+        self.pending = [identifier]
+        while self.pending:
+            function_identifier = self.pending.pop()
+            if function_identifier not in translated:
+                translated.add(function_identifier)
+                self.__function(self.functions_definitions[function_identifier], entry=False)
+        self.__function(self.functions_definitions[identifier], entry=True)
+        return TranslatedFunction(self.__compiled(f'e_{identifier}', identifier), '\n'.join(self.lines))
+
+    def translate_loop(self, until_statement, variables):
+        """
+        Translates the until statement.
+
+        :param until_statement: until statement to translate.
+        :param variables: dictionary of the variables used by the statement, which
+            are initialized before it.
+        :return: TranslatedLoop evaluating the statement.
+        :raise NotTranslatableException: statement can not be translated.
+        """
+        names = sorted(variables)
+        types = [variables[name].type for name in names]
+        if any(variable_type not in (VariableType.NUMBER, VariableType.MATRIX) for variable_type in types):
+            raise NotTranslatableException('variable neither number nor matrix')
+        self.loop = True
+        self.scopes = [dict(zip(names, types))]
+        parameters = [_local('v', name) for name in names]
+        self.__line(f'def loop(c, {", ".join(parameters)}):')
+        self.depth += 1
+        self.__line('s = 0')
+        self.__line('try:')
+        self.depth += 1
+        self.__until(until_statement)
+        self.depth -= 1
+        self.__line('except Exception as e:')
+        self.__line('    raise Deoptimization(s, locals()) from e')
+        self.__line(f'return ({"".join(f"{parameter}, " for parameter in parameters)})')
+        self.depth -= 1
+        return TranslatedLoop(self.__compiled('loop', 'loop'), names, types, self.points, '\n'.join(self.lines))
+
+    def __compiled(self, name, identifier):
+        namespace = {'Deoptimization': Deoptimization, '_deoptimized': _deoptimized}
+        exec(compile('\n'.join(self.lines), f'<translated {identifier}>', 'exec'), namespace)
+        return namespace[name]
+
+    def __line(self, text):
+        self.lines.append('    ' * self.depth + text)
+
+    def __point(self, construction):
+        # Following code evaluates the construction, which may fail.
+        self.__line(f's = {len(self.points)}')
+        self.points.append((construction, list(reversed(self.enclosing)), list(reversed(self.continuation))))
+
+    def __function(self, function_def, entry):
+        # Entry is called with the argument variables, so it returns also
+        # the values of the parameters.
+        parameters = [_local('v', parameter.name) for parameter in function_def.parameters]
+        if len(set(parameters)) != len(parameters):
+            raise NotTranslatableException('duplicated parameters')
+        self.entry = entry
+        self.parameters = parameters
+        self.__line(f'def {_local("e" if entry else "f", function_def.identifier)}(c, {", ".join(parameters)}):')
+        self.depth += 1
+        self.__line('if c.cancelled:')
+        self.__line('    raise Deoptimization()')
+        self.scopes = [{parameter.name: VariableType.NUMBER for parameter in function_def.parameters}]
+        if self.__block(function_def.statement_block):
+            # Function ending without return statement returns undefined value.
+            self.__line('raise Deoptimization()')
+        self.depth -= 1
+        self.lines.append('')
+
+    def __block(self, statement_block):
+        # Returns True if the end of the block may be reached.
+        self.scopes.append({})
+        self.enclosing.append('evaluate statement block')
+        start = len(self.lines)
+        for name in _common_names(statement_block):
+            self.__line(f'm_{name[1:]} = None')
+        reached = True
+        for position, statement in enumerate(statement_block.statements):
+            self.continuation.append((statement_block.statements[position + 1:], list(reversed(self.enclosing))))
+            reached = self.__statement(statement)
+            self.continuation.pop()
+            if not reached:
+                break
+        if len(self.lines) == start:
+            self.__line('pass')
+        self.enclosing.pop()
+        self.scopes.pop()
+        return reached
+
+    def __statement(self, statement):
+        if type(statement) is StatementBlock:
+            return self.__block(statement)
+        if type(statement) is IfStatement:
+            if self.loop:
+                self.__point(statement)
+            self.enclosing.append('evaluate if statement')
+            self.__line(f'if {self.__condition(statement.condition)}:')
+            self.depth += 1
+            reached = self.__block(statement.statement_block)
+            self.depth -= 1
+            else_statement = statement.else_statement
+            if else_statement is not None:
+                self.__line('else:')
+                self.depth += 1
+                reached = self.__statement(else_statement) or reached
+                self.depth -= 1
+            else:
+                reached = True
+            self.enclosing.pop()
+            return reached
+        if type(statement) is UntilStatement:
+            # Statement is evaluated again after the end of its body.
+            self.continuation.append(([statement], list(reversed(self.enclosing))))
+            self.enclosing.append('evaluate until statement')
+            self.__until(statement)
+            self.enclosing.pop()
+            self.continuation.pop()
+            return True
+        if type(statement) is AssignStatement:
+            if self.loop:
+                self.__point(statement)
+            self.__assignment(statement)
+            return True
+        if type(statement) is ReturnStatement:
+            if statement.expression is None:
+                raise NotTranslatableException('return without value')
+            if self.loop:
+                raise NotTranslatableException('return from loop')
+            expression = self.__expression(statement.expression)
+            if self.entry:
+                self.__line(f'return ({expression}, {"".join(f"{name}, " for name in self.parameters)})')
+            else:
+                self.__line(f'return {expression}')
+            return False
+        if type(statement) in (FunctionCall, InlinedCall):
+            self.__line(self.__expression(statement))
+            return True
+        raise NotTranslatableException(f'statement {type(statement).__name__}')
+
+    def __until(self, until_statement):
+        for name in until_statement.invariants:
+            self.__line(f'h_{name[1:]} = None')
+        if not self.loop:
+            self.__line(f'while {self.__condition(until_statement.condition)}:')
+            self.depth += 1
+        else:
+            self.__line('while True:')
+            self.depth += 1
+            self.__point(until_statement.condition)
+            self.__line(f'if not {self.__condition(until_statement.condition)}:')
+            self.__line('    break')
+            # Cancelled loop raises its error instead of evaluating any
+            # construction.
+            self.__point(None)
+        self.__line('if c.cancelled:')
+        self.__line('    raise Deoptimization()')
+        self.__block(until_statement.statement_block)
+        self.depth -= 1
+
+    def __assignment(self, assign_statement):
+        identifier = assign_statement.identifier
+        expression = self.__expression(assign_statement.expression)
+        variable_type = self.__type_of(identifier.name)
+        if identifier.index_operator is not None:
+            if variable_type != VariableType.MATRIX:
+                raise NotTranslatableException('index operator assignment')
+            self.__line(f'{self.__element(identifier)} = {expression}')
+            return
+        if variable_type is None:
+            self.scopes[-1][identifier.name] = VariableType.NUMBER
+        elif variable_type != VariableType.NUMBER:
+            raise NotTranslatableException(f'number assigned to {identifier.name}')
+        self.__line(f'{_local("v", identifier.name)} = {expression}')
+
+    def __type_of(self, name):
+        # Returns None if the variable may be not initialized.
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def __element(self, identifier):
+        # Single element of the matrix selected with the numbers.
+        index_operator = identifier.index_operator
+        if DotsSelect in (type(index_operator.first_selector), type(index_operator.second_selector)):
+            raise NotTranslatableException('dots selector')
+        first = self.__expression(index_operator.first_selector)
+        second = self.__expression(index_operator.second_selector)
+        return f'{_local("v", identifier.name)}[int({first}), int({second})]'
+
+    def __condition(self, condition):
+        if type(condition) is OrCondition:
+            return f'({" or ".join(self.__nested_condition(operand) for operand in condition.and_conditions)})'
+        if type(condition) is AndCondition:
+            return f'({" and ".join(self.__nested_condition(operand) for operand in condition.rel_conditions)})'
+        if type(condition) is RelationCondition:
+            if type(condition.left_expression) in (OrCondition, AndCondition, RelationCondition):
+                raise NotTranslatableException('condition as operand')
+            left = self.__expression(condition.left_expression)
+            if condition.operator is None:
+                text = f'({left} != 0)'
+            elif condition.operator in RELATION_OPERATORS:
+                if type(condition.right_expression) in (OrCondition, AndCondition, RelationCondition):
+                    raise NotTranslatableException('condition as operand')
+                text = f'({left} {condition.operator} {self.__expression(condition.right_expression)})'
+            else:
+                raise NotTranslatableException(f'operator {condition.operator}')
+            return f'(not {text})' if condition.negated else text
+        # Collapsed expression is true, when it is not zero.
+        return f'({self.__expression(condition)} != 0)'
+
+    def __nested_condition(self, condition):
+        # Operands of and and or conditions, which are not the conditions,
+        # evaluate into the variables, which are always true.
+        if type(condition) not in (OrCondition, AndCondition, RelationCondition):
+            raise NotTranslatableException('expression as condition operand')
+        return self.__condition(condition)
+
+    def __expression(self, expression):
+        if type(expression) is NumberLiteral:
+            if type(expression.value) not in (int, float):
+                raise NotTranslatableException('number literal')
+            return repr(expression.value)
+        if type(expression) is Identifier:
+            variable_type = self.__type_of(expression.name)
+            if variable_type is None:
+                raise NotTranslatableException(f'variable {expression.name} may be not initialized')
+            if expression.index_operator is not None:
+                if variable_type != VariableType.MATRIX:
+                    raise NotTranslatableException('index operator')
+                return self.__element(expression)
+            if variable_type != VariableType.NUMBER:
+                raise NotTranslatableException(f'variable {expression.name} is not number')
+            return _local('v', expression.name)
+        if type(expression) is AdditiveExpression:
+            return self.__operations(expression.multiplicative_expressions, expression.operators)
+        if type(expression) is MultiplicativeExpression:
+            return self.__operations(expression.atomic_expressions, expression.operators)
+        if type(expression) is NegatedAtomicExpression:
+            return f'(-{self.__expression(expression.atomic_expression)})'
+        if type(expression) is LoopInvariant:
+            name = f'h_{expression.name[1:]}'
+            return f'({name} if {name} is not None else ({name} := {self.__expression(expression.expression)}))'
+        if type(expression) is CommonExpression:
+            name = f'm_{expression.name[1:]}'
+            return f'({name} if {name} is not None else ({name} := {self.__expression(expression.expression)}))'
+        if type(expression) in (FunctionCall, InlinedCall) and self.loop:
+            # Failing call can not be evaluated again by the interpreter.
+            raise NotTranslatableException('function call in loop')
+        if type(expression) is InlinedCall:
+            return self.__expression(expression.function_call)
+        if type(expression) is FunctionCall:
+            function_def = self.functions_definitions.get(expression.identifier)
+            if function_def is None:
+                raise NotTranslatableException(f'library function {expression.identifier}')
+            if len(function_def.parameters) != len(expression.arguments):
+                raise NotTranslatableException(f'function {expression.identifier} arguments mismatch')
+            self.pending.append(expression.identifier)
+            arguments = ''.join(f', {self.__expression(argument)}' for argument in expression.arguments)
+            return f'{_local("f", expression.identifier)}(c{arguments})'
+        raise NotTranslatableException(f'expression {type(expression).__name__}')
+
+    def __operations(self, operands, operators):
+        text = self.__expression(operands[0])
+        for operator, operand in zip(operators, operands[1:]):
+            right = self.__expression(operand)
+            if operator == '/':
+                # Division by zero raises error.
+                temporary = f't_{self.temporaries}'
+                self.temporaries += 1
+                text = f'({text} / {temporary} if ({temporary} := {right}) != 0 else _deoptimized())'
+            else:
+                text = f'({text} {operator} {right})'
+        return text
+
+
+def _local(prefix, name):
+    # Identifiers of the language may contain letters, which are not
+    # allowed in the Python ones.
+    local = f'{prefix}_{name}'
+    if not local.isidentifier():
+        raise NotTranslatableException(f'identifier {name}')
+    return local
+
+
+def _writeable_matrix(value):
+    # Matrices modified in place by the interpreter, without copying.
+    return isinstance(value, np.ndarray) and value.ndim == 2 and value.flags.writeable
+
+
+def _deoptimized():
+    raise Deoptimization()
+
+
+def _common_names(statement_block):
+    # Common expressions are stored in the scope of the block containing
+    # the statements computing them.
+    names = set()
+    for statement in statement_block.statements:
+        if type(statement) in (AssignStatement, ReturnStatement, FunctionCall, InlinedCall):
+            pending = [statement]
+            while pending:
+                construction = pending.pop()
+                if type(construction) is CommonExpression:
+                    names.add(construction.name)
+                pending.extend(_operands(construction))
+    return sorted(names)
+
+
+def _operands(construction):
+    if type(construction) is AssignStatement:
+        return [construction.identifier, construction.expression]
+    if type(construction) is ReturnStatement:
+        return [construction.expression] if construction.expression is not None else []
+    if type(construction) is AdditiveExpression:
+        return construction.multiplicative_expressions
+    if type(construction) is MultiplicativeExpression:
+        return construction.atomic_expressions
+    if type(construction) is NegatedAtomicExpression:
+        return [construction.atomic_expression]
+    if type(construction) is FunctionCall:
+        return construction.arguments
+    if type(construction) is InlinedCall:
+        return [construction.function_call]
+    if type(construction) in (CommonExpression, LoopInvariant):
+        return [construction.expression]
+    if type(construction) is Identifier and construction.index_operator is not None:
+        # Selectors of the element read or modified.
+        index_operator = construction.index_operator
+        return [index_operator.first_selector, index_operator.second_selector]
+    return []
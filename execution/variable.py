@@ -3,12 +3,16 @@ from enum import Enum, auto
 
 
 class Variable:
+    # Structured matrix held instead of the dense value, see the
+    # StructuredVariable; plain variables never hold one.
+    structure = None
+
     def __init__(self, var_type, value):
         self.type = var_type
         self.value = value
 
     def __eq__(self, other):
-        if type(other) is type(self):
+        if isinstance(other, Variable):
             if self.type == VariableType.MATRIX and other.type == VariableType.MATRIX:
                 return np.all(self.value == other.value)
             return self.type == other.type and self.value == other.value
@@ -21,9 +25,61 @@ class Variable:
         return f'Variable: type: {self.type}, value: {self.value}'
 
 
+class StructuredVariable(Variable):
+    """
+    Matrix variable holding the structured matrix (see StructuredMatrix)
+    instead of the dense value.
+
+    Dense value is materialized, when it is read for the first time, and
+    it is kept by the structure, so variables sharing the structure share
+    its dense value too, the same way as the variables sharing the matrix.
+    Variables may be read by the statements evaluated concurrently, so
+    the class of the variable is never changed back; assigned value
+    replaces the structure instead. Operations aware of the structure
+    read it without materializing the matrix.
+    """
+
+    def __init__(self, structure):
+        self.type = VariableType.MATRIX
+        self.structure = structure
+
+    @staticmethod
+    def assign(variable, structure):
+        """
+        Sets the structured matrix as the value of the variable.
+
+        Variable is changed in place, since it may be referenced by the
+        other scopes, the same way as when its value is set.
+
+        :param variable: Variable to set.
+        :param structure: StructuredMatrix set as the variable value.
+        """
+        variable.structure = structure
+        variable.__class__ = StructuredVariable
+        variable.type = VariableType.MATRIX
+
+    @property
+    def value(self):
+        # Value assigned after the structure is stored in the instance
+        # dictionary, the same way as for the plain variables.
+        structure = self.structure
+        if structure is None:
+            return self.__dict__['value']
+        return structure.materialized()
+
+    @value.setter
+    def value(self, value):
+        # Value is stored first, so it is found by the concurrent readers,
+        # once they see the structure removed.
+        self.__dict__['value'] = value
+        self.structure = None
+
+
 class VariableType(Enum):
     MATRIX = auto(),
+    SPARSE = auto(),
     NUMBER = auto(),
     STRING = auto(),
+    STREAM = auto(),
     DOTS = auto(),
     UNDEFINED = auto()
@@ -0,0 +1,178 @@
+import numpy as np
+
+from execution.interpreter import Interpreter
+from execution.variable import Variable, VariableType
+
+
+class NotLiftableException(Exception):
+    """
+    Raised when the function can not be evaluated over the whole batch at once.
+    """
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class LiftedInterpreter(Interpreter):
+    """
+    Interpreter evaluating the pure function once over the whole batch.
+
+    Batched matrices are stacked into 3-D arrays and batched numbers into
+    arrays of (batch, 1, 1) shape, so the element-wise operations and
+    np.matmul broadcast them over the batch, while not batched values are
+    shared by all the batch items. Control flow depending on the batched
+    values, index operator assignments and library calls with batched
+    arguments can not be lifted and raise NotLiftableException.
+    """
+
+    def __init__(self, program, options=None):
+        # Tiled multiplication supports 2-D matrices only.
+        super().__init__(None, {**(options if options is not None else {}), 'OUT_OF_CORE_THRESHOLD': np.inf,
+                                'PARALLEL_STATEMENTS': False, 'PARALLEL_ARGUMENTS': False}, program)
+        # Translated functions compute single numbers, not the batches,
+        # and so do the scalar expressions.
+        self.tiers = None
+        self.scalar_expressions = {}
+
+    def evaluate_assign_statement(self, assign_statement):
+        if assign_statement.identifier.index_operator is not None:
+            raise NotLiftableException('index operator assignment')
+        super().evaluate_assign_statement(assign_statement)
+
+    def evaluate_relation_condition(self, rel_condition):
+        # Operands are pure, so they are evaluated again by the interpreter,
+        # when they turn out to be not batched.
+        rel_condition.left_expression.accept(self)
+        if _is_batched(self.result):
+            raise NotLiftableException('condition depending on batch')
+        if rel_condition.right_expression is not None:
+            rel_condition.right_expression.accept(self)
+            if _is_batched(self.result):
+                raise NotLiftableException('condition depending on batch')
+        super().evaluate_relation_condition(rel_condition)
+
+    def evaluate_function_call(self, function_call):
+        if (identifier := function_call.identifier) in self.program_functions:
+            super().evaluate_function_call(function_call)
+            return
+        args = []
+        for argument in function_call.arguments:
+            argument.accept(self)
+            if _is_batched(self.result):
+                raise NotLiftableException(f'library function {identifier} over batch')
+            args.append(self.result)
+        self.lib_functions[identifier](args, self)
+
+    def evaluate_inlined_call(self, inlined_call):
+        # Parameters of the called function are checked by the lifted
+        # reads of the identifiers, so the function is called.
+        self.evaluate_function_call(inlined_call.function_call)
+
+    def evaluate_matrix_literal(self, matrix_literal):
+        super().evaluate_matrix_literal(matrix_literal)
+        if self.result.value.ndim != 2:
+            raise NotLiftableException('matrix literal of batched numbers')
+
+    def evaluate_identifier(self, identifier):
+        variable = self.stack.get_variable(identifier.name)
+        if identifier.index_operator is None or not _is_batched(variable):
+            super().evaluate_identifier(identifier)
+            return
+        identifier.index_operator.first_selector.accept(self)
+        first = self.result
+        identifier.index_operator.second_selector.accept(self)
+        second = self.result
+        if _is_batched(first) or _is_batched(second) or \
+                first.type not in [VariableType.DOTS, VariableType.NUMBER] or \
+                second.type not in [VariableType.DOTS, VariableType.NUMBER]:
+            raise NotLiftableException('index operator depending on batch')
+        # Selection happens on the last two axes, keeping the shapes of
+        # the not batched selection results.
+        matrix = variable.value
+        if first.type == VariableType.DOTS and second.type == VariableType.DOTS:
+            self.result = variable
+        elif first.type == VariableType.NUMBER and second.type == VariableType.DOTS:
+            self.result = Variable(VariableType.MATRIX, matrix[:, int(first.value), :][:, np.newaxis, :])
+        elif first.type == VariableType.DOTS and second.type == VariableType.NUMBER:
+            self.result = Variable(VariableType.MATRIX, matrix[:, :, int(second.value)][:, np.newaxis, :])
+        else:
+            self.result = Variable(VariableType.NUMBER, matrix[:, int(first.value), int(second.value)][:, None, None])
+
+
+def _is_batched(variable):
+    return variable is not None and \
+        variable.type in [VariableType.MATRIX, VariableType.NUMBER] and \
+        variable.structure is None and \
+        isinstance(variable.value, np.ndarray) and variable.value.ndim == 3
+
+
+def vmap(program, identifier, arguments, options=None, not_liftable=None):
+    """
+    Calls the function of the program for every item of the batch.
+
+    Batched arguments are 3-D arrays of the stacked matrices or 1-D arrays
+    of numbers, all with the same number of items; other arguments are
+    passed to every call. Pure functions are evaluated once over the whole
+    batch, when it is possible; otherwise, or if lifted evaluation fails,
+    the function is called for every item separately, so the results and
+    errors are the same as of the separate calls.
+
+    :param program: CompiledProgram of the function.
+    :param identifier: name of the function.
+    :param arguments: list of tuples of argument variable and flag informing whether it is batched.
+    :param options: interpreter options.
+    :param not_liftable: optional set of the function calls, which could not be lifted;
+        updated with the call, if it is not liftable.
+    :return: tuple of list of result variables of the items and flag informing whether it was lifted.
+    """
+    size = _batch_size(arguments)
+    key = (identifier, tuple(batched for _, batched in arguments))
+    if identifier in program.functions and identifier in program.pure_functions and \
+            (not_liftable is None or key not in not_liftable):
+        try:
+            result = LiftedInterpreter(program, options).call(identifier, [
+                _stacked(variable) if batched else variable for variable, batched in arguments
+            ])
+            return _unstacked(result, size), True
+        except NotLiftableException:
+            if not_liftable is not None:
+                not_liftable.add(key)
+        except Exception:
+            # Errors are reported by the separate calls, with their
+            # proper stack traces.
+            pass
+    interpreter = Interpreter(None, options, program)
+    results = []
+    for item in range(size):
+        results.append(interpreter.call(identifier, [
+            _item_of(variable, item) if batched else variable for variable, batched in arguments
+        ]))
+    return results, False
+
+
+def _batch_size(arguments):
+    sizes = {len(variable.value) for variable, batched in arguments if batched}
+    if len(sizes) != 1:
+        raise ValueError(f'expected batched arguments of the same size, got sizes {sorted(sizes)}')
+    return sizes.pop()
+
+
+def _stacked(variable):
+    if variable.type == VariableType.NUMBER:
+        return Variable(VariableType.NUMBER, variable.value[:, None, None])
+    return variable
+
+
+def _item_of(variable, item):
+    # Item of the stacked matrices is the view, so the modifications
+    # made by the function are visible in the batch.
+    return Variable(variable.type, variable.value[item])
+
+
+def _unstacked(result, size):
+    if _is_batched(result):
+        if result.type == VariableType.NUMBER:
+            return [Variable(VariableType.NUMBER, value) for value in result.value[:, 0, 0]]
+        return [Variable(VariableType.MATRIX, value) for value in result.value]
+    return [result] * size
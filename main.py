@@ -1,4 +1,5 @@
 import sys
+import argparse
 
 from data.source.pipeline import positional_file_source_pipe
 from lexical.analyzer import LexicalAnalyzer
@@ -6,17 +7,16 @@ from lexical.exception import LexicalException
 from syntactic.analyzer import SyntacticAnalyzer
 from syntactic.exception import SyntacticException
 from execution.interpreter import Interpreter
+from execution.program import CompiledProgram
 from execution.exception import ExecutionException
 from exception.handler import ExceptionHandler
+from server.daemon import InterpreterServer
+from batch.runner import BatchRunner
+from optimizer.printer import ProgramPrinter
+from optimizer.inlining import FunctionInliner
 
 
-arguments_err_mess = '''
-Expected single argument with file name containing the source code of the program. 
-Got {} arguments instead.
-'''
-
-
-def start_interpretation(file_name):
+def start_interpretation(file_name, options=None):
     # Separate data source handling since it may be used for lexical
     # exceptions reporting.
     try:
@@ -26,7 +26,7 @@ def start_interpretation(file_name):
         return
 
     try:
-        interpreter = Interpreter(SyntacticAnalyzer(LexicalAnalyzer(data_source)))
+        interpreter = Interpreter(SyntacticAnalyzer(LexicalAnalyzer(data_source)), options)
         interpreter.execute()
     except LexicalException as e:
         ExceptionHandler.handle_lexical_exception(e, data_source.unified_source.raw_source)
@@ -36,10 +36,118 @@ def start_interpretation(file_name):
         ExceptionHandler.handle_execution_exception(e)
 
 
+def dump_optimized(file_name, compiler_options=None):
+    try:
+        data_source = positional_file_source_pipe(file_name)
+    except IOError as e:
+        print(e)
+        return
+
+    try:
+        program = CompiledProgram.compile(SyntacticAnalyzer(LexicalAnalyzer(data_source)), compiler_options)
+        print(ProgramPrinter.print_program(program.program))
+        for identifier, eliminated in program.eliminated_evaluations.items():
+            if eliminated:
+                print(f'# {identifier}: {eliminated} evaluations of common subexpressions eliminated')
+    except LexicalException as e:
+        ExceptionHandler.handle_lexical_exception(e, data_source.unified_source.raw_source)
+    except SyntacticException as e:
+        ExceptionHandler.handle_syntactic_exception(e, data_source.unified_source.raw_source)
+    except ExecutionException as e:
+        ExceptionHandler.handle_execution_exception(e)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Matrix Language interpreter.')
+    parser.add_argument('file_name', nargs='?', help='file containing the source code of the program')
+    parser.add_argument(
+        '--parallel-statements', action='store_true',
+        help='evaluate independent statements concurrently on the thread pool'
+    )
+    parser.add_argument(
+        '--parallel-arguments', action='store_true',
+        help='evaluate arguments of function calls concurrently on the thread pool'
+    )
+    parser.add_argument(
+        '--dump-optimized', action='store_true',
+        help='print the program optimized by the compiler instead of executing it'
+    )
+    parser.add_argument(
+        '--inline-max-size', type=int, default=FunctionInliner.default_options['INLINE_MAX_SIZE'],
+        help='maximal number of constructions of the inlined function expression, 0 disables inlining'
+    )
+    parser.add_argument(
+        '--inline-max-depth', type=int, default=FunctionInliner.default_options['INLINE_MAX_DEPTH'],
+        help='maximal number of inlined calls nested in each other'
+    )
+    parser.add_argument('--workers', type=int, default=None, help='number of the worker threads')
+    parser.add_argument('--serve', metavar='SOCKET', help='run the interpreter server on the Unix domain socket')
+    parser.add_argument(
+        '--max-concurrency', type=int, default=InterpreterServer.default_options['MAX_CONCURRENCY'],
+        help='maximal number of programs executed by the server at once'
+    )
+    parser.add_argument(
+        '--cache-size', type=int, default=InterpreterServer.default_options['CACHE_SIZE'],
+        help='number of compiled programs cached by the server'
+    )
+    parser.add_argument(
+        '--timeout', type=float, default=None,
+        help='execution timeout of the server requests or batch jobs in seconds'
+    )
+    parser.add_argument('--batch', metavar='MANIFEST', help='execute the jobs of the JSON-lines manifest')
+    parser.add_argument('--report', help='file of the batch JSON-lines report, standard output by default')
+    parser.add_argument('--processes', type=int, default=None, help='number of the batch worker processes')
+    parser.add_argument(
+        '--jobs-per-worker', type=int, default=BatchRunner.default_options['JOBS_PER_WORKER'],
+        help='number of the batch jobs executed by the worker process before it is replaced'
+    )
+    arguments = parser.parse_args()
+    if [arguments.file_name, arguments.serve, arguments.batch].count(None) != 2:
+        parser.error('expected either file name, --serve or --batch option')
+    return arguments
+
+
+def start_batch(arguments, interpreter_options):
+    runner = BatchRunner({
+        'PROCESSES': arguments.processes,
+        'JOBS_PER_WORKER': arguments.jobs_per_worker,
+        'TIMEOUT': arguments.timeout,
+        'INTERPRETER_OPTIONS': interpreter_options
+    })
+    try:
+        if arguments.report is None:
+            runner.run(arguments.batch, sys.stdout)
+        else:
+            with open(arguments.report, 'w', encoding='utf-8') as report:
+                runner.run(arguments.batch, report)
+    except OSError as e:
+        print(e)
+
+
 if __name__ == '__main__':
-    arguments = sys.argv[1:]
-    if len(arguments) != 1:
-        print(str.format(arguments_err_mess, len(arguments)))
+    arguments = parse_arguments()
+    compiler_options = {
+        'INLINE_MAX_SIZE': arguments.inline_max_size,
+        'INLINE_MAX_DEPTH': arguments.inline_max_depth
+    }
+    interpreter_options = {
+        'PARALLEL_STATEMENTS': arguments.parallel_statements,
+        'PARALLEL_ARGUMENTS': arguments.parallel_arguments,
+        'PARALLEL_WORKERS': arguments.workers,
+        'COMPILER_OPTIONS': compiler_options
+    }
+    if arguments.serve is not None:
+        InterpreterServer(arguments.serve, {
+            'MAX_CONCURRENCY': arguments.max_concurrency,
+            'CACHE_SIZE': arguments.cache_size,
+            'TIMEOUT': (arguments.timeout
+                        if arguments.timeout is not None
+                        else InterpreterServer.default_options['TIMEOUT']),
+            'INTERPRETER_OPTIONS': interpreter_options
+        }).serve()
+    elif arguments.batch is not None:
+        start_batch(arguments, interpreter_options)
+    elif arguments.dump_optimized:
+        dump_optimized(arguments.file_name, compiler_options)
     else:
-        start_interpretation(arguments[0])
-
+        start_interpretation(arguments.file_name, interpreter_options)
@@ -0,0 +1,145 @@
+"""
+Embedding API of the Matrix Language interpreter.
+
+Program is parsed once, when it is loaded; its functions may be then
+called from Python with NumPy arrays, numbers and strings:
+
+    module = matlan.load('kernels.txt')
+    result = module.call('scale', np.eye(3), 2.0)
+
+Arrays are passed by reference, the same way as matrices are passed
+between Mat-Lan functions, so function modifying its argument with the
+index operator modifies the given array. Matrices are returned as NumPy
+arrays, without copying; sparse matrices are passed and returned as
+execution.sparse.SparseMatrix objects. Lexical, syntactic and execution exceptions of
+the interpreter are raised to the caller.
+"""
+import os
+import numbers
+import numpy as np
+
+from data.source.pipeline import positional_string_source_pipe
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from execution.interpreter import Interpreter
+from execution.program import CompiledProgram
+from execution.variable import Variable, VariableType
+from execution.sparse import SparseMatrix
+from execution.vectorize import vmap
+
+
+class Module:
+    """
+    Module is the loaded program, which functions may be called.
+
+    Every call is executed in its own execution context, so the module
+    may be used by many threads at once.
+    """
+
+    def __init__(self, program, options=None):
+        """
+        Module constructor.
+
+        :param program: CompiledProgram of the module.
+        :param options: interpreter options of the calls.
+        """
+        self.program = program
+        self.options = options
+        self.not_liftable = set()
+
+    @property
+    def functions(self):
+        return list(self.program.functions)
+
+    def call(self, identifier, *arguments):
+        """
+        Calls the function of the module.
+
+        :param identifier: name of the function.
+        :param arguments: NumPy arrays (vectors are single row matrices), sparse matrices, numbers or strings.
+        :return: NumPy array, number or string returned by the function; None,
+            if the function does not return anything.
+        """
+        args = [_variable_of(argument) for argument in arguments]
+        result = Interpreter(None, self.options, self.program).call(identifier, args)
+        return None if result.type == VariableType.UNDEFINED else result.value
+
+    def vmap(self, identifier, *arguments, batched=(0,)):
+        """
+        Calls the function for every item of the batch.
+
+        Pure function is evaluated once over the whole batch, if its body
+        allows that; data dependent control flow falls back to the call
+        per item.
+
+        :param identifier: name of the function.
+        :param arguments: arguments of the function.
+        :param batched: indexes of the batched arguments: 3-D arrays of
+            stacked matrices or 1-D arrays of numbers.
+        :return: 3-D array of stacked matrices or 1-D array of numbers
+            returned for the items; list of the values, if they can not be stacked.
+        """
+        args = []
+        for index, argument in enumerate(arguments):
+            if index not in batched:
+                args.append((_variable_of(argument), False))
+            elif isinstance(argument, np.ndarray) and argument.ndim == 3 and argument.dtype.kind in 'biuf':
+                args.append((Variable(VariableType.MATRIX, argument), True))
+            elif isinstance(argument, np.ndarray) and argument.ndim == 1 and argument.dtype.kind in 'biuf':
+                args.append((Variable(VariableType.NUMBER, argument), True))
+            else:
+                raise TypeError('expected batch of matrices or numbers as 3-D or 1-D numeric array')
+        results, _ = vmap(self.program, identifier, args, self.options, self.not_liftable)
+        return _stacked_values(results)
+
+    def __repr__(self):
+        return str.format('Module\n\tFunctions: {}\n', self.functions)
+
+
+def load(path_or_source, options=None):
+    """
+    Loads the program.
+
+    :param path_or_source: path of the file with the source code or the source code itself.
+    :param options: interpreter options of the module calls; its COMPILER_OPTIONS
+        are the optimization options of the program.
+    :return: Module of the program.
+    """
+    if isinstance(path_or_source, os.PathLike) or os.path.isfile(path_or_source):
+        with open(path_or_source, encoding='utf-8') as file:
+            source_code = file.read()
+    else:
+        source_code = path_or_source
+    parser = SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source_code)))
+    return Module(CompiledProgram.compile(parser, (options or {}).get('COMPILER_OPTIONS')), options)
+
+
+def _stacked_values(results):
+    values = [None if result.type == VariableType.UNDEFINED else result.value for result in results]
+    if all(result.type == VariableType.NUMBER for result in results):
+        return np.array(values)
+    if all(result.type == VariableType.MATRIX for result in results) and \
+            len({value.shape for value in values}) <= 1:
+        return np.stack(values) if values else np.empty((0, 0, 0))
+    return values
+
+
+def _variable_of(argument):
+    if isinstance(argument, Variable):
+        return argument
+    if isinstance(argument, str):
+        return Variable(VariableType.STRING, argument)
+    if isinstance(argument, numbers.Real):
+        return Variable(VariableType.NUMBER, argument)
+    if isinstance(argument, np.ndarray):
+        if argument.dtype.kind not in 'biuf':
+            raise TypeError(f'expected numeric array, got {argument.dtype} array')
+        if argument.ndim == 1:
+            # Reshaping returns the view, so the array is still shared.
+            argument = argument.reshape(1, -1)
+        if argument.ndim != 2:
+            raise TypeError(f'expected one or two dimensional array, got {argument.ndim} dimensional array')
+        return Variable(VariableType.MATRIX, argument)
+    if isinstance(argument, SparseMatrix):
+        return Variable(VariableType.SPARSE, argument)
+    raise TypeError(f'unsupported argument type {type(argument).__name__}')
@@ -0,0 +1,50 @@
+import os
+import argparse
+
+from data.source.pipeline import positional_file_source_pipe
+from lexical.analyzer import LexicalAnalyzer
+from lexical.exception import LexicalException
+from syntactic.analyzer import SyntacticAnalyzer
+from syntactic.exception import SyntacticException
+from exception.handler import ExceptionHandler
+from transpiler.generator import ModuleGenerator
+
+
+def compile_program(file_name, output_name=None):
+    try:
+        data_source = positional_file_source_pipe(file_name)
+    except IOError as e:
+        print(e)
+        return
+
+    try:
+        program = SyntacticAnalyzer(LexicalAnalyzer(data_source)).construct_program()
+    except LexicalException as e:
+        ExceptionHandler.handle_lexical_exception(e, data_source.unified_source.raw_source)
+        return
+    except SyntacticException as e:
+        ExceptionHandler.handle_syntactic_exception(e, data_source.unified_source.raw_source)
+        return
+
+    if output_name is None:
+        output_name = os.path.splitext(file_name)[0] + '.py'
+    try:
+        with open(output_name, 'w', encoding='utf-8') as output:
+            output.write(ModuleGenerator.generate(program, os.path.basename(file_name)))
+    except OSError as e:
+        print(e)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Matrix Language compiler into Python modules.')
+    parser.add_argument('file_name', help='file containing the source code of the program')
+    parser.add_argument(
+        '-o', '--output',
+        help='file of the generated Python module, the program file with .py extension by default'
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    arguments = parse_arguments()
+    compile_program(arguments.file_name, arguments.output)
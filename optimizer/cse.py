@@ -0,0 +1,292 @@
+import itertools
+from collections import Counter
+
+from syntax_tree.constructions import *
+from semantic.effects import EffectsCollector
+from optimizer.mutation import MutationAnalysis
+
+# Expressions which results are reused; constructions are compared and
+# hashed structurally, so the same expressions written twice are equal.
+COMMON_CONSTRUCTIONS = (AdditiveExpression, MultiplicativeExpression, FunctionCall)
+
+
+class CommonSubexpressionEliminator:
+    """
+    Class reusing the results of the expressions computed earlier in the
+    statement block.
+
+    Expressions of the statements of the block are equal, when they are
+    structurally equal and no statement between them may change the
+    variables they read (see MutationAnalysis). Statements calling the
+    functions, which may modify their arguments, are not optimized, since
+    the variables may change while the statement is evaluated. Expressions
+    calling impure functions are never reused.
+
+    Repeated expressions are replaced by the CommonExpression
+    constructions: the first one evaluated stores its value in the
+    variable of the statement block scope and the next ones read it.
+    Matrices bound to variables, passed to functions or returned are
+    copied from the stored value, since they may be modified.
+
+    Optimized program is the new program; the given one is not modified.
+    """
+
+    def __init__(self, pure_functions, mutations):
+        self.pure_functions = pure_functions
+        self.mutations = mutations
+        self.commons = 0
+        # Common expressions mapped into the number of their evaluations.
+        self.uses = Counter()
+
+    @staticmethod
+    def eliminate(program, pure_functions, preserving_functions=(), fresh_functions=()):
+        """
+        Eliminates the common subexpressions of the program.
+
+        :param program: Program construction to optimize.
+        :param pure_functions: names of the pure functions, including library ones.
+        :param preserving_functions: names of the impure library functions
+            never modifying their arguments.
+        :param fresh_functions: names of the library functions always returning new matrices.
+        :return: tuple of the new Program construction and the dictionary mapping
+            names of the functions into the numbers of the eliminated evaluations.
+        """
+        preserving_functions = MutationAnalysis.preserving(
+            program.functions_definitions,
+            pure_functions,
+            preserving_functions
+        )
+        functions_definitions = {}
+        eliminated = {}
+        for identifier, function_def in program.functions_definitions.items():
+            eliminator = CommonSubexpressionEliminator(
+                pure_functions,
+                MutationAnalysis(function_def, preserving_functions, fresh_functions)
+            )
+            statement_block = eliminator.__eliminated_block(function_def.statement_block)
+            # Expressions used once, since the other occurrences were
+            # inside the reused ones, are evaluated directly.
+            statement_block = SingleUsesRemover(eliminator.uses).removed(statement_block)
+            functions_definitions[identifier] = FunctionDefinition(
+                function_def.identifier,
+                function_def.parameters,
+                statement_block
+            )
+            eliminated[identifier] = sum(uses - 1 for uses in eliminator.uses.values() if uses > 1)
+        return Program(functions_definitions), eliminated
+
+    def __eliminated_block(self, statement_block):
+        statements = [self.__eliminated_nested(statement) for statement in statement_block.statements]
+        # Expressions of every statement are mapped into their
+        # generations - occurrences of the expression without changes of
+        # the variables it reads between them.
+        available = {}
+        identifiers = itertools.count()
+        occurrences = Counter()
+        generations = []
+        for statement in statements:
+            statement_generations = {}
+            if type(statement) in (AssignStatement, FunctionCall, ReturnStatement) and \
+                    not self.mutations.modifying_calls(statement):
+                for expression in _evaluated_expressions(statement):
+                    if not self.__reusable(expression):
+                        continue
+                    if expression not in available:
+                        available[expression] = (next(identifiers), EffectsCollector.collect(expression).reads)
+                    generation, _ = available[expression]
+                    statement_generations[expression] = generation
+                    occurrences[generation] += 1
+            generations.append(statement_generations)
+            changed = self.mutations.changed_variables(statement)
+            available = {
+                expression: (generation, reads) for expression, (generation, reads) in available.items()
+                if changed is not None and not reads & changed
+            }
+        names = {}
+        rewritten = []
+        for statement, statement_generations in zip(statements, generations):
+            common = {
+                expression: generation for expression, generation in statement_generations.items()
+                if occurrences[generation] > 1
+            }
+            rewritten.append(StatementRewriter(self, common, names).rewritten_statement(statement))
+        return StatementBlock(rewritten)
+
+    def __eliminated_nested(self, statement):
+        if type(statement) is StatementBlock:
+            return self.__eliminated_block(statement)
+        if type(statement) is IfStatement:
+            else_statement = statement.else_statement
+            return IfStatement(
+                statement.condition,
+                self.__eliminated_block(statement.statement_block),
+                self.__eliminated_nested(else_statement) if else_statement is not None else None
+            )
+        if type(statement) is UntilStatement:
+            return UntilStatement(
+                statement.condition,
+                self.__eliminated_block(statement.statement_block),
+                statement.invariants
+            )
+        return statement
+
+    def __reusable(self, expression):
+        if type(expression) not in COMMON_CONSTRUCTIONS:
+            return False
+        calls = EffectsCollector.collect(expression).calls
+        return calls <= self.pure_functions
+
+    def next_name(self):
+        name = f'@{self.commons}'
+        self.commons += 1
+        return name
+
+
+class StatementRewriter:
+    """
+    Class replacing the common expressions of the single statement.
+    """
+
+    def __init__(self, eliminator, common, names):
+        self.eliminator = eliminator
+        self.common = common
+        # Generations of the common expressions mapped into the names of
+        # their variables.
+        self.names = names
+
+    def rewritten_statement(self, statement):
+        if type(statement) is AssignStatement:
+            return AssignStatement(
+                self.__rewritten(statement.identifier, escaping=False),
+                self.__rewritten(statement.expression, escaping=True)
+            )
+        if type(statement) is ReturnStatement and statement.expression is not None:
+            return ReturnStatement(self.__rewritten(statement.expression, escaping=True))
+        if type(statement) is FunctionCall:
+            return self.__rewritten(statement, escaping=False)
+        return statement
+
+    def __rewritten(self, expression, escaping):
+        if expression in self.common:
+            generation = self.common[expression]
+            if generation in self.names:
+                # Value is already computed, so the expression itself is
+                # never evaluated.
+                name = self.names[generation]
+                self.eliminator.uses[name] += 1
+                return CommonExpression(expression, name, escaping)
+            name = self.names[generation] = self.eliminator.next_name()
+            self.eliminator.uses[name] += 1
+            return CommonExpression(self.__rewritten_operands(expression), name, escaping)
+        return self.__rewritten_operands(expression)
+
+    def __rewritten_operands(self, expression):
+        if type(expression) is AdditiveExpression:
+            return AdditiveExpression(
+                [self.__rewritten(operand, False) for operand in expression.multiplicative_expressions],
+                expression.operators
+            )
+        if type(expression) is MultiplicativeExpression:
+            return MultiplicativeExpression(
+                [self.__rewritten(operand, False) for operand in expression.atomic_expressions],
+                expression.operators
+            )
+        if type(expression) is NegatedAtomicExpression:
+            return NegatedAtomicExpression(self.__rewritten(expression.atomic_expression, False))
+        if type(expression) is MatrixLiteral:
+            return MatrixLiteral([self.__rewritten(element, False) for element in expression.expressions], expression.separators)
+        if type(expression) is FunctionCall:
+            return FunctionCall(expression.identifier, [self.__rewritten(argument, True) for argument in expression.arguments])
+        if type(expression) is Identifier and expression.index_operator is not None:
+            return Identifier(expression.name, IndexOperator(
+                self.__rewritten(expression.index_operator.first_selector, False),
+                self.__rewritten(expression.index_operator.second_selector, False)
+            ))
+        return expression
+
+
+class SingleUsesRemover:
+    """
+    Class replacing the common expressions used once with their expressions.
+    """
+
+    def __init__(self, uses):
+        self.uses = uses
+
+    def removed(self, construction):
+        if type(construction) is CommonExpression:
+            if self.uses[construction.name] > 1:
+                return CommonExpression(self.removed(construction.expression), construction.name, construction.copied)
+            return self.removed(construction.expression)
+        if type(construction) is StatementBlock:
+            return StatementBlock([self.removed(statement) for statement in construction.statements])
+        if type(construction) is IfStatement:
+            else_statement = construction.else_statement
+            return IfStatement(
+                construction.condition,
+                self.removed(construction.statement_block),
+                self.removed(else_statement) if else_statement is not None else None
+            )
+        if type(construction) is UntilStatement:
+            return UntilStatement(construction.condition, self.removed(construction.statement_block), construction.invariants)
+        if type(construction) is AssignStatement:
+            return AssignStatement(self.removed(construction.identifier), self.removed(construction.expression))
+        if type(construction) is ReturnStatement and construction.expression is not None:
+            return ReturnStatement(self.removed(construction.expression))
+        if type(construction) is AdditiveExpression:
+            return AdditiveExpression(
+                [self.removed(operand) for operand in construction.multiplicative_expressions],
+                construction.operators
+            )
+        if type(construction) is MultiplicativeExpression:
+            return MultiplicativeExpression(
+                [self.removed(operand) for operand in construction.atomic_expressions],
+                construction.operators
+            )
+        if type(construction) is NegatedAtomicExpression:
+            return NegatedAtomicExpression(self.removed(construction.atomic_expression))
+        if type(construction) is MatrixLiteral:
+            return MatrixLiteral([self.removed(element) for element in construction.expressions], construction.separators)
+        if type(construction) is FunctionCall:
+            return FunctionCall(construction.identifier, [self.removed(argument) for argument in construction.arguments])
+        if type(construction) is Identifier and construction.index_operator is not None:
+            return Identifier(construction.name, IndexOperator(
+                self.removed(construction.index_operator.first_selector),
+                self.removed(construction.index_operator.second_selector)
+            ))
+        return construction
+
+
+def _evaluated_expressions(statement):
+    # Yields the subexpressions of the statement evaluated every time the
+    # statement is evaluated, in the order of their evaluation; operands
+    # of conditions may be short-circuited and loop invariants are
+    # evaluated once.
+    if type(statement) is AssignStatement:
+        yield from _subexpressions(statement.expression)
+        yield from _subexpressions(statement.identifier)
+    elif type(statement) is ReturnStatement:
+        if statement.expression is not None:
+            yield from _subexpressions(statement.expression)
+    else:
+        yield from _subexpressions(statement)
+
+
+def _subexpressions(expression):
+    yield expression
+    if type(expression) is AdditiveExpression:
+        operands = expression.multiplicative_expressions
+    elif type(expression) is MultiplicativeExpression:
+        operands = expression.atomic_expressions
+    elif type(expression) is NegatedAtomicExpression:
+        operands = [expression.atomic_expression]
+    elif type(expression) is MatrixLiteral:
+        operands = expression.expressions
+    elif type(expression) is FunctionCall:
+        operands = expression.arguments
+    elif type(expression) is Identifier and expression.index_operator is not None:
+        operands = [expression.index_operator.first_selector, expression.index_operator.second_selector]
+    else:
+        operands = []
+    for operand in operands:
+        yield from _subexpressions(operand)
@@ -0,0 +1,124 @@
+from syntax_tree.constructions import *
+
+
+class ElementIndexSpecializer:
+    """
+    Class replacing the index operators selecting single elements of the
+    matrices with the ElementIndex constructions.
+
+    Index operator selects the single element, when neither of its
+    selectors is the dots select; no other expression evaluates into
+    the dots, so its selectors are always numbers, unless they raise
+    the type error. Element of the matrix is read and modified by the
+    interpreter without the dispatch on the selector types, with the
+    same errors reported.
+
+    Specialized program is the new program; the given one is not modified.
+    """
+
+    @staticmethod
+    def specialize(program):
+        """
+        Specializes the element index operators of the program.
+
+        :param program: Program construction to optimize.
+        :return: new Program construction with ElementIndex constructions.
+        """
+        specializer = ElementIndexSpecializer()
+        return Program({
+            identifier: FunctionDefinition(
+                function_def.identifier,
+                function_def.parameters,
+                specializer.__specialized(function_def.statement_block)
+            )
+            for identifier, function_def in program.functions_definitions.items()
+        })
+
+    def __index_operator(self, index_operator):
+        if index_operator is None:
+            return None
+        first_selector = self.__specialized(index_operator.first_selector)
+        second_selector = self.__specialized(index_operator.second_selector)
+        if type(first_selector) is DotsSelect or type(second_selector) is DotsSelect:
+            return IndexOperator(first_selector, second_selector)
+        return ElementIndex(first_selector, second_selector)
+
+    def __specialized(self, construction):
+        if type(construction) is Identifier:
+            return Identifier(construction.name, self.__index_operator(construction.index_operator))
+        if type(construction) is InlinedArgument:
+            return InlinedArgument(
+                construction.name,
+                construction.position,
+                self.__index_operator(construction.index_operator)
+            )
+        if type(construction) is StatementBlock:
+            return StatementBlock([self.__specialized(statement) for statement in construction.statements])
+        if type(construction) is IfStatement:
+            else_statement = construction.else_statement
+            return IfStatement(
+                self.__specialized(construction.condition),
+                self.__specialized(construction.statement_block),
+                self.__specialized(else_statement) if else_statement is not None else None
+            )
+        if type(construction) is UntilStatement:
+            return UntilStatement(
+                self.__specialized(construction.condition),
+                self.__specialized(construction.statement_block),
+                construction.invariants
+            )
+        if type(construction) is AssignStatement:
+            return AssignStatement(
+                self.__specialized(construction.identifier),
+                self.__specialized(construction.expression)
+            )
+        if type(construction) is ReturnStatement and construction.expression is not None:
+            return ReturnStatement(self.__specialized(construction.expression))
+        if type(construction) is FunctionCall:
+            return FunctionCall(
+                construction.identifier,
+                [self.__specialized(argument) for argument in construction.arguments]
+            )
+        if type(construction) is InlinedCall:
+            return InlinedCall(
+                self.__specialized(construction.function_call),
+                self.__specialized(construction.expression)
+            )
+        if type(construction) is AdditiveExpression:
+            return AdditiveExpression(
+                [self.__specialized(operand) for operand in construction.multiplicative_expressions],
+                construction.operators
+            )
+        if type(construction) is MultiplicativeExpression:
+            return MultiplicativeExpression(
+                [self.__specialized(operand) for operand in construction.atomic_expressions],
+                construction.operators
+            )
+        if type(construction) is NegatedAtomicExpression:
+            return NegatedAtomicExpression(self.__specialized(construction.atomic_expression))
+        if type(construction) is MatrixLiteral:
+            return MatrixLiteral(
+                [self.__specialized(element) for element in construction.expressions],
+                construction.separators
+            )
+        if type(construction) is OrCondition:
+            return OrCondition([self.__specialized(condition) for condition in construction.and_conditions])
+        if type(construction) is AndCondition:
+            return AndCondition([self.__specialized(condition) for condition in construction.rel_conditions])
+        if type(construction) is RelationCondition:
+            right_expression = construction.right_expression
+            return RelationCondition(
+                construction.negated,
+                self.__specialized(construction.left_expression),
+                construction.operator,
+                self.__specialized(right_expression) if right_expression is not None else None
+            )
+        if type(construction) is LoopInvariant:
+            return LoopInvariant(self.__specialized(construction.expression), construction.name)
+        if type(construction) is CommonExpression:
+            return CommonExpression(
+                self.__specialized(construction.expression),
+                construction.name,
+                construction.copied
+            )
+        return construction
@@ -0,0 +1,251 @@
+import numpy as np
+
+from syntax_tree.constructions import *
+from execution.variable import Variable, VariableType
+from execution.exception import WithStackTraceException
+
+# Constructions evaluating always into the same value.
+CONSTANT_CONSTRUCTIONS = (NumberLiteral, StringLiteral, ConstantMatrix)
+
+
+class ConstantFolder:
+    """
+    Visitor creating the program with the constant expressions evaluated.
+
+    Expressions and conditions, which operands are constant, are evaluated
+    once by the interpreter, so their values are exactly the same as the
+    ones computed during execution; constructions raising errors are left
+    unchanged, so the errors are raised during execution. Constant matrix
+    literals become read-only matrices shared by all the evaluations.
+    Constant matrices bound to variables, parameters or returned are
+    copied, when evaluated, since matrices are passed by reference and
+    the copy may be modified. Branches of if statements, which are never
+    evaluated, and until statements never iterating are removed.
+
+    Folded program is the new program; the given one is not modified.
+    """
+
+    def __init__(self):
+        # Interpreter is imported here, since it imports compiled program
+        # optimized with the folder.
+        from execution.interpreter import Interpreter
+        self.interpreter = Interpreter(None)
+        self.result = None
+
+    @staticmethod
+    def fold(program):
+        """
+        Folds the constant expressions of the program.
+
+        :param program: Program construction to fold.
+        :return: new Program construction with folded functions.
+        """
+        folder = ConstantFolder()
+        functions_definitions = {}
+        for identifier, function_def in program.functions_definitions.items():
+            function_def.accept(folder)
+            functions_definitions[identifier] = folder.result
+        return Program(functions_definitions)
+
+    def __folded(self, construction):
+        construction.accept(self)
+        return self.result
+
+    def __folded_bound(self, expression):
+        # Value of the expression is bound to the variable.
+        folded = self.__folded(expression)
+        if type(folded) is ConstantMatrix:
+            return ConstantMatrix(folded.value, copied=True)
+        return folded
+
+    def evaluate_function_definition(self, function_def):
+        self.result = FunctionDefinition(
+            function_def.identifier,
+            function_def.parameters,
+            self.__folded(function_def.statement_block)
+        )
+
+    def evaluate_statement_block(self, statement_block):
+        statements = []
+        for statement in statement_block.statements:
+            # Removed statements are folded into None.
+            if (folded := self.__folded(statement)) is not None:
+                statements.append(folded)
+        self.result = StatementBlock(statements)
+
+    def evaluate_if_statement(self, if_statement):
+        condition = self.__folded_condition(if_statement.condition)
+        statement_block = self.__folded(if_statement.statement_block)
+        else_statement = None
+        if if_statement.else_statement is not None:
+            else_statement = self.__folded(if_statement.else_statement)
+        if type(condition) is not NumberLiteral:
+            self.result = IfStatement(condition, statement_block, else_statement)
+        elif condition.value != 0:
+            self.result = IfStatement(condition, statement_block)
+        elif else_statement is None:
+            self.result = None
+        elif type(else_statement) is IfStatement:
+            self.result = else_statement
+        else:
+            # Statement block opens the new scope, so it is kept
+            # as the block of the always evaluated if statement.
+            self.result = IfStatement(NumberLiteral(1), else_statement)
+
+    def evaluate_until_statement(self, until_statement):
+        condition = self.__folded_condition(until_statement.condition)
+        if type(condition) is NumberLiteral and condition.value == 0:
+            self.result = None
+            return
+        self.result = UntilStatement(condition, self.__folded(until_statement.statement_block))
+
+    def evaluate_return_statement(self, return_statement):
+        if return_statement.expression is None:
+            self.result = ReturnStatement()
+            return
+        self.result = ReturnStatement(self.__folded_bound(return_statement.expression))
+
+    def evaluate_function_call(self, function_call):
+        self.result = FunctionCall(
+            function_call.identifier,
+            [self.__folded_bound(argument) for argument in function_call.arguments]
+        )
+
+    def evaluate_assign_statement(self, assign_statement):
+        expression = self.__folded_bound(assign_statement.expression)
+        self.result = AssignStatement(self.__folded(assign_statement.identifier), expression)
+
+    def evaluate_additive_expression(self, add_expression):
+        self.__fold_operations(add_expression.multiplicative_expressions, add_expression.operators, AdditiveExpression)
+
+    def evaluate_multiplicative_expression(self, mul_expression):
+        self.__fold_operations(mul_expression.atomic_expressions, mul_expression.operators, MultiplicativeExpression)
+
+    def __fold_operations(self, operands, operators, construction_type):
+        operands = [self.__folded(operand) for operand in operands]
+        # Operations are left associative, so only the constant operands
+        # at the beginning may be folded.
+        folded = 1
+        while folded < len(operands) and \
+                type(operands[0]) in CONSTANT_CONSTRUCTIONS and type(operands[folded]) in CONSTANT_CONSTRUCTIONS:
+            constant = self.__evaluated(construction_type([operands[0], operands[folded]], [operators[folded - 1]]))
+            if constant is None:
+                break
+            operands[0] = constant
+            folded += 1
+        if folded == len(operands):
+            self.result = operands[0]
+            return
+        self.result = construction_type([operands[0], *operands[folded:]], operators[folded - 1:])
+
+    def evaluate_negated_atomic_expression(self, expression):
+        self.result = NegatedAtomicExpression(self.__folded(expression.atomic_expression))
+        if type(self.result.atomic_expression) in CONSTANT_CONSTRUCTIONS:
+            self.result = self.__evaluated(self.result) or self.result
+
+    def evaluate_or_condition(self, or_condition):
+        self.result = OrCondition([self.__folded(condition) for condition in or_condition.and_conditions])
+
+    def evaluate_and_condition(self, and_condition):
+        self.result = AndCondition([self.__folded(condition) for condition in and_condition.rel_conditions])
+
+    def evaluate_relation_condition(self, rel_condition):
+        right_expression = None
+        if rel_condition.right_expression is not None:
+            right_expression = self.__folded(rel_condition.right_expression)
+        self.result = RelationCondition(
+            rel_condition.negated,
+            self.__folded(rel_condition.left_expression),
+            rel_condition.operator,
+            right_expression
+        )
+
+    def evaluate_matrix_literal(self, matrix_literal):
+        expressions = [self.__folded(expression) for expression in matrix_literal.expressions]
+        self.result = MatrixLiteral(expressions, matrix_literal.separators)
+        if all(type(expression) is NumberLiteral for expression in expressions):
+            self.result = self.__evaluated(self.result) or self.result
+
+    def evaluate_constant_matrix(self, constant_matrix):
+        self.result = constant_matrix
+
+    def evaluate_number_literal(self, number_literal):
+        self.result = number_literal
+
+    def evaluate_string_literal(self, string_literal):
+        self.result = string_literal
+
+    def evaluate_identifier(self, identifier):
+        if identifier.index_operator is None:
+            self.result = identifier
+            return
+        self.result = Identifier(identifier.name, IndexOperator(
+            self.__folded(identifier.index_operator.first_selector),
+            self.__folded(identifier.index_operator.second_selector)
+        ))
+
+    def evaluate_dots_select(self, dots_select):
+        self.result = dots_select
+
+    def __evaluated(self, expression):
+        # Returns the constant construction of the expression value or
+        # None, if evaluation fails.
+        try:
+            expression.accept(self.interpreter)
+        except WithStackTraceException:
+            return None
+        result = self.interpreter.result
+        if result.type == VariableType.NUMBER:
+            return NumberLiteral(result.value)
+        if result.type == VariableType.STRING:
+            return StringLiteral(result.value)
+        if result.type == VariableType.MATRIX:
+            # Evaluated matrix may share the memory with the folded
+            # constant, for example when it is added zero.
+            return ConstantMatrix(result.value.copy())
+        return None
+
+    def __folded_condition(self, condition):
+        # Condition of if or until statement is folded into the number
+        # literal, when it has the same value every time it is evaluated.
+        folded = self.__folded(condition)
+        if (value := self.__condition_value(folded)) is None:
+            return folded
+        if type(value) is not bool:
+            if value.type == VariableType.MATRIX:
+                value = bool(np.any(value.value))
+            elif value.type == VariableType.NUMBER:
+                value = value.value != 0
+            elif value.type == VariableType.STRING:
+                value = value.value != ''
+            else:
+                return folded
+        return NumberLiteral(int(value))
+
+    def __condition_value(self, condition):
+        # Returns the result of the constant condition exactly as it is
+        # computed by the interpreter, including its short-circuiting,
+        # or None when the condition is not constant.
+        if type(condition) in (OrCondition, AndCondition):
+            short_circuit = type(condition) is OrCondition
+            conditions = condition.and_conditions if short_circuit else condition.rel_conditions
+            value = None
+            for element in conditions:
+                if (value := self.__condition_value(element)) is None:
+                    return None
+                if bool(value) == short_circuit:
+                    break
+            return value
+        if type(condition) is RelationCondition:
+            constant = type(condition.left_expression) in CONSTANT_CONSTRUCTIONS and \
+                (condition.right_expression is None or type(condition.right_expression) in CONSTANT_CONSTRUCTIONS)
+        else:
+            constant = type(condition) in CONSTANT_CONSTRUCTIONS
+        if not constant:
+            return None
+        try:
+            condition.accept(self.interpreter)
+        except WithStackTraceException:
+            return None
+        result = self.interpreter.result
+        return result if type(result) in (bool, Variable) else None
@@ -0,0 +1,216 @@
+from syntax_tree.constructions import *
+from optimizer.mutation import MutationAnalysis
+
+# Invariant expressions worth computing once; identifiers and literals
+# are evaluated as fast as the stored invariant.
+HOISTED_CONSTRUCTIONS = (
+    AdditiveExpression,
+    MultiplicativeExpression,
+    NegatedAtomicExpression,
+    MatrixLiteral,
+    FunctionCall,
+    Identifier
+)
+
+
+class LoopInvariantHoister:
+    """
+    Class moving the loop invariant expressions out of until statements.
+
+    Expression is invariant, when it calls only pure functions and reads
+    only variables, which may not be changed by the until statement (see
+    MutationAnalysis).
+
+    Invariants are replaced by the LoopInvariant constructions, evaluated
+    when they are reached for the first time in the loop execution, so
+    the loop never iterating does not evaluate them and errors are raised
+    by the same expression as before. Only the values used as operands
+    are hoisted; values bound to variables, passed to functions and
+    returned are shared by reference and may be modified.
+
+    Hoisted program is the new program; the given one is not modified.
+    """
+
+    def __init__(self, pure_functions, mutations):
+        self.pure_functions = pure_functions
+        self.mutations = mutations
+        self.invariants = 0
+
+    @staticmethod
+    def hoist(program, pure_functions, preserving_functions=(), fresh_functions=()):
+        """
+        Hoists the loop invariants of the program.
+
+        :param program: Program construction to optimize.
+        :param pure_functions: names of the pure functions, including library ones.
+        :param preserving_functions: names of the impure library functions
+            never modifying their arguments.
+        :param fresh_functions: names of the library functions always returning new matrices.
+        :return: new Program construction with hoisted invariants.
+        """
+        preserving_functions = MutationAnalysis.preserving(
+            program.functions_definitions,
+            pure_functions,
+            preserving_functions
+        )
+        functions_definitions = {}
+        for identifier, function_def in program.functions_definitions.items():
+            hoister = LoopInvariantHoister(
+                pure_functions,
+                MutationAnalysis(function_def, preserving_functions, fresh_functions)
+            )
+            functions_definitions[identifier] = FunctionDefinition(
+                function_def.identifier,
+                function_def.parameters,
+                hoister.__hoisted_block(function_def.statement_block)
+            )
+        return Program(functions_definitions)
+
+    def __hoisted_block(self, statement_block):
+        return StatementBlock([self.__hoisted_statement(statement) for statement in statement_block.statements])
+
+    def __hoisted_statement(self, statement):
+        if type(statement) is StatementBlock:
+            return self.__hoisted_block(statement)
+        if type(statement) is IfStatement:
+            else_statement = statement.else_statement
+            return IfStatement(
+                statement.condition,
+                self.__hoisted_block(statement.statement_block),
+                self.__hoisted_statement(else_statement) if else_statement is not None else None
+            )
+        if type(statement) is UntilStatement:
+            return self.__hoisted_loop(statement)
+        return statement
+
+    def __hoisted_loop(self, until_statement):
+        # Outer loop is hoisted first, so the expressions invariant in
+        # the nested loops too are computed once per the outer loop.
+        changed = self.mutations.changed_variables(until_statement)
+        invariants = self.invariants
+        loop = LoopRewriter(self, changed)
+        condition = loop.rewritten(until_statement.condition, escaping=False)
+        statement_block = loop.rewritten_block(until_statement.statement_block)
+        statement_block = self.__hoisted_block(statement_block)
+        names = tuple(f'${index}' for index in range(invariants, invariants + loop.hoisted))
+        return UntilStatement(condition, statement_block, names)
+
+    def next_name(self):
+        name = f'${self.invariants}'
+        self.invariants += 1
+        return name
+
+
+class LoopRewriter:
+    """
+    Class replacing the invariant expressions of the single until statement.
+
+    Nested until statements are rewritten as a part of the loop body;
+    invariants already hoisted by the enclosing loops are not changed.
+    """
+
+    def __init__(self, hoister, changed):
+        self.hoister = hoister
+        self.changed = changed
+        self.hoisted = 0
+
+    def rewritten_block(self, statement_block):
+        return StatementBlock([self.__rewritten_statement(statement) for statement in statement_block.statements])
+
+    def __rewritten_statement(self, statement):
+        if type(statement) is StatementBlock:
+            return self.rewritten_block(statement)
+        if type(statement) is IfStatement:
+            else_statement = statement.else_statement
+            return IfStatement(
+                self.rewritten(statement.condition, escaping=False),
+                self.rewritten_block(statement.statement_block),
+                self.__rewritten_statement(else_statement) if else_statement is not None else None
+            )
+        if type(statement) is UntilStatement:
+            return UntilStatement(
+                self.rewritten(statement.condition, escaping=False),
+                self.rewritten_block(statement.statement_block),
+                statement.invariants
+            )
+        if type(statement) is ReturnStatement:
+            if statement.expression is None:
+                return statement
+            return ReturnStatement(self.rewritten(statement.expression, escaping=True))
+        if type(statement) is AssignStatement:
+            return AssignStatement(
+                self.rewritten(statement.identifier, escaping=True),
+                self.rewritten(statement.expression, escaping=True)
+            )
+        return self.rewritten(statement, escaping=True)
+
+    def rewritten(self, expression, escaping):
+        """
+        Replaces the invariant subexpressions of the expression.
+
+        :param expression: expression or condition to rewrite.
+        :param escaping: True if the value of the expression is bound to
+            the variable, passed to the function or returned.
+        :return: rewritten expression.
+        """
+        if not escaping and type(expression) in HOISTED_CONSTRUCTIONS and self.__invariant(expression):
+            if type(expression) is not Identifier or expression.index_operator is not None:
+                self.hoisted += 1
+                return LoopInvariant(expression, self.hoister.next_name())
+        if type(expression) is AdditiveExpression:
+            return AdditiveExpression(
+                [self.rewritten(operand, False) for operand in expression.multiplicative_expressions],
+                expression.operators
+            )
+        if type(expression) is MultiplicativeExpression:
+            return MultiplicativeExpression(
+                [self.rewritten(operand, False) for operand in expression.atomic_expressions],
+                expression.operators
+            )
+        if type(expression) is NegatedAtomicExpression:
+            return NegatedAtomicExpression(self.rewritten(expression.atomic_expression, False))
+        if type(expression) is MatrixLiteral:
+            return MatrixLiteral([self.rewritten(element, False) for element in expression.expressions], expression.separators)
+        if type(expression) is FunctionCall:
+            return FunctionCall(expression.identifier, [self.rewritten(argument, True) for argument in expression.arguments])
+        if type(expression) is OrCondition:
+            return OrCondition([self.rewritten(condition, False) for condition in expression.and_conditions])
+        if type(expression) is AndCondition:
+            return AndCondition([self.rewritten(condition, False) for condition in expression.rel_conditions])
+        if type(expression) is RelationCondition:
+            right_expression = expression.right_expression
+            return RelationCondition(
+                expression.negated,
+                self.rewritten(expression.left_expression, False),
+                expression.operator,
+                self.rewritten(right_expression, False) if right_expression is not None else None
+            )
+        if type(expression) is Identifier and expression.index_operator is not None:
+            return Identifier(expression.name, IndexOperator(
+                self.rewritten(expression.index_operator.first_selector, False),
+                self.rewritten(expression.index_operator.second_selector, False)
+            ))
+        return expression
+
+    def __invariant(self, expression):
+        if type(expression) in (NumberLiteral, StringLiteral, ConstantMatrix, DotsSelect, LoopInvariant):
+            return True
+        if type(expression) is Identifier:
+            index_operator = expression.index_operator
+            return self.changed is not None and expression.name not in self.changed and (
+                index_operator is None or
+                self.__invariant(index_operator.first_selector) and self.__invariant(index_operator.second_selector)
+            )
+        if type(expression) is AdditiveExpression:
+            return all(self.__invariant(operand) for operand in expression.multiplicative_expressions)
+        if type(expression) is MultiplicativeExpression:
+            return all(self.__invariant(operand) for operand in expression.atomic_expressions)
+        if type(expression) is NegatedAtomicExpression:
+            return self.__invariant(expression.atomic_expression)
+        if type(expression) is MatrixLiteral:
+            return all(self.__invariant(element) for element in expression.expressions)
+        if type(expression) is FunctionCall:
+            return expression.identifier in self.hoister.pure_functions and \
+                all(self.__invariant(argument) for argument in expression.arguments)
+        # Conditions evaluate into the booleans, not the variables.
+        return False
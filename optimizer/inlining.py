@@ -0,0 +1,248 @@
+from syntax_tree.constructions import *
+from semantic.effects import EffectsCollector
+
+# Constructions, which the inlined expressions may consist of; the
+# identifiers must be the parameters of the function.
+INLINED_CONSTRUCTIONS = (
+    AdditiveExpression,
+    MultiplicativeExpression,
+    NegatedAtomicExpression,
+    MatrixLiteral,
+    ConstantMatrix,
+    FunctionCall,
+    NumberLiteral,
+    StringLiteral,
+    Identifier,
+    DotsSelect
+)
+
+
+class FunctionInliner:
+    """
+    Class replacing the calls of the small program functions with the
+    expressions they return.
+
+    Function is inlined, when its body is the single return statement,
+    its expression reads only the parameters of the function and it
+    does not call itself, directly or through the other inlined
+    functions. Calls with the number of arguments not matching the
+    parameters are left unchanged, so the error is raised during
+    execution.
+
+    Calls are replaced by the InlinedCall constructions: arguments are
+    evaluated the same way as the ones of the function call and are
+    read by the expression as the InlinedArgument constructions, so
+    matrices are passed by reference and numbers by value, while the
+    scope of the caller is never visible for the expression. Errors of
+    the expression have the same stack trace as the ones of the called
+    function.
+
+    Inlined program is the new program; the given one is not modified.
+    """
+
+    default_options = {
+        # Maximal number of the constructions of the inlined expression.
+        'INLINE_MAX_SIZE': 24,
+        # Maximal number of the inlined calls nested in each other.
+        'INLINE_MAX_DEPTH': 4
+    }
+
+    def __init__(self, functions_definitions, options=None):
+        self.functions_definitions = functions_definitions
+        self.options = ({**FunctionInliner.default_options, **options}
+                        if options is not None
+                        else FunctionInliner.default_options)
+        self.candidates = {
+            identifier: function_def.statement_block.statements[0].expression
+            for identifier, function_def in functions_definitions.items()
+            if _inlinable(function_def)
+        }
+        self.__remove_recursive()
+        # Identifiers of the inlined functions mapped into their expressions
+        # with the nested calls inlined, None if they are too large.
+        self.expansions = {}
+
+    @staticmethod
+    def inline(program, options=None):
+        """
+        Inlines the calls of the small functions of the program.
+
+        :param program: Program construction to optimize.
+        :param options: inlining thresholds, see default_options.
+        :return: new Program construction with inlined calls.
+        """
+        inliner = FunctionInliner(program.functions_definitions, options)
+        functions_definitions = {}
+        for identifier, function_def in program.functions_definitions.items():
+            functions_definitions[identifier] = FunctionDefinition(
+                function_def.identifier,
+                function_def.parameters,
+                inliner.__inlined(function_def.statement_block, None)
+            )
+        return Program(functions_definitions)
+
+    def __remove_recursive(self):
+        calls = {
+            identifier: EffectsCollector.collect(expression).calls & set(self.candidates)
+            for identifier, expression in self.candidates.items()
+        }
+        recursive = set()
+        for identifier in calls:
+            reached = set()
+            pending = list(calls[identifier])
+            while pending:
+                called = pending.pop()
+                if called not in reached:
+                    reached.add(called)
+                    pending.extend(calls[called])
+            if identifier in reached:
+                recursive.add(identifier)
+        for identifier in recursive:
+            del self.candidates[identifier]
+
+    def __expansion(self, identifier):
+        if identifier not in self.expansions:
+            parameters = self.functions_definitions[identifier].parameters
+            # Last of the duplicated parameters is bound, the same as by
+            # the function call.
+            positions = {parameter.name: position for position, parameter in enumerate(parameters)}
+            expression = self.__inlined(self.candidates[identifier], positions)
+            if _size(expression) > self.options['INLINE_MAX_SIZE'] or \
+                    _depth(expression) >= self.options['INLINE_MAX_DEPTH']:
+                expression = None
+            self.expansions[identifier] = expression
+        return self.expansions[identifier]
+
+    def __inlined(self, construction, positions):
+        # Positions of the parameters are given for the expressions of
+        # the inlined functions, which identifiers are the arguments.
+        if type(construction) is FunctionCall:
+            function_call = FunctionCall(
+                construction.identifier,
+                [self.__inlined(argument, positions) for argument in construction.arguments]
+            )
+            identifier = construction.identifier
+            if identifier in self.candidates and \
+                    len(construction.arguments) == len(self.functions_definitions[identifier].parameters) and \
+                    (expression := self.__expansion(identifier)) is not None:
+                return InlinedCall(function_call, expression)
+            return function_call
+        if type(construction) is Identifier:
+            index_operator = construction.index_operator
+            if index_operator is not None:
+                index_operator = IndexOperator(
+                    self.__inlined(index_operator.first_selector, positions),
+                    self.__inlined(index_operator.second_selector, positions)
+                )
+            if positions is not None:
+                return InlinedArgument(construction.name, positions[construction.name], index_operator)
+            return Identifier(construction.name, index_operator)
+        if type(construction) is StatementBlock:
+            return StatementBlock([self.__inlined(statement, positions) for statement in construction.statements])
+        if type(construction) is IfStatement:
+            else_statement = construction.else_statement
+            return IfStatement(
+                self.__inlined(construction.condition, positions),
+                self.__inlined(construction.statement_block, positions),
+                self.__inlined(else_statement, positions) if else_statement is not None else None
+            )
+        if type(construction) is UntilStatement:
+            return UntilStatement(
+                self.__inlined(construction.condition, positions),
+                self.__inlined(construction.statement_block, positions),
+                construction.invariants
+            )
+        if type(construction) is AssignStatement:
+            return AssignStatement(
+                self.__inlined(construction.identifier, positions),
+                self.__inlined(construction.expression, positions)
+            )
+        if type(construction) is ReturnStatement and construction.expression is not None:
+            return ReturnStatement(self.__inlined(construction.expression, positions))
+        if type(construction) is AdditiveExpression:
+            return AdditiveExpression(
+                [self.__inlined(operand, positions) for operand in construction.multiplicative_expressions],
+                construction.operators
+            )
+        if type(construction) is MultiplicativeExpression:
+            return MultiplicativeExpression(
+                [self.__inlined(operand, positions) for operand in construction.atomic_expressions],
+                construction.operators
+            )
+        if type(construction) is NegatedAtomicExpression:
+            return NegatedAtomicExpression(self.__inlined(construction.atomic_expression, positions))
+        if type(construction) is MatrixLiteral:
+            return MatrixLiteral(
+                [self.__inlined(element, positions) for element in construction.expressions],
+                construction.separators
+            )
+        if type(construction) is OrCondition:
+            return OrCondition([self.__inlined(condition, positions) for condition in construction.and_conditions])
+        if type(construction) is AndCondition:
+            return AndCondition([self.__inlined(condition, positions) for condition in construction.rel_conditions])
+        if type(construction) is RelationCondition:
+            right_expression = construction.right_expression
+            return RelationCondition(
+                construction.negated,
+                self.__inlined(construction.left_expression, positions),
+                construction.operator,
+                self.__inlined(right_expression, positions) if right_expression is not None else None
+            )
+        if type(construction) is LoopInvariant:
+            return LoopInvariant(self.__inlined(construction.expression, positions), construction.name)
+        if type(construction) is CommonExpression:
+            return CommonExpression(
+                self.__inlined(construction.expression, positions),
+                construction.name,
+                construction.copied
+            )
+        return construction
+
+
+def _inlinable(function_def):
+    statements = function_def.statement_block.statements
+    if len(statements) != 1 or type(statements[0]) is not ReturnStatement or statements[0].expression is None:
+        return False
+    parameters = {parameter.name for parameter in function_def.parameters}
+    return all(
+        type(construction) in INLINED_CONSTRUCTIONS and
+        (type(construction) is not Identifier or construction.name in parameters)
+        for construction in _constructions(statements[0].expression)
+    )
+
+
+def _size(expression):
+    return sum(1 for _ in _constructions(expression))
+
+
+def _depth(expression):
+    # Number of the inlined calls nested in each other.
+    return max(
+        (1 + _depth(construction.expression) for construction in _constructions(expression)
+         if type(construction) is InlinedCall),
+        default=0
+    )
+
+
+def _constructions(expression):
+    # Yields the expression and its subexpressions; expressions of the
+    # inlined calls are included.
+    yield expression
+    if type(expression) is AdditiveExpression:
+        operands = expression.multiplicative_expressions
+    elif type(expression) is MultiplicativeExpression:
+        operands = expression.atomic_expressions
+    elif type(expression) is NegatedAtomicExpression:
+        operands = [expression.atomic_expression]
+    elif type(expression) is MatrixLiteral:
+        operands = expression.expressions
+    elif type(expression) is FunctionCall:
+        operands = expression.arguments
+    elif type(expression) is InlinedCall:
+        operands = [expression.function_call, expression.expression]
+    elif type(expression) in (Identifier, InlinedArgument) and expression.index_operator is not None:
+        operands = [expression.index_operator.first_selector, expression.index_operator.second_selector]
+    else:
+        operands = []
+    for operand in operands:
+        yield from _constructions(operand)
@@ -0,0 +1,98 @@
+from syntax_tree.constructions import *
+from semantic.effects import EffectsCollector, is_fresh_expression
+
+
+class MutationAnalysis:
+    """
+    Class finding the variables, which values may be changed by the
+    constructions of the function.
+
+    Variables are changed, when they are assigned, modified with the
+    index operator or passed to the function, which may modify its
+    arguments. Matrices are passed by reference, so modifying the matrix
+    changes also the other variables sharing it: fresh matrix may be
+    shared only by the variables assigned with not fresh expressions,
+    while the other one - by any variable.
+    """
+
+    def __init__(self, function_def, preserving_functions, fresh_functions=()):
+        """
+        MutationAnalysis constructor.
+
+        :param function_def: function definition containing the analyzed constructions.
+        :param preserving_functions: names of the functions never modifying their arguments.
+        :param fresh_functions: names of the library functions always returning new matrices.
+        """
+        effects = EffectsCollector.collect(function_def, fresh_functions)
+        self.preserving_functions = preserving_functions
+        self.shared = effects.not_fresh_writes | {parameter.name for parameter in function_def.parameters}
+        self.not_fresh_writes = effects.not_fresh_writes
+
+    @staticmethod
+    def preserving(functions_definitions, pure_functions, preserving_library_functions):
+        """
+        Finds the functions never modifying their arguments.
+
+        :param functions_definitions: dictionary of the program functions definitions.
+        :param pure_functions: names of the pure functions, including library ones.
+        :param preserving_library_functions: names of the impure library functions
+            never modifying their arguments.
+        :return: set of names of the functions.
+        """
+        return set(pure_functions) | (set(preserving_library_functions) - set(functions_definitions))
+
+    def changed_variables(self, construction):
+        """
+        Finds the variables, which values may be changed by the construction.
+
+        :param construction: syntactic construction of the function.
+        :return: set of names of the variables or None, when it may be any variable.
+        """
+        effects = EffectsCollector.collect(construction)
+        modified = effects.modifies | self.passed_variables(construction)
+        if modified & self.shared:
+            # Matrix shared by the modified variable may be shared by any
+            # other variable, which it was assigned from.
+            return None
+        if modified:
+            return effects.writes | modified | self.not_fresh_writes
+        return effects.writes
+
+    def passed_variables(self, construction):
+        """
+        Finds the variables passed to the functions, which may modify them.
+
+        :param construction: syntactic construction of the function.
+        :return: set of names of the passed variables.
+        """
+        collector = ArgumentsCollector(self.preserving_functions)
+        construction.accept(collector)
+        return collector.passed
+
+    def modifying_calls(self, construction):
+        """
+        Checks whether construction calls the function, which may modify its arguments.
+
+        :param construction: syntactic construction of the function.
+        :return: True if such function is called.
+        """
+        return not EffectsCollector.collect(construction).calls <= self.preserving_functions
+
+
+class ArgumentsCollector(EffectsCollector):
+    """
+    Visitor collecting the variables passed to the functions, which may
+    modify them, since matrices are passed by reference.
+    """
+
+    def __init__(self, preserving_functions):
+        super().__init__()
+        self.preserving_functions = preserving_functions
+        self.passed = set()
+
+    def evaluate_function_call(self, function_call):
+        if function_call.identifier not in self.preserving_functions:
+            for argument in function_call.arguments:
+                if type(argument) is Identifier and not is_fresh_expression(argument):
+                    self.passed.add(argument.name)
+        super().evaluate_function_call(function_call)
@@ -0,0 +1,213 @@
+from syntax_tree.constructions import *
+
+INDENT = '    '
+
+# Constructions requiring parentheses, when they are operands of the
+# construction of the given type.
+PARENTHESIZED = {
+    AdditiveExpression: (OrCondition, AndCondition, RelationCondition),
+    MultiplicativeExpression: (OrCondition, AndCondition, RelationCondition, AdditiveExpression),
+    NegatedAtomicExpression: (OrCondition, AndCondition, RelationCondition, AdditiveExpression, MultiplicativeExpression),
+    RelationCondition: (OrCondition, AndCondition, RelationCondition),
+    AndCondition: (OrCondition, AndCondition),
+    OrCondition: (OrCondition,)
+}
+
+
+class ProgramPrinter:
+    """
+    Visitor printing the program as the source code.
+
+    It shows the program executed by the interpreter after the
+    optimizations: folded constants are printed as literals, while loop
+    invariants and common subexpressions as the hidden variables, which
+    expressions are listed in the comments before the until statements
+    and the statements computing them. Inlined calls are printed as the
+    calls, listed in the comments before their statements.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.depth = 0
+        self.result = None
+        # Hoisted expressions of the printed until statements.
+        self.invariants = {}
+        # Common subexpressions of the printed statement and names of all
+        # the printed ones.
+        self.commons = {}
+        self.printed_commons = set()
+        # Names of the functions inlined into the printed statement.
+        self.inlined = []
+
+    @staticmethod
+    def print_program(program):
+        """
+        Prints the program as the source code.
+
+        :param program: Program construction to print.
+        :return: source code of the program.
+        """
+        printer = ProgramPrinter()
+        program.accept(printer)
+        return '\n'.join(printer.lines)
+
+    def __line(self, text):
+        self.lines.append(INDENT * self.depth + text)
+
+    def __text(self, construction, parent_type=None):
+        construction.accept(self)
+        if parent_type is not None and type(construction) in PARENTHESIZED[parent_type]:
+            return f'({self.result})'
+        return self.result
+
+    def evaluate_program(self, program):
+        for index, function_def in enumerate(program.functions_definitions.values()):
+            if index > 0:
+                self.lines.append('')
+            function_def.accept(self)
+
+    def evaluate_function_definition(self, function_def):
+        parameters = ', '.join(parameter.name for parameter in function_def.parameters)
+        self.__line(f'{function_def.identifier}({parameters}) {{')
+        self.__block_statements(function_def.statement_block)
+        self.__line('}')
+
+    def __block_statements(self, statement_block):
+        self.depth += 1
+        for statement in statement_block.statements:
+            start = len(self.lines)
+            commons = {}
+            inlined = []
+            # Statements of the nested blocks list their own expressions.
+            self.commons, outer_commons = commons, self.commons
+            self.inlined, outer_inlined = inlined, self.inlined
+            if type(statement) in (FunctionCall, InlinedCall):
+                self.__line(self.__text(statement))
+            else:
+                statement.accept(self)
+            self.commons = outer_commons
+            self.inlined = outer_inlined
+            comments = [f'# common {name} = {text}' for name, text in commons.items()]
+            if inlined:
+                comments.append(f'# inlined {", ".join(dict.fromkeys(inlined))}')
+            self.lines[start:start] = [INDENT * self.depth + comment for comment in comments]
+        self.depth -= 1
+
+    def evaluate_statement_block(self, statement_block):
+        self.__line('{')
+        self.__block_statements(statement_block)
+        self.__line('}')
+
+    def evaluate_if_statement(self, if_statement, prefix=''):
+        self.__line(f'{prefix}if ({self.__text(if_statement.condition)}) {{')
+        self.__block_statements(if_statement.statement_block)
+        else_statement = if_statement.else_statement
+        if else_statement is None:
+            self.__line('}')
+        elif type(else_statement) is IfStatement:
+            self.evaluate_if_statement(else_statement, '} else ')
+        else:
+            self.__line('} else {')
+            self.__block_statements(else_statement)
+            self.__line('}')
+
+    def evaluate_until_statement(self, until_statement):
+        # Invariants are found, when the loop is printed, so it is printed
+        # first and moved after their comment.
+        start = len(self.lines)
+        self.__line(f'until ({self.__text(until_statement.condition)}) {{')
+        self.__block_statements(until_statement.statement_block)
+        self.__line('}')
+        hoisted = [
+            INDENT * self.depth + f'# hoisted {name} = {self.invariants[name]}'
+            for name in until_statement.invariants
+            if name in self.invariants
+        ]
+        self.lines[start:start] = hoisted
+
+    def evaluate_return_statement(self, return_statement):
+        if return_statement.expression is None:
+            self.__line('return')
+            return
+        self.__line(f'return {self.__text(return_statement.expression)}')
+
+    def evaluate_function_call(self, function_call):
+        arguments = ', '.join(self.__text(argument, AdditiveExpression) for argument in function_call.arguments)
+        self.result = f'{function_call.identifier}({arguments})'
+
+    def evaluate_assign_statement(self, assign_statement):
+        identifier = self.__text(assign_statement.identifier)
+        self.__line(f'{identifier} = {self.__text(assign_statement.expression)}')
+
+    def evaluate_additive_expression(self, add_expression):
+        self.__operations(add_expression.multiplicative_expressions, add_expression.operators, AdditiveExpression)
+
+    def evaluate_multiplicative_expression(self, mul_expression):
+        self.__operations(mul_expression.atomic_expressions, mul_expression.operators, MultiplicativeExpression)
+
+    def __operations(self, operands, operators, construction_type):
+        texts = [self.__text(operands[0], construction_type)]
+        for operator, operand in zip(operators, operands[1:]):
+            texts.append(f'{operator} {self.__text(operand, construction_type)}')
+        self.result = ' '.join(texts)
+
+    def evaluate_negated_atomic_expression(self, expression):
+        self.result = f'-{self.__text(expression.atomic_expression, NegatedAtomicExpression)}'
+
+    def evaluate_or_condition(self, or_condition):
+        self.result = ' or '.join(self.__text(condition, OrCondition) for condition in or_condition.and_conditions)
+
+    def evaluate_and_condition(self, and_condition):
+        self.result = ' and '.join(self.__text(condition, AndCondition) for condition in and_condition.rel_conditions)
+
+    def evaluate_relation_condition(self, rel_condition):
+        text = self.__text(rel_condition.left_expression, RelationCondition)
+        if rel_condition.operator is not None:
+            text = f'{text} {rel_condition.operator} {self.__text(rel_condition.right_expression, RelationCondition)}'
+        self.result = f'!{text}' if rel_condition.negated else text
+
+    def evaluate_matrix_literal(self, matrix_literal):
+        texts = [self.__text(matrix_literal.expressions[0], AdditiveExpression)]
+        for separator, expression in zip(matrix_literal.separators, matrix_literal.expressions[1:]):
+            texts.append(f'{separator} {self.__text(expression, AdditiveExpression)}')
+        self.result = f'[{"".join(texts)}]'
+
+    def evaluate_constant_matrix(self, constant_matrix):
+        rows = '; '.join(', '.join(str(value) for value in row.tolist()) for row in constant_matrix.value)
+        self.result = f'[{rows}]'
+
+    def evaluate_loop_invariant(self, invariant):
+        self.invariants[invariant.name] = self.__text(invariant.expression)
+        self.result = invariant.name
+
+    def evaluate_common_expression(self, common):
+        # Only the first expression of the name is evaluated, the next
+        # ones reuse its value.
+        text = self.__text(common.expression)
+        if common.name not in self.printed_commons:
+            self.printed_commons.add(common.name)
+            self.commons[common.name] = text
+        self.result = common.name
+
+    def evaluate_inlined_call(self, inlined_call):
+        # Inlined expression is the one of the function, so the call is
+        # printed as it is written.
+        inlined_call.function_call.accept(self)
+        self.inlined.append(inlined_call.function_call.identifier)
+
+    def evaluate_number_literal(self, number_literal):
+        self.result = str(number_literal.value)
+
+    def evaluate_string_literal(self, string_literal):
+        escaped = string_literal.value.replace('$', '$$').replace('"', '$"')
+        self.result = f'"{escaped}"'
+
+    def evaluate_identifier(self, identifier):
+        self.result = identifier.name
+        if identifier.index_operator is not None:
+            first = self.__text(identifier.index_operator.first_selector)
+            second = self.__text(identifier.index_operator.second_selector)
+            self.result = f'{identifier.name}[{first}, {second}]'
+
+    def evaluate_dots_select(self, _):
+        self.result = ':'
@@ -0,0 +1,44 @@
+from semantic.effects import EffectsCollector
+
+
+class CallResolver(EffectsCollector):
+    """
+    Visitor resolving the functions called by the function calls.
+
+    Program functions never change once the program is compiled, so every
+    call site is bound to the called definition or library function once,
+    and the interpreter calls it without looking the name up. Calls of
+    the undefined functions are left unresolved; they are reported by the
+    type checker, when the program is compiled.
+    """
+
+    def __init__(self, functions_definitions, library_functions):
+        super().__init__()
+        self.functions_definitions = functions_definitions
+        self.library_functions = library_functions
+        self.targets = {}
+
+    @staticmethod
+    def targets_of(functions_definitions, library_functions):
+        """
+        Resolves the function calls of the program functions.
+
+        :param functions_definitions: dictionary of the program functions definitions.
+        :param library_functions: dictionary of the library functions.
+        :return: dictionary mapping ids of the function calls into the definitions
+            of the called program functions or into the called library functions.
+        """
+        resolver = CallResolver(functions_definitions, library_functions)
+        for function_def in functions_definitions.values():
+            function_def.accept(resolver)
+        return resolver.targets
+
+    def evaluate_function_call(self, function_call):
+        # Program functions hide the library ones, the same way as when
+        # they are called by name.
+        identifier = function_call.identifier
+        if identifier in self.functions_definitions:
+            self.targets[id(function_call)] = self.functions_definitions[identifier]
+        elif identifier in self.library_functions:
+            self.targets[id(function_call)] = self.library_functions[identifier]
+        super().evaluate_function_call(function_call)
@@ -0,0 +1,251 @@
+from syntax_tree.constructions import *
+
+
+class Effects:
+    """
+    Effects describe how the syntactic construction interacts with variables.
+
+    Effects are:
+        - reads: names of the variables whose values are read.
+        - writes: names of the variables assigned with '=' operator.
+        - modifies: names of the matrices modified with the index operator.
+        - calls: names of the called functions.
+        - not_fresh_writes: names assigned with values which may be shared
+          with other variables (see is_fresh_expression).
+    """
+
+    def __init__(self):
+        self.reads = set()
+        self.writes = set()
+        self.modifies = set()
+        self.calls = set()
+        self.not_fresh_writes = set()
+
+    def accessed(self):
+        return self.reads | self.writes | self.modifies
+
+    def __repr__(self):
+        return str.format(
+            'Effects\n\tReads: {}\n\tWrites: {}\n\tModifies: {}\n\tCalls: {}\n',
+            self.reads,
+            self.writes,
+            self.modifies,
+            self.calls
+        )
+
+
+class EffectsCollector:
+    """
+    Visitor collecting the effects of the syntactic construction.
+
+    Collector does not evaluate anything, so all the branches of
+    if statements and bodies of until statements are visited.
+    """
+
+    def __init__(self, fresh_functions=()):
+        self.effects = Effects()
+        self.fresh_functions = fresh_functions
+
+    @staticmethod
+    def collect(construction, fresh_functions=()):
+        """
+        Collects the effects of the syntactic construction.
+
+        :param construction: syntactic construction to analyze.
+        :param fresh_functions: names of the functions always returning new matrices.
+        :return: Effects of the construction.
+        """
+        collector = EffectsCollector(fresh_functions)
+        construction.accept(collector)
+        return collector.effects
+
+    def evaluate_program(self, program):
+        for function_def in program.functions_definitions.values():
+            function_def.accept(self)
+
+    def evaluate_function_definition(self, function_def):
+        function_def.statement_block.accept(self)
+
+    def evaluate_statement_block(self, statement_block):
+        for statement in statement_block.statements:
+            statement.accept(self)
+
+    def evaluate_if_statement(self, if_statement):
+        if_statement.condition.accept(self)
+        if_statement.statement_block.accept(self)
+        if if_statement.else_statement is not None:
+            if_statement.else_statement.accept(self)
+
+    def evaluate_until_statement(self, until_statement):
+        until_statement.condition.accept(self)
+        until_statement.statement_block.accept(self)
+
+    def evaluate_return_statement(self, return_statement):
+        if return_statement.expression is not None:
+            return_statement.expression.accept(self)
+
+    def evaluate_function_call(self, function_call):
+        self.effects.calls.add(function_call.identifier)
+        for argument in function_call.arguments:
+            argument.accept(self)
+
+    def evaluate_assign_statement(self, assign_statement):
+        assign_statement.expression.accept(self)
+        identifier = assign_statement.identifier
+        if identifier.index_operator is None:
+            self.effects.writes.add(identifier.name)
+            if not is_fresh_expression(assign_statement.expression, self.fresh_functions):
+                self.effects.not_fresh_writes.add(identifier.name)
+            return
+        # Index operator changes only the part of the matrix,
+        # so the rest of the matrix is read.
+        self.effects.reads.add(identifier.name)
+        self.effects.modifies.add(identifier.name)
+        self.__evaluate_index_operator(identifier.index_operator)
+
+    def evaluate_additive_expression(self, add_expression):
+        for mul_expression in add_expression.multiplicative_expressions:
+            mul_expression.accept(self)
+
+    def evaluate_multiplicative_expression(self, mul_expression):
+        for atomic_expression in mul_expression.atomic_expressions:
+            atomic_expression.accept(self)
+
+    def evaluate_negated_atomic_expression(self, expression):
+        expression.atomic_expression.accept(self)
+
+    def evaluate_or_condition(self, or_condition):
+        for and_condition in or_condition.and_conditions:
+            and_condition.accept(self)
+
+    def evaluate_and_condition(self, and_condition):
+        for rel_condition in and_condition.rel_conditions:
+            rel_condition.accept(self)
+
+    def evaluate_relation_condition(self, rel_condition):
+        rel_condition.left_expression.accept(self)
+        if rel_condition.right_expression is not None:
+            rel_condition.right_expression.accept(self)
+
+    def evaluate_matrix_literal(self, matrix_literal):
+        for expression in matrix_literal.expressions:
+            expression.accept(self)
+
+    def evaluate_loop_invariant(self, invariant):
+        invariant.expression.accept(self)
+
+    def evaluate_common_expression(self, common):
+        common.expression.accept(self)
+
+    def evaluate_inlined_call(self, inlined_call):
+        # Inlined function is still called, so the effects do not depend
+        # on the calls being inlined.
+        inlined_call.function_call.accept(self)
+        inlined_call.expression.accept(self)
+
+    def evaluate_inlined_argument(self, argument):
+        # Arguments are evaluated by the inlined call, so they are not
+        # variables of the analyzed construction.
+        if argument.index_operator is not None:
+            self.__evaluate_index_operator(argument.index_operator)
+
+    def evaluate_constant_matrix(self, _):
+        pass
+
+    def evaluate_number_literal(self, _):
+        pass
+
+    def evaluate_string_literal(self, _):
+        pass
+
+    def evaluate_identifier(self, identifier):
+        self.effects.reads.add(identifier.name)
+        if identifier.index_operator is not None:
+            self.__evaluate_index_operator(identifier.index_operator)
+
+    def evaluate_dots_select(self, _):
+        pass
+
+    def __evaluate_index_operator(self, index_operator):
+        index_operator.first_selector.accept(self)
+        index_operator.second_selector.accept(self)
+
+
+def is_fresh_expression(expression, fresh_functions=()):
+    """
+    Checks whether expression always evaluates into new matrix.
+
+    Fresh matrix does not share memory with any existing variable, so
+    modifying it with the index operator can not affect other variables.
+    Identifiers, selecting all matrix elements and function calls may
+    return the existing matrix, so they are not fresh.
+
+    :param expression: syntactic construction of the expression.
+    :param fresh_functions: names of the functions always returning new matrices.
+    :return: True if the expression result is never shared.
+    """
+    if type(expression) is Identifier:
+        # Selecting single row, column or element copies the data.
+        index_operator = expression.index_operator
+        return index_operator is not None and \
+            (type(index_operator.first_selector) is not DotsSelect or
+             type(index_operator.second_selector) is not DotsSelect)
+    if type(expression) is FunctionCall:
+        return expression.identifier in fresh_functions
+    if type(expression) is InlinedCall:
+        return is_fresh_expression(expression.function_call, fresh_functions)
+    return True
+
+
+class PurityAnalyzer:
+    """
+    Class finding the pure functions of the program.
+
+    Function is pure when calling it can not be observed other way than
+    by its result: it does not modify its arguments, does not interact
+    with environment and calls pure functions only.
+
+    The analysis is conservative: function assigning to its parameters is
+    considered impure, since matrices are passed by reference, and
+    index operator assignments are allowed only for matrices created by
+    the function itself.
+    """
+
+    @staticmethod
+    def pure_functions(functions_definitions, pure_library_functions, fresh_library_functions=()):
+        """
+        Finds the pure functions of the program.
+
+        :param functions_definitions: dictionary of the program functions definitions.
+        :param pure_library_functions: names of the library functions without side effects.
+        :param fresh_library_functions: names of the library functions always returning new matrices.
+        :return: set of names of pure functions, including the library ones.
+        """
+        fresh_library_functions = set(fresh_library_functions) - set(functions_definitions)
+        effects = {
+            identifier: EffectsCollector.collect(function_def, fresh_library_functions)
+            for identifier, function_def in functions_definitions.items()
+        }
+        pure = set()
+        for identifier, function_def in functions_definitions.items():
+            function_effects = effects[identifier]
+            parameters = {parameter.name for parameter in function_def.parameters}
+            if function_effects.writes & parameters or \
+                    function_effects.modifies & (parameters | function_effects.not_fresh_writes):
+                continue
+            if not function_effects.modifies <= function_effects.writes:
+                # Matrix modified, but not created by the function.
+                continue
+            pure.add(identifier)
+        # Function calling impure function is impure as well. Removing
+        # them until nothing changes handles the recursion properly.
+        pure_library_functions = set(pure_library_functions) - set(functions_definitions)
+        changed = True
+        while changed:
+            changed = False
+            for identifier in list(pure):
+                if not effects[identifier].calls <= pure | pure_library_functions:
+                    pure.remove(identifier)
+                    changed = True
+
+        return pure | pure_library_functions
@@ -0,0 +1,72 @@
+from syntax_tree.constructions import *
+from semantic.effects import EffectsCollector
+
+
+class LivenessAnalyzer:
+    """
+    Class finding the variables, which values are never read again.
+
+    Variables are live, when their current values may be read later:
+    assignment ends the liveness of the previous value, until statement
+    keeps alive everything read by its next iterations and return ends
+    the liveness of all the variables. Variable is dead after the
+    statement accessing it, if it is not live after the statement.
+
+    Names are analyzed per function, without distinguishing the scopes,
+    which only makes the variables live longer. Parameters are never
+    dead, since matrices are passed by reference, so the variables of
+    parameters are shared with the calling function.
+    """
+
+    def __init__(self, parameters):
+        self.parameters = parameters
+        self.dead = {}
+
+    @staticmethod
+    def dead_variables(function_def):
+        """
+        Finds the variables dead after the statements of the function.
+
+        :param function_def: function definition to analyze.
+        :return: dictionary mapping ids of the statements into the sets of
+            names of the variables dead after them.
+        """
+        analyzer = LivenessAnalyzer({parameter.name for parameter in function_def.parameters})
+        analyzer.__live_before_block(function_def.statement_block, set())
+        return {statement: names for statement, names in analyzer.dead.items() if names}
+
+    def __live_before_block(self, statement_block, live_after):
+        live = live_after
+        for statement in reversed(statement_block.statements):
+            live_before = self.__live_before(statement, live)
+            # Statements of the until statement body are analyzed until
+            # the liveness stops changing, so the last result is kept.
+            self.dead[id(statement)] = frozenset(
+                EffectsCollector.collect(statement).accessed() - live - self.parameters
+            )
+            live = live_before
+        return live
+
+    def __live_before(self, statement, live_after):
+        if type(statement) is StatementBlock:
+            return self.__live_before_block(statement, live_after)
+        if type(statement) is IfStatement:
+            live = self.__live_before_block(statement.statement_block, live_after)
+            if statement.else_statement is not None:
+                live = live | self.__live_before(statement.else_statement, live_after)
+            else:
+                live = live | live_after
+            return live | EffectsCollector.collect(statement.condition).reads
+        if type(statement) is UntilStatement:
+            # Condition is evaluated before every iteration and after
+            # the last one, and the body may be evaluated again.
+            live = live_after | EffectsCollector.collect(statement.condition).reads
+            while True:
+                joined = live | self.__live_before_block(statement.statement_block, live)
+                if joined == live:
+                    return live
+                live = joined
+        effects = EffectsCollector.collect(statement)
+        if type(statement) is ReturnStatement:
+            return set(effects.reads)
+        return (live_after - effects.writes) | effects.reads
@@ -0,0 +1,100 @@
+from syntax_tree.constructions import *
+
+# Constructions, which may be evaluated into the numbers without the
+# variables of their intermediate results.
+SCALAR_OPERATIONS = (AdditiveExpression, MultiplicativeExpression, NegatedAtomicExpression)
+
+
+class ScalarExpressionsCollector:
+    """
+    Class finding the expressions, which evaluate into the numbers, when
+    the variables they read are numbers.
+
+    Scalar expression consists of number literals, identifiers, also
+    with the index operator selecting single element, loop invariants,
+    common subexpressions and arithmetic operations only. Interpreter
+    evaluates the scalar expressions (and relation conditions of them)
+    on the plain Python numbers (see ScalarTranslator), and falls back
+    to the variables, when any of the values is not a number.
+    """
+
+    def __init__(self):
+        self.scalars = {}
+
+    @staticmethod
+    def collect(functions_definitions):
+        """
+        Finds the scalar expressions of the functions.
+
+        :param functions_definitions: dictionary of the function definitions.
+        :return: dictionary mapping ids of the scalar expressions (operations
+            and relation conditions only) into the expressions.
+        """
+        collector = ScalarExpressionsCollector()
+        for function_def in functions_definitions.values():
+            collector.__visit(function_def.statement_block)
+        return collector.scalars
+
+    def __visit(self, construction):
+        # Returns True if the construction is the scalar expression.
+        construction_type = type(construction)
+        if construction_type is NumberLiteral:
+            return True
+        if construction_type is Identifier:
+            index_operator = construction.index_operator
+            if index_operator is None:
+                return True
+            # Both selectors are visited, so the nested expressions are found.
+            first = self.__visit(index_operator.first_selector)
+            second = self.__visit(index_operator.second_selector)
+            return first and second
+        if construction_type in (LoopInvariant, CommonExpression):
+            # Stored value is read, when it is computed already.
+            self.__visit(construction.expression)
+            return True
+        if construction_type is RelationCondition:
+            left = self.__visit(construction.left_expression)
+            if construction.operator is not None and \
+                    self.__visit(construction.right_expression) and left:
+                self.scalars[id(construction)] = construction
+            return False
+        scalar = construction_type in SCALAR_OPERATIONS
+        for child in _children(construction):
+            scalar = self.__visit(child) and scalar
+        if scalar:
+            self.scalars[id(construction)] = construction
+        return scalar
+
+
+def _children(construction):
+    construction_type = type(construction)
+    if construction_type is StatementBlock:
+        return construction.statements
+    if construction_type is IfStatement:
+        children = [construction.condition, construction.statement_block]
+        return children if construction.else_statement is None else [*children, construction.else_statement]
+    if construction_type is UntilStatement:
+        return [construction.condition, construction.statement_block]
+    if construction_type is AssignStatement:
+        return [construction.identifier, construction.expression]
+    if construction_type is ReturnStatement:
+        return [] if construction.expression is None else [construction.expression]
+    if construction_type is FunctionCall:
+        return construction.arguments
+    if construction_type is AdditiveExpression:
+        return construction.multiplicative_expressions
+    if construction_type is MultiplicativeExpression:
+        return construction.atomic_expressions
+    if construction_type is NegatedAtomicExpression:
+        return [construction.atomic_expression]
+    if construction_type is OrCondition:
+        return construction.and_conditions
+    if construction_type is AndCondition:
+        return construction.rel_conditions
+    if construction_type is MatrixLiteral:
+        return construction.expressions
+    if construction_type is InlinedCall:
+        return [construction.function_call, construction.expression]
+    if construction_type is InlinedArgument and construction.index_operator is not None:
+        return [construction.index_operator.first_selector, construction.index_operator.second_selector]
+    return []
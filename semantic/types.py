@@ -0,0 +1,583 @@
+from syntax_tree.constructions import *
+from semantic.effects import EffectsCollector
+from execution.variable import VariableType
+from execution.exception import *
+
+# Types of the values, which may be stored in the variables.
+ANY_TYPES = frozenset([
+    VariableType.MATRIX,
+    VariableType.SPARSE,
+    VariableType.NUMBER,
+    VariableType.STRING,
+    VariableType.STREAM,
+    VariableType.UNDEFINED
+])
+UNKNOWN_SHAPE = (None, None)
+
+
+class StaticType:
+    """
+    StaticType describes the values, which the expression may evaluate into.
+
+    Static type is the set of possible variable types (empty set means the
+    expression is never evaluated) and the shape of the matrix, where rows
+    or columns are None, if they are not known.
+    """
+
+    def __init__(self, types, shape=UNKNOWN_SHAPE):
+        self.types = frozenset(types)
+        self.shape = shape if VariableType.MATRIX in self.types else UNKNOWN_SHAPE
+
+    def join(self, other):
+        if VariableType.MATRIX not in self.types:
+            shape = other.shape
+        elif VariableType.MATRIX not in other.types:
+            shape = self.shape
+        else:
+            shape = _joined_shape(self.shape, other.shape)
+        return StaticType(self.types | other.types, shape)
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.types == other.types and self.shape == other.shape
+        return False
+
+    def __hash__(self):
+        return hash((self.types, self.shape))
+
+    def __repr__(self):
+        return str.format('StaticType\n\tTypes: {}\n\tShape: {}\n', set(self.types), self.shape)
+
+
+class TypeInformation:
+    """
+    TypeInformation is the result of the type checking of the program.
+
+    Type information contains:
+        - errors: execution exceptions, which are certain to be raised
+          when the construction they were found in is evaluated.
+        - early_errors: errors, which are certain to be raised, when the
+          program is executed, since their constructions are evaluated
+          by every execution of the main function.
+        - checked: ids of the constructions, which runtime type checks
+          are proven to pass (additive and multiplicative expressions,
+          assignments and relation conditions).
+        - scalar_products: ids of the multiplicative expressions, which
+          operands are proven to be numbers.
+        - return_types: static types of the values returned by the functions.
+    """
+
+    def __init__(self, errors, checked, return_types, early_errors=(), scalar_products=frozenset()):
+        self.errors = errors
+        self.early_errors = early_errors
+        self.checked = checked
+        self.scalar_products = scalar_products
+        self.return_types = return_types
+
+
+class TypeChecker:
+    """
+    Visitor inferring the static types of the program functions.
+
+    Checker evaluates the functions abstractly, the same way the
+    interpreter does, but with the sets of possible types instead of
+    the values: scopes are opened and closed the same way, branches of
+    if statements are joined and until statements are evaluated until
+    the types of the variables stop changing. Parameters may be of any
+    type, since functions may be called from Python as well.
+
+    Only the errors raised for all the possible types are reported, so
+    the reported construction fails whenever it is evaluated. Errors of
+    the constructions evaluated unconditionally, neither in the branches
+    of if statements, nor in the bodies of until statements, nor after
+    the return statement, which may be executed, nor in short-circuited
+    conditions, are also early errors, when their functions are called
+    unconditionally by the main function, so correct program is never
+    rejected. Functions reading variables, which may be not initialized
+    depending on the short-circuited conditions, are not checked at all.
+    """
+
+    def __init__(self, functions_definitions, library_result_types, library_functions=None):
+        self.functions_definitions = functions_definitions
+        self.library_result_types = library_result_types
+        self.library_functions = library_functions
+        self.return_types = {identifier: StaticType(()) for identifier in functions_definitions}
+        # Invariant: scopes is None, when the recently visited
+        # construction is never finished (it returns).
+        self.scopes = None
+        self.result = None
+        self.returned = None
+        self.reporting = False
+        self.optional = 0
+        self.imprecise = False
+        self.context = []
+        self.errors = []
+        self.checked = set()
+        self.unchecked = set()
+        self.scalar_products = set()
+        self.matrix_products = set()
+        # Constructions are evaluated unconditionally, when the counter is
+        # zero and no return statement may have been executed before.
+        self.conditional = 0
+        self.diverted = False
+        self.early_errors = []
+        self.calls = set()
+
+    @staticmethod
+    def check(functions_definitions, library_result_types=None, library_functions=None):
+        """
+        Checks the types of the program functions.
+
+        :param functions_definitions: dictionary of the program functions definitions.
+        :param library_result_types: dictionary mapping library functions into
+            the types of their results; other functions may return any type.
+        :param library_functions: names of the library functions; when given,
+            calls of the functions defined neither by the program nor by the
+            library are reported.
+        :return: TypeInformation of the program.
+        """
+        checker = TypeChecker(functions_definitions, library_result_types or {}, library_functions)
+        # Return types depend on each other, so they are inferred until
+        # nothing changes; types only grow, so it always ends.
+        changed = True
+        while changed:
+            changed = False
+            for identifier, function_def in functions_definitions.items():
+                return_type = checker.return_types[identifier].join(checker.__function_type(function_def))
+                if return_type != checker.return_types[identifier]:
+                    checker.return_types[identifier] = return_type
+                    changed = True
+        checker.reporting = True
+        errors = []
+        checked = set()
+        scalar_products = set()
+        early_errors = {}
+        calls = {}
+        for identifier, function_def in functions_definitions.items():
+            checker.errors, checker.checked, checker.unchecked = [], set(), set()
+            checker.early_errors, checker.calls = [], set()
+            checker.scalar_products, checker.matrix_products = set(), set()
+            checker.__function_type(function_def)
+            calls[identifier] = checker.calls
+            if not checker.imprecise:
+                errors.extend(checker.errors)
+                early_errors[identifier] = checker.early_errors
+                checked |= checker.checked - checker.unchecked
+                scalar_products |= checker.scalar_products - checker.matrix_products
+        # Functions called unconditionally by the main function are
+        # executed by every execution of the program.
+        executed = set()
+        pending = ['main'] if 'main' in functions_definitions else []
+        while pending:
+            if (identifier := pending.pop()) not in executed:
+                executed.add(identifier)
+                pending.extend(calls[identifier])
+        return TypeInformation(
+            errors,
+            frozenset(checked),
+            checker.return_types,
+            [error for identifier in functions_definitions if identifier in executed
+             for error in early_errors.get(identifier, [])],
+            frozenset(scalar_products)
+        )
+
+    def __function_type(self, function_def):
+        self.scopes = [{parameter.name: StaticType(ANY_TYPES) for parameter in function_def.parameters}]
+        self.returned = StaticType(())
+        self.imprecise = False
+        self.conditional = 0
+        self.diverted = False
+        self.context = [f'function {function_def.identifier}']
+        function_def.accept(self)
+        if self.scopes is not None:
+            # Function ended without return statement.
+            self.returned = self.returned.join(StaticType([VariableType.UNDEFINED]))
+        if self.imprecise:
+            return StaticType(ANY_TYPES)
+        return self.returned
+
+    def evaluate_function_definition(self, function_def):
+        function_def.statement_block.accept(self)
+
+    def evaluate_statement_block(self, statement_block):
+        self.scopes.append({})
+        for statement in statement_block.statements:
+            statement.accept(self)
+            if self.scopes is None:
+                # Following statements are never evaluated.
+                return
+        self.scopes.pop()
+
+    def evaluate_if_statement(self, if_statement):
+        self.context.append('if statement')
+        self.__evaluate_condition(if_statement.condition)
+        before = _copied(self.scopes)
+        self.conditional += 1
+        if_statement.statement_block.accept(self)
+        after_block = self.scopes
+        self.scopes = before
+        if if_statement.else_statement is not None:
+            if_statement.else_statement.accept(self)
+        self.conditional -= 1
+        self.scopes = _joined_scopes(after_block, self.scopes)
+        self.context.pop()
+
+    def evaluate_until_statement(self, until_statement):
+        self.context.append('until statement')
+        # Types at the beginning of the iteration are found first,
+        # without reporting, since errors of the earlier iterations may
+        # be not certain in the later ones.
+        reporting, self.reporting = self.reporting, False
+        head = _copied(self.scopes)
+        while True:
+            self.scopes = _copied(head)
+            self.__evaluate_condition(until_statement.condition)
+            self.conditional += 1
+            until_statement.statement_block.accept(self)
+            self.conditional -= 1
+            joined = _joined_scopes(head, self.scopes)
+            if joined == head:
+                break
+            head = joined
+        self.reporting = reporting
+        self.scopes = head
+        self.__evaluate_condition(until_statement.condition)
+        after_condition = _copied(self.scopes)
+        self.conditional += 1
+        until_statement.statement_block.accept(self)
+        self.conditional -= 1
+        self.scopes = after_condition
+        self.context.pop()
+
+    def __evaluate_condition(self, condition):
+        condition.accept(self)
+
+    def evaluate_return_statement(self, return_statement):
+        self.context.append('return statement')
+        if return_statement.expression is not None:
+            return_statement.expression.accept(self)
+            self.returned = self.returned.join(self.result)
+        else:
+            self.returned = self.returned.join(StaticType([VariableType.UNDEFINED]))
+        self.scopes = None
+        # Statements following the if or until statement may be not executed.
+        self.diverted = self.diverted or self.conditional > 0
+        self.context.pop()
+
+    def evaluate_function_call(self, function_call):
+        self.context.append(f'function {function_call.identifier} call')
+        for argument in function_call.arguments:
+            argument.accept(self)
+        # Matrices are passed by reference, so the called function may
+        # change the shapes of the argument variables.
+        for argument in function_call.arguments:
+            for name in EffectsCollector.collect(argument).reads:
+                if (scope := self.__scope_of(name)) is not None:
+                    scope[name] = StaticType(scope[name].types)
+        identifier = function_call.identifier
+        if identifier in self.functions_definitions:
+            if self.__unconditional():
+                self.calls.add(identifier)
+            self.result = self.return_types[identifier]
+        elif (result_types := self.library_result_types.get(identifier)) is not None:
+            self.result = StaticType(result_types)
+        else:
+            if self.reporting and self.library_functions is not None and identifier not in self.library_functions:
+                self.__add_error(UndefinedFunctionException(identifier))
+            self.result = StaticType(ANY_TYPES)
+        self.context.pop()
+
+    def evaluate_assign_statement(self, assign_statement):
+        self.context.append('assign statement')
+        assign_statement.expression.accept(self)
+        result = self.result
+        identifier = assign_statement.identifier
+        variable = self.__get_variable(identifier.name)
+        if identifier.index_operator is not None:
+            if not variable.types & {VariableType.MATRIX, VariableType.SPARSE}:
+                self.__report(variable.types, lambda t: InvalidTypeException(t))
+            if not result.types & {VariableType.MATRIX, VariableType.NUMBER}:
+                self.__report(result.types, lambda t: InvalidTypeException(t))
+            self.__evaluate_selectors(identifier.index_operator)
+        else:
+            assigned = {
+                right for left in variable.types for right in result.types
+                if _assignment_error(left, right) is None
+            }
+            self.__verify(assign_statement, variable.types, result.types, _assignment_error)
+            self.__scope_of(identifier.name)[identifier.name] = StaticType(assigned, result.shape)
+        self.context.pop()
+
+    def evaluate_additive_expression(self, add_expression):
+        operators = ['_', *add_expression.operators] if add_expression.operators is not None else ['_']
+        left = None
+        for mul_expression, operator in zip(add_expression.multiplicative_expressions, operators):
+            mul_expression.accept(self)
+            if left is not None:
+                self.__verify(add_expression, left.types, self.result.types, _matching_error)
+                self.result = self.__combined(left, self.result, operator)
+            left = self.result
+
+    def evaluate_multiplicative_expression(self, mul_expression):
+        operators = ['_', *mul_expression.operators] if mul_expression.operators is not None else ['_']
+        left = None
+        scalar = True
+        for atomic_expression, operator in zip(mul_expression.atomic_expressions, operators):
+            atomic_expression.accept(self)
+            right = self.result
+            scalar = scalar and right.types <= {VariableType.NUMBER}
+            if left is not None:
+                self.__verify(mul_expression, left.types, right.types, _matching_error)
+                if operator == '/' and left.types and right.types and \
+                        left.types | right.types <= {VariableType.MATRIX, VariableType.SPARSE}:
+                    divisor = min(right.types, key=_order)
+                    self.__report(left.types, lambda t: TypesMismatchException(t, divisor))
+                if operator == '*' and left.types == {VariableType.MATRIX} and right.types == {VariableType.MATRIX} \
+                        and None not in (left.shape[1], right.shape[0]) and left.shape[1] != right.shape[0]:
+                    self.__report(left.types, lambda _: MatrixDimensionsMismatchException(left.shape, right.shape))
+                self.result = self.__combined(left, right, operator)
+            left = self.result
+        if self.reporting:
+            (self.scalar_products if scalar else self.matrix_products).add(id(mul_expression))
+
+    @staticmethod
+    def __combined(left, right, operator):
+        types = set()
+        shape = None
+        for left_type in left.types:
+            for right_type in right.types:
+                if _matching_error(left_type, right_type) is not None:
+                    continue
+                if VariableType.SPARSE in (left_type, right_type):
+                    # Shapes of the sparse matrices are not known.
+                    types.add(_sparse_combined_type(left_type, right_type, operator))
+                    shape = UNKNOWN_SHAPE
+                    continue
+                types.add(left_type)
+                if left_type != VariableType.MATRIX:
+                    continue
+                if right_type == VariableType.NUMBER:
+                    combined_shape = left.shape
+                elif operator == '*':
+                    combined_shape = (left.shape[0], right.shape[1])
+                else:
+                    combined_shape = left.shape if left.shape == right.shape else UNKNOWN_SHAPE
+                shape = combined_shape if shape is None else _joined_shape(shape, combined_shape)
+        return StaticType(types, shape if shape is not None else UNKNOWN_SHAPE)
+
+    def evaluate_negated_atomic_expression(self, expression):
+        expression.atomic_expression.accept(self)
+        negated_types = {VariableType.MATRIX, VariableType.SPARSE, VariableType.NUMBER}
+        if not self.result.types & negated_types:
+            self.__report(self.result.types, lambda t: InvalidTypeException(t))
+        self.result = StaticType(self.result.types & negated_types, self.result.shape)
+
+    def evaluate_or_condition(self, or_condition):
+        for index, and_condition in enumerate(or_condition.and_conditions):
+            # Conditions after the first one may be short-circuited.
+            self.optional += index > 0
+            and_condition.accept(self)
+            self.optional -= index > 0
+
+    def evaluate_and_condition(self, and_condition):
+        for index, rel_condition in enumerate(and_condition.rel_conditions):
+            self.optional += index > 0
+            rel_condition.accept(self)
+            self.optional -= index > 0
+
+    def evaluate_relation_condition(self, rel_condition):
+        rel_condition.left_expression.accept(self)
+        if rel_condition.operator is None:
+            casted_types = {VariableType.MATRIX, VariableType.SPARSE, VariableType.NUMBER, VariableType.STRING}
+            if not self.result.types & casted_types:
+                self.__report(self.result.types, lambda t: InvalidTypeException(t))
+            return
+        left = self.result
+        rel_condition.right_expression.accept(self)
+        self.__verify(rel_condition, left.types, self.result.types, _comparison_error)
+
+    def evaluate_matrix_literal(self, matrix_literal):
+        rows = [0]
+        for expression, separator in zip(matrix_literal.expressions, ['_', *matrix_literal.separators]):
+            expression.accept(self)
+            if not self.result.types & {VariableType.NUMBER}:
+                self.__report(self.result.types, lambda t: InvalidTypeException(t))
+            if separator == ';':
+                rows.append(0)
+            rows[-1] += 1
+        if any(row != rows[0] for row in rows):
+            self.__report(ANY_TYPES, lambda _: InvalidMatrixLiteralException())
+        self.result = StaticType([VariableType.MATRIX], (len(rows), rows[0]))
+
+    def evaluate_loop_invariant(self, invariant):
+        invariant.expression.accept(self)
+
+    def evaluate_common_expression(self, common):
+        common.expression.accept(self)
+
+    def evaluate_inlined_call(self, inlined_call):
+        # Result is the same as the one of the function call; the
+        # expression is checked as a part of the inlined function.
+        inlined_call.function_call.accept(self)
+
+    def evaluate_constant_matrix(self, constant_matrix):
+        self.result = StaticType([VariableType.MATRIX], constant_matrix.value.shape)
+
+    def evaluate_number_literal(self, _):
+        self.result = StaticType([VariableType.NUMBER])
+
+    def evaluate_string_literal(self, _):
+        self.result = StaticType([VariableType.STRING])
+
+    def evaluate_identifier(self, identifier):
+        variable = self.__get_variable(identifier.name)
+        if identifier.index_operator is None:
+            self.result = variable
+            return
+        if not variable.types & {VariableType.MATRIX, VariableType.SPARSE}:
+            self.__report(variable.types, lambda t: InvalidTypeException(t))
+        first, second = self.__evaluate_selectors(identifier.index_operator)
+        rows, cols = variable.shape
+        if first and second:
+            self.result = StaticType(variable.types & {VariableType.MATRIX, VariableType.SPARSE}, variable.shape)
+        elif second:
+            self.result = StaticType([VariableType.MATRIX], (1, cols))
+        elif first:
+            self.result = StaticType([VariableType.MATRIX], (1, rows))
+        else:
+            self.result = StaticType([VariableType.NUMBER])
+
+    def __evaluate_selectors(self, index_operator):
+        # Returns flags informing whether the selectors are the dots.
+        dots = []
+        for selector in [index_operator.first_selector, index_operator.second_selector]:
+            selector.accept(self)
+            if self.result is None:
+                dots.append(True)
+                continue
+            if not self.result.types & {VariableType.NUMBER}:
+                self.__report(self.result.types, lambda t: InvalidTypeException(t))
+            dots.append(False)
+        return dots
+
+    def evaluate_dots_select(self, _):
+        self.result = None
+
+    def __get_variable(self, name):
+        if (scope := self.__scope_of(name)) is not None:
+            return scope[name]
+        if self.optional:
+            # Variable may be initialized here or later, in the inner
+            # scope, depending on the short-circuited condition.
+            self.imprecise = True
+        # Interpreter initializes missing variable in the current scope.
+        self.scopes[-1][name] = StaticType([VariableType.UNDEFINED])
+        return self.scopes[-1][name]
+
+    def __scope_of(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope
+        return None
+
+    def __verify(self, construction, left_types, right_types, error_of):
+        # Construction is checked, if its runtime check passes for all
+        # the possible types, and the error is certain, if it fails for
+        # all of them.
+        if not self.reporting:
+            return
+        errors = [
+            error for left in sorted(left_types, key=_order) for right in sorted(right_types, key=_order)
+            if (error := error_of(left, right)) is not None
+        ]
+        if not errors:
+            self.checked.add(id(construction))
+            return
+        self.unchecked.add(id(construction))
+        if len(errors) == len(left_types) * len(right_types):
+            self.__add_error(errors[0])
+
+    def __report(self, types, error_of):
+        if self.reporting and types:
+            self.__add_error(error_of(min(types, key=_order)))
+
+    def __add_error(self, error):
+        error.stack = [f'check {item}' for item in reversed(self.context)]
+        self.errors.append(error)
+        if self.__unconditional():
+            self.early_errors.append(error)
+
+    def __unconditional(self):
+        return not self.conditional and not self.optional and not self.diverted
+
+
+def _order(variable_type):
+    return variable_type.name
+
+
+def _matching_error(left, right):
+    # Mirrors type check of the operands of the additive and
+    # multiplicative expressions.
+    if left == VariableType.UNDEFINED or right == VariableType.UNDEFINED:
+        return UndefinedVariableException()
+    if left == right or (left == VariableType.MATRIX and right == VariableType.NUMBER):
+        return None
+    if left == VariableType.SPARSE and right in [VariableType.MATRIX, VariableType.NUMBER]:
+        return None
+    if left == VariableType.MATRIX and right == VariableType.SPARSE:
+        return None
+    return TypesMismatchException(left, right)
+
+
+def _sparse_combined_type(left, right, operator):
+    # Sparse matrices stay sparse, when combined together, multiplied
+    # or divided by numbers; other results are dense.
+    if left == right or (right == VariableType.NUMBER and operator in ['*', '/']):
+        return VariableType.SPARSE
+    return VariableType.MATRIX
+
+
+def _assignment_error(left, right):
+    if left == VariableType.UNDEFINED and right != VariableType.UNDEFINED:
+        return None
+    if left == VariableType.UNDEFINED or right == VariableType.UNDEFINED:
+        return UndefinedVariableException()
+    if left == right:
+        return None
+    return TypesMismatchException(left, right)
+
+
+def _comparison_error(left, right):
+    invalid_types = [VariableType.STRING, VariableType.SPARSE, VariableType.UNDEFINED]
+    if left in invalid_types:
+        return InvalidTypeException(left)
+    if right in invalid_types:
+        return InvalidTypeException(right)
+    if left != right:
+        return TypesMismatchException(left, right)
+    return None
+
+
+def _joined_shape(first, second):
+    return tuple(a if a == b else None for a, b in zip(first, second))
+
+
+def _copied(scopes):
+    return [dict(scope) for scope in scopes] if scopes is not None else None
+
+
+def _joined_scopes(first, second):
+    if first is None:
+        return second
+    if second is None:
+        return first
+    joined = []
+    for first_scope, second_scope in zip(first, second):
+        scope = {}
+        for name in first_scope.keys() | second_scope.keys():
+            # Variable missing on one of the paths is initialized with
+            # undefined value, when it is accessed.
+            undefined = StaticType([VariableType.UNDEFINED])
+            scope[name] = first_scope.get(name, undefined).join(second_scope.get(name, undefined))
+        joined.append(scope)
+    return joined
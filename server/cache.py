@@ -0,0 +1,67 @@
+import hashlib
+import threading
+import collections
+
+from data.source.pipeline import positional_string_source_pipe
+from lexical.analyzer import LexicalAnalyzer
+from lexical.exception import LexicalException
+from syntactic.analyzer import SyntacticAnalyzer
+from syntactic.exception import SyntacticException
+from execution.program import CompiledProgram
+
+
+class ProgramCache:
+    """
+    ProgramCache keeps recently used compiled programs.
+
+    Programs are keyed by the hash of their source code and by the
+    compiler options, so changed program file is compiled again, while
+    the same source sent by many clients is parsed only once. Least recently used program is evicted,
+    when the cache is full. Cache may be used by many threads at once.
+    """
+
+    def __init__(self, capacity):
+        """
+        ProgramCache constructor.
+
+        :param capacity: maximal number of the cached programs.
+        """
+        self.capacity = capacity
+        self.programs = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def compile(self, source_code, options=None):
+        """
+        Returns compiled program of the source code, compiling it if needed.
+
+        Lexical and syntactic exceptions are raised with the data source
+        of the program attached as the source attribute, so they can be
+        reported with the invalid line of the program.
+
+        :param source_code: source code of the program.
+        :param options: compiler options, see CompiledProgram.compile.
+        :return: tuple of CompiledProgram and flag informing whether it was cached.
+        """
+        key = (hashlib.sha256(source_code.encode('utf-8')).hexdigest(), repr(sorted((options or {}).items())))
+        with self.lock:
+            if (program := self.programs.get(key)) is not None:
+                self.programs.move_to_end(key)
+                return program, True
+        # Compilation happens outside the lock, so long programs do not
+        # block the other requests; the same program compiled twice by
+        # concurrent requests is harmless.
+        data_source = positional_string_source_pipe(source_code)
+        try:
+            program = CompiledProgram.compile(SyntacticAnalyzer(LexicalAnalyzer(data_source)), options)
+        except (LexicalException, SyntacticException) as e:
+            e.source = data_source.unified_source.raw_source
+            raise e
+        with self.lock:
+            self.programs[key] = program
+            self.programs.move_to_end(key)
+            while len(self.programs) > self.capacity:
+                self.programs.popitem(last=False)
+        return program, False
+
+    def __len__(self):
+        return len(self.programs)
@@ -0,0 +1,87 @@
+import io
+import sys
+import contextlib
+import contextvars
+
+# Streams redirected in the current context, mapped into their buffers.
+_redirected = contextvars.ContextVar('redirected streams', default={})
+
+
+class ThreadLocalStream:
+    """
+    Stream forwarding the operations to the stream of the current thread.
+
+    Library functions use the standard streams of sys module, so they
+    are replaced with ThreadLocalStream instances, while the server is
+    running. Threads executing the requests redirect them into their
+    own buffers, other threads use the original streams. Redirections
+    are context variables, so the worker threads of the parallel
+    evaluation, which run in the context of the thread executing the
+    request (see ContextThreadPoolExecutor), use its buffers too.
+    """
+
+    def __init__(self, default):
+        self.default = default
+
+    def current(self):
+        return _redirected.get().get(self, self.default)
+
+    def redirect(self, stream):
+        _redirected.set({**_redirected.get(), self: stream})
+
+    def restore(self):
+        _redirected.set({stream: buffer for stream, buffer in _redirected.get().items() if stream is not self})
+
+    def write(self, text):
+        return self.current().write(text)
+
+    def readline(self, size=-1):
+        return self.current().readline(size)
+
+    def flush(self):
+        self.current().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
+
+
+def install_streams():
+    """
+    Replaces standard streams with ThreadLocalStream instances.
+    """
+    sys.stdin, sys.stdout, sys.stderr = (ThreadLocalStream(stream) for stream in (sys.stdin, sys.stdout, sys.stderr))
+
+
+@contextlib.contextmanager
+def installed_streams():
+    """
+    Replaces standard streams with ThreadLocalStream instances, until
+    the context is exited.
+    """
+    original = sys.stdin, sys.stdout, sys.stderr
+    install_streams()
+    try:
+        yield
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = original
+
+
+@contextlib.contextmanager
+def captured_streams(stdin=''):
+    """
+    Captures the standard streams of the current thread.
+
+    Streams must be installed with installed_streams beforehand.
+
+    :param stdin: text read by the current thread from the standard input.
+    :return: tuple of stdout and stderr buffers.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    streams = [(sys.stdin, io.StringIO(stdin)), (sys.stdout, stdout), (sys.stderr, stderr)]
+    for stream, buffer in streams:
+        stream.redirect(buffer)
+    try:
+        yield stdout, stderr
+    finally:
+        for stream, _ in streams:
+            stream.restore()
@@ -0,0 +1,60 @@
+"""
+Thin client of the interpreter server.
+
+Client imports the standard library only, so it starts in milliseconds,
+while the server keeps NumPy and the compiled programs loaded:
+
+    python -m server.client --socket /tmp/matlan.sock --input input.txt program.txt
+"""
+import os
+import sys
+import json
+import socket
+import argparse
+
+
+def request(socket_path, message):
+    """
+    Sends single request to the server and waits for the response.
+
+    :param socket_path: path of the server Unix domain socket.
+    :param message: dictionary of the request.
+    :return: dictionary of the response.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        with connection.makefile('rb') as response:
+            return json.loads(response.readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Matrix Language interpreter server client.')
+    parser.add_argument('file_name', nargs='?', help='file containing the source code of the program')
+    parser.add_argument('--socket', required=True, help='path of the server socket')
+    parser.add_argument('--source', help='source code of the program, instead of the file')
+    parser.add_argument('--input', help='file read by the cin function, - for the standard input')
+    parser.add_argument('--timeout', type=float, help='execution timeout in seconds')
+    arguments = parser.parse_args()
+
+    if (arguments.file_name is None) == (arguments.source is None):
+        parser.error('expected either file name or --source')
+    message = ({'source': arguments.source}
+               if arguments.source is not None
+               else {'path': os.path.abspath(arguments.file_name)})
+    if arguments.input == '-':
+        message['stdin'] = sys.stdin.read()
+    elif arguments.input is not None:
+        with open(arguments.input, encoding='utf-8') as file:
+            message['stdin'] = file.read()
+    if arguments.timeout is not None:
+        message['timeout'] = arguments.timeout
+
+    response = request(arguments.socket, message)
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    sys.exit(response['status'])
+
+
+if __name__ == '__main__':
+    main()
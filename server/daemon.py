@@ -0,0 +1,139 @@
+import os
+import json
+import asyncio
+import functools
+import concurrent.futures
+
+from server.cache import ProgramCache
+from server.capture import installed_streams
+from server.job import Job, ERROR_STATUS, INVALID_REQUEST_STATUS
+
+
+class InterpreterServer:
+    """
+    Long-lived interpreter server listening on the Unix domain socket.
+
+    Requests and responses are JSON objects, each in a single line; one
+    connection may send many requests. Request contains either program
+    'path' or program 'source', optional 'stdin' text read by the cin
+    function and optional 'timeout' in seconds. Response contains exit
+    'status', captured 'stdout' and 'stderr', flag informing whether
+    the program was 'cached' and execution 'time'.
+
+    Programs are executed by the thread pool, at most MAX_CONCURRENCY
+    at once; compiled programs are kept in the LRU cache.
+    """
+
+    default_options = {
+        'MAX_CONCURRENCY': os.cpu_count() or 1,
+        'CACHE_SIZE': 128,
+        'TIMEOUT': 60.0,
+        'REQUEST_LIMIT': 2 ** 24,
+        'INTERPRETER_OPTIONS': None
+    }
+
+    def __init__(self, socket_path, options=None):
+        """
+        InterpreterServer constructor.
+
+        :param socket_path: path of the Unix domain socket.
+        :param options: server options, see default_options.
+        """
+        self.socket_path = socket_path
+        self.options = ({**InterpreterServer.default_options, **options}
+                        if options is not None
+                        else InterpreterServer.default_options)
+        self.cache = ProgramCache(self.options['CACHE_SIZE'])
+        self.compiler_options = (self.options['INTERPRETER_OPTIONS'] or {}).get('COMPILER_OPTIONS')
+        self.executor = None
+        self.semaphore = None
+        self.server = None
+
+    def serve(self):
+        """
+        Runs the server until it is interrupted.
+        """
+        with installed_streams():
+            try:
+                asyncio.run(self.serve_forever())
+            except KeyboardInterrupt:
+                pass
+
+    async def serve_forever(self, started=None):
+        """
+        Accepts the connections until the server task is cancelled.
+
+        :param started: optional callable invoked once the socket is listening.
+        """
+        self.executor = concurrent.futures.ThreadPoolExecutor(self.options['MAX_CONCURRENCY'])
+        self.semaphore = asyncio.Semaphore(self.options['MAX_CONCURRENCY'])
+        self.server = await asyncio.start_unix_server(
+            self.__handle_connection,
+            path=self.socket_path,
+            limit=self.options['REQUEST_LIMIT']
+        )
+        try:
+            async with self.server:
+                if started is not None:
+                    started()
+                await self.server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def __handle_connection(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await self.handle_request(line)
+                except Exception as e:
+                    # Client always gets the response, even if the request
+                    # failed unexpectedly.
+                    response = {'status': ERROR_STATUS, 'stdout': '', 'stderr': f'Error: {type(e).__name__}: {e}\n'}
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # Client disconnected or sent too long request line.
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, line):
+        """
+        Executes the program of the single request.
+
+        :param line: JSON encoded request.
+        :return: dictionary of the response.
+        """
+        try:
+            request = json.loads(line)
+            source_code = InterpreterServer.__source_code_of(request)
+            timeout = float(request.get('timeout', self.options['TIMEOUT']))
+            stdin = str(request.get('stdin', ''))
+        except (ValueError, TypeError, AttributeError, OSError) as e:
+            return {'status': INVALID_REQUEST_STATUS, 'stdout': '', 'stderr': f'Error: Invalid request; {e}\n'}
+
+        job = Job(
+            functools.partial(self.cache.compile, source_code, self.compiler_options),
+            stdin,
+            self.options['INTERPRETER_OPTIONS']
+        )
+        async with self.semaphore:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, job.run)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                # Thread can not be killed, so the job is cancelled and
+                # still occupies the slot until it really stops.
+                job.cancel()
+                return await future
+
+    @staticmethod
+    def __source_code_of(request):
+        if 'source' in request:
+            return str(request['source'])
+        if 'path' in request:
+            with open(request['path'], encoding='utf-8') as file:
+                return file.read()
+        raise ValueError('expected program path or source')
@@ -0,0 +1,76 @@
+import time
+
+from server.capture import captured_streams
+from lexical.exception import LexicalException
+from syntactic.exception import SyntacticException
+from execution.interpreter import Interpreter
+from execution.exception import ExecutionException, ExecutionCancelledException
+from execution.cancellation import CancellationToken
+from exception.handler import ExceptionHandler, e_print
+
+# Exit statuses of the executed programs.
+SUCCESS_STATUS = 0
+ERROR_STATUS = 1
+INVALID_REQUEST_STATUS = 2
+TIMEOUT_STATUS = 124
+
+
+class Job:
+    """
+    Job is the single execution of the program with the given input.
+
+    Job runs with its own captured standard streams (see captured_streams)
+    and its own execution context of the (possibly cached) compiled
+    program. Job may be cancelled from the other thread; cancellation
+    takes effect at the next loop iteration or function call.
+    """
+
+    def __init__(self, compile_program, stdin, options):
+        """
+        Job constructor.
+
+        :param compile_program: callable returning compiled program of the job
+            and flag informing whether it was cached.
+        :param stdin: text read by the cin function.
+        :param options: interpreter options.
+        """
+        self.compile_program = compile_program
+        self.stdin = stdin
+        self.options = options
+        self.cancellation = CancellationToken()
+
+    def cancel(self):
+        self.cancellation.cancel()
+
+    def run(self):
+        start = time.perf_counter()
+        cached = False
+        with captured_streams(self.stdin) as (stdout, stderr):
+            try:
+                program, cached = self.compile_program()
+                Interpreter(None, self.options, program, self.cancellation).execute()
+                status = SUCCESS_STATUS
+            except LexicalException as e:
+                ExceptionHandler.handle_lexical_exception(e, e.source)
+                status = ERROR_STATUS
+            except SyntacticException as e:
+                ExceptionHandler.handle_syntactic_exception(e, e.source)
+                status = ERROR_STATUS
+            except ExecutionCancelledException as e:
+                ExceptionHandler.handle_execution_exception(e)
+                status = TIMEOUT_STATUS
+            except ExecutionException as e:
+                ExceptionHandler.handle_execution_exception(e)
+                status = ERROR_STATUS
+            except Exception as e:
+                # Failures not reported by the interpreter, like the runaway
+                # recursion, fail this job only.
+                e_print(f'Error: {type(e).__name__}: {e}')
+                status = ERROR_STATUS
+        return {
+            'status': status,
+            'stdout': stdout.getvalue(),
+            'stderr': stderr.getvalue(),
+            'cached': cached,
+            'time': time.perf_counter() - start
+        }
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class Program:
     def __init__(self, functions_definitions):
         self.functions_definitions = functions_definitions
@@ -14,7 +17,7 @@ class Program:
         return False
 
     def __hash__(self):
-        return hash(self.functions_definitions)
+        return hash(tuple(self.functions_definitions.items()))
 
 
 class FunctionDefinition:
@@ -42,7 +45,7 @@ class FunctionDefinition:
         return False
 
     def __hash__(self):
-        return hash((self.identifier, self.parameters, self.statement_block))
+        return hash((self.identifier, tuple(self.parameters), self.statement_block))
 
 
 class StatementBlock:
@@ -61,7 +64,7 @@ class StatementBlock:
         return False
 
     def __hash__(self):
-        return hash(self.statements)
+        return hash(tuple(self.statements))
 
 
 class IfStatement:
@@ -93,28 +96,32 @@ class IfStatement:
 
 
 class UntilStatement:
-    def __init__(self, condition, statement_block):
+    def __init__(self, condition, statement_block, invariants=()):
         self.condition = condition
         self.statement_block = statement_block
+        # Names of the loop invariants computed once per loop execution.
+        self.invariants = invariants
 
     def accept(self, visitor):
         visitor.evaluate_until_statement(self)
 
     def __repr__(self):
         return str.format(
-            'Until statement\n\tCondition: {}\n\tStatement block: {}\n',
+            'Until statement\n\tCondition: {}\n\tStatement block: {}\n\tInvariants: {}\n',
             self.condition,
-            self.statement_block
+            self.statement_block,
+            self.invariants
         )
 
     def __eq__(self, other):
         if type(other) is type(self):
             return self.condition == other.condition and \
-                   self.statement_block == other.statement_block
+                   self.statement_block == other.statement_block and \
+                   tuple(self.invariants) == tuple(other.invariants)
         return False
 
     def __hash__(self):
-        return hash((self.condition, self.statement_block))
+        return hash((self.condition, self.statement_block, tuple(self.invariants)))
 
 
 class ReturnStatement:
@@ -158,7 +165,7 @@ class FunctionCall:
         return False
 
     def __hash__(self):
-        return hash((self.identifier, self.arguments))
+        return hash((self.identifier, tuple(self.arguments)))
 
 
 class AssignStatement:
@@ -208,7 +215,7 @@ class AdditiveExpression:
         return False
 
     def __hash__(self):
-        return hash((self.multiplicative_expressions, self.operators))
+        return hash((tuple(self.multiplicative_expressions), tuple(self.operators or ())))
 
 
 class MultiplicativeExpression:
@@ -233,7 +240,7 @@ class MultiplicativeExpression:
         return False
 
     def __hash__(self):
-        return hash((self.atomic_expressions, self.operators))
+        return hash((tuple(self.atomic_expressions), tuple(self.operators or ())))
 
 
 class NegatedAtomicExpression:
@@ -277,7 +284,7 @@ class OrCondition:
         return False
 
     def __hash__(self):
-        return hash(self.and_conditions)
+        return hash(tuple(self.and_conditions))
 
 
 class AndCondition:
@@ -299,7 +306,7 @@ class AndCondition:
         return False
 
     def __hash__(self):
-        return hash(self.rel_conditions)
+        return hash(tuple(self.rel_conditions))
 
 
 class RelationCondition:
@@ -355,7 +362,149 @@ class MatrixLiteral:
         return False
 
     def __hash__(self):
-        return hash((self.expressions, self.separators))
+        return hash((tuple(self.expressions), tuple(self.separators)))
+
+
+class ConstantMatrix:
+    # Matrix precomputed by the optimizer from the constant expression.
+    # Matrix is read-only; copied constant is evaluated into the copy of
+    # it, since it is bound to the variable and may be modified.
+    def __init__(self, value, copied=False):
+        self.value = value
+        self.value.flags.writeable = False
+        self.copied = copied
+
+    def accept(self, visitor):
+        visitor.evaluate_constant_matrix(self)
+
+    def __repr__(self):
+        return str.format('Constant Matrix\n\tValue: {}\n\tCopied: {}\n', self.value, self.copied)
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return np.array_equal(self.value, other.value) and \
+                   self.copied == other.copied
+        return False
+
+    def __hash__(self):
+        return hash((self.value.tobytes(), self.copied))
+
+
+class LoopInvariant:
+    # Expression hoisted by the optimizer out of the until statement.
+    # It is evaluated once per loop execution, when it is reached for the
+    # first time, and its value is stored in the variable of the name,
+    # which is not a valid identifier.
+    def __init__(self, expression, name):
+        self.expression = expression
+        self.name = name
+
+    def accept(self, visitor):
+        visitor.evaluate_loop_invariant(self)
+
+    def __repr__(self):
+        return str.format('Loop invariant\n\tName: {}\n\tExpression: {}\n', self.name, self.expression)
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.name == other.name and self.expression == other.expression
+        return False
+
+    def __hash__(self):
+        return hash((self.name, self.expression))
+
+
+class CommonExpression:
+    # Expression repeated in the statement block. Its value is stored in
+    # the variable of the name, which is not a valid identifier, when it
+    # is evaluated for the first time in the block, and read by the next
+    # evaluations. Copied expression is evaluated into the copy of the
+    # stored matrix, since it is bound to the variable and may be modified.
+    def __init__(self, expression, name, copied=False):
+        self.expression = expression
+        self.name = name
+        self.copied = copied
+
+    def accept(self, visitor):
+        visitor.evaluate_common_expression(self)
+
+    def __repr__(self):
+        return str.format(
+            'Common expression\n\tName: {}\n\tExpression: {}\n\tCopied: {}\n',
+            self.name,
+            self.expression,
+            self.copied
+        )
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.name == other.name and \
+                   self.expression == other.expression and \
+                   self.copied == other.copied
+        return False
+
+    def __hash__(self):
+        return hash((self.name, self.expression, self.copied))
+
+
+class InlinedCall:
+    # Call of the small program function replaced by the expression it
+    # returns. Arguments of the function call are evaluated the same way,
+    # but the expression is evaluated without binding them to the scope
+    # of the new context: parameters are read as the InlinedArgument
+    # constructions.
+    def __init__(self, function_call, expression):
+        self.function_call = function_call
+        self.expression = expression
+
+    def accept(self, visitor):
+        visitor.evaluate_inlined_call(self)
+
+    def __repr__(self):
+        return str.format(
+            'Inlined call\n\tFunction call: {}\n\tExpression: {}\n',
+            self.function_call,
+            self.expression
+        )
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.function_call == other.function_call and \
+                   self.expression == other.expression
+        return False
+
+    def __hash__(self):
+        return hash((self.function_call, self.expression))
+
+
+class InlinedArgument:
+    # Parameter of the inlined function read by its expression; position
+    # is the index of the argument of the innermost inlined call.
+    def __init__(self, name, position, index_operator=None):
+        self.name = name
+        self.position = position
+        self.index_operator = index_operator
+
+    def accept(self, visitor):
+        visitor.evaluate_inlined_argument(self)
+
+    def __repr__(self):
+        return str.format(
+            'Inlined argument\n\tName: {}\n\tPosition: {}\n\tIndex operator: {}\n',
+            self.name,
+            self.position,
+            self.index_operator
+        )
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.name == other.name and \
+                   self.position == other.position and \
+                   self.index_operator == other.index_operator
+        return False
+
+    def __hash__(self):
+        return hash((self.name, self.position, self.index_operator))
 
 
 class StringLiteral:
@@ -443,6 +592,18 @@ class IndexOperator:
         return hash((self.first_selector, self.second_selector))
 
 
+class ElementIndex(IndexOperator):
+    # Index operator selecting the single element of the matrix, created
+    # by the optimizer from the one without dots selectors. Selectors are
+    # evaluated straight into the ints, with no dispatch on the dots.
+    def __repr__(self):
+        return str.format(
+            'Element index\n\tFirst selector: {}\n\tSecond selector: {}\n',
+            self.first_selector,
+            self.second_selector
+        )
+
+
 class DotsSelect:
     def __int__(self):
         pass
@@ -457,4 +618,4 @@ class DotsSelect:
         return type(other) is type(self)
 
     def __hash__(self):
-        return hash(self)
+        return hash(type(self))
@@ -0,0 +1,129 @@
+import io
+import os
+import json
+import unittest
+import tempfile
+from unittest import mock
+
+import numpy as np
+
+from batch.runner import BatchRunner
+from execution.shared import SharedMatrices
+from execution.program import CompiledProgram
+from server.job import SUCCESS_STATUS, ERROR_STATUS, INVALID_REQUEST_STATUS, TIMEOUT_STATUS
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.__write('sum.txt', 'main() { a = cin() b = cin() print(a + b) }')
+        self.__write('invalid.txt', 'main() { a = = 1 }')
+        self.__write('endless.txt', 'main() { until (1) { } }')
+        self.__write('recursion.txt', 'f(n) { return f(n + 1) } main() { print(f(0)) }')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def __write(self, name, content):
+        with open(os.path.join(self.directory.name, name), 'w') as file:
+            file.write(content)
+
+    def __run(self, manifest, options=None):
+        self.__write('manifest.jsonl', '\n'.join(json.dumps(entry) for entry in manifest) + '\n')
+        report = io.StringIO()
+        BatchRunner(options).run(os.path.join(self.directory.name, 'manifest.jsonl'), report)
+        return [json.loads(line) for line in report.getvalue().splitlines()]
+
+    def test_batch_report(self):
+        """
+        Tests that report contains the jobs results in the manifest order.
+
+        Test cases are:
+            - Program with input given as list and as text
+            - Invalid program
+            - Missing program
+        """
+        report = self.__run([
+            {'program': 'sum.txt', 'input': [1, 2]},
+            {'program': 'invalid.txt'},
+            {'program': 'sum.txt', 'input': '3\n4\n', 'id': 'text input'},
+            {'program': 'missing.txt'}
+        ], {'PROCESSES': 2})
+        self.assertEqual([1, 2, 'text input', 4], [entry['id'] for entry in report])
+        self.assertEqual(
+            [SUCCESS_STATUS, ERROR_STATUS, SUCCESS_STATUS, INVALID_REQUEST_STATUS],
+            [entry['status'] for entry in report]
+        )
+        self.assertTrue(report[0]['stdout'].endswith('3.0 \n\n'))
+        self.assertTrue(report[2]['stdout'].endswith('7.0 \n\n'))
+        self.assertTrue(report[1]['stderr'].startswith('Error: Expected expression'))
+        self.assertTrue(all(entry['time'] >= 0 for entry in report))
+
+    def test_programs_compiled_once(self):
+        """
+        Tests that each distinct program is compiled once.
+        """
+        with mock.patch.object(CompiledProgram, 'compile', wraps=CompiledProgram.compile) as compile_program:
+            report = self.__run([{'program': 'sum.txt', 'input': [n, n]} for n in range(10)], {'PROCESSES': 2})
+        self.assertEqual(1, compile_program.call_count)
+        self.assertEqual([f'{2 * n}.0' for n in range(10)], [entry['stdout'].split()[-1] for entry in report])
+
+    def test_workers_recycling(self):
+        """
+        Tests that worker processes are replaced after the given number of jobs.
+        """
+        report = self.__run(
+            [{'program': 'sum.txt', 'input': [n, n]} for n in range(6)],
+            {'PROCESSES': 2, 'JOBS_PER_WORKER': 1}
+        )
+        self.assertEqual(6, len({entry['worker'] for entry in report}))
+
+    def test_jobs_timeout(self):
+        """
+        Tests that jobs exceeding the timeout are cancelled.
+        """
+        report = self.__run(
+            [{'program': 'endless.txt'}, {'program': 'sum.txt', 'input': [1, 1]}],
+            {'PROCESSES': 1, 'TIMEOUT': 0.2}
+        )
+        self.assertEqual([TIMEOUT_STATUS, SUCCESS_STATUS], [entry['status'] for entry in report])
+
+    def test_failing_job(self):
+        """
+        Tests that job failing out of the interpreter does not stop the other jobs.
+        """
+        report = self.__run(
+            [{'program': 'sum.txt', 'input': [1, 1]}, {'program': 'recursion.txt'},
+             {'program': 'sum.txt', 'input': [2, 2]}],
+            {'PROCESSES': 1}
+        )
+        self.assertEqual([SUCCESS_STATUS, ERROR_STATUS, SUCCESS_STATUS], [entry['status'] for entry in report])
+        self.assertTrue(report[1]['stderr'].startswith('Error: RecursionError'))
+        self.assertTrue(report[2]['stdout'].endswith('4.0 \n\n'))
+
+    def test_shared_matrices(self):
+        """
+        Tests that jobs read the shared matrices, while their modifications stay private.
+        """
+        self.__write('shared.txt', """
+        main() {
+            a = shared("weights")
+            print(a * [1; 1])
+            a[0, 0] = cin()
+            print(a)
+        }
+        """)
+        weights = np.array([[1, 2], [3, 4]])
+        with SharedMatrices({'weights': weights}) as shared:
+            report = self.__run(
+                [{'program': 'shared.txt', 'input': [n]} for n in range(4)],
+                {'PROCESSES': 2, 'SHARED_MATRICES': shared}
+            )
+        for n, entry in enumerate(report):
+            self.assertEqual(SUCCESS_STATUS, entry['status'])
+            self.assertEqual(f'[[3]\n [7]] \n\n', entry['stdout'].split('Provide')[0])
+            self.assertIn(f'[[{n} 2]', entry['stdout'])
+
+
+if __name__ == '__main__':
+    unittest.main()
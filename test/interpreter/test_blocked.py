@@ -0,0 +1,102 @@
+import io
+import os
+import tempfile
+import unittest
+import contextlib
+import numpy as np
+
+from execution.blocked import blocked_matmul
+from execution.interpreter import Interpreter
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from syntax_tree.constructions import *
+
+
+class TestBlockedMatmul(unittest.TestCase):
+    def test_blocked_matmul(self):
+        """
+        Tests tiled multiplication against numpy.matmul.
+
+        Test cases are:
+            - Tile size dividing the dimensions
+            - Tile size not dividing the dimensions
+            - Tile size larger than the matrices
+            - Integer matrices
+        """
+        generator = np.random.default_rng(42)
+        operands = [
+            (generator.random((8, 4)), generator.random((4, 6)), 2),
+            (generator.random((7, 5)), generator.random((5, 9)), 3),
+            (generator.random((3, 2)), generator.random((2, 3)), 16),
+            (np.arange(12).reshape(3, 4), np.arange(8).reshape(4, 2), 3)
+        ]
+        for left, right, tile_size in operands:
+            result = blocked_matmul(left, right, tile_size)
+            self.assertIsInstance(result, np.memmap)
+            self.assertEqual(np.result_type(left, right), result.dtype)
+            self.assertTrue(np.allclose(np.matmul(left, right), result))
+
+    def test_memory_mapped_blocked_matmul(self):
+        """
+        Tests tiled multiplication of memory mapped operands.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            left, right = np.arange(30.0).reshape(5, 6), np.arange(24.0).reshape(6, 4)
+            np.save(os.path.join(directory, 'left.npy'), left)
+            np.save(os.path.join(directory, 'right.npy'), right)
+            result = blocked_matmul(
+                np.load(os.path.join(directory, 'left.npy'), mmap_mode='r'),
+                np.load(os.path.join(directory, 'right.npy'), mmap_mode='r'),
+                2,
+                directory
+            )
+            self.assertTrue(np.array_equal(np.matmul(left, right), result))
+
+    def test_invalid_blocked_matmul(self):
+        """
+        Tests that dimensions mismatch is reported as ValueError.
+        """
+        with self.assertRaises(ValueError):
+            blocked_matmul(np.zeros((2, 3)), np.zeros((2, 3)), 2)
+
+    def test_out_of_core_multiplicative_expression_evaluation(self):
+        """
+        Tests that interpreter multiplies matrices above the threshold tile by tile.
+
+        Test cases are:
+            - Matrices multiplication above the threshold
+            - Dimensions mismatch above the threshold
+        """
+        interpreter = Interpreter(None, {'OUT_OF_CORE_THRESHOLD': 0, 'OUT_OF_CORE_TILE_SIZE': 1})
+        left = MatrixLiteral([NumberLiteral(1), NumberLiteral(2), NumberLiteral(3), NumberLiteral(4)], [',', ';', ','])
+        right = MatrixLiteral([NumberLiteral(5), NumberLiteral(6)], [';'])
+        interpreter.evaluate_multiplicative_expression(MultiplicativeExpression([left, right], ['*']))
+        self.assertEqual(Variable(VariableType.MATRIX, np.array([[17], [39]])), interpreter.result)
+        self.assertIsInstance(interpreter.result.value, np.memmap)
+        with self.assertRaises(MatrixDimensionsMismatchException):
+            interpreter.evaluate_multiplicative_expression(MultiplicativeExpression([right, right], ['*']))
+
+    def test_out_of_core_errors(self):
+        """
+        Tests errors of the out of core multiplication.
+
+        Test cases are:
+            - Result file not created in the missing directory
+            - Tile size not positive
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            interpreter = Interpreter(None, {
+                'OUT_OF_CORE_THRESHOLD': 0,
+                'OUT_OF_CORE_DIRECTORY': os.path.join(directory, 'missing')
+            })
+            matrix = MatrixLiteral([NumberLiteral(1)], [])
+            with contextlib.redirect_stderr(io.StringIO()) as error:
+                with self.assertRaises(WithStackTraceException):
+                    interpreter.evaluate_multiplicative_expression(MultiplicativeExpression([matrix, matrix], ['*']))
+            self.assertIn('Out of core multiplication failed', error.getvalue())
+        with self.assertRaises(ValueError):
+            Interpreter(None, {'OUT_OF_CORE_TILE_SIZE': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,281 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from execution.interpreter import Interpreter
+from execution.libraries import StandardLibrary
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _interpreter_of(source):
+    return Interpreter(SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))))
+
+
+class TestStandardLibrary(unittest.TestCase):
+    def setUp(self):
+        self.library = StandardLibrary.import_library()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def __path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_transpose_evaluation(self):
+        """
+        Tests transpose function evaluation not modifying its argument.
+        """
+        argument = Variable(VariableType.MATRIX, np.array([[1, 2, 3]]))
+        interpreter = Interpreter(None)
+        self.library['transpose']([argument], interpreter)
+        self.assertEqual(Variable(VariableType.MATRIX, np.array([[1], [2], [3]])), interpreter.result)
+        self.assertEqual((1, 3), argument.value.shape)
+
+    def test_load_evaluation(self):
+        """
+        Tests load function evaluation.
+
+        Test cases are:
+            - Loading without memory mapping
+            - Loading with read only memory mapping
+            - Loading one dimensional array as the row matrix
+        """
+        np.save(self.__path('matrix.npy'), np.array([[1.0, 2.0], [3.0, 4.0]]))
+        np.save(self.__path('row.npy'), np.array([1.0, 2.0, 3.0]))
+        arguments = [
+            [Variable(VariableType.STRING, self.__path('matrix.npy'))],
+            [Variable(VariableType.STRING, self.__path('matrix.npy')), Variable(VariableType.STRING, 'r')],
+            [Variable(VariableType.STRING, self.__path('row.npy'))]
+        ]
+        expected_results = [
+            Variable(VariableType.MATRIX, np.array([[1.0, 2.0], [3.0, 4.0]])),
+            Variable(VariableType.MATRIX, np.array([[1.0, 2.0], [3.0, 4.0]])),
+            Variable(VariableType.MATRIX, np.array([[1.0, 2.0, 3.0]]))
+        ]
+        is_mapped = [
+            False,
+            True,
+            False
+        ]
+        interpreter = Interpreter(None)
+
+        for args, expected, mapped in zip(arguments, expected_results, is_mapped):
+            self.library['load'](args, interpreter)
+            self.assertEqual(expected, interpreter.result)
+            self.assertEqual(mapped, isinstance(interpreter.result.value, np.memmap))
+
+    def test_invalid_load_evaluation(self):
+        """
+        Tests invalid load function evaluation.
+
+        Test cases are:
+            - Arguments number mismatch
+            - Path is not a string
+            - Mode is not a string
+            - Unknown mode
+            - Missing file
+            - Three dimensional array
+            - Empty file, loaded with and without memory mapping
+            - Array of strings
+        """
+        np.save(self.__path('cube.npy'), np.zeros((2, 2, 2)))
+        np.save(self.__path('strings.npy'), np.array(['a', 'b']))
+        open(self.__path('empty.npy'), 'wb').close()
+        arguments = [
+            [],
+            [Variable(VariableType.NUMBER, 42)],
+            [Variable(VariableType.STRING, self.__path('cube.npy')), Variable(VariableType.NUMBER, 1)],
+            [Variable(VariableType.STRING, self.__path('cube.npy')), Variable(VariableType.STRING, 'w')],
+            [Variable(VariableType.STRING, self.__path('missing.npy'))],
+            [Variable(VariableType.STRING, self.__path('cube.npy'))],
+            [Variable(VariableType.STRING, self.__path('empty.npy'))],
+            [Variable(VariableType.STRING, self.__path('empty.npy')), Variable(VariableType.STRING, 'r')],
+            [Variable(VariableType.STRING, self.__path('strings.npy'))]
+        ]
+        expected_exceptions = [
+            FunctionArgumentsMismatchException,
+            InvalidTypeException,
+            InvalidTypeException,
+            WithStackTraceException,
+            WithStackTraceException,
+            WithStackTraceException,
+            WithStackTraceException,
+            WithStackTraceException,
+            WithStackTraceException
+        ]
+        interpreter = Interpreter(None)
+
+        for args, exception in zip(arguments, expected_exceptions):
+            with self.assertRaises(exception):
+                self.library['load'](args, interpreter)
+
+    def test_save_evaluation(self):
+        """
+        Tests save function evaluation.
+        """
+        matrix = np.array([[1.0, 2.0], [3.0, 4.0]])
+        path = self.__path('saved.npy')
+        self.library['save']([
+            Variable(VariableType.STRING, path),
+            Variable(VariableType.MATRIX, matrix)
+        ], Interpreter(None))
+        self.assertTrue(np.array_equal(matrix, np.load(path)))
+
+    def test_invalid_save_evaluation(self):
+        """
+        Tests invalid save function evaluation.
+
+        Test cases are:
+            - Arguments number mismatch
+            - Path is not a string
+            - Saved value is not a matrix
+        """
+        arguments = [
+            [Variable(VariableType.STRING, self.__path('saved.npy'))],
+            [Variable(VariableType.NUMBER, 1), Variable(VariableType.MATRIX, np.zeros((1, 1)))],
+            [Variable(VariableType.STRING, self.__path('saved.npy')), Variable(VariableType.NUMBER, 1)]
+        ]
+        expected_exceptions = [
+            FunctionArgumentsMismatchException,
+            InvalidTypeException,
+            InvalidTypeException
+        ]
+        interpreter = Interpreter(None)
+
+        for args, exception in zip(arguments, expected_exceptions):
+            with self.assertRaises(exception):
+                self.library['save'](args, interpreter)
+
+    def test_memory_mapped_index_assignment(self):
+        """
+        Tests that index assignment on the 'r+' memory mapped matrix
+        modifies the file itself.
+        """
+        path = self.__path('mapped.npy')
+        np.save(path, np.zeros((2, 3)))
+        interpreter = _interpreter_of(
+            f"""
+            main() {{
+                m = load("{path}", "r+")
+                m[1, 2] = 42
+                m[0, :] = [1, 2, 3]
+                return m[1, 2]
+            }}
+            """
+        )
+        interpreter.execute()
+        self.assertEqual(Variable(VariableType.NUMBER, 42), interpreter.result)
+        self.assertTrue(np.array_equal(np.array([[1, 2, 3], [0, 0, 42]]), np.load(path)))
+
+    def test_read_only_memory_mapped_index_assignment(self):
+        """
+        Tests that index assignment on the 'r' memory mapped matrix fails.
+        """
+        path = self.__path('mapped.npy')
+        np.save(path, np.zeros((2, 3)))
+        interpreter = _interpreter_of(
+            f"""
+            main() {{
+                m = load("{path}", "r")
+                m[1, 2] = 42
+            }}
+            """
+        )
+        with self.assertRaises(IndexException):
+            interpreter.execute()
+        self.assertTrue(np.array_equal(np.zeros((2, 3)), np.load(path)))
+
+    def test_rows_streaming(self):
+        """
+        Tests aggregation of the delimited file chunk by chunk.
+        """
+        path = self.__path('rows.csv')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.writelines(f'{i},{2 * i}\n' for i in range(10))
+        interpreter = _interpreter_of(
+            f"""
+            main() {{
+                rows = open_rows("{path}", 3)
+                total = [0, 0]
+                chunk = next_chunk(rows)
+                rows_number = size(chunk)
+                until (rows_number[0, 0]) {{
+                    total = total + full(1, rows_number[0, 0], 1) * chunk
+                    chunk = next_chunk(rows)
+                    rows_number = size(chunk)
+                }}
+                return total
+            }}
+            """
+        )
+        interpreter.execute()
+        self.assertEqual(Variable(VariableType.MATRIX, np.array([[45, 90]])), interpreter.result)
+
+    def test_rows_streams_closed(self):
+        """
+        Tests that streams abandoned by the program are closed, when the execution ends,
+        while the stream returned by the called function stays open.
+        """
+        path = self.__path('rows.csv')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.writelines(f'{i},{2 * i}\n' for i in range(100))
+        interpreter = _interpreter_of(
+            f"""
+            main() {{
+                rows = open_rows("{path}", 1)
+                chunk = next_chunk(rows)
+                return rows
+            }}
+            """
+        )
+        interpreter.execute()
+        self.assertFalse(interpreter.result.value.thread.is_alive())
+        self.assertTrue(interpreter.result.value.file.closed)
+        stream = interpreter.call('main', []).value
+        self.assertEqual(1, stream.next_chunk().shape[0])
+        stream.close()
+
+    def test_invalid_rows_streaming(self):
+        """
+        Tests invalid open rows and next chunk functions evaluation.
+
+        Test cases are:
+            - Open rows arguments number mismatch
+            - Path is not a string
+            - Chunk size is not a number
+            - Chunk size is not positive
+            - Missing file
+            - Next chunk obtains not a stream
+        """
+        path = Variable(VariableType.STRING, self.__path('missing.csv'))
+        calls = [
+            ('open_rows', [path]),
+            ('open_rows', [Variable(VariableType.NUMBER, 1), Variable(VariableType.NUMBER, 1)]),
+            ('open_rows', [path, path]),
+            ('open_rows', [path, Variable(VariableType.NUMBER, 0)]),
+            ('open_rows', [path, Variable(VariableType.NUMBER, 1)]),
+            ('next_chunk', [path])
+        ]
+        expected_exceptions = [
+            FunctionArgumentsMismatchException,
+            InvalidTypeException,
+            InvalidTypeException,
+            WithStackTraceException,
+            WithStackTraceException,
+            InvalidTypeException
+        ]
+        interpreter = Interpreter(None)
+
+        for (function, args), exception in zip(calls, expected_exceptions):
+            with self.assertRaises(exception):
+                self.library[function](args, interpreter)
+
+
+if __name__ == '__main__':
+    unittest.main()
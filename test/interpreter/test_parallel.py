@@ -0,0 +1,250 @@
+import io
+import unittest
+import contextlib
+import concurrent.futures
+import numpy as np
+
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from execution.parallel import ParallelStatementEvaluator, ParallelArgumentsEvaluator
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _interpreter_of(source, options=None):
+    return Interpreter(SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))), options)
+
+
+class _RecordingExecutor:
+    # Executor evaluating submitted tasks immediately, which records
+    # the evaluated statements.
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, interpreter, construction):
+        self.submitted.append(construction)
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(function(interpreter, construction))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self):
+        pass
+
+
+programs = [
+    """
+    square(m) { return m * m }
+    main() {
+        a = [1, 2; 3, 4]
+        b = square(a)
+        c = a * a * a
+        d = square(c)
+        print(b, c)
+        e = b + d
+        return e
+    }
+    """,
+    """
+    main() {
+        a = [1, 2; 3, 4]
+        b = a * a
+        a = b * 2
+        c = a * b
+        b = [0, 0; 0, 0]
+        return a + b + c
+    }
+    """,
+    """
+    modify(m) { m[0, 0] = 42 }
+    main() {
+        a = [1, 2; 3, 4]
+        b = a * 1
+        modify(a)
+        c = a * 1
+        return b - c
+    }
+    """,
+    """
+    main() {
+        a = 10
+        b = 0
+        until (a) {
+            b = b + a * a
+            a = a - 1
+        }
+        return b
+    }
+    """
+]
+
+
+class TestParallelStatementEvaluator(unittest.TestCase):
+    def __execute(self, source, options=None):
+        interpreter = _interpreter_of(source, options)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            interpreter.execute()
+        return interpreter.result, output.getvalue()
+
+    def test_parallel_program_evaluation(self):
+        """
+        Tests that parallel evaluation produces the same results and output
+        as sequential evaluation.
+
+        Test cases are:
+            - Independent products with printing barrier
+            - Dependent assignments
+            - Function modifying the matrix argument
+            - Loop of dependent statements
+        """
+        for source in programs:
+            expected_result, expected_output = self.__execute(source)
+            result, output = self.__execute(source, {'PARALLEL_STATEMENTS': True, 'PARALLEL_WORKERS': 4})
+            self.assertEqual(expected_result, result)
+            self.assertEqual(expected_output, output)
+
+    def test_concurrent_statements_selection(self):
+        """
+        Tests which statements are sent to the worker threads.
+        """
+        interpreter = _interpreter_of(programs[0], {'PARALLEL_STATEMENTS': True})
+        executor = _RecordingExecutor()
+        interpreter.parallel_evaluator = ParallelStatementEvaluator(interpreter, executor, {'square'})
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.execute()
+        self.assertEqual(
+            ['b', 'c', 'd'],
+            [statement.identifier.name for statement in executor.submitted]
+        )
+        self.assertEqual(Variable(VariableType.MATRIX, np.array([[5750, 8380], [12570, 18320]])), interpreter.result)
+
+    def test_scalar_products_not_concurrent(self):
+        """
+        Tests that products of the numbers are not sent to the worker threads.
+        """
+        source = 'main() { a = [1, 2; 3, 4] n = 3 until (n < 4) { n = n + 1 } k = n * 2 b = a * k c = a * a return b + c }'
+        program = CompiledProgram.compile(SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))))
+        interpreter = Interpreter(None, {'PARALLEL_STATEMENTS': True}, program)
+        executor = _RecordingExecutor()
+        interpreter.parallel_evaluator = ParallelStatementEvaluator(
+            interpreter, executor, program.pure_functions, program.scalar_products
+        )
+        interpreter.execute()
+        self.assertEqual(['b', 'c'], [statement.identifier.name for statement in executor.submitted])
+        self.assertEqual(Variable(VariableType.MATRIX, np.array([[15, 26], [39, 54]])), interpreter.result)
+
+    def test_parallel_exceptions_order(self):
+        """
+        Tests that the exception of the earliest statement is reported
+        with the same stack trace as in sequential evaluation.
+        """
+        source = """
+        main() {
+            a = [1, 2] * [3, 4]
+            b = [1, 2; 3, 4] * [1, 2, 3]
+            c = "Lorem ipsum"
+            c = 1
+        }
+        """
+        with self.assertRaises(MatrixDimensionsMismatchException) as sequential:
+            _interpreter_of(source).execute()
+        with self.assertRaises(MatrixDimensionsMismatchException) as parallel:
+            _interpreter_of(source, {'PARALLEL_STATEMENTS': True}).execute()
+        self.assertEqual((1, 2), parallel.exception.left_dim)
+        self.assertEqual(sequential.exception.stack, parallel.exception.stack)
+
+
+
+arguments_programs = [
+    """
+    heavy(m) { return m * m * m }
+    combine(a, b, c) { return a + b - c }
+    main() {
+        a = [1, 2; 3, 4]
+        return combine(heavy(a), a * a, heavy(a * 2))
+    }
+    """,
+    """
+    modify(m) { m[0, 0] = 0 return m }
+    combine(a, b) { return a + b }
+    main() {
+        a = [1, 2; 3, 4]
+        return combine(a * a, modify(a) * a)
+    }
+    """,
+    """
+    fib(n) {
+        if (n < 2) { return n }
+        return fib(n - 1) + fib(n - 2)
+    }
+    add(a, b) { return a + b }
+    main() {
+        return add(fib(10), fib(11))
+    }
+    """
+]
+
+
+class TestParallelArgumentsEvaluator(unittest.TestCase):
+    def test_parallel_arguments_evaluation(self):
+        """
+        Tests that parallel evaluation of the arguments produces the same
+        results as sequential evaluation.
+
+        Test cases are:
+            - Pure function calls and products
+            - Argument calling impure function
+            - Recursive functions
+        """
+        for source in arguments_programs:
+            sequential = _interpreter_of(source)
+            sequential.execute()
+            for options in [{'PARALLEL_ARGUMENTS': True},
+                            {'PARALLEL_ARGUMENTS': True, 'PARALLEL_STATEMENTS': True, 'PARALLEL_WORKERS': 2}]:
+                parallel = _interpreter_of(source, options)
+                parallel.execute()
+                self.assertEqual(sequential.result, parallel.result)
+
+    def test_concurrent_arguments_selection(self):
+        """
+        Tests which arguments are sent to the worker threads.
+
+        First costly argument is evaluated by the interpreter itself and
+        arguments of impure calls are never sent.
+        """
+        for source, expected in zip(arguments_programs, [2, 0, 1]):
+            interpreter = _interpreter_of(source, {'PARALLEL_ARGUMENTS': True})
+            executor = _RecordingExecutor()
+            interpreter.executor = executor
+            interpreter.execute()
+            self.assertEqual(expected, len(executor.submitted))
+
+    def test_parallel_arguments_exceptions_order(self):
+        """
+        Tests that exception of the leftmost failing argument is reported
+        with the same stack trace as in sequential evaluation.
+        """
+        source = """
+        heavy(m) { return m * m }
+        combine(a, b, c) { return a }
+        main() {
+            a = [1, 2; 3, 4]
+            return combine(heavy(a), heavy([1, 2, 3]), a * [1, 2])
+        }
+        """
+        with self.assertRaises(MatrixDimensionsMismatchException) as sequential:
+            _interpreter_of(source).execute()
+        with self.assertRaises(MatrixDimensionsMismatchException) as parallel:
+            _interpreter_of(source, {'PARALLEL_ARGUMENTS': True}).execute()
+        self.assertEqual((1, 3), parallel.exception.left_dim)
+        self.assertEqual(sequential.exception.stack, parallel.exception.stack)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import threading
+import numpy as np
+
+from execution.interpreter import Interpreter
+from execution.program import CompiledProgram
+from execution.variable import Variable, VariableType
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+source = """
+fill(m, value) {
+    i = 0
+    until (i < 100) {
+        m[i, :] = value + i
+        i = i + 1
+    }
+    return m
+}
+half(x) { return x / 2 }
+main() {
+    m = full(100, 3, 0)
+    total = 0
+    round = 0
+    until (round < 20) {
+        m = fill(m, round)
+        total = total + half(m[99, 2])
+        round = round + 1
+    }
+    return total
+}
+"""
+
+
+class _CountingParser:
+    def __init__(self, source_code):
+        self.parser = SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source_code)))
+        self.constructed = 0
+
+    def construct_program(self):
+        self.constructed += 1
+        return self.parser.construct_program()
+
+
+class TestCompiledProgram(unittest.TestCase):
+    def test_compiled_program(self):
+        """
+        Tests compiled program analysis results.
+        """
+        program = CompiledProgram.compile(_CountingParser(source))
+        self.assertEqual(['fill', 'half', 'main'], sorted(program.functions))
+        self.assertIn('half', program.pure_functions)
+        self.assertNotIn('fill', program.pure_functions)
+        self.assertNotIn('main', program.pure_functions)
+        self.assertIn('print', program.library_functions)
+        with self.assertRaises(TypeError):
+            program.functions['main'] = None
+
+    def test_concurrent_execution_contexts(self):
+        """
+        Tests that many contexts execute the single compiled program
+        at the same time without interfering with each other.
+        """
+        parser = _CountingParser(source)
+        program = CompiledProgram.compile(parser)
+        results = [None] * 8
+        barrier = threading.Barrier(len(results))
+
+        def execute(index):
+            interpreter = Interpreter(None, None, program)
+            barrier.wait()
+            interpreter.execute()
+            results[index] = interpreter.result
+
+        threads = [threading.Thread(target=execute, args=(index,)) for index in range(len(results))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, parser.constructed)
+        expected = Variable(VariableType.NUMBER, sum((99 + i) / 2 for i in range(20)))
+        for result in results:
+            self.assertEqual(expected, result)
+
+    def test_interpreter_compiles_program(self):
+        """
+        Tests that interpreter created with parser compiles the program once.
+        """
+        parser = _CountingParser(source)
+        interpreter = Interpreter(parser)
+        interpreter.execute()
+        self.assertEqual(1, parser.constructed)
+        self.assertIs(interpreter.program.functions, interpreter.program_functions)
+        self.assertEqual(1085, interpreter.result.value)
+
+
+if __name__ == '__main__':
+    unittest.main()
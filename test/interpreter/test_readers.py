@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from execution.readers import RowsReader
+
+
+class TestRowsReader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'rows.csv')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def __write(self, content):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(content)
+
+    def test_chunks_reading(self):
+        """
+        Tests reading the file chunk by chunk.
+
+        Test cases are:
+            - Full chunks followed by the partial one
+            - Blank lines are skipped
+            - Exhausted reader keeps returning empty chunks
+        """
+        self.__write('1,2\n3,4\n\n5,6\n7,8\n9,10\n')
+        reader = RowsReader(self.path, 2)
+        expected_chunks = [
+            np.array([[1, 2], [3, 4]]),
+            np.array([[5, 6], [7, 8]]),
+            np.array([[9, 10]]),
+            np.empty((0, 2)),
+            np.empty((0, 2))
+        ]
+        for expected in expected_chunks:
+            chunk = reader.next_chunk()
+            self.assertEqual(expected.shape, chunk.shape)
+            self.assertTrue(np.array_equal(expected, chunk))
+
+    def test_invalid_chunks_reading(self):
+        """
+        Tests reading malformed files.
+
+        Test cases are:
+            - Invalid number
+            - Columns number changing between chunks
+        """
+        contents = [
+            '1,2\n3,x\n',
+            '1,2\n3,4\n5,6,7\n'
+        ]
+        for content in contents:
+            self.__write(content)
+            reader = RowsReader(self.path, 2)
+            with self.assertRaises(ValueError):
+                while reader.next_chunk().shape[0]:
+                    pass
+            self.assertEqual(0, reader.next_chunk().shape[0])
+
+    def test_reading_errors(self):
+        """
+        Tests that errors of reading the file other than ValueError are raised by next chunk.
+        """
+        self.__write('1,2\n3,4\n')
+        with mock.patch('execution.readers.np.loadtxt', side_effect=OSError('read failure')):
+            reader = RowsReader(self.path, 2)
+            with self.assertRaises(OSError):
+                reader.next_chunk()
+        self.assertEqual(0, reader.next_chunk().shape[0])
+
+    def test_close(self):
+        """
+        Tests that closed reader stops its thread and closes the file.
+        """
+        self.__write(''.join(f'{i},{i}\n' for i in range(100)))
+        reader = RowsReader(self.path, 1)
+        reader.next_chunk()
+        reader.close()
+        self.assertFalse(reader.thread.is_alive())
+        self.assertTrue(reader.file.closed)
+        self.assertEqual(0, reader.next_chunk().shape[0])
+
+    def test_missing_file(self):
+        """
+        Tests that missing file is reported at construction.
+        """
+        with self.assertRaises(IOError):
+            RowsReader(os.path.join(self.directory.name, 'missing.csv'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+
+from multiprocessing import shared_memory
+from execution.interpreter import Interpreter
+from execution.shared import SharedMatrices
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _interpreter_of(source, matrices):
+    return Interpreter(
+        SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))),
+        {'SHARED_MATRICES': matrices}
+    )
+
+
+class TestSharedMatrices(unittest.TestCase):
+    def test_shared_matrices(self):
+        """
+        Tests placing matrices in the shared memory blocks.
+        """
+        with SharedMatrices({'a': np.arange(6).reshape(2, 3), 'b': np.ones(4)}) as shared:
+            block, a = shared.descriptions['a'].attach()
+            self.assertTrue(np.array_equal(np.arange(6).reshape(2, 3), a))
+            self.assertFalse(a.flags.writeable)
+            block_b, b = shared.descriptions['b'].attach()
+            self.assertEqual((1, 4), b.shape)
+            del a, b
+            block.close()
+            block_b.close()
+            name = shared.descriptions['a'].block_name
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_invalid_shared_matrices(self):
+        """
+        Tests that only numeric matrices may be shared.
+        """
+        for matrix in [np.zeros((2, 2, 2)), np.array(['a', 'b'])]:
+            with self.assertRaises(ValueError):
+                with SharedMatrices({'a': np.ones(2), 'b': matrix}):
+                    pass
+
+    def test_copy_on_write(self):
+        """
+        Tests that modified shared matrix is copied, while the other
+        variables referencing it see the original values.
+
+        Test cases are:
+            - Matrix modified through the function parameter
+            - Matrix modified directly, after it was assigned to the other variable
+        """
+        sources = [
+            """
+            modify(m) { m[0, :] = 0 }
+            main() {
+                a = shared("a")
+                b = a
+                modify(a)
+                return a + b
+            }
+            """,
+            'main() { a = shared("a") b = a a[0, 0] = 5 return a + b * 10 }'
+        ]
+        expected = [np.array([[1, 2], [6, 8]]), np.array([[15, 22], [33, 44]])]
+        with SharedMatrices({'a': np.array([[1, 2], [3, 4]])}) as shared:
+            block, matrix = shared.descriptions['a'].attach()
+            for source, result in zip(sources, expected):
+                interpreter = _interpreter_of(source, {'a': matrix})
+                interpreter.execute()
+                self.assertEqual(Variable(VariableType.MATRIX, result), interpreter.result)
+            self.assertTrue(np.array_equal(np.array([[1, 2], [3, 4]]), matrix))
+            del matrix
+            block.close()
+
+    def test_missing_shared_matrix(self):
+        """
+        Tests reading not existing shared matrix.
+        """
+        with self.assertRaises(WithStackTraceException):
+            _interpreter_of('main() { a = shared("a") }', {}).execute()
+
+
+if __name__ == '__main__':
+    unittest.main()
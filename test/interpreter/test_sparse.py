@@ -0,0 +1,191 @@
+import io
+import unittest
+import contextlib
+import numpy as np
+from unittest import mock
+
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from execution.sparse import SparseMatrix
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _interpreter_of(source):
+    program = SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program()
+    return Interpreter(None, None, CompiledProgram(program))
+
+
+def _sparse(dense):
+    rows, cols = np.nonzero(dense)
+    return Variable(VariableType.SPARSE, SparseMatrix.from_triplets(dense.shape, rows, cols, dense[rows, cols]))
+
+
+def _dense(value):
+    return value.dense() if isinstance(value, SparseMatrix) else value
+
+
+class TestSparseMatrix(unittest.TestCase):
+    def test_triplets(self):
+        """
+        Tests matrix created from the triplets with duplicates summed and zeros removed.
+        """
+        matrix = SparseMatrix.from_triplets((3, 4), [2, 0, 2, 1, 0], [1, 3, 1, 2, 0], [1.5, 2, 2.5, 0, -1])
+        self.assertEqual([[-1, 0, 0, 2], [0, 0, 0, 0], [0, 4, 0, 0]], matrix.dense().tolist())
+        self.assertEqual([0, 2, 2, 3], matrix.indptr.tolist())
+        self.assertEqual([0, 3, 1], matrix.indices.tolist())
+        for rows, cols in [([3], [0]), ([0], [-1]), ([0, 1], [0])]:
+            with self.assertRaises(ValueError):
+                SparseMatrix.from_triplets((3, 4), rows, cols, [1])
+
+    def test_elements(self):
+        """
+        Tests elements read and modified in place.
+
+        Test cases are:
+            - Stored element changed
+            - Element inserted into the row
+            - Element set to zero removed
+            - Negative indexes and elements out of the matrix
+        """
+        matrix = SparseMatrix.from_triplets((2, 3), [0, 1], [1, 2], [5, 6])
+        matrix.set_item(0, 1, 7)
+        matrix.set_item(0, 0, 2.5)
+        matrix.set_item(1, -1, 0)
+        self.assertEqual([[2, 7, 0], [0, 0, 0]], matrix.dense().tolist())
+        self.assertEqual([0, 2, 2], matrix.indptr.tolist())
+        self.assertEqual(7, matrix.item(-2, 1))
+        self.assertIs(int, type(matrix.item(1, 1)))
+        with self.assertRaises(IndexError):
+            matrix.item(2, 0)
+        with self.assertRaises(IndexError):
+            matrix.set_item(0, 3, 1)
+
+
+class TestSparseOperations(unittest.TestCase):
+    def test_results(self):
+        """
+        Tests results of the operations the same as of the dense matrices.
+
+        Test cases are:
+            - Products of sparse and dense matrices
+            - Sums and differences of sparse and dense matrices
+            - Operations with numbers and negation
+            - Transposition, rows and columns selection
+        """
+        left = np.array([[0, 2.5, 0], [1, 0, 0], [0, 0, -3]])
+        right = np.array([[0, 0, 1], [4, 0, 0], [0, 2, 0]])
+        expressions = {
+            's * t': (VariableType.SPARSE, left @ right),
+            's * b': (VariableType.MATRIX, left @ right),
+            'a * t': (VariableType.MATRIX, left @ right),
+            's + t': (VariableType.SPARSE, left + right),
+            's - t': (VariableType.SPARSE, left - right),
+            's - s': (VariableType.SPARSE, np.zeros((3, 3))),
+            's + b': (VariableType.MATRIX, left + right),
+            'a - t': (VariableType.MATRIX, left - right),
+            's * 2 / 4': (VariableType.SPARSE, left / 2),
+            's - 1': (VariableType.MATRIX, left - 1),
+            '-s': (VariableType.SPARSE, -left),
+            'transpose(s)': (VariableType.SPARSE, left.T),
+            's[1, :]': (VariableType.MATRIX, left[[1], :]),
+            't[:, 2]': (VariableType.MATRIX, right[:, 2].reshape(1, -1)),
+            'size(s)': (VariableType.MATRIX, np.array([[3, 3]]))
+        }
+        interpreter = _interpreter_of(' '.join(
+            f'f{position}(s, t, a, b) {{ return {expression} }}' for position, expression in enumerate(expressions)
+        ))
+        for position, (expression, (result_type, expected)) in enumerate(expressions.items()):
+            args = [_sparse(left), _sparse(right), Variable(VariableType.MATRIX, left),
+                    Variable(VariableType.MATRIX, right)]
+            result = interpreter.call(f'f{position}', args)
+            self.assertEqual(result_type, result.type, expression)
+            self.assertTrue(np.array_equal(expected, _dense(result.value)), expression)
+
+    def test_chunked_product(self):
+        """
+        Tests product with the dense matrix computed in chunks of the elements.
+        """
+        rng = np.random.default_rng(0)
+        left = rng.integers(-2, 3, (7, 5)) * (rng.random((7, 5)) < 0.4)
+        right = rng.random((5, 3))
+        interpreter = _interpreter_of('f(s, b) { return s * b } g(a, t) { return a * t }')
+        for chunk_size in [1, 4, 2 ** 20]:
+            with mock.patch('execution.sparse._PRODUCT_CHUNK_SIZE', chunk_size):
+                product = interpreter.call('f', [_sparse(left), Variable(VariableType.MATRIX, right)]).value
+                transposed = interpreter.call('g', [Variable(VariableType.MATRIX, right.T), _sparse(left.T)]).value
+            self.assertTrue(np.allclose(left @ right, product), chunk_size)
+            self.assertTrue(np.allclose(right.T @ left.T, transposed), chunk_size)
+
+    def test_elements(self):
+        """
+        Tests single elements of the argument read and modified.
+        """
+        interpreter = _interpreter_of(
+            """
+            f(s, n) {
+                i = 0
+                until (i < n) { s[i, i] = s[i, i] + i i = i + 1 }
+                return s[n - 1, n - 1] + s[0, 1]
+            }
+            """
+        )
+        matrix = _sparse(np.array([[0, 3], [0, 5]]))
+        self.assertEqual(9, interpreter.call('f', [matrix, Variable(VariableType.NUMBER, 2)]).value)
+        self.assertEqual([[0, 3], [0, 6]], matrix.value.dense().tolist())
+
+    def test_library(self):
+        """
+        Tests sparse and dense library functions.
+        """
+        interpreter = _interpreter_of(
+            """
+            graph(n) {
+                s = sparse([0, 1, 1], [1, 0, 2], [1, 1, 1], n, n)
+                print(s)
+                return dense(s * s)
+            }
+            invalid() { return sparse([0], [5], [1], 2, 2) }
+            """
+        )
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = interpreter.call('graph', [Variable(VariableType.NUMBER, 3)])
+        self.assertEqual([[1, 0, 1], [0, 1, 0], [0, 0, 0]], result.value.tolist())
+        self.assertIn('<3x3 sparse matrix of 3 elements>\n  (0, 1)\t1', output.getvalue())
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(WithStackTraceException):
+                interpreter.call('invalid', [])
+
+    def test_errors(self):
+        """
+        Tests type errors of the sparse matrices.
+
+        Test cases are:
+            - Number combined with the sparse matrix
+            - Division by the sparse matrix
+            - Dense matrix assigned to the sparse variable
+            - Comparison of the sparse matrices
+            - Matrices dimensions mismatch
+            - Row modified with the index operator
+            - Element out of the matrix
+        """
+        sources = {
+            'f(s) { return 1 + s }': TypesMismatchException,
+            'f(s) { return s / s }': TypesMismatchException,
+            'f(s) { s = [1] }': TypesMismatchException,
+            'f(s) { if (s == s) { return 1 } }': InvalidTypeException,
+            'f(s) { return s * [1, 2] }': MatrixDimensionsMismatchException,
+            'f(s) { s[0, :] = 1 }': InvalidTypeException,
+            'f(s) { s[0, 2] = 1 }': IndexException
+        }
+        for source, exception in sources.items():
+            with self.assertRaises(exception, msg=source):
+                _interpreter_of(source).call('f', [_sparse(np.identity(2))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import io
+import unittest
+import contextlib
+import concurrent.futures
+import numpy as np
+
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from execution.structured import StructuredMatrix, pending
+from execution.variable import Variable, VariableType, StructuredVariable
+from execution.exception import *
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _interpreter_of(source):
+    program = SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program()
+    return Interpreter(None, None, CompiledProgram(program))
+
+
+def _matrices():
+    # Structured matrices of every kind and the dense matrix.
+    return [
+        StructuredVariable(StructuredMatrix.identity(3)),
+        StructuredVariable(StructuredMatrix.diagonal_of(np.array([[2, -3, 0]]))),
+        StructuredVariable(StructuredMatrix.constant(3, 3, 0)),
+        StructuredVariable(StructuredMatrix.constant(3, 3, 2)),
+        Variable(VariableType.MATRIX, np.array([[1.5, -2, 0], [3, 4, -1], [0, 1, 2]]))
+    ]
+
+
+class TestStructuredMatrices(unittest.TestCase):
+    def test_results(self):
+        """
+        Tests results of the structured matrices the same as of the dense ones.
+
+        Test cases are:
+            - Matrix products of all the kinds
+            - Elementwise operations of all the kinds
+            - Operations with numbers and negation
+            - Rows, columns and elements selection
+        """
+        expressions = [
+            'i * a', 'a * i', 'd * a', 'a * d', 'd * d', 'z * a', 'a * z', 'i * c', 'c * d',
+            'i + d', 'd - c', 'c + z', 'i - i',
+            'i * 2 - 1', '-d', 'd / 2', 'c + 1.5', '-z',
+            'd[1, :]', 'd[:, 1]', 'i[2, 2] + d[1, 1] + c[0, 1]'
+        ]
+        interpreter = _interpreter_of(' '.join(
+            f'f{position}(i, d, z, c, a) {{ return {expression} }}'
+            for position, expression in enumerate(expressions)
+        ))
+        for position, expression in enumerate(expressions):
+            dense = [Variable(VariableType.MATRIX, variable.value.copy()) for variable in _matrices()]
+            expected = interpreter.call(f'f{position}', dense).value
+            result = interpreter.call(f'f{position}', _matrices()).value
+            self.assertEqual(np.asarray(expected).dtype, np.asarray(result).dtype, expression)
+            self.assertTrue(np.array_equal(expected, result), expression)
+            self.assertTrue(np.array_equal(np.signbit(expected), np.signbit(result)), expression)
+
+    def test_not_materialized(self):
+        """
+        Tests large structured matrices used without materializing them.
+        """
+        interpreter = _interpreter_of(
+            """
+            f(n) {
+                m = ident(n) * 3 + 1
+                s = size(m)
+                r = m[1, :]
+                return [s[0, 1], m[7, 7] + m[7, 8], r[0, 1]]
+            }
+            scaled(n) { d = diag(full(1, n, 2)) return d * ident(n) - 1 }
+            """
+        )
+        result = interpreter.call('f', [Variable(VariableType.NUMBER, 100000)])
+        self.assertEqual([[100000, 5, 4]], result.value.tolist())
+        scaled = interpreter.call('scaled', [Variable(VariableType.NUMBER, 100000)])
+        self.assertIsNotNone(pending(scaled))
+        self.assertEqual(1, scaled.structure.item(5, 5))
+        self.assertEqual(-1, scaled.structure.item(5, 6))
+
+    def test_materialized_on_modification(self):
+        """
+        Tests structured matrix materialized, when it is modified, with the
+        variables sharing it changed as well.
+        """
+        interpreter = _interpreter_of(
+            """
+            f() {
+                a = ident(2)
+                b = [0, 0; 0, 0]
+                b = a
+                b[0, 1] = 5
+                print(a)
+                return b
+            }
+            """
+        )
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = interpreter.call('f', [])
+        self.assertEqual([[1, 5], [0, 1]], result.value.tolist())
+        self.assertIsNone(pending(result))
+        self.assertIn('[[1. 5.]', output.getvalue())
+
+    def test_concurrent_materialization(self):
+        """
+        Tests variables sharing the structure read concurrently getting the same dense matrix.
+        """
+        structure = StructuredMatrix.identity(500)
+        variables = [StructuredVariable(structure) for _ in range(16)]
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            matrices = list(executor.map(lambda variable: variable.value, variables))
+        self.assertTrue(all(matrix is matrices[0] for matrix in matrices))
+        variables[0].value[0, 1] = 5
+        self.assertEqual(5, variables[-1].value[0, 1])
+        variables[0].value = np.zeros((1, 1))
+        self.assertIsNone(variables[0].structure)
+        self.assertEqual([[0]], variables[0].value.tolist())
+        self.assertEqual(1, variables[-1].value[0, 0])
+
+    def test_errors(self):
+        """
+        Tests errors of the structured matrices the same as of the dense ones.
+
+        Test cases are:
+            - Element out of the matrix
+            - Row out of the matrix
+            - Matrix dimensions mismatch
+        """
+        interpreter = _interpreter_of(
+            """
+            element(m) { return m[3, 0] }
+            row(m) { return m[-4, :] }
+            product(m) { return m * [1, 2] }
+            """
+        )
+        for identifier, exception in [('element', IndexException), ('row', IndexException),
+                                      ('product', MatrixDimensionsMismatchException)]:
+            errors = []
+            matrices = [StructuredVariable(StructuredMatrix.identity(3)), Variable(VariableType.MATRIX, np.identity(3))]
+            for matrix in matrices:
+                with self.assertRaises(exception) as context:
+                    interpreter.call(identifier, [matrix])
+                errors.append((str(getattr(context.exception, 'error', '')), context.exception.stack))
+            self.assertEqual(errors[1], errors[0])
+        with self.assertRaises(ValueError):
+            _interpreter_of('f() { return ident(-1) }').call('f', [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,247 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from execution.interpreter import Interpreter
+from execution.program import CompiledProgram
+from execution.tiering import FunctionTranslator
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+HOT = {'TIER_UP_CALLS': 1, 'TIER_UP_ITERATIONS': 1}
+INTERPRETED = {'TIER_UP_CALLS': None}
+REPLACED = {'OSR_ITERATIONS': 2}
+
+source = """
+fib(n) {
+    if (n < 2) {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+countdown(n) {
+    steps = 0
+    until (n > 0) {
+        n = n - 1
+        steps = steps + 1
+    }
+    return steps
+}
+inverse(x) { return 1 / x }
+half(x) { return x * 0.5 }
+describe(x) {
+    print(x)
+    return x
+}
+late(x) {
+    if (x) {
+        y = x
+    }
+    return y
+}
+fill(m) {
+    i = 0
+    total = 0
+    until (i < 4) {
+        m[0, i] = i * i
+        if (m[0, i] > 1) {
+            total = total + m[0, i]
+        }
+        i = i + 1
+    }
+    return total
+}
+inverses(m, k) {
+    i = 0
+    until (i < 4) {
+        m[0, i] = 1 / (k - i)
+        i = i + 1
+    }
+}
+buckets(m) {
+    i = 0
+    until (i < 2000) {
+        m[0, i / 400] = m[0, i / 400] + 1
+        i = i + 1
+    }
+}
+repeat(s) {
+    i = 0
+    until (i < 4) {
+        t = s
+        i = i + 1
+    }
+    return i
+}
+"""
+
+
+def _compiled(options):
+    return CompiledProgram(SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program(), options)
+
+
+def _number(value):
+    return Variable(VariableType.NUMBER, value)
+
+
+class TestFunctionTiers(unittest.TestCase):
+    def test_translated(self):
+        """
+        Tests results of the functions translated, when they are hot.
+
+        Test cases are:
+            - Recursive function
+            - Function with until statement
+        """
+        program = _compiled(HOT)
+        interpreter = Interpreter(None, None, program)
+        self.assertEqual(_number(55), interpreter.call('fib', [_number(10)]))
+        self.assertEqual(_number(4), interpreter.call('countdown', [_number(4)]))
+        self.assertIsNotNone(program.tiers.translated['fib'])
+        self.assertIsNotNone(program.tiers.translated['countdown'])
+        self.assertEqual(_number(89), interpreter.call('fib', [_number(11)]))
+
+    def test_not_translated(self):
+        """
+        Tests functions staying interpreted.
+
+        Test cases are:
+            - Library function called
+            - Variable read out of its scope
+            - Function called with matrices
+        """
+        program = _compiled(HOT)
+        interpreter = Interpreter(None, None, program)
+        matrix = Variable(VariableType.MATRIX, np.array([[2.0]]))
+        interpreter.call('describe', [_number(1)])
+        interpreter.call('late', [_number(1)])
+        interpreter.call('half', [matrix])
+        for identifier in ['describe', 'late', 'half']:
+            self.assertIsNone(program.tiers.translated[identifier])
+        self.assertEqual(_number(1.0), interpreter.call('half', [_number(2)]))
+
+    def test_deoptimized(self):
+        """
+        Tests calls evaluated by the interpreter, when translated code can not continue.
+
+        Test cases are:
+            - Argument of not observed type
+            - Division by zero
+        """
+        program = _compiled(HOT)
+        interpreter = Interpreter(None, None, program)
+        self.assertEqual(_number(1.0), interpreter.call('half', [_number(2)]))
+        self.assertIsNotNone(program.tiers.translated['half'])
+        matrix = Variable(VariableType.MATRIX, np.array([[2.0]]))
+        self.assertEqual(Variable(VariableType.MATRIX, np.array([[1.0]])), interpreter.call('half', [matrix]))
+        stacks = []
+        for options in [HOT, INTERPRETED]:
+            interpreter = Interpreter(None, None, _compiled(options))
+            interpreter.call('inverse', [_number(2)])
+            with self.assertRaises(ZeroDivisionException) as context:
+                interpreter.call('inverse', [_number(0)])
+            stacks.append(context.exception.stack)
+        self.assertEqual(stacks[1], stacks[0])
+
+    def test_assigned_parameters(self):
+        """
+        Tests numbers assigned to the parameters stored in the argument variables.
+        """
+        for options in [HOT, INTERPRETED]:
+            argument = _number(3)
+            Interpreter(None, None, _compiled(options)).call('countdown', [argument])
+            self.assertEqual(_number(0), argument)
+
+
+class TestOnStackReplacement(unittest.TestCase):
+    def test_replaced(self):
+        """
+        Tests loops continued by the translated ones with the same results.
+        """
+        for options in [REPLACED, INTERPRETED]:
+            program = _compiled(options)
+            matrix = np.zeros((1, 4))
+            result = Interpreter(None, None, program).call('fill', [Variable(VariableType.MATRIX, matrix)])
+            self.assertEqual(_number(13), result)
+            self.assertTrue(np.array_equal(np.array([[0.0, 1.0, 4.0, 9.0]]), matrix))
+        program = _compiled(REPLACED)
+        Interpreter(None, None, program).call('fill', [Variable(VariableType.MATRIX, np.zeros((1, 4)))])
+        self.assertIsNotNone(*program.tiers.loops.values())
+
+    def test_common_index_selectors(self):
+        """
+        Tests common expressions of the index selectors of the modified element.
+        """
+        for options in [REPLACED, INTERPRETED]:
+            matrix = np.zeros((1, 5), dtype=int)
+            Interpreter(None, None, _compiled(options)).call('buckets', [Variable(VariableType.MATRIX, matrix)])
+            self.assertEqual([[400, 400, 400, 400, 400]], matrix.tolist())
+
+    def test_translation_fault(self):
+        """
+        Tests loops continued by the interpreter, when the translated code fails,
+        but the interpreter does not.
+
+        Test cases are:
+            - Statement of the nested block failing
+            - Translated loop failing out of its statements
+        """
+        assignment = FunctionTranslator._FunctionTranslator__assignment
+
+        def failing_assignment(translator, assign_statement):
+            if assign_statement.identifier.name == 'total':
+                translator._FunctionTranslator__line('raise RuntimeError()')
+            assignment(translator, assign_statement)
+
+        translate_loop = FunctionTranslator.translate_loop
+
+        def failing_loop(translator, until_statement, variables):
+            def entry(*args):
+                raise RuntimeError()
+
+            translated = translate_loop(translator, until_statement, variables)
+            translated.entry = entry
+            return translated
+
+        for method, replacement in [('_FunctionTranslator__assignment', failing_assignment),
+                                    ('translate_loop', failing_loop)]:
+            program = _compiled(REPLACED)
+            matrix = np.zeros((1, 4))
+            with mock.patch.object(FunctionTranslator, method, replacement):
+                result = Interpreter(None, None, program).call('fill', [Variable(VariableType.MATRIX, matrix)])
+            self.assertEqual(_number(13), result)
+            self.assertTrue(np.array_equal(np.array([[0.0, 1.0, 4.0, 9.0]]), matrix))
+            self.assertIsNotNone(*program.tiers.loops.values())
+
+    def test_not_replaced(self):
+        """
+        Tests loops using variables other than numbers and matrices staying interpreted.
+        """
+        program = _compiled(REPLACED)
+        result = Interpreter(None, None, program).call('repeat', [Variable(VariableType.STRING, 'text')])
+        self.assertEqual(_number(4), result)
+        self.assertEqual([None], list(program.tiers.loops.values()))
+
+    def test_stack_trace(self):
+        """
+        Tests errors of the replaced loops reported the same way as by the interpreter.
+        """
+        stacks = []
+        matrices = []
+        for options in [REPLACED, INTERPRETED]:
+            program = _compiled(options)
+            matrix = Variable(VariableType.MATRIX, np.zeros((1, 4)))
+            with self.assertRaises(ZeroDivisionException) as context:
+                Interpreter(None, None, program).call('inverses', [matrix, _number(3)])
+            stacks.append(context.exception.stack)
+            matrices.append(matrix.value)
+        self.assertEqual(stacks[1], stacks[0])
+        self.assertTrue(np.array_equal(matrices[1], matrices[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import io
+import unittest
+import contextlib
+import numpy as np
+
+from execution.exception import *
+from execution.program import CompiledProgram
+from execution.variable import Variable, VariableType
+from execution.vectorize import vmap
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+source = """
+affine(x, w, b) { return w * x + b }
+norm(x) { return x[0, 0] * x[0, 0] + x[1, 0] * x[1, 0] }
+power(x, n) { i = 1 r = x until (i < n) { r = r * x i = i + 1 } return r }
+rectify(x) { if (x[0, 0] > 0) { return x } return x * 0 }
+clear(x) { x[0, :] = 0 return x }
+shape(x) { return size(x) }
+"""
+
+
+def compile_program():
+    return CompiledProgram.compile(SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))))
+
+
+class TestVmap(unittest.TestCase):
+    def setUp(self):
+        self.program = compile_program()
+        self.batch = np.array([[[1.0], [2.0]], [[-3.0], [4.0]], [[5.0], [-6.0]]])
+
+    def separate(self, identifier, arguments):
+        # Results of the separate calls of the function.
+        return vmap(self.program, identifier, arguments, not_liftable={(identifier, tuple(b for _, b in arguments))})
+
+    def test_lifted(self):
+        """
+        Tests functions evaluated once over the whole batch.
+
+        Test cases are:
+            - Matrix operations with not batched arguments
+            - Index operator reading batched matrix
+            - Loop controlled by not batched number
+            - Batched numbers
+        """
+        w, b = np.array([[1.0, 2.0], [3.0, 4.0]]), np.array([[1.0], [-1.0]])
+        cases = [
+            ('affine', [(Variable(VariableType.MATRIX, self.batch), True),
+                        (Variable(VariableType.MATRIX, w), False), (Variable(VariableType.MATRIX, b), False)]),
+            ('norm', [(Variable(VariableType.MATRIX, self.batch), True)]),
+            ('power', [(Variable(VariableType.MATRIX, np.arange(12.0).reshape(3, 2, 2)), True), (Variable(VariableType.NUMBER, 3), False)]),
+            ('affine', [(Variable(VariableType.NUMBER, np.array([1.0, 2.0, 3.0])), True),
+                        (Variable(VariableType.MATRIX, w), False), (Variable(VariableType.MATRIX, b), False)])
+        ]
+        for identifier, arguments in cases:
+            results, lifted = vmap(self.program, identifier, arguments)
+            expected, separate = self.separate(identifier, arguments)
+            self.assertTrue(lifted)
+            self.assertFalse(separate)
+            self.assertEqual(len(expected), len(results))
+            for result, expected_result in zip(results, expected):
+                self.assertEqual(expected_result.type, result.type)
+                self.assertTrue(np.allclose(expected_result.value, result.value))
+
+    def test_fallback(self):
+        """
+        Tests functions called for every batch item separately.
+
+        Test cases are:
+            - Condition depending on the batch
+            - Library function with batched argument
+            - Index operator assignment modifying the batch items
+        """
+        not_liftable = set()
+        results, lifted = vmap(self.program, 'rectify', [(Variable(VariableType.MATRIX, self.batch), True)],
+                               not_liftable=not_liftable)
+        self.assertFalse(lifted)
+        self.assertEqual({('rectify', (True,))}, not_liftable)
+        self.assertTrue(np.array_equal([[[1.0], [2.0]], [[0.0], [0.0]], [[5.0], [-6.0]]],
+                                       np.stack([result.value for result in results])))
+
+        results, lifted = vmap(self.program, 'shape', [(Variable(VariableType.MATRIX, self.batch), True)])
+        self.assertFalse(lifted)
+        self.assertTrue(all(np.array_equal([[2, 1]], result.value) for result in results))
+
+        results, lifted = vmap(self.program, 'clear', [(Variable(VariableType.MATRIX, self.batch), True)])
+        self.assertFalse(lifted)
+        self.assertTrue(np.array_equal(np.zeros(3), self.batch[:, 0, 0]))
+
+    def test_error(self):
+        """
+        Tests error reported the same way as by the separate call.
+        """
+        arguments = [(Variable(VariableType.MATRIX, self.batch), True),
+                     (Variable(VariableType.MATRIX, np.ones((3, 3))), False),
+                     (Variable(VariableType.NUMBER, 1), False)]
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(WithStackTraceException):
+                vmap(self.program, 'affine', arguments)
+
+    def test_batch_size(self):
+        """
+        Tests batched arguments of different sizes.
+        """
+        with self.assertRaises(ValueError):
+            vmap(self.program, 'affine', [(Variable(VariableType.MATRIX, self.batch), True),
+                                          (Variable(VariableType.NUMBER, np.ones(2)), True),
+                                          (Variable(VariableType.NUMBER, 1), False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
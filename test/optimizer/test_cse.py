@@ -0,0 +1,138 @@
+import unittest
+import numpy as np
+
+from optimizer.cse import CommonSubexpressionEliminator
+from syntax_tree.constructions import *
+from semantic.effects import PurityAnalyzer
+from execution.libraries import StandardLibrary
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from execution.variable import Variable, VariableType
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _program_of(source):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program()
+
+
+def _eliminated(source):
+    program = _program_of(source)
+    pure_functions = PurityAnalyzer.pure_functions(
+        program.functions_definitions,
+        StandardLibrary.pure_functions,
+        StandardLibrary.fresh_functions
+    )
+    return CommonSubexpressionEliminator.eliminate(
+        program,
+        pure_functions,
+        StandardLibrary.preserving_functions,
+        StandardLibrary.fresh_functions
+    )
+
+
+def _expression_of(source):
+    return _program_of(f'main() {{ a = {source} }}').functions_definitions['main'].statement_block.statements[0].expression
+
+
+class TestCommonSubexpressionEliminator(unittest.TestCase):
+    def test_reused(self):
+        """
+        Tests expressions reused in the statement block.
+
+        Test cases are:
+            - Expression bound to variable
+            - Expression used as operand
+            - Expression passed to function
+        """
+        program, eliminated = _eliminated(
+            """
+            main(a, x) {
+                g = transpose(a) * a
+                b = transpose(a) * a + x
+                print(transpose(a) * a)
+            }
+            """
+        )
+        statements = program.functions_definitions['main'].statement_block.statements
+        gram = _expression_of('transpose(a) * a')
+        self.assertEqual(CommonExpression(gram, '@0', True), statements[0].expression)
+        self.assertEqual(CommonExpression(gram, '@0', False), statements[1].expression.multiplicative_expressions[0])
+        self.assertEqual(CommonExpression(gram, '@0', True), statements[2].arguments[0])
+        self.assertEqual({'main': 2}, eliminated)
+
+    def test_changed_variables(self):
+        """
+        Tests expressions not reused after the variables they read may change.
+
+        Test cases are:
+            - Variable assigned
+            - Matrix modified with index operator
+            - Matrix passed to function modifying it
+            - Impure function called by expression
+        """
+        sources = [
+            'main(a) { b = a * 2 + 1 a = a * 3 c = a * 2 + 1 }',
+            'main() { a = [1, 2] b = a * 2 + 1 a[0, 0] = 2 c = a * 2 + 1 }',
+            'clear(m) { m[0, 0] = 0 } main() { a = [1, 2] b = a * 2 + 1 clear(a) c = a * 2 + 1 }',
+            'main() { b = cin() + 1 c = cin() + 1 }'
+        ]
+        for source in sources:
+            self.assertFalse(any(_eliminated(source)[1].values()))
+
+    def test_nested_blocks(self):
+        """
+        Tests expressions reused in the nested statement blocks.
+        """
+        _, eliminated = _eliminated(
+            'main(a) { if (a) { b = a * a c = a * a } else { b = a * a } }'
+        )
+        self.assertEqual({'main': 1}, eliminated)
+
+
+class TestEliminatedExecution(unittest.TestCase):
+    def test_results(self):
+        """
+        Tests results of the reused expressions.
+        """
+        program = CompiledProgram(_program_of(
+            """
+            gram(a, x) {
+                g = transpose(a) * a
+                b = transpose(a) * a + x
+                c = transpose(a) * a - x * 2
+                a[0, 0] = 5
+                d = transpose(a) * a
+                g[0, 0] = 0
+                return g + b + c + d
+            }
+            """
+        ))
+        a = np.array([[1.0, 2.0], [3.0, 4.0]])
+        x = np.ones((2, 2))
+        gram = a.T @ a
+        expected = gram + (gram + x) + (gram - x * 2)
+        expected[0, 0] -= gram[0, 0]
+        a_modified = a.copy()
+        a_modified[0, 0] = 5
+        expected += a_modified.T @ a_modified
+        result = Interpreter(None, None, program).call('gram', [
+            Variable(VariableType.MATRIX, a.copy()),
+            Variable(VariableType.MATRIX, x)
+        ])
+        self.assertEqual({'gram': 2}, dict(program.eliminated_evaluations))
+        self.assertTrue(np.array_equal(expected, result.value))
+
+    def test_loop_iterations(self):
+        """
+        Tests expressions computed again in every iteration of the loop.
+        """
+        program = CompiledProgram(_program_of(
+            'main() { s = 0 i = 0 until (i < 3) { s = s + i * i + i * i i = i + 1 } return s }'
+        ))
+        self.assertEqual(10, Interpreter(None, None, program).call('main', []).value)
+
+
+if __name__ == '__main__':
+    unittest.main()
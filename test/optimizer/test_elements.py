@@ -0,0 +1,136 @@
+import unittest
+import numpy as np
+
+from optimizer.elements import ElementIndexSpecializer
+from optimizer.inlining import FunctionInliner
+from syntax_tree.constructions import *
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+INTERPRETED = {'TIER_UP_CALLS': None}
+
+source = """
+increment(m, i, j) {
+    m[i, j] = m[i, j] + 1
+    return m[i, j]
+}
+element(m, i) { return m[0, i] }
+main(m, i) { return element(m, i) }
+assign(m, i, j) { m[i, j] = 1 }
+"""
+
+
+def _program_of(text):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(text))).construct_program()
+
+
+def _interpreters():
+    # Interpreter of the specialized program and the one of the program
+    # with the index operators only.
+    program = CompiledProgram(_program_of(source), INTERPRETED)
+    plain = Interpreter(None, None, program)
+    plain.program_functions = FunctionInliner.inline(program.parsed_program).functions_definitions
+    plain.checked_constructions = frozenset()
+    plain.scalar_expressions = {}
+    plain.dead_variables = {}
+    return Interpreter(None, None, program), plain
+
+
+def _number(value):
+    return Variable(VariableType.NUMBER, value)
+
+
+class TestElementIndexSpecializer(unittest.TestCase):
+    def test_specialized(self):
+        """
+        Tests index operators replaced by the element ones.
+
+        Test cases are:
+            - Element read and modified
+            - Row and column selected with dots
+            - Element of the inlined argument
+            - Index operator in the selector
+        """
+        program = ElementIndexSpecializer.specialize(FunctionInliner.inline(_program_of(
+            """
+            first(m) { return m[0, 1] }
+            main(m, i) {
+                m[i, 0] = m[0, i + 1] + first(m)
+                r = m[0, :] + m[:, m[0, 0]]
+            }
+            """
+        )))
+        statements = program.functions_definitions['main'].statement_block.statements
+        self.assertEqual(ElementIndex(Identifier('i'), NumberLiteral(0)), statements[0].identifier.index_operator)
+        read, inlined = statements[0].expression.multiplicative_expressions
+        self.assertIs(ElementIndex, type(read.index_operator))
+        self.assertEqual(
+            InlinedArgument('m', 0, ElementIndex(NumberLiteral(0), NumberLiteral(1))),
+            inlined.expression
+        )
+        row, column = statements[1].expression.multiplicative_expressions
+        self.assertIs(IndexOperator, type(row.index_operator))
+        self.assertIs(IndexOperator, type(column.index_operator))
+        self.assertIs(ElementIndex, type(column.index_operator.second_selector.index_operator))
+
+    def test_results(self):
+        """
+        Tests elements read and modified the same way as with the index operator.
+        """
+        results = []
+        for interpreter in _interpreters():
+            matrix = Variable(VariableType.MATRIX, np.array([[1.5, 2], [3, 4]]))
+            results.append([
+                interpreter.call('increment', [matrix, _number(1), _number(-1)]).value,
+                interpreter.call('main', [matrix, _number(1.0)]).value,
+                matrix.value.tolist()
+            ])
+        self.assertEqual(results[1], results[0])
+        self.assertEqual([5, 2, [[1.5, 2], [3, 5]]], results[0])
+
+    def test_read_only(self):
+        """
+        Tests read-only matrix copied, when its element is modified.
+        """
+        value = np.ones((2, 2))
+        value.flags.writeable = False
+        matrix = Variable(VariableType.MATRIX, value)
+        result = _interpreters()[0].call('increment', [matrix, _number(0), _number(0)])
+        self.assertEqual(2, result.value)
+        self.assertEqual(1, value[0, 0])
+
+    def test_errors(self):
+        """
+        Tests errors reported the same way as by the index operator.
+
+        Test cases are:
+            - Element out of the matrix
+            - Element out of the matrix modified
+            - Selector not being number
+            - Selector being matrix
+        """
+        calls = [
+            ('increment', [Variable(VariableType.MATRIX, np.ones((2, 2))), _number(2), _number(0)], IndexException),
+            ('main', [Variable(VariableType.MATRIX, np.ones((2, 2))), _number(5)], IndexException),
+            ('assign', [Variable(VariableType.MATRIX, np.ones((2, 2))), _number(3), _number(3)], IndexException),
+            ('increment', [Variable(VariableType.MATRIX, np.ones((2, 2))), Variable(VariableType.STRING, 'a'),
+                           _number(0)], InvalidTypeException),
+            ('increment', [Variable(VariableType.MATRIX, np.ones((2, 2))), Variable(VariableType.MATRIX, np.ones((1, 1))),
+                           _number(0)], InvalidTypeException)
+        ]
+        for identifier, args, exception in calls:
+            stacks = []
+            for interpreter in _interpreters():
+                with self.assertRaises(exception) as context:
+                    interpreter.call(identifier, args)
+                stacks.append(context.exception.stack)
+            self.assertEqual(stacks[1], stacks[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
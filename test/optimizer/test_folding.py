@@ -0,0 +1,155 @@
+import unittest
+import numpy as np
+
+from optimizer.folding import ConstantFolder
+from syntax_tree.constructions import *
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _program_of(source):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program()
+
+
+def _folded_statements(source):
+    program = ConstantFolder.fold(_program_of(source))
+    return program.functions_definitions['main'].statement_block.statements
+
+
+class TestConstantFolder(unittest.TestCase):
+    def test_expressions(self):
+        """
+        Tests folding of the constant expressions.
+
+        Test cases are:
+            - Arithmetic of numbers
+            - Constant operands before the variable
+            - Constant operands after the variable
+            - Negated number
+            - Operation raising error
+        """
+        statements = _folded_statements(
+            """
+            main() {
+                a = 2 * 3 + 1
+                b = 1 + 2 + a
+                c = a + 1 + 2
+                d = -(4 / 2)
+                e = 1 + "s"
+            }
+            """
+        )
+        self.assertEqual(NumberLiteral(7), statements[0].expression)
+        self.assertEqual(AdditiveExpression([NumberLiteral(3), Identifier('a')], ['+']), statements[1].expression)
+        self.assertEqual(
+            AdditiveExpression([Identifier('a'), NumberLiteral(1), NumberLiteral(2)], ['+', '+']),
+            statements[2].expression
+        )
+        self.assertEqual(NumberLiteral(-2), statements[3].expression)
+        self.assertEqual(type(statements[4].expression), AdditiveExpression)
+
+    def test_matrix_literals(self):
+        """
+        Tests matrix literals precomputed as read-only matrices.
+
+        Test cases are:
+            - Operand shared by all evaluations
+            - Matrix bound to variable
+            - Literal with variable element
+        """
+        statements = _folded_statements(
+            """
+            main() {
+                x = 1
+                a = x * [1, 2; 3, 4]
+                b = [1, 2] * 2
+                c = [x, 2]
+            }
+            """
+        )
+        operand = statements[1].expression.atomic_expressions[1]
+        self.assertEqual(ConstantMatrix(np.array([[1, 2], [3, 4]])), operand)
+        self.assertFalse(operand.value.flags.writeable)
+        self.assertEqual(ConstantMatrix(np.array([[2, 4]]), copied=True), statements[2].expression)
+        self.assertEqual(MatrixLiteral, type(statements[3].expression))
+
+    def test_unreachable_branches(self):
+        """
+        Tests removing branches never evaluated.
+
+        Test cases are:
+            - Always true condition
+            - Always false condition with else block
+            - Always false condition with else if
+            - Always false condition without else
+            - Until never iterating
+        """
+        statements = _folded_statements(
+            """
+            main() {
+                if (1 < 2) { a = 1 } else { a = 2 }
+                if (1 > 2 and 3) { b = 1 } else { b = 2 }
+                if (0) { c = 1 } else if (x) { c = 2 }
+                if ("") { d = 1 }
+                until (2 < 1) { e = 1 }
+            }
+            """
+        )
+        self.assertEqual(3, len(statements))
+        self.assertEqual(
+            IfStatement(NumberLiteral(1), StatementBlock([AssignStatement(Identifier('a'), NumberLiteral(1))])),
+            statements[0]
+        )
+        self.assertEqual(
+            IfStatement(NumberLiteral(1), StatementBlock([AssignStatement(Identifier('b'), NumberLiteral(2))])),
+            statements[1]
+        )
+        self.assertEqual(Identifier('x'), statements[2].condition)
+
+    def test_idempotent(self):
+        """
+        Tests folding of the folded program, repeated when it is compiled again.
+        """
+        folded = ConstantFolder.fold(_program_of(
+            'main() { a = [1, 2] * 2 + [1, 1] if (3 > 2) { print(a * [1; 2] + 1 + 2) } }'
+        ))
+        self.assertEqual(folded, ConstantFolder.fold(folded))
+
+
+class TestFoldedExecution(unittest.TestCase):
+    def test_constant_not_modified(self):
+        """
+        Tests modifying the matrix assigned from the constant in the loop.
+        """
+        program = CompiledProgram(_program_of(
+            """
+            main() {
+                s = 0
+                i = 0
+                until (i < 3) {
+                    m = [1, 2; 3, 4] * 2
+                    m[0, 0] = m[0, 0] + i
+                    s = s + m[0, 0]
+                    i = i + 1
+                }
+                return s
+            }
+            """
+        ))
+        self.assertEqual(9, Interpreter(None, None, program).call('main', []).value)
+
+    def test_aliasing_preserved(self):
+        """
+        Tests variables assigned from the same literal not sharing the matrix.
+        """
+        program = CompiledProgram(_program_of(
+            'main() { a = [1, 2] b = [1, 2] b[0, 0] = 5 return a }'
+        ))
+        self.assertTrue(np.array_equal(np.array([[1, 2]]), Interpreter(None, None, program).call('main', []).value))
+
+
+if __name__ == '__main__':
+    unittest.main()
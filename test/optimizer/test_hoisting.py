@@ -0,0 +1,186 @@
+import unittest
+import numpy as np
+
+from optimizer.hoisting import LoopInvariantHoister
+from syntax_tree.constructions import *
+from semantic.effects import PurityAnalyzer
+from execution.libraries import StandardLibrary
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from execution.variable import Variable, VariableType
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _program_of(source):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program()
+
+
+def _hoisted(source):
+    program = _program_of(source)
+    pure_functions = PurityAnalyzer.pure_functions(
+        program.functions_definitions,
+        StandardLibrary.pure_functions,
+        StandardLibrary.fresh_functions
+    )
+    return LoopInvariantHoister.hoist(
+        program,
+        pure_functions,
+        StandardLibrary.preserving_functions,
+        StandardLibrary.fresh_functions
+    )
+
+
+def _loop_of(program, function='main'):
+    statements = program.functions_definitions[function].statement_block.statements
+    return next(statement for statement in statements if type(statement) is UntilStatement)
+
+
+class _CountingInterpreter(Interpreter):
+    def __init__(self, program):
+        super().__init__(None, None, program)
+        self.rows = 0
+
+    def evaluate_function_call(self, function_call):
+        if function_call.identifier == 'rows':
+            self.rows += 1
+        super().evaluate_function_call(function_call)
+
+
+class TestLoopInvariantHoister(unittest.TestCase):
+    def test_invariants(self):
+        """
+        Tests hoisting of the invariant operands.
+
+        Test cases are:
+            - Pure function call in condition
+            - Invariant product in body
+            - Expression reading variable assigned in loop
+            - Matrix modified with index operator
+            - Value assigned to variable
+        """
+        loop = _loop_of(_hoisted(
+            """
+            main() {
+                m = [1, 2; 3, 4]
+                n = [1; 1]
+                i = 0
+                until (i < size(n) * 2) {
+                    s = m * n + i
+                    t = m[0, 0] + n[0, 0]
+                    k = size(n)
+                    m[0, 0] = i
+                    i = i + 1
+                }
+            }
+            """
+        ))
+        self.assertEqual(('$0', '$1'), loop.invariants)
+        self.assertEqual(
+            RelationCondition(False, Identifier('i'), '<', LoopInvariant(
+                MultiplicativeExpression([FunctionCall('size', [Identifier('n')]), NumberLiteral(2)], ['*']), '$0'
+            )),
+            loop.condition
+        )
+        statements = loop.statement_block.statements
+        self.assertEqual(_program_of('main() { s = m * n + i }').functions_definitions['main'].statement_block.statements[0],
+                         statements[0])
+        self.assertEqual(LoopInvariant(Identifier('n', IndexOperator(NumberLiteral(0), NumberLiteral(0))), '$1'),
+                         statements[1].expression.multiplicative_expressions[1])
+        self.assertEqual(FunctionCall('size', [Identifier('n')]), statements[2].expression)
+
+    def test_shared_matrices(self):
+        """
+        Tests matrices possibly modified through the other variables.
+
+        Test cases are:
+            - Matrix modified through variable sharing it
+            - Matrix passed to function modifying it
+            - Matrix passed to print
+        """
+        self.assertFalse(_loop_of(_hoisted(
+            'main() { a = [1, 2] b = a i = 0 until (i < 3) { s = s + a * 2 b[0, 0] = i i = i + 1 } }'
+        )).invariants)
+        self.assertFalse(_loop_of(_hoisted(
+            'clear(m) { m[0, 0] = 0 } '
+            'main() { a = [1, 2] i = 0 until (i < 3) { s = s + a * 2 clear(a) i = i + 1 } }'
+        ), 'main').invariants)
+        self.assertEqual(('$0',), _loop_of(_hoisted(
+            'main() { a = [1, 2] i = 0 until (i < 3) { s = s + a * 2 print(a) i = i + 1 } }'
+        )).invariants)
+
+    def test_nested_loops(self):
+        """
+        Tests invariants of the nested loop computed again for every outer iteration.
+        """
+        program = CompiledProgram(_program_of(
+            """
+            main() {
+                s = 0
+                i = 0
+                until (i < 3) {
+                    j = 0
+                    until (j < 2) {
+                        s = s + (i + 1) * 10
+                        j = j + 1
+                    }
+                    i = i + 1
+                }
+                return s
+            }
+            """
+        ))
+        self.assertTrue(_loop_of(program.program).statement_block.statements[1].invariants)
+        self.assertEqual(120, Interpreter(None, None, program).call('main', []).value)
+
+
+class TestHoistedExecution(unittest.TestCase):
+    source = """
+    rows(m) {
+        shape = size(m)
+        return shape[0, 0]
+    }
+
+    main(n) {
+        m = full(2, 2, 1)
+        i = 0
+        s = 0
+        until (i < n and i < rows(m) * 10) {
+            s = s + m[0, 0] * 2
+            i = i + 1
+        }
+        return s
+    }
+    """
+
+    def test_evaluated_once(self):
+        """
+        Tests invariant evaluated once per loop execution.
+        """
+        interpreter = _CountingInterpreter(CompiledProgram(_program_of(self.source)))
+        self.assertEqual(10, interpreter.call('main', [Variable(VariableType.NUMBER, 5)]).value)
+        self.assertEqual(1, interpreter.rows)
+
+    def test_not_iterating(self):
+        """
+        Tests invariant never evaluated, when the loop does not iterate.
+        """
+        interpreter = _CountingInterpreter(CompiledProgram(_program_of(self.source)))
+        self.assertEqual(0, interpreter.call('main', [Variable(VariableType.NUMBER, 0)]).value)
+        self.assertEqual(0, interpreter.rows)
+
+    def test_matrix_result(self):
+        """
+        Tests matrix computed by the invariant not shared with the variables.
+        """
+        program = CompiledProgram(_program_of(
+            'main(a) { b = full(2, 2, 0) i = 0 until (i < 2) { b = a * 2 + 1 b[0, 0] = 0 i = i + 1 } return b }'
+        ))
+        self.assertTrue(_loop_of(program.program).invariants)
+        result = Interpreter(None, None, program).call('main', [Variable(VariableType.MATRIX, np.ones((2, 2)))])
+        self.assertTrue(np.array_equal(np.array([[0, 3], [3, 3]]), result.value))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import numpy as np
+
+from optimizer.inlining import FunctionInliner
+from syntax_tree.constructions import *
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+NOT_INLINED = {'INLINE_MAX_SIZE': 0}
+
+
+def _program_of(source):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program()
+
+
+def _main_statements(source, options=None):
+    program = FunctionInliner.inline(_program_of(source), options)
+    return program.functions_definitions['main'].statement_block.statements
+
+
+def _called(source, args, options=None):
+    program = CompiledProgram(_program_of(source), options)
+    return Interpreter(None, None, program).call('main', args)
+
+
+class TestFunctionInliner(unittest.TestCase):
+    def test_inlined(self):
+        """
+        Tests calls replaced by the expressions of the functions.
+
+        Test cases are:
+            - Parameters read as arguments
+            - Parameter with index operator
+            - Nested inlined call
+        """
+        statements = _main_statements(
+            """
+            sum(a, b) { return a + b }
+            first(m) { return m[0, :] }
+            twice(x) { return sum(x, x) }
+            main(p) { c = sum(p, 2) d = first(p) e = twice(p) }
+            """
+        )
+        self.assertEqual(InlinedCall(
+            FunctionCall('sum', [Identifier('p'), NumberLiteral(2)]),
+            AdditiveExpression([InlinedArgument('a', 0), InlinedArgument('b', 1)], ['+'])
+        ), statements[0].expression)
+        self.assertEqual(InlinedCall(
+            FunctionCall('first', [Identifier('p')]),
+            InlinedArgument('m', 0, IndexOperator(NumberLiteral(0), DotsSelect()))
+        ), statements[1].expression)
+        self.assertEqual(InlinedCall(
+            FunctionCall('twice', [Identifier('p')]),
+            InlinedCall(
+                FunctionCall('sum', [InlinedArgument('x', 0), InlinedArgument('x', 0)]),
+                AdditiveExpression([InlinedArgument('a', 0), InlinedArgument('b', 1)], ['+'])
+            )
+        ), statements[2].expression)
+
+    def test_not_inlined(self):
+        """
+        Tests calls left unchanged.
+
+        Test cases are:
+            - Recursive function
+            - Mutually recursive functions
+            - Function of many statements
+            - Function reading variable other than parameter
+            - Arguments not matching parameters
+            - Function exceeding size threshold
+        """
+        sources = [
+            'f(n) { return f(n - 1) } main() { a = f(1) }',
+            'f(n) { return g(n) } g(n) { return f(n) } main() { a = f(1) }',
+            'f(n) { b = n return b } main() { a = f(1) }',
+            'f(n) { return n + b } main() { a = f(1) }',
+            'f(n) { return n } main() { a = f(1, 2) }'
+        ]
+        for source in sources:
+            self.assertIs(FunctionCall, type(_main_statements(source)[0].expression))
+        statements = _main_statements('f(n) { return n + 1 } main() { a = f(1) }', {'INLINE_MAX_SIZE': 2})
+        self.assertIs(FunctionCall, type(statements[0].expression))
+
+    def test_depth_threshold(self):
+        """
+        Tests nested calls inlined up to the depth threshold.
+        """
+        source = 'f(n) { return n + 1 } g(n) { return f(n) } main() { a = g(1) b = f(1) }'
+        statements = _main_statements(source, {'INLINE_MAX_DEPTH': 1})
+        self.assertIs(FunctionCall, type(statements[0].expression))
+        self.assertIs(InlinedCall, type(statements[1].expression))
+
+
+class TestInlinedExecution(unittest.TestCase):
+    def test_results(self):
+        """
+        Tests results the same as the ones of the calls.
+
+        Test cases are:
+            - Numbers passed by value
+            - Matrix passed by reference and modified
+            - Nested inlined calls
+        """
+        source = """
+            same(m) { return m }
+            scale(m, k) { return m * k }
+            norm(m) { return scale(transpose(m), 2) * same(m) }
+            main(a) {
+                b = same(a)
+                b[0, 0] = 7
+                c = scale(a, 3)
+                n = 2
+                d = scale(n, n)
+                e = norm(a)
+                return [e[0, 0], c[0, 0], c[1, 0], d]
+            }
+        """
+        for options in [None, NOT_INLINED]:
+            a = np.array([[1.0], [2.0]])
+            result = _called(source, [Variable(VariableType.MATRIX, a)], options)
+            a_modified = np.array([[7.0], [2.0]])
+            expected = np.array([[106.0, 21.0, 6.0, 4.0]])
+            self.assertTrue(np.array_equal(expected, result.value))
+            self.assertTrue(np.array_equal(a_modified, a))
+
+    def test_stack_trace(self):
+        """
+        Tests errors of the inlined expressions reported the same way as the ones of the calls.
+        """
+        source = 'wrong(s) { return s + 1 } main() { a = wrong("text") }'
+        stacks = []
+        for options in [None, NOT_INLINED]:
+            with self.assertRaises(WithStackTraceException) as context:
+                _called(source, [], options)
+            stacks.append(context.exception.stack)
+        self.assertIn('evaluate function wrong', stacks[0])
+        self.assertEqual(stacks[1], stacks[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+from optimizer.printer import ProgramPrinter
+from execution.program import CompiledProgram
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _program_of(source):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program()
+
+
+class TestProgramPrinter(unittest.TestCase):
+    def test_parsed_again(self):
+        """
+        Tests printed program parsed into the same program.
+        """
+        program = _program_of(
+            """
+            f(a, b) {
+                c = -(a + b) * [1, 2; 3, a] - b / (2 - a)
+                if (!(a < b or b > 1) and c[0, :] == a) { print("$"text$"", c[:, 1]) }
+                else if (a) { { return } }
+                else { until (a + 1 < b) { a = a + 1 } }
+                return f(a, b)
+            }
+            """
+        )
+        self.assertEqual(program, _program_of(ProgramPrinter.print_program(program)))
+
+    def test_optimized(self):
+        """
+        Tests printing constants and invariants of the optimized program.
+        """
+        program = CompiledProgram(_program_of(
+            'main(m) { i = 0 s = 0 until (i < 10) { s = s + m * (2 * 3) i = i + 1 } }'
+        ))
+        self.assertEqual(
+            'main(m) {\n'
+            '    i = 0\n'
+            '    s = 0\n'
+            '    # hoisted $0 = m * 6\n'
+            '    until (i < 10) {\n'
+            '        s = s + $0\n'
+            '        i = i + 1\n'
+            '    }\n'
+            '}',
+            ProgramPrinter.print_program(program.program)
+        )
+
+
+    def test_common_expressions(self):
+        """
+        Tests printing common subexpressions before the statement computing them.
+        """
+        program = CompiledProgram(_program_of('main(a) { b = a * a + 1 if (b) { c = a * a d = a * a } }'))
+        self.assertEqual(
+            'main(a) {\n'
+            '    b = a * a + 1\n'
+            '    if (b) {\n'
+            '        # common @0 = a * a\n'
+            '        c = @0\n'
+            '        d = @0\n'
+            '    }\n'
+            '}',
+            ProgramPrinter.print_program(program.program)
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import io
+import unittest
+import contextlib
+
+from semantic.calls import CallResolver
+from execution.libraries import StandardLibrary
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _program_of(source):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program()
+
+
+class TestCallResolver(unittest.TestCase):
+    def test_targets(self):
+        """
+        Tests function calls bound to the called functions.
+
+        Test cases are:
+            - Recursive call
+            - Library function
+            - Program function hiding the library one
+            - Call in the arguments of the other call
+        """
+        library_functions = StandardLibrary.import_library()
+        functions_definitions = _program_of(
+            """
+            size(m) { return m }
+            f(n) { a = f(n - 1) print(size(n)) return ident(n) }
+            """
+        ).functions_definitions
+        statements = functions_definitions['f'].statement_block.statements
+        targets = CallResolver.targets_of(functions_definitions, library_functions)
+        self.assertIs(functions_definitions['f'], targets[id(statements[0].expression)])
+        self.assertIs(library_functions['print'], targets[id(statements[1])])
+        self.assertIs(functions_definitions['size'], targets[id(statements[1].arguments[0])])
+        self.assertIs(library_functions['ident'], targets[id(statements[2].expression)])
+
+
+class TestResolvedCalls(unittest.TestCase):
+    def test_results(self):
+        """
+        Tests resolved calls evaluated the same way as the calls by name.
+        """
+        program = CompiledProgram(_program_of(
+            """
+            fib(n) {
+                if (n < 2) { return n }
+                return fib(n - 1) + fib(n - 2)
+            }
+            size(m) { return m * 2 }
+            main(n) { return size(fib(n)) }
+            """
+        ), {'TIER_UP_CALLS': None})
+        interpreter = Interpreter(None, None, program)
+        self.assertEqual(110, interpreter.call('main', [Variable(VariableType.NUMBER, 10)]).value)
+
+    def test_undefined_function(self):
+        """
+        Tests call of the undefined function reported before the execution.
+        """
+        program = _program_of('f(x) { g() } main() { f(1) }')
+        with self.assertRaises(UndefinedFunctionException) as context:
+            CompiledProgram(program)
+        self.assertEqual('check function f', context.exception.stack[-1])
+        program = CompiledProgram(_program_of('f(x) { if (x) { g() } } main() { print(1) }'))
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(UndefinedFunctionException):
+                Interpreter(None, None, program).call('f', [Variable(VariableType.NUMBER, 1)])
+        with self.assertRaises(UndefinedFunctionException):
+            Interpreter(None, None, CompiledProgram(_program_of('main() { }'))).call('g', [])
+
+
+if __name__ == '__main__':
+    unittest.main()
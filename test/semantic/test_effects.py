@@ -0,0 +1,121 @@
+import unittest
+
+from semantic.effects import EffectsCollector, PurityAnalyzer, is_fresh_expression
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from syntax_tree.constructions import *
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _program_of(source):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program()
+
+
+class TestEffectsCollector(unittest.TestCase):
+    def test_effects_collection(self):
+        """
+        Tests effects collection of the function body.
+        """
+        program = _program_of(
+            """
+            main() {
+                a = b * c
+                if (d) {
+                    e[f, :] = g
+                } else {
+                    print(h)
+                }
+                until (i < 10) {
+                    i = i + 1
+                }
+            }
+            """
+        )
+        effects = EffectsCollector.collect(program.functions_definitions['main'])
+        self.assertEqual({'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i'}, effects.reads)
+        self.assertEqual({'a', 'i'}, effects.writes)
+        self.assertEqual({'e'}, effects.modifies)
+        self.assertEqual({'print'}, effects.calls)
+
+    def test_fresh_expressions(self):
+        """
+        Tests recognition of expressions evaluating into new matrices.
+
+        Test cases are:
+            - Identifier
+            - Identifier selecting all elements
+            - Identifier selecting single row
+            - Matrix literal
+            - Arithmetic expression
+            - Fresh function call
+            - Other function call
+        """
+        expressions = [
+            Identifier('a'),
+            Identifier('a', IndexOperator(DotsSelect(), DotsSelect())),
+            Identifier('a', IndexOperator(NumberLiteral(0), DotsSelect())),
+            MatrixLiteral([NumberLiteral(1)], []),
+            AdditiveExpression([Identifier('a'), Identifier('b')], ['+']),
+            FunctionCall('full', []),
+            FunctionCall('reshape', [])
+        ]
+        expected_results = [
+            False,
+            False,
+            True,
+            True,
+            True,
+            True,
+            False
+        ]
+        for expression, expected in zip(expressions, expected_results):
+            self.assertEqual(expected, is_fresh_expression(expression, ['full']))
+
+
+class TestPurityAnalyzer(unittest.TestCase):
+    def test_pure_functions(self):
+        """
+        Tests finding the pure functions of the program.
+
+        Test cases are:
+            - Arithmetic function is pure
+            - Function modifying its own matrix is pure
+            - Function printing is impure
+            - Function assigning to the parameter is impure
+            - Function modifying the parameter is impure
+            - Function modifying matrix sharing memory with parameter is impure
+            - Function calling impure function is impure
+            - Mutually recursive pure functions are pure
+        """
+        program = _program_of(
+            """
+            arithmetic(a, b) { return a * b + 1 }
+            own(n) {
+                m = full(1, n, 0)
+                m[0, 0] = n
+                return m
+            }
+            printing(a) { print(a) }
+            assigning(a) { a = a + 1 }
+            modifying(a) { a[0, 0] = 1 }
+            sharing(a) {
+                b = a
+                b[0, 0] = 1
+            }
+            calling(a) { return printing(a) }
+            even(n) {
+                if (n) { return odd(n - 1) }
+                return 1
+            }
+            odd(n) {
+                if (n) { return even(n - 1) }
+                return 0
+            }
+            """
+        )
+        pure = PurityAnalyzer.pure_functions(program.functions_definitions, ['full'], ['full'])
+        self.assertEqual({'arithmetic', 'own', 'even', 'odd', 'full'}, pure)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+import numpy as np
+
+from semantic.liveness import LivenessAnalyzer
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _program_of(source):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program()
+
+
+def _dead_by_statement(function_def):
+    dead = LivenessAnalyzer.dead_variables(function_def)
+    return [dead.get(id(statement), frozenset()) for statement in function_def.statement_block.statements]
+
+
+class TestLivenessAnalyzer(unittest.TestCase):
+    def test_straight_line(self):
+        """
+        Tests variables dead after the statements without control flow.
+
+        Test cases are:
+            - Variable dead after its last read
+            - Value overwritten before being read
+            - Parameter never dead
+            - Returned variable
+        """
+        program = _program_of(
+            """
+            f(p) {
+                a = p * 2
+                b = a + 1
+                c = b
+                c = a
+                print(c)
+                return b
+            }
+            """
+        )
+        self.assertEqual(
+            [set(), set(), {'c'}, {'a'}, {'c'}, {'b'}],
+            _dead_by_statement(program.functions_definitions['f'])
+        )
+
+    def test_until_statement(self):
+        """
+        Tests variables read by the next iterations of until statement.
+        """
+        program = _program_of(
+            """
+            main() {
+                m = [1, 2]
+                s = 0
+                i = 0
+                until (i < 10) {
+                    t = m * 2
+                    s = s + t[0, 0]
+                    i = i + 1
+                }
+                print(s)
+            }
+            """
+        )
+        main = program.functions_definitions['main']
+        self.assertEqual([set(), set(), set(), {'m', 'i', 't'}, {'s'}], _dead_by_statement(main))
+        body = main.statement_block.statements[3].statement_block.statements
+        dead = LivenessAnalyzer.dead_variables(main)
+        # Matrix is read again by the next iteration, temporary is not.
+        self.assertNotIn('m', dead.get(id(body[0]), set()))
+        self.assertEqual({'t'}, dead[id(body[1])])
+        self.assertNotIn(id(body[2]), dead)
+
+    def test_if_statement(self):
+        """
+        Tests variables read in one of the branches only.
+        """
+        program = _program_of(
+            """
+            main() {
+                a = [1]
+                b = [2]
+                if (1) { print(a) } else { print(b) }
+                print(b)
+            }
+            """
+        )
+        main = program.functions_definitions['main']
+        self.assertEqual([set(), set(), {'a'}, {'b'}], _dead_by_statement(main))
+        else_statement = main.statement_block.statements[2].else_statement
+        self.assertNotIn(id(else_statement.statements[0]), LivenessAnalyzer.dead_variables(main))
+
+
+class _ProbingInterpreter(Interpreter):
+    # Records the value of the variable, when the probe function is called.
+    def __init__(self, program, options=None):
+        super().__init__(None, options, program)
+        self.probed = []
+
+    def evaluate_function_call(self, function_call):
+        if function_call.identifier == 'probe':
+            self.probed.append(self.stack.find_variable('a').value)
+        super().evaluate_function_call(function_call)
+
+
+class TestReleasingVariables(unittest.TestCase):
+    source = """
+    probe() { }
+    main() {
+        a = full(2, 2, 1)
+        b = a * 2
+        probe()
+        a = b
+        return a
+    }
+    """
+
+    def test_released(self):
+        """
+        Tests matrix released after its last read, keeping its type.
+        """
+        interpreter = _ProbingInterpreter(CompiledProgram(_program_of(self.source)))
+        result = interpreter.call('main', [])
+        self.assertEqual([None], interpreter.probed)
+        self.assertTrue(np.array_equal(np.full((2, 2), 2), result.value))
+
+    def test_released_in_parallel(self):
+        """
+        Tests matrices released, when the statements are evaluated in parallel.
+
+        Test cases are:
+            - Matrix released after the pending statements are assigned
+            - Matrix assigned again after the release
+        """
+        interpreter = _ProbingInterpreter(CompiledProgram(_program_of(self.source)), {'PARALLEL_STATEMENTS': True})
+        result = interpreter.call('main', [])
+        self.assertEqual([None], interpreter.probed)
+        self.assertTrue(np.array_equal(np.full((2, 2), 2), result.value))
+        interpreter = Interpreter(None, {'PARALLEL_STATEMENTS': True}, CompiledProgram(_program_of(
+            'main() { a = [1] c = a * a x = [1] x = [2] return x + c }'
+        )))
+        self.assertEqual([[3]], interpreter.call('main', []).value.tolist())
+
+    def test_not_released(self):
+        """
+        Tests matrix kept, when releasing is disabled.
+        """
+        interpreter = _ProbingInterpreter(CompiledProgram(_program_of(self.source)), {'RELEASE_DEAD_VARIABLES': False})
+        interpreter.call('main', [])
+        self.assertTrue(np.array_equal(np.full((2, 2), 1), interpreter.probed[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
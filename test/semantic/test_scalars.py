@@ -0,0 +1,163 @@
+import unittest
+import numpy as np
+
+from semantic.scalars import ScalarExpressionsCollector
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+INTERPRETED = {'TIER_UP_CALLS': None}
+
+source = """
+count(n) {
+    i = 0
+    until (i < n) {
+        i = i + 1
+    }
+    return i
+}
+total(m) {
+    s = 0
+    i = 0
+    until (i < 3) {
+        s = s + m[0, i] * 2 - -m[0, i] / 4
+        i = i + 1
+    }
+    return s
+}
+element(m, i) {
+    return m[0, i]
+}
+divide(a, b) {
+    return a / b + 1
+}
+square(m) {
+    m[0, 0] = m[0, 0] * m[0, 0]
+    b = m[0, 0] * 10
+    m[0, 1] = b
+    return b
+}
+store(m, n) {
+    m[0, 0] = n * n * n
+}
+"""
+
+
+def _program_of(text):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(text))).construct_program()
+
+
+def _interpreters():
+    # Interpreter with the scalar fast path and the one without it.
+    program = CompiledProgram(_program_of(source), INTERPRETED)
+    plain = Interpreter(None, None, program)
+    plain.scalar_expressions = {}
+    return Interpreter(None, None, program), plain
+
+
+def _number(value):
+    return Variable(VariableType.NUMBER, value)
+
+
+class TestScalarExpressionsCollector(unittest.TestCase):
+    def test_collected(self):
+        """
+        Tests expressions collected as the scalar ones.
+
+        Test cases are:
+            - Arithmetic of identifiers and literals
+            - Relation of scalar expressions
+            - Expression with function call
+            - Expression with matrix literal
+            - Element of the matrix selected with dots
+        """
+        program = _program_of(
+            """
+            f(a, m) {
+                b = a * 2 + m[0, 1]
+                if (a < b) { print(a) }
+                c = sum(a) + 1
+                d = [a] * 2
+                e = m[:, 0] + 1
+            }
+            """
+        )
+        statements = program.functions_definitions['f'].statement_block.statements
+        scalars = ScalarExpressionsCollector.collect(program.functions_definitions)
+        self.assertIn(id(statements[0].expression), scalars)
+        self.assertIn(id(statements[1].condition), scalars)
+        for statement in statements[2:]:
+            self.assertNotIn(id(statement.expression), scalars)
+
+
+class TestScalarFastPath(unittest.TestCase):
+    def test_results(self):
+        """
+        Tests results of the fast path equal to the ones of the variables.
+        """
+        matrix = np.array([[1.5, 2, 4]])
+        results = []
+        for interpreter in _interpreters():
+            results.append([
+                interpreter.call('count', [_number(10)]).value,
+                interpreter.call('total', [Variable(VariableType.MATRIX, matrix)]).value,
+                interpreter.call('divide', [_number(3), _number(2)]).value
+            ])
+        self.assertEqual(results[1], results[0])
+        self.assertEqual([10, 16.875, 2.5], results[0])
+
+    def test_plain_numbers(self):
+        """
+        Tests elements of the matrices read as the plain Python numbers.
+        """
+        matrix = Variable(VariableType.MATRIX, np.array([[1.5, 2]]))
+        for interpreter in _interpreters():
+            self.assertIs(float, type(interpreter.call('element', [matrix, _number(0)]).value))
+            self.assertIs(float, type(interpreter.call('total', [Variable(VariableType.MATRIX, np.ones((1, 3)))]).value))
+
+    def test_integer_elements(self):
+        """
+        Tests elements of the integer matrices wrapping around as the NumPy integers.
+
+        Test cases are:
+            - Product of the elements exceeding the integer range
+            - Number exceeding the integer range stored in the matrix
+        """
+        for interpreter in _interpreters():
+            matrix = Variable(VariableType.MATRIX, np.array([[1000000000, 1]]))
+            with np.errstate(over='ignore'):
+                result = interpreter.call('square', [matrix]).value
+            self.assertIsInstance(result, np.int64)
+            self.assertEqual([[10 ** 18, 10 ** 19 - 2 ** 64]], matrix.value.tolist())
+            with self.assertRaises(IndexException):
+                interpreter.call('store', [matrix, _number(10 ** 9)])
+
+    def test_errors(self):
+        """
+        Tests errors reported the same way, when the fast path is left.
+
+        Test cases are:
+            - Division by zero
+            - Element out of the matrix
+            - Operand not being number
+        """
+        calls = [
+            ('divide', [_number(1), _number(0)], ZeroDivisionException),
+            ('total', [Variable(VariableType.MATRIX, np.ones((1, 2)))], IndexException),
+            ('count', [Variable(VariableType.STRING, 'a')], InvalidTypeException)
+        ]
+        for identifier, args, exception in calls:
+            stacks = []
+            for interpreter in _interpreters():
+                with self.assertRaises(exception) as context:
+                    interpreter.call(identifier, args)
+                stacks.append(context.exception.stack)
+            self.assertEqual(stacks[1], stacks[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+import io
+import unittest
+import contextlib
+
+from semantic.types import TypeChecker, StaticType, ANY_TYPES
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from execution.libraries import StandardLibrary
+from execution.program import CompiledProgram
+from execution.interpreter import Interpreter
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+
+def _program_of(source):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source))).construct_program()
+
+
+def _check(source):
+    return TypeChecker.check(_program_of(source).functions_definitions, StandardLibrary.result_types)
+
+
+class TestTypeChecker(unittest.TestCase):
+    def test_return_types(self):
+        """
+        Tests inference of the functions return types.
+
+        Test cases are:
+            - Literals of the different types
+            - Parameter of any type
+            - Expression of the parameter
+            - Recursive function
+            - Function without return statement
+            - Library function result
+        """
+        types = _check(
+            """
+            literal(a) { if (a) { return 1 } return "one" }
+            identity(a) { return a }
+            twice(a) { return a * 2 }
+            count(n) { if (n > 0) { return count(n - 1) + 1 } return 0 }
+            nothing() { a = 1 }
+            matrix() { return ident(3) }
+            """
+        )
+        expected = {
+            'literal': {VariableType.NUMBER, VariableType.STRING},
+            'identity': ANY_TYPES,
+            'twice': {VariableType.MATRIX, VariableType.SPARSE, VariableType.NUMBER},
+            'count': {VariableType.NUMBER},
+            'nothing': {VariableType.UNDEFINED},
+            'matrix': {VariableType.MATRIX}
+        }
+        for identifier, types_set in expected.items():
+            self.assertEqual(types_set, types.return_types[identifier].types)
+
+    def test_errors(self):
+        """
+        Tests type errors found before the execution.
+
+        Test cases are:
+            - Variable type change
+            - String and number addition
+            - Matrix dimensions mismatch
+            - Matrix division by matrix
+            - Comparison of the number and the matrix
+            - Index operator applied to the number
+            - Matrix literal rows of different lengths
+            - Undefined variable in the loop
+        """
+        sources = [
+            'main() { a = 1 a = "Lorem ipsum" }',
+            'main() { a = "Lorem ipsum" + 1 }',
+            'main() { a = [1, 2, 3] * [1, 2] }',
+            'main() { a = [1, 2] / [1, 2] }',
+            'main() { if (1 < [1]) { print(1) } }',
+            'main() { a = 1 a[0, 0] = 2 }',
+            'main() { a = [1, 2; 3] }',
+            'main() { i = 0 until (i < 3) { if (i > 0) { s = s + 1 } s = 1 i = i + 1 } }'
+        ]
+        errors = [
+            TypesMismatchException,
+            TypesMismatchException,
+            MatrixDimensionsMismatchException,
+            TypesMismatchException,
+            TypesMismatchException,
+            InvalidTypeException,
+            InvalidMatrixLiteralException,
+            UndefinedVariableException
+        ]
+        for source, error in zip(sources, errors):
+            types = _check(source)
+            self.assertEqual(1, len(types.errors), source)
+            self.assertIsInstance(types.errors[0], error)
+            self.assertEqual('check function main', types.errors[0].stack[-1])
+
+    def test_undefined_function(self):
+        """
+        Tests calls of the undefined functions reported, when library functions are given.
+        """
+        functions_definitions = _program_of(
+            'f(x) { return x } main() { a = f(1) if (a) { b = g(size(a)) } }'
+        ).functions_definitions
+        types = TypeChecker.check(functions_definitions, StandardLibrary.result_types, StandardLibrary.import_library())
+        self.assertEqual(1, len(types.errors))
+        self.assertIsInstance(types.errors[0], UndefinedFunctionException)
+        self.assertEqual(['check function g call', 'check assign statement'], types.errors[0].stack[:2])
+        self.assertEqual([], TypeChecker.check(functions_definitions, StandardLibrary.result_types).errors)
+
+    def test_no_errors(self):
+        """
+        Tests correct programs, which types are not known exactly.
+
+        Test cases are:
+            - Parameters of any types
+            - Variable initialized in one branch only
+            - Matrix changing its shape in the loop
+            - Variable read after the short-circuited condition
+        """
+        sources = [
+            'f(a, b) { return a * b + 1 }',
+            'main() { a = 0 if (a) { b = 1 } else { b = [1] } }',
+            'main() { m = [1, 2] i = 0 until (i < 2) { m = transpose(m) * m i = i + 1 } }',
+            'main() { if (1 or a) { a = 2 } print(a + 1) }'
+        ]
+        for source in sources:
+            self.assertEqual([], _check(source).errors, source)
+
+    def test_checked_constructions(self):
+        """
+        Tests constructions, which runtime type checks are proven to pass.
+        """
+        program = _program_of('f(a) { i = 0 until (i < a) { i = i + 1 } return a + i }')
+        statements = program.functions_definitions['f'].statement_block.statements
+        until_statement = statements[1]
+        increment = until_statement.statement_block.statements[0]
+        checked = TypeChecker.check(program.functions_definitions).checked
+        # Counter is always a number.
+        self.assertIn(id(increment), checked)
+        self.assertIn(id(increment.expression), checked)
+        # Parameter may be of any type.
+        self.assertNotIn(id(until_statement.condition), checked)
+        self.assertNotIn(id(statements[2].expression), checked)
+
+    def test_static_type_join(self):
+        """
+        Tests joining the static types.
+        """
+        matrix = StaticType([VariableType.MATRIX], (2, 3))
+        self.assertEqual(StaticType([VariableType.MATRIX], (2, None)),
+                         matrix.join(StaticType([VariableType.MATRIX], (2, 4))))
+        self.assertEqual(StaticType([VariableType.MATRIX, VariableType.NUMBER], (2, 3)),
+                         matrix.join(StaticType([VariableType.NUMBER])))
+
+
+class TestCompiledProgramTypes(unittest.TestCase):
+    def test_error_before_execution(self):
+        """
+        Tests type error reported before any statement is executed.
+        """
+        parser = SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(
+            'main() { print("Lorem ipsum") loop() } loop() { i = 0 i = i + "1" until (i < 10) { i = i + 1 } }'
+        )))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            with self.assertRaises(TypesMismatchException):
+                Interpreter(parser).execute()
+        self.assertEqual('', output.getvalue())
+
+    def test_error_never_executed(self):
+        """
+        Tests type errors of the constructions, which may be not executed, reported at runtime.
+
+        Test cases are:
+            - Branch, which is never taken
+            - Statement after the return statement of the branch
+            - Function, which is never called
+            - Function called in the branch
+        """
+        sources = [
+            'main() { a = [1, 2; 3, 4] b = [1, 2, 3] i = 0 if (i) { c = a * b } print(1) }',
+            'main() { f(0) print(1) } f(i) { if (i == 0) { return 0 } return 1 + "1" }',
+            'main() { print(1) } f() { return 1 + "1" }',
+            'main() { i = 0 if (i) { f() } print(1) } f() { return 1 + "1" }'
+        ]
+        for source in sources:
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                Interpreter(SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source)))).execute()
+            self.assertEqual('1 \n\n', output.getvalue(), source)
+        parser = SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(
+            'main() { a = [1, 2; 3, 4] b = [1, 2, 3] i = 1 print(1) if (i) { c = a * b } }'
+        )))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(MatrixDimensionsMismatchException):
+                Interpreter(parser).execute()
+        self.assertEqual('1 \n\n', output.getvalue())
+
+    def test_checked_execution(self):
+        """
+        Tests execution with the runtime checks skipped.
+        """
+        program = CompiledProgram(_program_of(
+            'f(n) { i = 0 s = 0 until (i < n) { s = s + i * 2 i = i + 1 } return s }'
+        ))
+        self.assertTrue(program.checked_constructions)
+        self.assertEqual(90, Interpreter(None, None, program).call('f', [Variable(VariableType.NUMBER, 10)]).value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from server.cache import ProgramCache
+from syntactic.exception import SyntacticException
+
+
+class TestProgramCache(unittest.TestCase):
+    def test_cache_hits(self):
+        """
+        Tests that the same source code is compiled only once.
+        """
+        cache = ProgramCache(2)
+        program, cached = cache.compile('main() { return 1 }')
+        self.assertFalse(cached)
+        same_program, cached = cache.compile('main() { return 1 }')
+        self.assertTrue(cached)
+        self.assertIs(program, same_program)
+
+    def test_cache_eviction(self):
+        """
+        Tests that the least recently used program is evicted.
+        """
+        cache = ProgramCache(2)
+        cache.compile('main() { return 1 }')
+        cache.compile('main() { return 2 }')
+        cache.compile('main() { return 1 }')
+        cache.compile('main() { return 3 }')
+        self.assertEqual(2, len(cache))
+        self.assertTrue(cache.compile('main() { return 1 }')[1])
+        self.assertFalse(cache.compile('main() { return 2 }')[1])
+
+    def test_compiler_options(self):
+        """
+        Tests that the same source code compiled with other options is compiled again.
+        """
+        cache = ProgramCache(2)
+        program, _ = cache.compile('main() { return 1 }')
+        inlined, cached = cache.compile('main() { return 1 }', {'INLINE_MAX_SIZE': 0})
+        self.assertFalse(cached)
+        self.assertEqual({'INLINE_MAX_SIZE': 0}, inlined.options)
+        self.assertIs(inlined, cache.compile('main() { return 1 }', {'INLINE_MAX_SIZE': 0})[0])
+        self.assertIs(program, cache.compile('main() { return 1 }')[0])
+
+    def test_invalid_program(self):
+        """
+        Tests that invalid programs are not cached and their exceptions
+        contain the program source.
+        """
+        cache = ProgramCache(2)
+        with self.assertRaises(SyntacticException) as context:
+            cache.compile('main() { a = = 1 }')
+        context.exception.source.set_position(0)
+        self.assertEqual('main() { a = = 1 }', context.exception.source.get_line())
+        self.assertEqual(0, len(cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
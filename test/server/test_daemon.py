@@ -0,0 +1,154 @@
+import os
+import asyncio
+import unittest
+import tempfile
+import threading
+import concurrent.futures
+from unittest import mock
+
+from server.daemon import InterpreterServer
+from server.job import SUCCESS_STATUS, ERROR_STATUS, INVALID_REQUEST_STATUS, TIMEOUT_STATUS
+from server.capture import installed_streams
+from server.client import request
+
+
+class TestInterpreterServer(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, 'server.sock')
+        self.server = InterpreterServer(self.socket_path, {'MAX_CONCURRENCY': 2, 'TIMEOUT': 5.0})
+        self.streams = installed_streams()
+        self.streams.__enter__()
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self.task = None
+
+        def serve():
+            asyncio.set_event_loop(self.loop)
+            self.task = self.loop.create_task(self.server.serve_forever(started.set))
+            try:
+                self.loop.run_until_complete(self.task)
+            except asyncio.CancelledError:
+                pass
+
+        self.thread = threading.Thread(target=serve)
+        self.thread.start()
+        started.wait()
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join()
+        self.loop.close()
+        self.streams.__exit__(None, None, None)
+        self.directory.cleanup()
+
+    def __request(self, **message):
+        return request(self.socket_path, message)
+
+    def test_program_execution(self):
+        """
+        Tests execution of programs given by source and path.
+        """
+        source = 'main() { print([1, 2] * 2) }'
+        response = self.__request(source=source)
+        self.assertEqual(SUCCESS_STATUS, response['status'])
+        self.assertEqual('[[2 4]] \n\n', response['stdout'])
+        self.assertEqual('', response['stderr'])
+        self.assertFalse(response['cached'])
+
+        path = os.path.join(self.directory.name, 'program.txt')
+        with open(path, 'w') as file:
+            file.write(source)
+        response = self.__request(path=path)
+        self.assertEqual('[[2 4]] \n\n', response['stdout'])
+        self.assertTrue(response['cached'])
+
+    def test_program_input(self):
+        """
+        Tests that cin function reads the request input.
+        """
+        response = self.__request(source='main() { a = cin() b = cin() print(a * b) }', stdin='2\n3\n')
+        self.assertEqual(SUCCESS_STATUS, response['status'])
+        self.assertTrue(response['stdout'].endswith('6.0 \n\n'))
+
+    def test_program_errors(self):
+        """
+        Tests the errors reporting.
+
+        Test cases are:
+            - Syntactic error
+            - Execution error
+            - Missing program
+            - Invalid request
+        """
+        response = self.__request(source='main() {\n a = = 1 }')
+        self.assertEqual(ERROR_STATUS, response['status'])
+        self.assertIn(' a = = 1 }', response['stderr'])
+
+        response = self.__request(source='main() { a = 1 / 0 }')
+        self.assertEqual(ERROR_STATUS, response['status'])
+        self.assertTrue(response['stderr'].startswith('Error: Division by zero'))
+
+        response = self.__request(path=os.path.join(self.directory.name, 'missing.txt'))
+        self.assertEqual(INVALID_REQUEST_STATUS, response['status'])
+
+        response = self.__request(stdin='')
+        self.assertEqual(INVALID_REQUEST_STATUS, response['status'])
+
+    def test_unexpected_errors(self):
+        """
+        Tests that the response is written, when the request fails unexpectedly.
+
+        Test cases are:
+            - Runaway recursion of the program
+            - Failure of the request handling
+        """
+        response = self.__request(source='f(n) { return f(n + 1) } main() { print(f(0)) }')
+        self.assertEqual(ERROR_STATUS, response['status'])
+        self.assertTrue(response['stderr'].startswith('Error: RecursionError'))
+
+        with mock.patch.object(InterpreterServer, 'handle_request', side_effect=RuntimeError('failure')):
+            response = self.__request(source='main() { print(1) }')
+        self.assertEqual(ERROR_STATUS, response['status'])
+        self.assertEqual('Error: RuntimeError: failure\n', response['stderr'])
+
+    def test_parallel_output(self):
+        """
+        Tests that output of the statements evaluated by the worker threads is captured.
+        """
+        options = {'PARALLEL_STATEMENTS': True, 'PARALLEL_ARGUMENTS': True}
+        with mock.patch.dict(self.server.options, {'INTERPRETER_OPTIONS': options}):
+            response = self.__request(
+                source='main() { a = [1, 2; 3, 4] c = transpose(a) d = [1, 2] * [5; 6] e = transpose(1) }'
+            )
+        self.assertEqual(ERROR_STATUS, response['status'])
+        self.assertTrue(response['stderr'].startswith('Error: Transpose function must obtain a matrix'))
+
+    def test_timeout(self):
+        """
+        Tests that the execution exceeding timeout is cancelled, while
+        the other requests are still served.
+        """
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            endless = executor.submit(
+                self.__request, source='main() { a = 1 until (1) { a = a + 1 } }', timeout=0.2
+            )
+            response = executor.submit(self.__request, source='main() { print(1) }').result()
+            self.assertEqual(SUCCESS_STATUS, response['status'])
+            response = endless.result()
+        self.assertEqual(TIMEOUT_STATUS, response['status'])
+        self.assertTrue(response['stderr'].startswith('Error: Execution cancelled'))
+
+    def test_concurrent_requests(self):
+        """
+        Tests that concurrent requests outputs are not mixed.
+        """
+        sources = [f'main() {{ i = 0 until (i < 50) {{ print({n}) i = i + 1 }} }}' for n in range(6)]
+        with concurrent.futures.ThreadPoolExecutor(6) as executor:
+            responses = list(executor.map(lambda source: self.__request(source=source), sources))
+        for n, response in enumerate(responses):
+            self.assertEqual(f'{n} \n\n' * 50, response['stdout'])
+
+
+if __name__ == '__main__':
+    unittest.main()
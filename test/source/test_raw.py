@@ -10,6 +10,17 @@ class TestRawStringSource(unittest.TestCase):
             self.assertEqual(source.next_char(), char, 'Characters should match')
         self.assertEqual(source.next_char(), '', 'Expected empty char (EOF')
 
+    def test_source_get_line(self):
+        source = RawStringSource('first line\nsecond line\nthird')
+        source.set_position(0)
+        self.assertEqual(source.get_line(), 'first line\n', 'Lines should match')
+        self.assertEqual(source.get_line(), 'second line\n', 'Lines should match')
+        self.assertEqual(source.next_char(), 't', 'Characters should match')
+        source.set_position(13)
+        self.assertEqual(source.get_line(), 'cond line\n', 'Lines should match')
+        self.assertEqual(source.get_line(), 'third', 'Lines should match')
+        self.assertEqual(source.get_line(), '', 'Expected empty line (EOF)')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,107 @@
+import io
+import os
+import unittest
+import tempfile
+import contextlib
+import numpy as np
+
+import matlan
+from execution.exception import *
+from syntactic.exception import SyntacticException
+
+
+source = """
+scale(m, factor) { return m * factor }
+first(m) { return m[0, 0] }
+clear(m) { m[0, :] = 0 }
+greet(name) { print(name) }
+"""
+
+
+class TestModule(unittest.TestCase):
+    def test_load(self):
+        """
+        Tests loading module from the source code and from the file.
+        """
+        self.assertEqual(['scale', 'first', 'clear', 'greet'], matlan.load(source).functions)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'module.txt')
+            with open(path, 'w') as file:
+                file.write(source)
+            self.assertEqual(['scale', 'first', 'clear', 'greet'], matlan.load(path).functions)
+        with self.assertRaises(SyntacticException):
+            matlan.load('scale(m) { return = m }')
+        compiler_options = {'INLINE_MAX_SIZE': 0}
+        module = matlan.load(source, {'COMPILER_OPTIONS': compiler_options})
+        self.assertEqual(compiler_options, module.program.options)
+
+    def test_call(self):
+        """
+        Tests calling module functions.
+
+        Test cases are:
+            - Matrix and number arguments
+            - Vector argument
+            - Number result
+            - Function modifying its argument
+            - Function without result
+        """
+        module = matlan.load(source)
+        matrix = np.array([[1.0, 2.0], [3.0, 4.0]])
+        self.assertTrue(np.array_equal(matrix * 2.5, module.call('scale', matrix, 2.5)))
+        self.assertTrue(np.array_equal(np.array([[2, 4, 6]]), module.call('scale', np.array([1, 2, 3]), 2)))
+        self.assertEqual(1.0, module.call('first', matrix))
+
+        self.assertIsNone(module.call('clear', matrix))
+        self.assertTrue(np.array_equal(np.array([[0.0, 0.0], [3.0, 4.0]]), matrix))
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertIsNone(module.call('greet', 'Lorem ipsum'))
+        self.assertEqual('Lorem ipsum \n\n', output.getvalue())
+
+    def test_vmap(self):
+        """
+        Tests calling module function for every item of the batch.
+        """
+        module = matlan.load(source)
+        batch = np.arange(12.0).reshape(3, 2, 2)
+        self.assertTrue(np.array_equal(batch * 2, module.vmap('scale', batch, 2)))
+        self.assertTrue(np.array_equal(batch * np.array([1, 2, 3])[:, None, None],
+                                       module.vmap('scale', batch, np.array([1, 2, 3]), batched=(0, 1))))
+        self.assertTrue(np.array_equal([0.0, 4.0, 8.0], module.vmap('first', batch)))
+        with self.assertRaises(TypeError):
+            module.vmap('first', np.eye(2))
+
+    def test_shared_result(self):
+        """
+        Tests that matrices are returned without copying.
+        """
+        module = matlan.load('identity(m) { return m }')
+        matrix = np.ones((3, 3))
+        self.assertIs(matrix, module.call('identity', matrix))
+
+    def test_invalid_call(self):
+        """
+        Tests the errors of the calls.
+
+        Test cases are:
+            - Undefined function
+            - Arguments number mismatch
+            - Execution error
+            - Unsupported arguments
+        """
+        module = matlan.load(source)
+        with self.assertRaises(UndefinedFunctionException):
+            module.call('missing')
+        with self.assertRaises(FunctionArgumentsMismatchException):
+            module.call('scale', np.ones((2, 2)))
+        with self.assertRaises(MatrixDimensionsMismatchException):
+            module.call('scale', np.ones((2, 2)), np.ones((3, 3)))
+        for argument in [[1, 2], np.ones((2, 2, 2)), np.array(['a'])]:
+            with self.assertRaises(TypeError):
+                module.call('first', argument)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+import io
+import os
+import sys
+import runpy
+import unittest
+import tempfile
+import contextlib
+import importlib.util
+import numpy as np
+
+from transpiler.generator import ModuleGenerator
+from execution.interpreter import Interpreter
+from execution.variable import Variable, VariableType
+from execution.exception import *
+from lexical.analyzer import LexicalAnalyzer
+from syntactic.analyzer import SyntacticAnalyzer
+from data.source.pipeline import positional_string_source_pipe
+
+source = """
+scale(m, k) { return m * k }
+alias(m) {
+    b = m
+    m = [5, 6]
+    return b
+}
+scopes(x) {
+    y = 0
+    if (x) {
+        y = 1
+        z = 2
+        x = 2
+    }
+    z = 3
+    return [x, y, z]
+}
+rows(m) {
+    i = 0
+    total = 0
+    n = size(m)
+    until (i < n[0, 0]) {
+        m[i, :] = m[i, :] * 2
+        total = total + m[i, 0]
+        i = i + 1
+    }
+    return total
+}
+conditions(a, b) {
+    c = 0
+    if (a and b) { c = c + 1 }
+    if (a < b or !(a - b)) { c = c + 10 }
+    if (!a) { c = c + 100 } else if (b >= 2) { c = c + 1000 }
+    return c
+}
+fib(n) {
+    if (n < 2) { return n }
+    return fib(n - 1) + fib(n - 2)
+}
+nothing() { a = 1 }
+"""
+
+
+def _program_of(source_code):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source_code))).construct_program()
+
+
+@contextlib.contextmanager
+def _compiled(source_code):
+    # Module is imported from the file, like the deployed one.
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'compiled.py')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(ModuleGenerator.generate(_program_of(source_code)))
+        spec = importlib.util.spec_from_file_location('compiled', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+
+
+def _calls(module_or_interpreter, calls):
+    results = []
+    for identifier, arguments in calls:
+        args = [Variable(VariableType.MATRIX, argument.copy()) if isinstance(argument, np.ndarray)
+                else Variable(VariableType.NUMBER, argument) for argument in arguments]
+        results.append((module_or_interpreter.call(identifier, args), args))
+    return results
+
+
+class TestModuleGenerator(unittest.TestCase):
+    def test_results(self):
+        """
+        Tests results of the compiled functions the same as the interpreted ones.
+
+        Test cases are:
+            - Matrix passed by reference and aliased
+            - Variables of the nested scopes
+            - Index operator modifying argument
+            - Conditions of numbers and variables
+            - Recursive function
+            - Function without return statement
+        """
+        matrix = np.array([[1.0, 2.0], [3.0, 4.0]])
+        calls = [
+            ('scale', [matrix, 3]),
+            ('alias', [matrix]),
+            ('scopes', [0]),
+            ('scopes', [1]),
+            ('rows', [matrix]),
+            ('conditions', [0, 1]),
+            ('conditions', [2, 2]),
+            ('conditions', [3, 0]),
+            ('fib', [15]),
+            ('nothing', [])
+        ]
+        with _compiled(source) as module:
+            compiled = _calls(module, calls)
+        interpreted = _calls(Interpreter(_parser(source)), calls)
+        for (compiled_result, compiled_args), (result, args) in zip(compiled, interpreted):
+            self.assertEqual(result.type, compiled_result.type)
+            self.assertTrue(np.array_equal(result.value, compiled_result.value))
+            self.assertEqual(args, compiled_args)
+
+    def test_errors(self):
+        """
+        Tests errors of the compiled functions the same as the interpreted ones.
+        """
+        sources = {
+            'main() { a = 1 a = [1] }': TypesMismatchException,
+            'main() { a = b + 1 }': UndefinedVariableException,
+            'f(x) { return x } main() { a = f(1, 2) }': FunctionArgumentsMismatchException,
+            'main() { a = g(1) }': UndefinedFunctionException,
+            'main() { a = 1 / 0 }': ZeroDivisionException,
+            'main() { a = [1, 2; 3] }': InvalidMatrixLiteralException,
+            'main() { a = [1, 2] b = a[3, 3] }': IndexException,
+            'main() { a = 1 b = a[0, 0] }': InvalidTypeException,
+            'main() { a = [1, 2] * [3, 4] }': MatrixDimensionsMismatchException,
+            'main() { a = transpose(1) }': InvalidTypeException
+        }
+        for source_code, exception in sources.items():
+            with _compiled(source_code) as module:
+                with self.assertRaises(exception):
+                    module.call('main', [])
+            with self.assertRaises(exception):
+                Interpreter(_parser(source_code)).call('main', [])
+
+    def test_names(self):
+        """
+        Tests names of the program, which are not valid or are reserved in the module.
+
+        Test cases are:
+            - Function named like Python keyword
+            - Function named like function of the module
+            - Parameters named like locals of the module
+            - Duplicated parameters
+        """
+        source_code = """
+            pass(lambda) { return lambda + 1 }
+            call(s, value, rt) { return pass(s) * value * rt }
+            twice(a, a) { return a * 2 }
+        """
+        with _compiled(source_code) as module:
+            self.assertEqual(Variable(VariableType.NUMBER, 12), module.call('call', _numbers(1, 2, 3)))
+            self.assertEqual(Variable(VariableType.NUMBER, 6), module.call('twice', _numbers(1, 3)))
+
+    def test_script(self):
+        """
+        Tests compiled module executed as the script printing the same output as the interpreter.
+        """
+        source_code = 'main() { i = 0 until (i < 3) { print(fib(i), "x") i = i + 1 } }' + source
+        output = io.StringIO()
+        with _compiled(source_code) as module, contextlib.redirect_stdout(output):
+            runpy.run_path(module.__file__, run_name='__main__')
+        interpreted = io.StringIO()
+        with contextlib.redirect_stdout(interpreted):
+            Interpreter(_parser(source_code)).execute()
+        self.assertEqual(interpreted.getvalue(), output.getvalue())
+
+
+def _parser(source_code):
+    return SyntacticAnalyzer(LexicalAnalyzer(positional_string_source_pipe(source_code)))
+
+
+def _numbers(*values):
+    return [Variable(VariableType.NUMBER, value) for value in values]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,263 @@
+import keyword
+
+from syntax_tree.constructions import *
+from execution.libraries import StandardLibrary
+
+INDENT = '    '
+
+# Names of the generated module and of the locals of the generated
+# functions, which the program functions and parameters must not hide.
+RESERVED_NAMES = {'rt', 'FUNCTIONS', 'call', 's', 'value', 'args'}
+
+
+class ModuleGenerator:
+    """
+    Visitor generating the Python module from the parsed program.
+
+    Every program function is generated as the Python function, which
+    takes and returns the interpreter variables; statements are the
+    Python statements and expressions are evaluated by the functions of
+    the runtime (see transpiler.runtime), in the same order as by the
+    interpreter, so the module has the same results, side effects and
+    errors as the interpreted program. Calls are resolved when the
+    module is generated: calls with wrong number of arguments and calls
+    of undefined functions raise their errors once the arguments are
+    evaluated.
+
+    Module defines FUNCTIONS, mapping the names of the program functions
+    into the generated functions and their numbers of parameters, call
+    function, calling them like Interpreter.call, and executes the main
+    function, when it is run as the script.
+    """
+
+    def __init__(self, functions_definitions):
+        self.functions_definitions = functions_definitions
+        self.lines = []
+        self.depth = 0
+        self.result = None
+        # Names of the program functions mapped into the Python ones.
+        self.names = {}
+        for identifier in functions_definitions:
+            used = {*functions_definitions, *self.names.values()} - {identifier}
+            self.names[identifier] = _python_name(identifier, used)
+        self.library_functions = StandardLibrary.import_library()
+
+    @staticmethod
+    def generate(program, source_name=None):
+        """
+        Generates the Python module of the program.
+
+        :param program: parsed Program construction.
+        :param source_name: name of the program file mentioned by the module docstring.
+        :return: source code of the module.
+        """
+        generator = ModuleGenerator(program.functions_definitions)
+        program_name = f' {source_name}' if source_name is not None else ''
+        generator.lines.extend([
+            '"""',
+            f'Module compiled from the Mat-Lan program{program_name}.',
+            '"""',
+            'from transpiler import runtime as rt'
+        ])
+        program.accept(generator)
+        return '\n'.join(generator.lines) + '\n'
+
+    def __line(self, text):
+        self.lines.append(INDENT * self.depth + text)
+
+    def __text(self, construction):
+        construction.accept(self)
+        return self.result
+
+    def evaluate_program(self, program):
+        for function_def in program.functions_definitions.values():
+            self.lines.extend(['', ''])
+            function_def.accept(self)
+        self.lines.extend(['', '', 'FUNCTIONS = {'])
+        for identifier, function_def in program.functions_definitions.items():
+            self.lines.append(f'{INDENT}{identifier!r}: ({self.names[identifier]}, {len(function_def.parameters)}),')
+        self.lines.extend([
+            '}',
+            '',
+            '',
+            'def call(identifier, args):',
+            f'{INDENT}"""',
+            f'{INDENT}Calls the function of the module with already evaluated arguments.',
+            f'{INDENT}"""',
+            f'{INDENT}return rt.call(FUNCTIONS, identifier, args)',
+            '',
+            '',
+            "if __name__ == '__main__':",
+            f'{INDENT}rt.execute(FUNCTIONS)'
+        ])
+
+    def evaluate_function_definition(self, function_def):
+        names = [parameter.name for parameter in function_def.parameters]
+        parameters = {}
+        for name in names:
+            parameters[name] = _python_name(name, {*self.names.values(), *parameters.values()})
+        if len(parameters) == len(names):
+            self.__line(f'def {self.names[function_def.identifier]}({", ".join(parameters.values())}):')
+            self.depth += 1
+            scope = ', '.join(f'{name!r}: {python_name}' for name, python_name in parameters.items())
+            self.__line(f's = rt.Scopes({{{scope}}})')
+        else:
+            # Last of the duplicated parameters is bound, the same as by
+            # the interpreter.
+            self.__line(f'def {self.names[function_def.identifier]}(*args):')
+            self.depth += 1
+            self.__line(f's = rt.Scopes(dict(zip({names!r}, args)))')
+        statements = function_def.statement_block.statements
+        self.__statements(statements)
+        if not statements or type(statements[-1]) is not ReturnStatement:
+            self.__line('return rt.undefined()')
+        self.depth -= 1
+
+    def __statements(self, statements):
+        for statement in statements:
+            if type(statement) is FunctionCall:
+                self.__line(self.__text(statement))
+            else:
+                statement.accept(self)
+
+    def evaluate_statement_block(self, statement_block):
+        if not statement_block.statements:
+            self.__line('pass')
+            return
+        self.__line('with s.scope():')
+        self.depth += 1
+        self.__statements(statement_block.statements)
+        self.depth -= 1
+
+    def __nested_block(self, statement_block):
+        self.depth += 1
+        statement_block.accept(self)
+        self.depth -= 1
+
+    def evaluate_if_statement(self, if_statement, prefix='if'):
+        self.__line(f'{prefix} rt.truth({self.__text(if_statement.condition)}):')
+        self.__nested_block(if_statement.statement_block)
+        else_statement = if_statement.else_statement
+        if type(else_statement) is IfStatement:
+            self.evaluate_if_statement(else_statement, 'elif')
+        elif else_statement is not None:
+            self.__line('else:')
+            self.__nested_block(else_statement)
+
+    def evaluate_until_statement(self, until_statement):
+        self.__line(f'while rt.truth({self.__text(until_statement.condition)}):')
+        self.__nested_block(until_statement.statement_block)
+
+    def evaluate_return_statement(self, return_statement):
+        if return_statement.expression is None:
+            self.__line('return rt.undefined()')
+            return
+        self.__line(f'return {self.__text(return_statement.expression)}')
+
+    def evaluate_assign_statement(self, assign_statement):
+        identifier = assign_statement.identifier
+        expression = self.__text(assign_statement.expression)
+        if identifier.index_operator is None:
+            self.__line(f's[{identifier.name!r}] = {expression}')
+            return
+        # Types are checked before the selectors are evaluated.
+        first, second = self.__selectors(identifier.index_operator)
+        self.__line(f'value = {expression}')
+        self.__line(f'rt.modify(s.modified({identifier.name!r}, value), value, {first}, {second})')
+
+    def evaluate_function_call(self, function_call):
+        identifier = function_call.identifier
+        arguments = ', '.join(self.__text(argument) for argument in function_call.arguments)
+        function_def = self.functions_definitions.get(identifier)
+        if function_def is None:
+            function = 'rt.library' if identifier in self.library_functions else 'rt.undefined_function'
+            self.result = f'{function}({identifier!r}, [{arguments}])'
+        elif len(function_def.parameters) != len(function_call.arguments):
+            self.result = f'rt.mismatched({identifier!r}, {len(function_def.parameters)}, [{arguments}])'
+        else:
+            self.result = f'{self.names[identifier]}({arguments})'
+
+    def evaluate_additive_expression(self, add_expression):
+        functions = {'+': 'rt.add', '-': 'rt.subtract'}
+        self.__operations(add_expression.multiplicative_expressions, add_expression.operators, functions)
+
+    def evaluate_multiplicative_expression(self, mul_expression):
+        functions = {'*': 'rt.multiply', '/': 'rt.divide'}
+        self.__operations(mul_expression.atomic_expressions, mul_expression.operators, functions)
+
+    def __operations(self, operands, operators, functions):
+        # Operations are evaluated from left to right, each operand right
+        # before its operation.
+        text = self.__text(operands[0])
+        for operator, operand in zip(operators, operands[1:]):
+            text = f'{functions[operator]}({text}, {self.__text(operand)})'
+        self.result = text
+
+    def evaluate_negated_atomic_expression(self, expression):
+        self.result = f'rt.negate({self.__text(expression.atomic_expression)})'
+
+    def evaluate_or_condition(self, or_condition):
+        # Operands are either bools or variables, which are always true,
+        # the same as in the interpreter.
+        self.result = ' or '.join(self.__condition(condition, OrCondition) for condition in or_condition.and_conditions)
+
+    def evaluate_and_condition(self, and_condition):
+        self.result = ' and '.join(
+            self.__condition(condition, (OrCondition, AndCondition)) for condition in and_condition.rel_conditions
+        )
+
+    def __condition(self, condition, parenthesized):
+        # Conditions in parentheses may be the operands of the others.
+        text = self.__text(condition)
+        return f'({text})' if isinstance(condition, parenthesized) else text
+
+    def evaluate_relation_condition(self, rel_condition):
+        left = self.__text(rel_condition.left_expression)
+        if rel_condition.operator is None:
+            text = f'rt.boolean({left})'
+        else:
+            text = f'rt.compare({left}, {self.__text(rel_condition.right_expression)}, {rel_condition.operator!r})'
+        self.result = f'not {text}' if rel_condition.negated else text
+
+    def evaluate_matrix_literal(self, matrix_literal):
+        rows = [[]]
+        for index, expression in enumerate(matrix_literal.expressions):
+            if index > 0 and matrix_literal.separators[index - 1] == ';':
+                rows.append([])
+            rows[-1].append(self.__element(expression))
+        self.result = f'rt.matrix([{", ".join("[" + ", ".join(row) + "]" for row in rows)}])'
+
+    def __element(self, expression):
+        # Number literals need no type check.
+        if type(expression) is NumberLiteral:
+            return repr(expression.value)
+        if type(expression) is NegatedAtomicExpression and type(expression.atomic_expression) is NumberLiteral:
+            return repr(-expression.atomic_expression.value)
+        return f'rt.element({self.__text(expression)})'
+
+    def evaluate_number_literal(self, number_literal):
+        self.result = f'rt.number({number_literal.value!r})'
+
+    def evaluate_string_literal(self, string_literal):
+        self.result = f'rt.string({string_literal.value!r})'
+
+    def evaluate_identifier(self, identifier):
+        if identifier.index_operator is None:
+            self.result = f's[{identifier.name!r}]'
+            return
+        first, second = self.__selectors(identifier.index_operator)
+        self.result = f'rt.select(s.matrix({identifier.name!r}), {first}, {second})'
+
+    def __selectors(self, index_operator):
+        return self.__text(index_operator.first_selector), self.__text(index_operator.second_selector)
+
+    def evaluate_dots_select(self, _):
+        self.result = 'rt.dots()'
+
+
+def _python_name(name, used):
+    # Names of the program are kept, unless they are reserved.
+    python_name = name
+    while keyword.iskeyword(python_name) or python_name in RESERVED_NAMES or python_name in used:
+        python_name += '_'
+    return python_name
@@ -0,0 +1,406 @@
+"""
+Runtime of the modules compiled from the Mat-Lan programs.
+
+Compiled functions keep the variables in the Scopes, which open the
+scope for every statement block, the same way as the interpreter does,
+and evaluate the expressions with the functions below. Values are the
+interpreter variables, so matrices are passed by reference and numbers
+by value, and errors are the interpreter exceptions, raised when the
+types of the operands do not match. Stack traces of the errors are left
+empty, the Python traceback shows the failing function.
+"""
+import contextlib
+import numpy as np
+
+from execution import sparse
+from execution.variable import Variable, VariableType
+from execution.libraries import StandardLibrary
+from execution.scalars import matrix_element
+from execution.stacks import ScopeStack
+from execution.exception import *
+
+LIBRARY_FUNCTIONS = StandardLibrary.import_library()
+
+
+class Scopes(ScopeStack):
+    """
+    Variables of the compiled function call, initialized with the parameters.
+    """
+
+    def __getitem__(self, name):
+        # Matrix is passed by reference, simple types by value.
+        variable = self.get_variable(name)
+        if variable.type == VariableType.MATRIX or variable.type == VariableType.SPARSE:
+            return variable
+        return Variable(variable.type, variable.value)
+
+    def __setitem__(self, name, value):
+        _check_types_matching(self.get_variable(name), value, for_assignment=True)
+        self.set_variable(name, value)
+
+    @contextlib.contextmanager
+    def scope(self):
+        """
+        Opens the scope of the statement block.
+        """
+        self.open_scope()
+        yield
+        self.close_scope()
+
+    def matrix(self, name):
+        """
+        Returns the variable read with the index operator.
+
+        :param name: name of the variable.
+        :return: matrix variable.
+        :raise InvalidTypeException: variable is not a matrix.
+        """
+        variable = self.get_variable(name)
+        if variable.type != VariableType.MATRIX and variable.type != VariableType.SPARSE:
+            raise InvalidTypeException(variable.type)
+        return variable
+
+    def modified(self, name, value):
+        """
+        Returns the variable modified with the index operator.
+
+        :param name: name of the variable.
+        :param value: assigned variable.
+        :return: matrix variable.
+        :raise InvalidTypeException: variable is not a matrix or value is neither matrix nor number.
+        """
+        variable = self.get_variable(name)
+        if variable.type is VariableType.SPARSE:
+            # Only single elements of the sparse matrices are modified.
+            if value.type != VariableType.NUMBER:
+                raise InvalidTypeException(value.type)
+            return variable
+        if variable.type is not VariableType.MATRIX:
+            raise InvalidTypeException(variable.type)
+        if value.type not in [VariableType.MATRIX, VariableType.NUMBER]:
+            raise InvalidTypeException(value.type)
+        return variable
+
+
+def number(value):
+    return Variable(VariableType.NUMBER, value)
+
+
+def string(value):
+    return Variable(VariableType.STRING, value)
+
+
+def dots():
+    return Variable(VariableType.DOTS, None)
+
+
+def undefined():
+    return Variable(VariableType.UNDEFINED, None)
+
+
+def element(value):
+    """
+    Returns the number of the matrix literal.
+
+    :raise InvalidTypeException: value is not a number.
+    """
+    if value.type != VariableType.NUMBER:
+        raise InvalidTypeException(value.type)
+    return value.value
+
+
+def matrix(rows):
+    """
+    Creates the matrix of the literal.
+
+    :param rows: lists of the numbers.
+    :raise InvalidMatrixLiteralException: rows are not of the same length.
+    """
+    if any(len(row) != len(rows[0]) for row in rows):
+        raise InvalidMatrixLiteralException()
+    return Variable(VariableType.MATRIX, np.array(rows))
+
+
+def add(left, right):
+    _check_types_matching(left, right)
+    if left.type == VariableType.SPARSE or right.type == VariableType.SPARSE:
+        return sparse.combined(left, right, '+')
+    if left.type == VariableType.MATRIX and right.type == VariableType.MATRIX:
+        return Variable(VariableType.MATRIX, np.add(left.value, right.value))
+    return Variable(left.type, left.value + right.value)
+
+
+def subtract(left, right):
+    _check_types_matching(left, right)
+    if left.type == VariableType.SPARSE or right.type == VariableType.SPARSE:
+        return sparse.combined(left, right, '-')
+    if left.type == VariableType.MATRIX and right.type == VariableType.MATRIX:
+        return Variable(VariableType.MATRIX, np.add(left.value, np.negative(right.value)))
+    return Variable(left.type, left.value - right.value)
+
+
+def multiply(left, right):
+    _check_types_matching(left, right)
+    if left.type == VariableType.SPARSE or right.type == VariableType.SPARSE:
+        return sparse.combined(left, right, '*')
+    if left.type == VariableType.MATRIX and right.type == VariableType.MATRIX:
+        try:
+            return Variable(VariableType.MATRIX, np.matmul(left.value, right.value))
+        except ValueError:
+            raise MatrixDimensionsMismatchException(left.value.shape, right.value.shape)
+    return Variable(left.type, left.value * right.value)
+
+
+def divide(left, right):
+    _check_types_matching(left, right)
+    if right.type == VariableType.MATRIX or right.type == VariableType.SPARSE:
+        raise TypesMismatchException(left.type, right.type)
+    if right.type == VariableType.NUMBER and right.value == 0:
+        raise ZeroDivisionException()
+    if left.type == VariableType.SPARSE:
+        return sparse.combined(left, right, '/')
+    return Variable(left.type, left.value / right.value)
+
+
+def negate(value):
+    # Matrices are evaluated by reference, so the negated one is new.
+    if value.type == VariableType.MATRIX:
+        return Variable(VariableType.MATRIX, np.negative(value.value))
+    if value.type == VariableType.NUMBER:
+        return Variable(VariableType.NUMBER, - value.value)
+    if value.type == VariableType.SPARSE:
+        return Variable(VariableType.SPARSE, sparse.negated(value.value))
+    raise InvalidTypeException(value.type)
+
+
+def truth(result):
+    """
+    Casts the result of the condition into bool.
+
+    :param result: bool of the relation or the variable of the expression.
+    """
+    if type(result) is bool:
+        return result
+    return boolean(result)
+
+
+def boolean(value):
+    if value.type == VariableType.MATRIX:
+        return np.any(value.value)
+    if value.type == VariableType.NUMBER:
+        return value.value != 0
+    if value.type == VariableType.STRING:
+        return value.value != ''
+    if value.type == VariableType.SPARSE:
+        return np.any(value.value.data)
+    raise InvalidTypeException(value.type)
+
+
+def compare(left, right, operator):
+    if left.type in [VariableType.STRING, VariableType.SPARSE, VariableType.UNDEFINED]:
+        raise InvalidTypeException(left.type)
+    if right.type in [VariableType.STRING, VariableType.SPARSE, VariableType.UNDEFINED]:
+        raise InvalidTypeException(right.type)
+    if left.type != right.type:
+        raise TypesMismatchException(left, right)
+    if left.type == VariableType.MATRIX:
+        match operator:
+            case '<':
+                return np.all(np.less(left.value, right.value))
+            case '>':
+                return np.all(np.greater(left.value, right.value))
+            case '>=':
+                return np.all(np.greater_equal(left.value, right.value))
+            case '<=':
+                return np.all(np.less_equal(left.value, right.value))
+            case '==':
+                return np.array_equal(left.value, right.value)
+            case '!=':
+                return not np.array_equal(left.value, right.value)
+    match operator:
+        case '<':
+            return bool(left.value < right.value)
+        case '>':
+            return bool(left.value > right.value)
+        case '>=':
+            return bool(left.value >= right.value)
+        case '<=':
+            return bool(left.value <= right.value)
+        case '==':
+            return bool(left.value == right.value)
+        case '!=':
+            return bool(left.value != right.value)
+
+
+def select(variable, first, second):
+    """
+    Reads the matrix with the index operator.
+
+    :param variable: matrix variable, see Scopes.matrix.
+    :param first: row selector, number or dots.
+    :param second: column selector, number or dots.
+    """
+    _check_selectors(first, second)
+    try:
+        if first.type == VariableType.DOTS and second.type == VariableType.DOTS:
+            return variable
+        if variable.type == VariableType.SPARSE:
+            return _select_sparse(variable.value, first, second)
+        if first.type == VariableType.NUMBER and second.type == VariableType.DOTS:
+            return Variable(VariableType.MATRIX, np.array([variable.value[int(first.value), :]]))
+        if first.type == VariableType.DOTS and second.type == VariableType.NUMBER:
+            return Variable(VariableType.MATRIX, np.array([variable.value[:, int(second.value)]]))
+        return Variable(VariableType.NUMBER, variable.value[int(first.value), int(second.value)])
+    except IndexError as e:
+        raise IndexException(e)
+
+
+def modify(variable, value, first, second):
+    """
+    Modifies the matrix with the index operator.
+
+    :param variable: matrix variable, see Scopes.modified.
+    :param value: assigned matrix or number.
+    :param first: row selector, number or dots.
+    :param second: column selector, number or dots.
+    """
+    _check_selectors(first, second)
+    if variable.type == VariableType.SPARSE:
+        _modify_sparse(variable.value, value, first, second)
+        return
+    try:
+        if not variable.value.flags.writeable and not isinstance(variable.value, np.memmap):
+            # Read-only matrices are copied on write.
+            variable.value = variable.value.copy()
+        if first.type == VariableType.DOTS and second.type == VariableType.DOTS:
+            variable.value[:, :] = value.value
+        elif first.type == VariableType.NUMBER and second.type == VariableType.DOTS:
+            variable.value[int(first.value), :] = value.value
+        elif first.type == VariableType.DOTS and second.type == VariableType.NUMBER:
+            variable.value[:, int(second.value)] = value.value
+        else:
+            variable.value[int(first.value), int(second.value)] = value.value
+    except (IndexError, ValueError, OverflowError) as e:
+        raise IndexException(e)
+
+
+def library(identifier, args):
+    """
+    Calls the function of the standard library.
+
+    :param identifier: name of the library function.
+    :param args: list of argument variables.
+    :return: result variable.
+    """
+    # Functions without result, such as print, leave the last evaluated
+    # variable, the same way as in the interpreter.
+    context = _LibraryContext(args[-1] if args else undefined())
+    LIBRARY_FUNCTIONS[identifier](args, context)
+    return context.result
+
+
+def mismatched(identifier, expected, args):
+    raise FunctionArgumentsMismatchException(identifier, expected, len(args))
+
+
+def undefined_function(identifier, args):
+    raise UndefinedFunctionException(identifier)
+
+
+def call(functions, identifier, args):
+    """
+    Calls the function of the compiled module with already evaluated arguments.
+
+    :param functions: functions of the module mapped into their numbers of parameters.
+    :param identifier: name of the program or library function.
+    :param args: list of argument variables.
+    :return: variable returned by the function.
+    """
+    if identifier in functions:
+        function, parameters = functions[identifier]
+        if parameters != len(args):
+            raise FunctionArgumentsMismatchException(identifier, parameters, len(args))
+        return function(*args)
+    if identifier in LIBRARY_FUNCTIONS:
+        return library(identifier, args)
+    raise UndefinedFunctionException(identifier)
+
+
+def execute(functions):
+    """
+    Executes the main function of the compiled module, reporting its errors.
+
+    :param functions: functions of the module mapped into their numbers of parameters.
+    """
+    from exception.handler import ExceptionHandler
+    try:
+        if 'main' not in functions:
+            raise MissingMainException()
+        function, parameters = functions['main']
+        # Parameters of the main function are never bound.
+        function(*[undefined() for _ in range(parameters)])
+    except ExecutionException as e:
+        ExceptionHandler.handle_execution_exception(e)
+    finally:
+        for stream in _LibraryContext.streams:
+            stream.close()
+        _LibraryContext.streams.clear()
+
+
+class _LibraryContext:
+    # Library functions store their results in the interpreter, which is
+    # replaced by the context of the single call.
+    options = {'SHARED_MATRICES': {}}
+    # Rows streams opened by the module, closed when the program ends.
+    streams = []
+
+    def __init__(self, result):
+        self.result = result
+
+
+def _check_types_matching(left, right, for_assignment=False):
+    if for_assignment and left.type == VariableType.UNDEFINED and right.type != VariableType.UNDEFINED:
+        return
+    if left.type == VariableType.UNDEFINED or right.type == VariableType.UNDEFINED:
+        raise UndefinedVariableException()
+    if left.type == right.type:
+        return
+    # Matrix + Number and Matrix * Number is ok for expressions, but for
+    # assignment types must be the same on both sides.
+    if not for_assignment and left.type == VariableType.MATRIX and right.type == VariableType.NUMBER:
+        return
+    # Sparse matrix is combined with the number, and with the dense
+    # matrix on either side.
+    if not for_assignment and left.type == VariableType.SPARSE and \
+            right.type in [VariableType.MATRIX, VariableType.NUMBER]:
+        return
+    if not for_assignment and left.type == VariableType.MATRIX and right.type == VariableType.SPARSE:
+        return
+    raise TypesMismatchException(left.type, right.type)
+
+
+def _select_sparse(matrix, first, second):
+    if second.type == VariableType.DOTS:
+        return Variable(VariableType.MATRIX, np.array([matrix.row(int(first.value))]))
+    if first.type == VariableType.DOTS:
+        return Variable(VariableType.MATRIX, np.array([matrix.column(int(second.value))]))
+    return Variable(VariableType.NUMBER, matrix_element(matrix, int(first.value), int(second.value)))
+
+
+def _modify_sparse(matrix, value, first, second):
+    if first.type != VariableType.NUMBER:
+        raise InvalidTypeException(first.type)
+    if second.type != VariableType.NUMBER:
+        raise InvalidTypeException(second.type)
+    try:
+        matrix.set_item(int(first.value), int(second.value), value.value)
+    except (IndexError, ValueError, OverflowError) as e:
+        raise IndexException(e)
+
+
+def _check_selectors(first, second):
+    allowed_selector_types = [VariableType.DOTS, VariableType.NUMBER]
+    if first.type not in allowed_selector_types:
+        raise InvalidTypeException(first.type)
+    if second.type not in allowed_selector_types:
+        raise InvalidTypeException(second.type)